@@ -0,0 +1,26 @@
+"""
+Headless entry point for running scripts without the Tkinter UI.
+
+Shares the storage, models, interpreters and execution engine with the
+desktop application, but never imports tkinter, pygments or the fonts.
+
+Usage:
+    python cli.py run <script> [-e <endpoint or pattern>] [-g <group>] [-j <concurrency>] [--format text|jsonl]
+    python cli.py list scripts|endpoints
+    python cli.py enqueue <script> [-e <endpoint or pattern>] [-g <group>] [--priority <priority>]
+    python cli.py schedule add|list|remove ...
+    python cli.py queue
+    python cli.py daemon
+    python cli.py probe [-e <endpoint or pattern>] [-g <group>] [--sort <phase>] [--export <file>]
+    python cli.py query <endpoint or pattern> "<sql>" [-o <file>] [--order-by <columns>]
+    python cli.py copy <endpoint> <table or query> -o <file> | -i <file> | --to-endpoint <endpoint>
+
+Run `python cli.py <command> -h` for the options of each command.
+"""
+
+import sys
+
+from controller.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
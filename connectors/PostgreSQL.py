@@ -1,13 +1,430 @@
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+
 import psycopg2
 from psycopg2 import OperationalError
-from typing import Dict, Any, List
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, TRANSACTION_STATUS_UNKNOWN
+from typing import BinaryIO, Dict, Any, Callable, Iterator, List, Optional, Sequence, Tuple
 from .base_connector import BaseConnector
+from .sql import COPY_FORMATS, DEFAULT_ITERSIZE, RowStream
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_COPY_CHUNK = 1024 * 1024
+# Источник COPY, который считается запросом, а не именем таблицы
+_QUERY_START = re.compile(r"^\s*(\(|select\b|with\b|values\b|table\b)", re.IGNORECASE)
+
+
+@dataclass
+class CopyResult:
+    """
+    Итог COPY.
+
+    :param rows: Сколько строк скопировано (по данным сервера).
+    :param bytes: Сколько байт данных прошло через клиент.
+    :param elapsed: Длительность в секундах.
+    """
+
+    rows: int = 0
+    bytes: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Скорость в байтах в секунду."""
+        return self.bytes / self.elapsed if self.elapsed > 0 else 0.0
+
+    def summary(self) -> str:
+        """Строка для отчёта: строки, объём и скорость."""
+        mib = self.bytes / 1048576
+        return (f"{self.rows} строк, {mib:.1f} МиБ за {self.elapsed:.1f} с "
+                f"({self.throughput / 1048576:.1f} МиБ/с, {self.rows / max(self.elapsed, 1e-9):.0f} строк/с)")
+
+
+def quote_ident(name: str) -> str:
+    """Имя таблицы или столбца для SQL: `schema.table` -> `"schema"."table"`."""
+    return ".".join('"' + part.replace('"', '""') + '"' for part in name.split("."))
+
+
+def copy_sql(source: str, direction: str, copy_format: str = "csv", header: bool = True,
+             columns: Optional[Sequence[str]] = None) -> str:
+    """
+    Текст команды COPY.
+
+    :param source: Имя таблицы (`schema.table`) или запрос (только для выгрузки).
+    :param direction: `"out"` (TO STDOUT) или `"in"` (FROM STDIN).
+    :param copy_format: `csv`, `binary` или `text`.
+    :param header: Строка заголовка (только для CSV).
+    :param columns: Столбцы таблицы.
+    :raises ValueError: При неизвестном формате или запросе в качестве цели загрузки.
+    """
+    if copy_format not in COPY_FORMATS:
+        raise ValueError(f"Неизвестный формат COPY: {copy_format}")
+    if _QUERY_START.match(source):
+        if direction != "out":
+            raise ValueError("Загружать данные можно только в таблицу")
+        target = f"({source.strip().rstrip(';')})"
+    else:
+        target = quote_ident(source.strip())
+        if columns:
+            target += " (" + ", ".join(quote_ident(column) for column in columns) + ")"
+    options = f"FORMAT {copy_format}" + (", HEADER true" if copy_format == "csv" and header else "")
+    return f"COPY {target} {'TO STDOUT' if direction == 'out' else 'FROM STDIN'} WITH ({options})"
+
+
+class _ChunkWriter:
+    """
+    Файл для `copy_expert` при выгрузке: psycopg2 пишет данные по строке,
+    а в файл они уходят блоками по `chunk_size` байт с вызовом `progress`.
+    """
+
+    def __init__(self, target: BinaryIO, chunk_size: int, progress: Optional[Callable[[int, float], None]],
+                 started: float) -> None:
+        self.target = target
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self.started = started
+        self.bytes = 0
+        self._buffer = bytearray()
+
+    def write(self, data: Any) -> int:
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        self._buffer += data
+        if len(self._buffer) >= self.chunk_size:
+            self._flush(len(self._buffer) - len(self._buffer) % self.chunk_size)
+        return len(data)
+
+    def close(self) -> None:
+        """Дописывает остаток буфера."""
+        if self._buffer:
+            self._flush(len(self._buffer))
+
+    def _flush(self, size: int) -> None:
+        chunk = self._buffer[:size]
+        del self._buffer[:size]
+        self.target.write(chunk)
+        self.bytes += len(chunk)
+        if self.progress is not None:
+            self.progress(self.bytes, time.monotonic() - self.started)
+
+
+class _ProgressReader:
+    """Файл для `copy_expert` при загрузке: считает прочитанные блоки."""
+
+    def __init__(self, source: BinaryIO, progress: Optional[Callable[[int, float], None]], started: float) -> None:
+        self.source = source
+        self.progress = progress
+        self.started = started
+        self.bytes = 0
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.source.read(size)
+        if data:
+            self.bytes += len(data)
+            if self.progress is not None:
+                self.progress(self.bytes, time.monotonic() - self.started)
+        return data
+
+    def readline(self, size: int = -1) -> bytes:
+        return self.read(size)
+
+
+class _PipeReader:
+    """
+    Читающий конец канала `copy_to_endpoint`. Если источник завершился
+    ошибкой, конец данных — тоже ошибка, а не EOF: иначе COPY на приёмнике
+    зафиксировал бы уже полученную часть строк.
+    """
+
+    def __init__(self, pipe: BinaryIO, errors: List[str]) -> None:
+        self.pipe = pipe
+        self.errors = errors
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.pipe.read(size)
+        if not data and self.errors:
+            raise ValueError(self.errors[0])
+        return data
+
+    def readline(self, size: int = -1) -> bytes:
+        return self.read(size)
+
+
+class PgConnectionPool:
+    """
+    Пул соединений PostgreSQL с отдельным набором соединений на каждый
+    эндпоинт (ключ — адрес, база, пользователь и отпечаток пароля).
+
+    Подключение к удалённой базе (TCP, TLS, аутентификация) стоит десятки
+    миллисекунд, поэтому соединения после запроса возвращаются в пул и
+    выдаются следующим запросам. Размер набора задаётся опциями эндпоинта:
+    не больше `pool_max_size` соединений одновременно (остальные запросы
+    ждут освобождения до `pool_acquire_timeout` секунд), простаивающие
+    дольше `pool_idle_timeout` закрываются, но не меньше `pool_min_size`.
+    Соединение, простоявшее дольше `health_check_after` секунд, перед
+    выдачей проверяется запросом `health_check_query`.
+    """
+
+    def __init__(self, factory: Callable[[Dict[str, Any]], Any], min_size: int = 1, max_size: int = 5,
+                 idle_timeout: float = 300.0, acquire_timeout: float = 30.0,
+                 health_query: str = "SELECT 1", health_check_after: float = 30.0) -> None:
+        """
+        :param factory: Функция, открывающая новое соединение по параметрам.
+        :param min_size: Сколько простаивающих соединений не закрывать.
+        :param max_size: Максимум соединений на один эндпоинт.
+        :param idle_timeout: Время простоя (в секундах), после которого соединение закрывается.
+        :param acquire_timeout: Сколько ждать свободного соединения (в секундах).
+        :param health_query: Запрос проверки соединения.
+        :param health_check_after: Проверять соединения, простоявшие дольше (в секундах).
+        """
+        self.factory = factory
+        self.defaults = {"pool_min_size": min_size, "pool_max_size": max_size, "pool_idle_timeout": idle_timeout,
+                         "pool_acquire_timeout": acquire_timeout, "health_check_query": health_query,
+                         "health_check_after": health_check_after}
+        self._states: Dict[Tuple, Dict[str, Any]] = {}
+        self._owners: Dict[int, Tuple] = {}
+        self._cond = threading.Condition()
+        self._reaper: Optional[threading.Thread] = None
+
+    @staticmethod
+    def make_key(params: Dict[str, Any]) -> Tuple:
+        """Ключ пула; пароль в ключе не хранится в открытом виде."""
+        secret = hashlib.sha256(str(params.get("password")).encode("utf-8")).hexdigest()
+        return (str(params.get("host")), int(params.get("port") or 5432), str(params.get("database")),
+                str(params.get("user")), secret)
+
+    def _settings(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Размеры и таймауты набора: опции эндпоинта поверх значений пула."""
+        settings = dict(self.defaults)
+        for name, default in self.defaults.items():
+            value = params.get(name)
+            if value not in (None, ""):
+                settings[name] = type(default)(value)
+        settings["pool_max_size"] = max(1, settings["pool_max_size"])
+        settings["pool_min_size"] = max(0, min(settings["pool_min_size"], settings["pool_max_size"]))
+        return settings
+
+    def _state(self, key: Tuple, params: Dict[str, Any]) -> Dict[str, Any]:
+        state = self._states.get(key)
+        if state is None:
+            state = self._states[key] = {"idle": [], "busy": 0, "opening": 0, **self._settings(params)}
+        return state
+
+    def is_healthy(self, connection: Any, query: str) -> bool:
+        """Проверка соединения запросом; транзакция проверки откатывается."""
+        if connection.closed:
+            return False
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(query)
+                cursor.fetchone()
+            connection.rollback()
+        except psycopg2.Error:
+            return False
+        return True
+
+    def acquire(self, params: Dict[str, Any]) -> Any:
+        """
+        Выдаёт соединение для эндпоинта: простаивающее (последним
+        возвращённое) или новое, если набор не заполнен. Каждый вызов должен
+        завершаться `release` для выданного соединения.
+
+        :raises ValueError: Если свободного соединения не дождались.
+        """
+        key = self.make_key(params)
+        while True:
+            with self._cond:
+                state = self._state(key, params)
+                deadline = time.monotonic() + state["pool_acquire_timeout"]
+                while not state["idle"] and state["busy"] + state["opening"] >= state["pool_max_size"]:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise ValueError(f"Нет свободного соединения с {key[0]}:{key[1]}/{key[2]} "
+                                         f"(pool_max_size={state['pool_max_size']})")
+                    self._cond.wait(remaining)
+                if state["idle"]:
+                    connection, last_used = state["idle"].pop()
+                    state["busy"] += 1
+                else:
+                    connection, last_used = None, 0.0
+                    state["opening"] += 1
+            if connection is None:
+                return self._open(key, state, params)
+            if time.monotonic() - last_used <= state["health_check_after"] and not connection.closed \
+                    or self.is_healthy(connection, state["health_check_query"]):
+                return connection
+            logger.info("PgConnectionPool: соединение %s:%s неактивно, переподключение", key[0], key[1])
+            self.release(connection, broken=True)
+
+    def _open(self, key: Tuple, state: Dict[str, Any], params: Dict[str, Any]) -> Any:
+        try:
+            connection = self.factory(params)
+        except BaseException:
+            with self._cond:
+                state["opening"] -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            state["opening"] -= 1
+            state["busy"] += 1
+            self._owners[id(connection)] = key
+        self._start_reaper()
+        return connection
+
+    def release(self, connection: Any, broken: bool = False) -> None:
+        """
+        Возвращает соединение в пул; незавершённая транзакция откатывается.
+
+        :param connection: Соединение, выданное `acquire`.
+        :param broken: Соединение повреждено и должно быть закрыто.
+        """
+        if not broken:
+            try:
+                status = connection.get_transaction_status()
+                if status == TRANSACTION_STATUS_UNKNOWN or connection.closed:
+                    broken = True
+                elif status != TRANSACTION_STATUS_IDLE:
+                    connection.rollback()
+            except psycopg2.Error:
+                broken = True
+        with self._cond:
+            key = self._owners.get(id(connection))
+            if key is None:
+                return
+            state = self._states[key]
+            state["busy"] = max(0, state["busy"] - 1)
+            if broken:
+                self._owners.pop(id(connection), None)
+            else:
+                state["idle"].append((connection, time.monotonic()))
+            self._cond.notify()
+        if broken:
+            self._close(connection)
+
+    @contextmanager
+    def connection(self, params: Dict[str, Any]) -> Iterator[Any]:
+        """Контекстный менеджер над `acquire`/`release`."""
+        connection = self.acquire(params)
+        broken = False
+        try:
+            yield connection
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            broken = True
+            raise
+        finally:
+            self.release(connection, broken=broken)
+
+    def warm(self, params: Dict[str, Any]) -> int:
+        """
+        Открывает соединения эндпоинта до `pool_min_size` (например, перед
+        fan-out запросом).
+
+        :return: Количество открытых соединений.
+        """
+        key = self.make_key(params)
+        opened = []
+        with self._cond:
+            state = self._state(key, params)
+            missing = state["pool_min_size"] - len(state["idle"]) - state["busy"] - state["opening"]
+        for _ in range(max(0, missing)):
+            with self._cond:
+                state["opening"] += 1
+            opened.append(self._open(key, state, params))
+        for connection in opened:
+            self.release(connection)
+        return len(opened)
+
+    def reap(self) -> int:
+        """
+        Закрывает соединения, простаивающие дольше `pool_idle_timeout`,
+        оставляя в каждом наборе не меньше `pool_min_size` соединений.
+
+        :return: Количество закрытых соединений.
+        """
+        now = time.monotonic()
+        expired = []
+        with self._cond:
+            for state in self._states.values():
+                idle = state["idle"]
+                # Список упорядочен по времени возврата: старые — в начале.
+                extra = len(idle) + state["busy"] - state["pool_min_size"]
+                while extra > 0 and idle and now - idle[0][1] > state["pool_idle_timeout"]:
+                    connection, _ = idle.pop(0)
+                    self._owners.pop(id(connection), None)
+                    expired.append(connection)
+                    extra -= 1
+        for connection in expired:
+            self._close(connection)
+        return len(expired)
+
+    def close_all(self) -> None:
+        """Закрывает простаивающие соединения; выданные закроются при возврате."""
+        with self._cond:
+            connections = [connection for state in self._states.values() for connection, _ in state["idle"]]
+            for state in self._states.values():
+                state["idle"] = []
+            for connection in connections:
+                self._owners.pop(id(connection), None)
+        for connection in connections:
+            self._close(connection)
+
+    def stats(self) -> Dict[Tuple, Dict[str, int]]:
+        """Число простаивающих и выданных соединений по ключам (без отпечатка пароля)."""
+        with self._cond:
+            return {key[:4]: {"idle": len(state["idle"]), "busy": state["busy"]}
+                    for key, state in self._states.items()}
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._owners)
+
+    @staticmethod
+    def _close(connection: Any) -> None:
+        try:
+            connection.close()
+        except Exception as e:
+            logger.debug("PgConnectionPool: ошибка при закрытии соединения: %s", e)
+
+    def _start_reaper(self) -> None:
+        # Как в SshConnectionPool: проверка и сброс `_reaper` — под замком пула.
+        with self._cond:
+            if self._reaper is not None:
+                return
+
+            def loop():
+                while True:
+                    time.sleep(max(1.0, min(self.defaults["pool_idle_timeout"], 30.0)))
+                    self.reap()
+                    with self._cond:
+                        if not self._owners:
+                            self._reaper = None
+                            return
+
+            self._reaper = threading.Thread(target=loop, name="pg-pool-reaper", daemon=True)
+            self._reaper.start()
+
 
 class PostgresqlConnector(BaseConnector):
     """
     Реализация коннектора для PostgreSQL.
+
+    Запросы и проверки берут соединения из общего пула
+    (`PostgresqlConnector.pool`) с отдельным набором на каждый эндпоинт.
+    Массовая выгрузка и загрузка — через COPY (`copy_out`, `copy_in`,
+    `copy_to_endpoint`).
     """
 
+    _pool: Optional[PgConnectionPool] = None
+    _pool_lock = threading.Lock()
+
     def __init__(self) -> None:
         super().__init__()
 
@@ -16,11 +433,51 @@ class PostgresqlConnector(BaseConnector):
         Возвращает настройки по умолчанию для PostgreSQL коннектора.
         """
         return {
-            "host": "localhost",
-            "port": 5432,
-            "database": "postgres",
-            "user": "postgres",
-            "password": "",
+            "connect_timeout": {
+                "type": int,
+                "description": "Таймаут подключения (в секундах)",
+                "value": 10
+            },
+            "itersize": {
+                "type": int,
+                "description": "Сколько строк сервер отдаёт за один FETCH при потоковом чтении запроса",
+                "value": DEFAULT_ITERSIZE
+            },
+            "pool_min_size": {
+                "type": int,
+                "description": "Сколько соединений держать открытыми в пуле при простое",
+                "value": 1
+            },
+            "pool_max_size": {
+                "type": int,
+                "description": "Максимум одновременных соединений с базой из пула",
+                "value": 5
+            },
+            "pool_idle_timeout": {
+                "type": int,
+                "description": "Закрывать соединения пула после простоя (в секундах)",
+                "value": 300
+            },
+            "pool_acquire_timeout": {
+                "type": int,
+                "description": "Сколько ждать свободного соединения пула (в секундах)",
+                "value": 30
+            },
+            "health_check_query": {
+                "type": str,
+                "description": "Запрос проверки соединения перед выдачей из пула",
+                "value": "SELECT 1"
+            },
+            "health_check_after": {
+                "type": int,
+                "description": "Проверять соединения, простоявшие дольше (в секундах)",
+                "value": 30
+            },
+            "copy_chunk_size": {
+                "type": int,
+                "description": "Размер блока данных COPY при выгрузке и загрузке (в байтах)",
+                "value": DEFAULT_COPY_CHUNK
+            },
         }
 
     def get_required_fields(self) -> List[str]:
@@ -43,21 +500,206 @@ class PostgresqlConnector(BaseConnector):
                 database=params["database"],
                 user=params["user"],
                 password=params["password"],
+                connect_timeout=int(params.get("connect_timeout", 10)),
             )
             return connection
         except OperationalError as e:
-            raise ValueError(f"Ошибка при подключении к PostgreSQL: {e}")
+            raise ValueError(f"Ошибка при подключении к PostgreSQL: {e}") from e
+
+    def stream_query(self, params: Dict[str, Any], sql: str, args: Optional[Sequence[Any]] = None,
+                     itersize: Optional[int] = None) -> RowStream:
+        """
+        Выполняет запрос на именованном (серверном) курсоре и возвращает
+        поток строк: сервер держит результат у себя и отдаёт его пачками по
+        `itersize` строк, так что память клиента не зависит от размера
+        результата. Подходит только для запросов, возвращающих строки.
+
+        Соединение берётся из пула и возвращается в него при закрытии потока;
+        если все строки прочитаны, транзакция фиксируется, иначе откатывается.
+
+        :param sql: Текст запроса (плейсхолдеры psycopg2: `%s`, `%(name)s`).
+        :param args: Параметры запроса.
+        :param itersize: Размер пачки (по умолчанию — опция `itersize` эндпоинта).
+        :raises ValueError: При ошибке подключения или выполнения запроса.
+        """
+        self.validate_params(params)
+        batch_size = int(itersize or params.get("itersize") or DEFAULT_ITERSIZE)
+        pool = self.pool()
+        connection = pool.acquire(params)
+        try:
+            cursor = connection.cursor(name=f"bino_{uuid.uuid4().hex}")
+            cursor.itersize = batch_size
+            cursor.execute(sql, args)
+        except psycopg2.Error as e:
+            pool.release(connection, broken=isinstance(e, (OperationalError, psycopg2.InterfaceError)))
+            raise ValueError(f"Ошибка выполнения запроса: {e}") from e
+
+        def finish(complete: bool) -> None:
+            broken = False
+            try:
+                if complete:
+                    connection.commit()
+                else:
+                    connection.rollback()
+            except psycopg2.Error:
+                broken = True
+            finally:
+                pool.release(connection, broken=broken)
+
+        return RowStream(cursor, batch_size, on_close=finish, errors=(psycopg2.Error,))
+
+    def _copy(self, params: Dict[str, Any], sql: str, file: Any) -> int:
+        """Выполняет COPY на соединении из пула; возвращает число строк."""
+        self.validate_params(params)
+        pool = self.pool()
+        connection = pool.acquire(params)
+        broken = False
+        try:
+            with connection.cursor() as cursor:
+                cursor.copy_expert(sql, file, size=self._chunk_size(params))
+                rows = max(0, cursor.rowcount)
+            connection.commit()
+            return rows
+        except (psycopg2.Error, OSError, ValueError) as e:
+            # Ошибка чтения файла прерывает COPY так же, как ошибка сервера: транзакция откатывается.
+            broken = isinstance(e, (OperationalError, psycopg2.InterfaceError))
+            try:
+                connection.rollback()
+            except psycopg2.Error:
+                broken = True
+            raise ValueError(f"Ошибка COPY: {e}") from e
+        finally:
+            pool.release(connection, broken=broken)
+
+    @staticmethod
+    def _chunk_size(params: Dict[str, Any]) -> int:
+        return max(8192, int(params.get("copy_chunk_size") or DEFAULT_COPY_CHUNK))
+
+    def copy_out(self, params: Dict[str, Any], source: str, target: BinaryIO, copy_format: str = "csv",
+                 header: bool = True, progress: Optional[Callable[[int, float], None]] = None) -> CopyResult:
+        """
+        Выгружает таблицу или результат запроса командой COPY TO STDOUT.
+
+        Данные идут с сервера потоком и пишутся в `target` блоками по
+        `copy_chunk_size` байт, без разбора на строки на клиенте.
+
+        :param source: Имя таблицы или запрос.
+        :param target: Файл, открытый на запись в двоичном режиме.
+        :param progress: Вызывается после каждого блока: `(байт всего, секунд с начала)`.
+        :raises ValueError: При ошибке выгрузки.
+        """
+        started = time.monotonic()
+        writer = _ChunkWriter(target, self._chunk_size(params), progress, started)
+        rows = self._copy(params, copy_sql(source, "out", copy_format, header), writer)
+        writer.close()
+        return CopyResult(rows=rows, bytes=writer.bytes, elapsed=time.monotonic() - started)
+
+    def copy_in(self, params: Dict[str, Any], table: str, source: BinaryIO, copy_format: str = "csv",
+                header: bool = True, columns: Optional[Sequence[str]] = None,
+                progress: Optional[Callable[[int, float], None]] = None) -> CopyResult:
+        """
+        Загружает данные в таблицу командой COPY FROM STDIN; файл читается
+        блоками по `copy_chunk_size` байт. Загрузка идёт одной транзакцией:
+        при ошибке в таблицу не попадает ничего.
+
+        :param source: Файл, открытый на чтение в двоичном режиме.
+        :raises ValueError: При ошибке загрузки.
+        """
+        started = time.monotonic()
+        reader = _ProgressReader(source, progress, started)
+        rows = self._copy(params, copy_sql(table, "in", copy_format, header, columns), reader)
+        return CopyResult(rows=rows, bytes=reader.bytes, elapsed=time.monotonic() - started)
+
+    def copy_to_endpoint(self, params: Dict[str, Any], source: str, target_params: Dict[str, Any], table: str,
+                         copy_format: str = "binary", columns: Optional[Sequence[str]] = None,
+                         progress: Optional[Callable[[int, float], None]] = None) -> CopyResult:
+        """
+        Копирует данные между двумя эндпоинтами PostgreSQL: COPY TO STDOUT
+        на источнике и COPY FROM STDIN на приёмнике соединены каналом
+        (`os.pipe`), данные не сохраняются на диск и не разбираются на клиенте.
+        Ошибка на источнике прерывает COPY на приёмнике, и его транзакция
+        откатывается: частично скопированные строки не фиксируются.
+
+        :param source: Таблица или запрос на источнике.
+        :param table: Таблица на приёмнике.
+        :param copy_format: По умолчанию `binary` — самый быстрый между
+                            серверами одной версии.
+        :raises ValueError: При ошибке на любой из сторон.
+        """
+        read_fd, write_fd = os.pipe()
+        errors: List[str] = []
+        result: Dict[str, CopyResult] = {}
+
+        def export() -> None:
+            with os.fdopen(write_fd, "wb") as pipe:
+                try:
+                    result["out"] = self.copy_out(params, source, pipe, copy_format, progress=progress)
+                except Exception as e:
+                    errors.append(f"источник: {e}")
+
+        exporter = threading.Thread(target=export, name="pg-copy-out", daemon=True)
+        exporter.start()
+        with os.fdopen(read_fd, "rb") as pipe:
+            try:
+                loaded = self.copy_in(target_params, table, _PipeReader(pipe, errors), copy_format, columns=columns)
+            except Exception as e:
+                if not errors:
+                    errors.append(f"приёмник: {e}")
+                # Источник не должен зависнуть на записи в канал, который никто не читает.
+                while pipe.read(self._chunk_size(params)):
+                    pass
+        exporter.join()
+        if errors:
+            raise ValueError("; ".join(errors))
+        return CopyResult(rows=loaded.rows, bytes=loaded.bytes,
+                          elapsed=max(loaded.elapsed, result["out"].elapsed))
+
+    @classmethod
+    def pool(cls) -> PgConnectionPool:
+        """
+        Возвращает общий для всех экземпляров пул соединений.
+        """
+        with cls._pool_lock:
+            if cls._pool is None:
+                cls._pool = PgConnectionPool(cls().connect)
+            return cls._pool
+
+    def session(self, params: Dict[str, Any]):
+        """
+        Контекстный менеджер, выдающий соединение из пула.
+        """
+        self.validate_params(params)
+        return self.pool().connection(params)
 
     def test_connection(self, params: Dict[str, Any]) -> bool:
         """
-        Проверяет возможность подключения к PostgreSQL.
+        Проверяет возможность подключения к PostgreSQL запросом проверки
+        на соединении из пула.
 
         :param params: Параметры подключения.
         :return: `True`, если подключение успешно, иначе `False`.
         """
         try:
-            connection = self.connect(params)
-            connection.close()  # Закрываем соединение после теста
+            with self.session(params) as connection:
+                query = params.get("health_check_query") or "SELECT 1"
+                if not self.pool().is_healthy(connection, query):
+                    raise ValueError("Соединение не отвечает на запрос проверки")
             return True, ""
         except ValueError as e:
             return False, str(e)
+
+    def probe(self, params: Dict[str, Any]) -> Tuple[bool, str, Dict[str, float]]:
+        """
+        Замеряет новое подключение (не из пула), чтобы проверка показывала
+        настоящую задержку подключения к базе.
+        """
+        try:
+            self.validate_params(params)
+        except ValueError as e:
+            return False, str(e), {}
+        started = time.monotonic()
+        try:
+            self.connect(params).close()
+        except ValueError as e:
+            return False, str(e), {"connect": time.monotonic() - started}
+        return True, "", {"connect": time.monotonic() - started}
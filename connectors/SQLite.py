@@ -1,11 +1,37 @@
+import itertools
+import logging
 import sqlite3
-from typing import Dict, Any, List, Tuple
+import time
+from typing import Dict, Any, Callable, Iterable, List, Optional, Sequence, Tuple
 from .base_connector import BaseConnector
+from .sql import DEFAULT_ITERSIZE, RowStream
+
+logger = logging.getLogger(__name__)
+
+# Значения PRAGMA профиля производительности (для опций, оставленных пустыми)
+PERFORMANCE_PROFILE = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -65536,       # отрицательное значение — в КиБ, т. е. 64 МиБ
+    "mmap_size": 268435456,     # 256 МиБ
+    "temp_store": "MEMORY",
+}
+# Допустимые значения строковых PRAGMA: значения подставляются в текст запроса
+PRAGMA_CHOICES = {
+    "journal_mode": ("DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"),
+    "synchronous": ("OFF", "NORMAL", "FULL", "EXTRA", "0", "1", "2", "3"),
+    "temp_store": ("DEFAULT", "FILE", "MEMORY", "0", "1", "2"),
+}
 
 
 class SqliteConnector(BaseConnector):
     """
     Коннектор для подключения к базе данных SQLite.
+
+    Для многогигабайтных локальных баз есть профиль производительности
+    (WAL, `mmap_size`, `cache_size`, `synchronous`, `temp_store`), пакетная
+    запись (`bulk_write`: `executemany` в явных транзакциях) и потоковое
+    чтение (`stream_query`: `fetchmany`).
     """
 
     def default_options(self) -> Dict[str, Dict[str, Any]]:
@@ -32,6 +58,42 @@ class SqliteConnector(BaseConnector):
                 "type": bool,
                 "description": "Разрешить использование соединения в разных потоках",
                 "value": True
+            },
+            "performance_profile": {
+                "type": bool,
+                "description": "Профиль производительности: WAL, mmap 256 МиБ, кэш 64 МиБ, "
+                               "synchronous=NORMAL, temp_store=MEMORY (для незаданных PRAGMA)",
+                "value": False
+            },
+            "journal_mode": {
+                "type": str,
+                "description": "PRAGMA journal_mode (DELETE, WAL, ...); пусто — не менять",
+                "value": None
+            },
+            "synchronous": {
+                "type": str,
+                "description": "PRAGMA synchronous (OFF, NORMAL, FULL, EXTRA); пусто — не менять",
+                "value": None
+            },
+            "cache_size": {
+                "type": int,
+                "description": "PRAGMA cache_size: страниц, либо КиБ при отрицательном значении",
+                "value": None
+            },
+            "mmap_size": {
+                "type": int,
+                "description": "PRAGMA mmap_size: сколько байт файла читать через mmap",
+                "value": None
+            },
+            "temp_store": {
+                "type": str,
+                "description": "PRAGMA temp_store (DEFAULT, FILE, MEMORY); пусто — не менять",
+                "value": None
+            },
+            "batch_size": {
+                "type": int,
+                "description": "Строк в одной транзакции пакетной записи и в одной пачке чтения",
+                "value": 10000
             }
         }
 
@@ -54,8 +116,113 @@ class SqliteConnector(BaseConnector):
             isolation_level=params.get("isolation_level", None),
             check_same_thread=params.get("check_same_thread", True)
         )
+        try:
+            self.apply_pragmas(connection, params)
+        except (ValueError, sqlite3.Error):
+            connection.close()
+            raise
         return connection
 
+    @staticmethod
+    def pragmas(params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        PRAGMA, которые нужно выполнить при подключении: явно заданные опции
+        и, при включённом `performance_profile`, значения профиля для остальных.
+
+        :raises ValueError: Если значение PRAGMA недопустимо.
+        """
+        profile = PERFORMANCE_PROFILE if params.get("performance_profile") else {}
+        result = {}
+        for name in PERFORMANCE_PROFILE:
+            value = params.get(name)
+            value = profile.get(name) if value in (None, "") else value
+            if value in (None, ""):
+                continue
+            if name in PRAGMA_CHOICES:
+                value = str(value).upper()
+                if value not in PRAGMA_CHOICES[name]:
+                    raise ValueError(f"Недопустимое значение {name}: {value}")
+            else:
+                try:
+                    value = int(value)
+                except (TypeError, ValueError) as e:
+                    raise ValueError(f"{name} должно быть целым числом: {value}") from e
+            result[name] = value
+        return result
+
+    def apply_pragmas(self, connection: sqlite3.Connection, params: Dict[str, Any]) -> None:
+        """Выполняет PRAGMA из `pragmas(params)` на соединении."""
+        for name, value in self.pragmas(params).items():
+            connection.execute(f"PRAGMA {name} = {value}").fetchall()
+
+    def bulk_write(self, params: Dict[str, Any], sql: str, rows: Iterable[Sequence[Any]],
+                   batch_size: Optional[int] = None,
+                   progress: Optional[Callable[[int, float], None]] = None) -> int:
+        """
+        Пакетная запись: `executemany` по `batch_size` строк, каждая пачка —
+        в явной транзакции. Строки берутся из итератора по мере записи,
+        поэтому импорт не держит данные в памяти целиком.
+
+        Пачки, записанные до ошибки, остаются в базе; пачка с ошибкой
+        откатывается.
+
+        :param sql: Запрос с плейсхолдерами (`INSERT INTO t VALUES (?, ?)`).
+        :param rows: Последовательности значений строк.
+        :param progress: Вызывается после каждой пачки: `(строк всего, секунд с начала)`.
+        :return: Количество записанных строк.
+        :raises ValueError: При ошибке записи.
+        """
+        size = max(1, int(batch_size or params.get("batch_size") or DEFAULT_ITERSIZE))
+        try:
+            connection = self.connect(params)
+        except sqlite3.Error as e:
+            raise ValueError(f"Ошибка подключения к базе: {e}") from e
+        started = time.monotonic()
+        written = 0
+        try:
+            iterator = iter(rows)
+            while True:
+                batch = list(itertools.islice(iterator, size))
+                if not batch:
+                    break
+                try:
+                    if not connection.in_transaction:
+                        connection.execute("BEGIN")
+                    connection.executemany(sql, batch)
+                    connection.commit()
+                except sqlite3.Error as e:
+                    connection.rollback()
+                    raise ValueError(f"Ошибка записи после {written} строк: {e}") from e
+                written += len(batch)
+                if progress is not None:
+                    progress(written, time.monotonic() - started)
+        finally:
+            connection.close()
+        logger.info("SqliteConnector.bulk_write() -> %s строк за %.2f с", written, time.monotonic() - started)
+        return written
+
+    def stream_query(self, params: Dict[str, Any], sql: str, args: Optional[Sequence[Any]] = None,
+                     itersize: Optional[int] = None) -> RowStream:
+        """
+        Выполняет запрос и возвращает поток строк, читаемый пачками
+        `fetchmany`; соединение закрывается вместе с потоком.
+
+        :param itersize: Размер пачки (по умолчанию — опция `batch_size`).
+        :raises ValueError: При ошибке подключения или выполнения запроса.
+        """
+        batch_size = int(itersize or params.get("batch_size") or DEFAULT_ITERSIZE)
+        try:
+            connection = self.connect(params)
+        except sqlite3.Error as e:
+            raise ValueError(f"Ошибка подключения к базе: {e}") from e
+        try:
+            cursor = connection.execute(sql, args or ())
+        except sqlite3.Error as e:
+            connection.close()
+            raise ValueError(f"Ошибка выполнения запроса: {e}") from e
+        return RowStream(cursor, batch_size, on_close=lambda complete: connection.close(),
+                         errors=(sqlite3.Error,))
+
     def test_connection(self, params: Dict[str, Any]) -> Tuple[bool, str]:
         """
         Проверяет возможность подключения к SQLite базе данных.
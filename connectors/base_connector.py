@@ -1,5 +1,6 @@
+import time
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Type
+from typing import Dict, Any, List, Tuple, Type
 
 
 class BaseConnector(ABC):
@@ -42,6 +43,25 @@ class BaseConnector(ABC):
             raise ValueError(f"Отсутствуют обязательные параметры: {', '.join(missing_fields)}")
         return True
 
+    def build_params(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Собирает параметры подключения из записи эндпоинта.
+
+        Значения по умолчанию из `available_options` перекрываются опциями
+        эндпоинта (`data["options"]`), а те, в свою очередь, полями записи.
+
+        :param data: Запись эндпоинта из хранилища или данные формы.
+        :return: Плоский словарь параметров для `connect`.
+        """
+        params = {
+            name: details.get("value")
+            for name, details in self.available_options.items()
+            if isinstance(details, dict) and details.get("value") is not None
+        }
+        params.update({k: v for k, v in (data.get("options") or {}).items() if v not in (None, "")})
+        params.update({k: v for k, v in data.items() if k != "options"})
+        return params
+
     @abstractmethod
     def connect(self, params: Dict[str, Any]) -> Any:
         """
@@ -61,3 +81,27 @@ class BaseConnector(ABC):
         :return: `True`, если подключение успешно, иначе `False`.
         """
         pass
+
+    def probe(self, params: Dict[str, Any]) -> Tuple[bool, str, Dict[str, float]]:
+        """
+        Проверяет подключение с замером времени фаз.
+
+        Базовая реализация замеряет `test_connection` целиком как фазу
+        `"connect"`; коннекторы с протоколом из нескольких фаз (SSH)
+        переопределяют метод и замеряют каждую фазу отдельно.
+
+        :param params: Параметры подключения.
+        :return: `(успех, сообщение, {фаза: секунды})`; при ошибке последняя
+                 фаза в словаре — та, на которой проверка остановилась.
+        """
+        try:
+            self.validate_params(params)
+        except ValueError as e:
+            return False, str(e), {}
+        started = time.monotonic()
+        try:
+            result = self.test_connection(params)
+        except Exception as e:
+            result = (False, str(e) or type(e).__name__)
+        success, message = result if isinstance(result, tuple) else (bool(result), "")
+        return bool(success), str(message or ""), {"connect": time.monotonic() - started}
@@ -0,0 +1,84 @@
+"""
+Асинхронное чтение каналов SSH.
+
+Модуль не импортирует paramiko: движок выполнения и история запусков
+подключают его при старте приложения, а сам драйвер SSH загружается
+только при первом соединении (см. `connectors.ssh`).
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Optional
+
+
+@dataclass
+class OutputChunk:
+    """
+    Кусок вывода удалённой команды.
+
+    :param stream: `"stdout"` или `"stderr"`.
+    :param data: Сырые байты из канала (в событиях движка — декодированный текст).
+    :param timestamp: Время получения (`time.time()`), по нему восстанавливается
+                      порядок чередования потоков.
+    """
+
+    stream: str
+    data: Any
+    timestamp: float
+
+
+class AsyncSshChannel:
+    """
+    Асинхронное чтение канала paramiko в цикле asyncio.
+
+    Готовность данных отслеживается через `Channel.fileno()` и
+    `loop.add_reader`, поэтому ожидание вывода не занимает отдельный поток:
+    тысячи открытых каналов обслуживаются одним циклом событий.
+    """
+
+    READ_SIZE = 32768
+
+    def __init__(self, channel: Any,
+                 loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        """
+        :param channel: Канал с уже запущенной командой.
+        :param loop: Цикл событий (по умолчанию — текущий).
+        """
+        self.channel = channel
+        self.loop = loop or asyncio.get_running_loop()
+
+    def _drained(self) -> bool:
+        channel = self.channel
+        return ((channel.eof_received or channel.closed)
+                and not channel.recv_ready() and not channel.recv_stderr_ready())
+
+    async def chunks(self) -> AsyncIterator[OutputChunk]:
+        """
+        Отдаёт куски вывода `OutputChunk` по мере поступления, завершается после EOF.
+
+        stdout и stderr читаются поочерёдно кусками до `READ_SIZE` байт, без
+        ожидания перевода строки: удалённый процесс не блокируется на
+        переполненном stderr, а порядок кусков соответствует порядку прихода.
+        """
+        ready = asyncio.Event()
+        fd = self.channel.fileno()
+        self.loop.add_reader(fd, ready.set)
+        try:
+            while True:
+                await ready.wait()
+                ready.clear()
+                while True:
+                    received = False
+                    if self.channel.recv_ready():
+                        yield OutputChunk("stdout", self.channel.recv(self.READ_SIZE), time.time())
+                        received = True
+                    if self.channel.recv_stderr_ready():
+                        yield OutputChunk("stderr", self.channel.recv_stderr(self.READ_SIZE), time.time())
+                        received = True
+                    if not received:
+                        break
+                if self._drained():
+                    break
+        finally:
+            self.loop.remove_reader(fd)
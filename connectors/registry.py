@@ -0,0 +1,187 @@
+"""
+Реестр коннекторов с кэшем описаний.
+
+Для формы эндпоинта нужны только имена коннекторов, схемы их опций и
+обязательные поля, а импорт модуля коннектора тянет за собой драйвер
+(paramiko, psycopg2). `ConnectorRegistry` хранит эти описания в JSON-кэше
+и при следующих запусках читает их без импорта: модуль загружается только
+при первом обращении к самому коннектору (соединение, проверка, сборка
+параметров). Запись кэша сбрасывается при изменении файла модуля
+(время изменения и размер).
+
+Коннектором считается модуль `connectors/<name>.py` с классом
+`<Name>Connector` (`ssh.py` -> `SshConnector`).
+"""
+
+import builtins
+import importlib
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+CACHE_VERSION = 1
+DEFAULT_CACHE_PATH = "connectors.cache.json"
+# Служебные модули пакета, которые не бывают коннекторами
+SERVICE_MODULES = ("__init__", "base_connector", "channel", "registry", "sql")
+
+
+def _encode_options(options: Dict[str, Any]) -> Dict[str, Any]:
+    """Схема опций для JSON: типы (`int`, `bool`, ...) записываются именами."""
+    return {name: dict(details, type=details["type"].__name__)
+            if isinstance(details, dict) and isinstance(details.get("type"), type) else details
+            for name, details in options.items()}
+
+
+def _decode_options(options: Dict[str, Any]) -> Dict[str, Any]:
+    """Обратное к `_encode_options`: имена встроенных типов снова становятся типами."""
+    return {name: dict(details, type=getattr(builtins, details["type"], object))
+            if isinstance(details, dict) and isinstance(details.get("type"), str) else details
+            for name, details in options.items()}
+
+
+def connectors_dir() -> str:
+    """Каталог с модулями коннекторов (в том числе внутри сборки PyInstaller)."""
+    if getattr(sys, "frozen", False):
+        return os.path.join(sys._MEIPASS, "connectors")
+    return os.path.dirname(os.path.abspath(__file__))
+
+
+class LazyConnector:
+    """
+    Коннектор, модуль которого импортируется при первом обращении.
+
+    Имя, схема опций и обязательные поля доступны сразу (из кэша), любые
+    другие атрибуты берутся у настоящего коннектора, который создаётся
+    один раз при первом таком обращении.
+    """
+
+    def __init__(self, name: str, module: str, class_name: str,
+                 available_options: Dict[str, Any], required_fields: List[str]) -> None:
+        self.name = name
+        self.module = module
+        self.class_name = class_name
+        self.available_options = available_options
+        self.required_fields = required_fields
+        self._instance: Optional[Any] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        """Импортирован ли уже модуль коннектора."""
+        return self._instance is not None
+
+    @property
+    def instance(self) -> Any:
+        """Настоящий коннектор (импортирует модуль при первом обращении)."""
+        with self._lock:
+            if self._instance is None:
+                logger.info("LazyConnector(%s) -> импорт %s", self.name, self.module)
+                connector_class = getattr(importlib.import_module(self.module), self.class_name)
+                self._instance = connector_class()
+            return self._instance
+
+    def get_required_fields(self) -> List[str]:
+        return list(self.required_fields)
+
+    def __getattr__(self, item: str) -> Any:
+        if item.startswith("_"):
+            raise AttributeError(item)
+        return getattr(self.instance, item)
+
+    def __repr__(self) -> str:
+        return f"<LazyConnector {self.name} loaded={self.loaded}>"
+
+
+class ConnectorRegistry:
+    """
+    Реестр коннекторов пакета с JSON-кэшем их описаний.
+    """
+
+    def __init__(self, directory: Optional[str] = None, package: str = "connectors",
+                 cache_path: Optional[str] = DEFAULT_CACHE_PATH) -> None:
+        """
+        :param directory: Каталог модулей коннекторов (по умолчанию — пакет `connectors`).
+        :param package: Имя пакета для импорта модулей.
+        :param cache_path: Путь к файлу кэша; `None` — не использовать кэш.
+        """
+        self.directory = directory or connectors_dir()
+        self.package = package
+        self.cache_path = cache_path
+        self.imported: List[str] = []
+
+    def _read_cache(self) -> Dict[str, Any]:
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return {}
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning("ConnectorRegistry: кэш %s не прочитан: %s", self.cache_path, e)
+            return {}
+        if cache.get("version") != CACHE_VERSION or cache.get("directory") != self.directory:
+            return {}
+        return cache.get("modules", {})
+
+    def _write_cache(self, modules: Dict[str, Any]) -> None:
+        cache = {"version": CACHE_VERSION, "directory": self.directory, "modules": modules}
+        directory = os.path.dirname(os.path.abspath(self.cache_path))
+        try:
+            text = json.dumps(cache, indent=2, ensure_ascii=False)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".connectors-", suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp_path, self.cache_path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning("ConnectorRegistry: кэш %s не сохранён: %s", self.cache_path, e)
+
+    def _describe(self, module_name: str) -> Dict[str, Any]:
+        """Импортирует модуль и описывает его коннектор (или его отсутствие)."""
+        module = importlib.import_module(f"{self.package}.{module_name}")
+        self.imported.append(module_name)
+        class_name = module_name.capitalize() + "Connector"
+        connector_class = getattr(module, class_name, None)
+        if connector_class is None:
+            return {"class": None}
+        connector = connector_class()
+        return {"class": class_name,
+                "options": _encode_options(connector.available_options),
+                "required": list(connector.get_required_fields())}
+
+    def load(self) -> Dict[str, LazyConnector]:
+        """
+        Коннекторы по именам модулей. Модули с актуальной записью в кэше не
+        импортируются; новые и изменённые описываются заново, кэш обновляется.
+        """
+        cached = self._read_cache()
+        modules: Dict[str, Any] = {}
+        connectors: Dict[str, LazyConnector] = {}
+        for file in sorted(os.listdir(self.directory)):
+            module_name = file[:-3]
+            if not file.endswith(".py") or module_name in SERVICE_MODULES or module_name.startswith("test_"):
+                continue
+            stat = os.stat(os.path.join(self.directory, file))
+            signature = [stat.st_mtime_ns, stat.st_size]
+            entry = cached.get(module_name)
+            if entry is None or entry.get("signature") != signature:
+                try:
+                    entry = dict(self._describe(module_name), signature=signature)
+                except Exception as e:
+                    # Коннектор с недоступным драйвером не должен ломать запуск приложения.
+                    logger.warning("ConnectorRegistry: коннектор '%s' не загружен: %s", module_name, e)
+                    continue
+            modules[module_name] = entry
+            if entry["class"]:
+                connectors[module_name] = LazyConnector(module_name, f"{self.package}.{module_name}",
+                                                        entry["class"], _decode_options(entry["options"]),
+                                                        entry["required"])
+        if self.cache_path and (self.imported or set(modules) != set(cached)):
+            self._write_cache(modules)
+        logger.info("ConnectorRegistry.load() -> %s (импортировано модулей: %s)",
+                    sorted(connectors), len(self.imported))
+        return connectors
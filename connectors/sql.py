@@ -0,0 +1,145 @@
+"""
+Потоковое чтение результатов SQL-запросов.
+
+Отчётные запросы возвращают миллионы строк, поэтому SQL-коннекторы не
+собирают результат в список, а отдают `RowStream`: курсор, из которого
+строки читаются пачками (`fetchmany`). У PostgreSQL это именованный
+(серверный) курсор — сервер отдаёт по `itersize` строк за один FETCH,
+и память клиента ограничена одной пачкой при любом размере результата.
+
+`write_rows` переливает поток в файл или текстовый поток (CSV, JSONL или
+строки через табуляцию) по одной пачке за раз.
+"""
+
+import csv
+import json
+import logging
+import time
+from typing import Any, Callable, Iterator, List, Optional, Sequence, TextIO, Tuple, Type
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ITERSIZE = 2000
+FORMATS = ("csv", "jsonl", "text")
+# Форматы COPY PostgreSQL
+COPY_FORMATS = ("csv", "binary", "text")
+
+
+class RowStream:
+    """
+    Результат запроса, читаемый пачками строк.
+
+    Итерация отдаёт списки кортежей длиной не больше `batch_size`; имена
+    столбцов доступны в `columns` (у серверного курсора — после первой
+    пачки, поэтому первая пачка при необходимости читается заранее).
+    Поток закрывается по окончании чтения, при выходе из `with` или явным
+    `close()`; `on_close` закрывает соединение (или возвращает его в пул).
+    """
+
+    def __init__(self, cursor: Any, batch_size: int = DEFAULT_ITERSIZE,
+                 on_close: Optional[Callable[[bool], None]] = None,
+                 errors: Tuple[Type[BaseException], ...] = ()) -> None:
+        """
+        :param cursor: DB-API курсор с выполненным запросом.
+        :param batch_size: Размер пачки `fetchmany`.
+        :param on_close: Вызывается один раз при закрытии; аргумент — `True`,
+                         если все строки были прочитаны.
+        :param errors: Исключения драйвера, которые при чтении превращаются в `ValueError`.
+        """
+        self.cursor = cursor
+        self.batch_size = max(1, int(batch_size))
+        self.rows = 0
+        self.started = time.monotonic()
+        self._on_close = on_close
+        self._errors = errors
+        self._pending: Optional[List[tuple]] = None
+        self._exhausted = False
+        self._closed = False
+
+    @property
+    def columns(self) -> List[str]:
+        """Имена столбцов результата."""
+        if self.cursor.description is None and not self._exhausted and self._pending is None:
+            self._pending = self._fetch()
+        return [column[0] for column in self.cursor.description or ()]
+
+    def _fetch(self) -> List[tuple]:
+        try:
+            batch = self.cursor.fetchmany(self.batch_size)
+        except self._errors as e:
+            raise ValueError(f"Ошибка чтения результата запроса: {e}") from e
+        if len(batch) < self.batch_size:
+            self._exhausted = True
+        return batch
+
+    def __iter__(self) -> Iterator[List[tuple]]:
+        try:
+            while True:
+                if self._pending is not None:
+                    batch, self._pending = self._pending, None
+                elif self._exhausted or self._closed:
+                    break
+                else:
+                    batch = self._fetch()
+                if batch:
+                    self.rows += len(batch)
+                    yield batch
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """Закрывает курсор; непрочитанные строки отбрасываются."""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self.cursor.close()
+        except Exception as e:
+            logger.debug("RowStream.close(): курсор не закрыт: %s", e)
+        if self._on_close is not None:
+            self._on_close(self._exhausted)
+
+    def __enter__(self) -> "RowStream":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+def _cell(value: Any) -> Any:
+    """Значение для CSV/текста: байты — в hex, None — пустая строка."""
+    if value is None:
+        return ""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value).hex()
+    return value
+
+
+def write_rows(stream: RowStream, out: TextIO, output_format: str = "csv",
+               progress: Optional[Callable[[int, float], None]] = None) -> int:
+    """
+    Пишет строки потока в `out` по мере чтения.
+
+    :param output_format: `csv` (с заголовком), `jsonl` (объект на строку)
+                          или `text` (заголовок и значения через табуляцию).
+    :param progress: Вызывается после каждой пачки: `(строк всего, секунд с начала)`.
+    :return: Количество записанных строк.
+    """
+    if output_format not in FORMATS:
+        raise ValueError(f"Неизвестный формат: {output_format}")
+    text = output_format == "text"
+    writer = csv.writer(out, delimiter="\t" if text else ",", lineterminator="\n",
+                        quoting=csv.QUOTE_NONE if text else csv.QUOTE_MINIMAL, escapechar="\\")
+    with stream:
+        columns: Sequence[str] = stream.columns
+        if output_format != "jsonl":
+            writer.writerow(columns)
+        for batch in stream:
+            if output_format == "jsonl":
+                out.writelines(json.dumps(dict(zip(columns, row)), ensure_ascii=False, default=str) + "\n"
+                               for row in batch)
+            else:
+                writer.writerows([_cell(value) for value in row] for row in batch)
+            if progress is not None:
+                progress(stream.rows, time.monotonic() - stream.started)
+    return stream.rows
@@ -1,13 +1,241 @@
+import hashlib
+import logging
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Callable, Iterator, List, Optional, Tuple
+
 import paramiko
-from typing import Dict, Any, List
 from .base_connector import BaseConnector
 
+logger = logging.getLogger(__name__)
+
+
+class SshConnectionPool:
+    """
+    Пул аутентифицированных SSH-соединений с ключом по параметрам подключения.
+
+    Соединения (транспорты) переиспользуются всеми запусками: на каждый
+    запуск открывается новый канал, а TCP + KEX + аутентификация выполняются
+    только при первом обращении. На одном соединении одновременно открыто
+    не больше `max_sessions` каналов (ограничение MaxSessions у sshd), при
+    превышении к тому же хосту открывается ещё одно соединение.
+    Соединения поддерживаются keepalive-пакетами, проверяются перед выдачей
+    и закрываются после простоя дольше `idle_timeout`.
+    """
+
+    AUTH_FIELDS = ("password", "key_filename", "passphrase", "allow_agent",
+                   "look_for_keys", "gss_auth", "gss_kex")
+
+    def __init__(self, factory: Callable[[Dict[str, Any]], paramiko.SSHClient],
+                 idle_timeout: float = 300.0, keepalive: int = 30, max_sessions: int = 8) -> None:
+        """
+        :param factory: Функция, открывающая новое соединение по параметрам.
+        :param idle_timeout: Время простоя (в секундах), после которого соединение закрывается.
+        :param keepalive: Интервал keepalive-пакетов (в секундах), 0 — отключить.
+        :param max_sessions: Максимум одновременных каналов на одно соединение.
+        """
+        self.factory = factory
+        self.idle_timeout = idle_timeout
+        self.keepalive = keepalive
+        self.max_sessions = max_sessions
+        self._entries: Dict[Tuple, List[Dict[str, Any]]] = {}
+        self._by_client: Dict[int, Tuple[Tuple, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Tuple, threading.Lock] = {}
+        self._reaper: Optional[threading.Thread] = None
+
+    @classmethod
+    def make_key(cls, params: Dict[str, Any]) -> Tuple:
+        """
+        Ключ пула: адрес, логин и отпечаток параметров аутентификации.
+        Секреты в ключе не хранятся в открытом виде.
+        """
+        auth = "\0".join(str(params.get(name)) for name in cls.AUTH_FIELDS)
+        return (str(params.get("ip")), int(params.get("port") or 22), str(params.get("login")),
+                hashlib.sha256(auth.encode("utf-8")).hexdigest())
+
+    @staticmethod
+    def is_alive(client: paramiko.SSHClient) -> bool:
+        """Проверка здоровья соединения перед выдачей из пула."""
+        transport = client.get_transport()
+        if transport is None or not transport.is_active() or not transport.is_authenticated():
+            return False
+        try:
+            transport.send_ignore()
+        except Exception:
+            return False
+        return True
+
+    def acquire(self, params: Dict[str, Any]) -> paramiko.SSHClient:
+        """
+        Выдаёт живое соединение для параметров, открывая новое при необходимости.
+        Каждый вызов должен завершаться `release` для выданного клиента.
+        """
+        key = self.make_key(params)
+        max_sessions = max(1, int(params.get("max_sessions", self.max_sessions) or 1))
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        # Блокировка на ключ: параллельные запуски на один хост ждут одно
+        # рукопожатие, а разные хосты не ждут друг друга.
+        with key_lock:
+            with self._lock:
+                candidates = [entry for entry in self._entries.get(key, [])
+                              if entry["leases"] < max_sessions]
+            entry = None
+            for candidate in candidates:
+                if self.is_alive(candidate["client"]):
+                    entry = candidate
+                    break
+                logger.info("SshConnectionPool: соединение %s:%s неактивно, переподключение", key[0], key[1])
+                self._discard(key, candidate)
+            if entry is None:
+                client = self.factory(params)
+                transport = client.get_transport()
+                keepalive = int(params.get("keepalive_interval", self.keepalive) or 0)
+                if transport is not None and keepalive:
+                    transport.set_keepalive(keepalive)
+                entry = {"client": client, "leases": 0, "last_used": time.monotonic(),
+                         "idle_timeout": float(params.get("pool_idle_timeout", self.idle_timeout))}
+                with self._lock:
+                    self._entries.setdefault(key, []).append(entry)
+                    self._by_client[id(client)] = (key, entry)
+                self._start_reaper()
+            with self._lock:
+                entry["leases"] += 1
+                entry["last_used"] = time.monotonic()
+            return entry["client"]
+
+    def release(self, client: paramiko.SSHClient, broken: bool = False) -> None:
+        """
+        Возвращает соединение в пул.
+
+        :param client: Клиент, выданный `acquire`.
+        :param broken: Соединение повреждено и должно быть закрыто.
+        """
+        with self._lock:
+            found = self._by_client.get(id(client))
+            if found is None:
+                return
+            key, entry = found
+            entry["leases"] = max(0, entry["leases"] - 1)
+            entry["last_used"] = time.monotonic()
+        if broken:
+            self._discard(key, entry)
+
+    @contextmanager
+    def connection(self, params: Dict[str, Any]) -> Iterator[paramiko.SSHClient]:
+        """Контекстный менеджер над `acquire`/`release`."""
+        client = self.acquire(params)
+        broken = False
+        try:
+            yield client
+        except (paramiko.SSHException, EOFError, OSError):
+            broken = True
+            raise
+        finally:
+            self.release(client, broken=broken)
+
+    def reap(self) -> int:
+        """
+        Закрывает неиспользуемые соединения, простаивающие дольше таймаута.
+
+        :return: Количество закрытых соединений.
+        """
+        now = time.monotonic()
+        with self._lock:
+            expired = [(key, entry) for key, entries in self._entries.items() for entry in entries
+                       if not entry["leases"] and now - entry["last_used"] > entry["idle_timeout"]]
+        for key, entry in expired:
+            self._discard(key, entry)
+        return len(expired)
+
+    def close_all(self) -> None:
+        """Закрывает все соединения пула."""
+        with self._lock:
+            entries = [(key, entry) for key, entries in self._entries.items() for entry in entries]
+        for key, entry in entries:
+            self._discard(key, entry)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._by_client)
+
+    def _discard(self, key: Tuple, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            entries = self._entries.get(key, [])
+            if entry in entries:
+                entries.remove(entry)
+                if not entries:
+                    del self._entries[key]
+            self._by_client.pop(id(entry["client"]), None)
+        try:
+            entry["client"].close()
+        except Exception as e:
+            logger.debug("SshConnectionPool: ошибка при закрытии %s: %s", key[0], e)
+
+    def _start_reaper(self) -> None:
+        # Решение «завершиться» принимается под тем же замком, под которым
+        # добавляются соединения: новое соединение не останется без reaper.
+        with self._lock:
+            if self._reaper is not None:
+                return
+
+            def loop():
+                while True:
+                    time.sleep(max(1.0, min(self.idle_timeout, 30.0)))
+                    self.reap()
+                    with self._lock:
+                        if not self._by_client:
+                            self._reaper = None
+                            return
+
+            self._reaper = threading.Thread(target=loop, name="ssh-pool-reaper", daemon=True)
+            self._reaper.start()
+
+
+class TimedSSHClient(paramiko.SSHClient):
+    """
+    `SSHClient`, замеряющий фазы подключения.
+
+    После `connect` в `connect_timings` лежат длительности фаз `"connect"`
+    (TCP и обмен ключами) и `"auth"` (аутентификация). Первый пользователь
+    соединения из пула забирает их себе и обнуляет атрибут.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.connect_timings: Optional[Dict[str, float]] = None
+        self._connect_started = 0.0
+
+    def connect(self, *args: Any, **kwargs: Any) -> None:
+        self._connect_started = time.monotonic()
+        self.connect_timings = {"connect": 0.0, "auth": 0.0}
+        super().connect(*args, **kwargs)
+
+    def _auth(self, *args: Any, **kwargs: Any) -> None:
+        # Вызывается SSHClient.connect после рукопожатия, перед аутентификацией.
+        started = time.monotonic()
+        self.connect_timings["connect"] = started - self._connect_started
+        try:
+            super()._auth(*args, **kwargs)
+        finally:
+            self.connect_timings["auth"] = time.monotonic() - started
+
 
 class SshConnector(BaseConnector):
     """
     SSH-коннектор для подключения к удалённым серверам по SSH.
+
+    Соединения для запусков и проверок берутся из общего пула
+    (`SshConnector.pool`), поэтому повторные обращения к хосту не
+    проходят рукопожатие заново.
     """
 
+    _pool: Optional[SshConnectionPool] = None
+    _pool_lock = threading.Lock()
+
     def default_options(self) -> Dict[str, Dict[str, Any]]:
         """
         Возвращает настройки по умолчанию для SSH-коннектора.
@@ -73,6 +301,21 @@ class SshConnector(BaseConnector):
                 "type": bool,
                 "description": "Использование GSS-API для обмена ключами",
                 "value": False
+            },
+            "keepalive_interval": {
+                "type": int,
+                "description": "Интервал keepalive для соединений в пуле (в секундах, 0 — выкл.)",
+                "value": 30
+            },
+            "pool_idle_timeout": {
+                "type": int,
+                "description": "Время простоя, после которого соединение из пула закрывается (в секундах)",
+                "value": 300
+            },
+            "max_sessions": {
+                "type": int,
+                "description": "Максимум одновременных каналов на одно соединение (MaxSessions сервера)",
+                "value": 8
             }
         }
 
@@ -88,9 +331,14 @@ class SshConnector(BaseConnector):
         Подключается к SSH-серверу и возвращает клиент.
         """
         self.validate_params(params)  # Проверяем, что все параметры на месте
-        print(params)
-        client = paramiko.SSHClient()
+        client = TimedSSHClient()
         client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        self._open(client, params)
+        return client
+
+    @staticmethod
+    def _open(client: paramiko.SSHClient, params: Dict[str, Any]) -> None:
+        """Рукопожатие и аутентификация клиента по параметрам эндпоинта."""
         client.connect(
             hostname=params["ip"],
             port=int(params["port"]),
@@ -109,15 +357,31 @@ class SshConnector(BaseConnector):
             gss_auth=params.get("gss_auth", False),
             gss_kex=params.get("gss_kex", False)
         )
-        return client
+
+    @classmethod
+    def pool(cls) -> SshConnectionPool:
+        """
+        Возвращает общий для всех экземпляров пул SSH-соединений.
+        """
+        with cls._pool_lock:
+            if cls._pool is None:
+                cls._pool = SshConnectionPool(cls().connect)
+            return cls._pool
+
+    def session(self, params: Dict[str, Any]):
+        """
+        Контекстный менеджер, выдающий соединение из пула.
+        Внутри следует открывать новый канал (например, `exec_command`).
+        """
+        return self.pool().connection(params)
 
     def test_connection(self, params: Dict[str, Any]) -> bool:
         """
-        Проверяет возможность SSH-подключения.
+        Проверяет возможность SSH-подключения через пул соединений.
         """
         try:
-            client = self.connect(params)
-            client.close()
+            with self.session(params) as client:
+                client.get_transport().send_ignore()
             return True, ""
         except paramiko.AuthenticationException:
             return False, "Ошибка аутентификации. Проверьте логин/пароль."
@@ -125,3 +389,55 @@ class SshConnector(BaseConnector):
             return False, e
         except Exception as e:
             return False, e
+
+    def probe(self, params: Dict[str, Any]) -> Tuple[bool, str, Dict[str, float]]:
+        """
+        Проверяет подключение новым соединением (в обход пула) с замером фаз:
+        `"tcp"` — установка TCP-соединения, `"banner"` — ожидание баннера
+        сервера, `"kex"` — обмен ключами, `"auth"` — аутентификация.
+
+        Баннер ожидается через `recv(MSG_PEEK)`: данные остаются в сокете,
+        и paramiko читает их сам, поэтому замер не меняет протокол.
+        """
+        try:
+            self.validate_params(params)
+        except ValueError as e:
+            return False, str(e), {}
+        timings: Dict[str, float] = {}
+        phase, started = "tcp", time.monotonic()
+        sock: Optional[socket.socket] = None
+        client = TimedSSHClient()
+        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        try:
+            sock = socket.create_connection((params["ip"], int(params["port"])),
+                                            timeout=float(params.get("timeout") or 5))
+            timings[phase] = time.monotonic() - started
+            phase, started = "banner", time.monotonic()
+            sock.settimeout(float(params.get("banner_timeout") or 15))
+            if not sock.recv(1, socket.MSG_PEEK):
+                raise EOFError("сервер закрыл соединение до баннера")
+            timings[phase] = time.monotonic() - started
+            phase, started = "kex", time.monotonic()
+            self._open(client, dict(params, sock=sock))
+            timings["kex"] = client.connect_timings["connect"]
+            timings["auth"] = client.connect_timings["auth"]
+            return True, "", timings
+        except Exception as e:
+            if phase == "kex" and client.connect_timings and client.connect_timings["connect"]:
+                # Рукопожатие прошло, ошибка — при аутентификации.
+                timings["kex"] = client.connect_timings["connect"]
+                timings["auth"] = client.connect_timings["auth"]
+                phase = "auth"
+            else:
+                timings[phase] = time.monotonic() - started
+            if isinstance(e, paramiko.AuthenticationException):
+                message = "Ошибка аутентификации. Проверьте логин/пароль."
+            elif isinstance(e, socket.timeout):
+                message = f"Таймаут на этапе {phase}"
+            else:
+                message = str(e) or type(e).__name__
+            return False, message, timings
+        finally:
+            client.close()
+            if sock is not None:
+                sock.close()
@@ -0,0 +1,246 @@
+"""Unit-тесты для пула соединений PgConnectionPool и COPY PostgresqlConnector."""
+
+import io
+import threading
+import time
+
+import psycopg2
+import pytest
+
+from connectors.PostgreSQL import PgConnectionPool, PostgresqlConnector, copy_sql
+
+
+PARAMS = {"host": "db", "port": 5432, "database": "app", "user": "report", "password": "x"}
+
+
+class FakeConnection:
+    """Соединение psycopg2 с управляемым состоянием транзакции и здоровьем."""
+
+    def __init__(self):
+        self.closed = 0
+        self.status = 0
+        self.healthy = True
+        self.rollbacks = 0
+        self.queries = []
+
+    def get_transaction_status(self):
+        return self.status
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.status = 0
+
+    def cursor(self):
+        connection = self
+
+        class Cursor:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *args):
+                return False
+
+            def execute(self, query):
+                connection.queries.append(query)
+                if not connection.healthy:
+                    raise psycopg2.OperationalError("server closed the connection")
+
+            def fetchone(self):
+                return (1,)
+
+        return Cursor()
+
+    def close(self):
+        self.closed = 1
+
+
+def make_pool(**kwargs):
+    opened = []
+
+    def factory(params):
+        opened.append(FakeConnection())
+        return opened[-1]
+
+    return PgConnectionPool(factory, **kwargs), opened
+
+
+def test_pool_reuses_and_limits_per_endpoint():
+    """Соединение переиспользуется; сверх pool_max_size запросы ждут освобождения."""
+    pool, opened = make_pool(max_size=5, acquire_timeout=0.2)
+    with pool.connection(PARAMS) as first:
+        first.status = 2  # незавершённая транзакция
+    with pool.connection(PARAMS) as second:
+        pass
+    assert first is second and len(opened) == 1 and first.rollbacks == 1
+
+    small = dict(PARAMS, database="small", pool_max_size=1)
+    held = pool.acquire(small)
+    with pytest.raises(ValueError, match="pool_max_size=1"):
+        pool.acquire(small)
+    threading.Timer(0.05, pool.release, args=(held,)).start()
+    assert pool.acquire(small) is held
+    assert pool.stats()[("db", 5432, "small", "report")] == {"idle": 0, "busy": 1}
+
+
+def test_pool_health_check_replaces_dead_connection():
+    """Соединение после простоя проверяется запросом и заменяется, если не отвечает."""
+    pool, opened = make_pool(health_check_after=0.0, health_query="SELECT 42")
+    pool.release(pool.acquire(PARAMS))
+    opened[0].healthy = False
+    time.sleep(0.01)
+    connection = pool.acquire(PARAMS)
+    assert connection is opened[1] and opened[0].closed and opened[0].queries == ["SELECT 42"]
+
+    connection.closed = 1  # соединение оборвалось во время работы
+    pool.release(connection)
+    assert len(pool) == 0
+
+
+def test_pool_warm_and_reap_keep_min_size():
+    """warm открывает pool_min_size соединений, reap не закрывает их при простое."""
+    pool, opened = make_pool(min_size=2, idle_timeout=0.0)
+    assert pool.warm(PARAMS) == 2 and pool.warm(PARAMS) == 0
+    extra = [pool.acquire(PARAMS) for _ in range(3)]
+    for connection in extra:
+        pool.release(connection)
+    assert len(opened) == 3
+    time.sleep(0.01)
+    assert pool.reap() == 1 and len(pool) == 2
+    pool.close_all()
+    assert len(pool) == 0 and all(connection.closed for connection in opened)
+
+
+def test_reaper_exits_when_empty_and_restarts_for_new_connection():
+    """Reaper завершается, когда соединений не осталось, и запускается снова для нового."""
+    pool, opened = make_pool(min_size=0, idle_timeout=0.0)
+    pool.release(pool.acquire(PARAMS))
+    first = pool._reaper
+    first.join(timeout=5)
+    assert not first.is_alive() and pool._reaper is None and len(pool) == 0 and opened[0].closed
+
+    pool.release(pool.acquire(PARAMS))
+    assert pool._reaper is not None and pool._reaper is not first and pool._reaper.is_alive()
+    pool.close_all()
+
+
+class CopyDatabase:
+    """
+    Сервер для COPY: TO STDOUT пишет строки `lines` (и обрывается после
+    `fail_after` строк), FROM STDIN сохраняет прочитанное.
+    """
+
+    def __init__(self, lines, fail_on_load=False, fail_after=None):
+        self.lines = lines
+        self.fail_on_load = fail_on_load
+        self.fail_after = fail_after
+        self.loaded = b""
+        self.commands = []
+        self.reads = []
+        self.connections = []
+
+    def connect(self, params):
+        database = self
+        connection = FakeConnection()
+        connection.commits = 0
+        connection.loads = 0
+        self.connections.append(connection)
+
+        def commit():
+            connection.commits += 1
+
+        class Cursor:
+            rowcount = -1
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *args):
+                return False
+
+            def copy_expert(self, sql, file, size=8192):
+                database.commands.append(sql)
+                if "TO STDOUT" in sql:
+                    for number, line in enumerate(database.lines):
+                        if number == database.fail_after:
+                            raise psycopg2.OperationalError("server closed the connection unexpectedly")
+                        file.write(line)
+                    self.rowcount = len(database.lines)
+                    return
+                connection.loads += 1
+                while True:
+                    data = file.read(size)
+                    if not data:
+                        break
+                    database.reads.append(len(data))
+                    database.loaded += data
+                if database.fail_on_load:
+                    raise psycopg2.DataError('invalid input syntax for type integer: "x"')
+                self.rowcount = database.loaded.count(b"\n")
+
+        connection.commit = commit
+        connection.cursor = lambda: Cursor()
+        return connection
+
+
+def use_database(monkeypatch, database):
+    monkeypatch.setattr(PostgresqlConnector, "_pool", PgConnectionPool(database.connect))
+    connector = PostgresqlConnector()
+    return connector, connector.build_params(dict(PARAMS, options={"copy_chunk_size": 8192}))
+
+
+def test_copy_sql_quotes_tables_and_wraps_queries():
+    """Таблица экранируется как идентификатор, запрос берётся в скобки, в запрос загружать нельзя."""
+    assert copy_sql('public.my"table', "in", "csv", columns=["id"]) == \
+        'COPY "public"."my""table" ("id") FROM STDIN WITH (FORMAT csv, HEADER true)'
+    assert copy_sql("SELECT * FROM t;", "out", "binary") == "COPY (SELECT * FROM t) TO STDOUT WITH (FORMAT binary)"
+    with pytest.raises(ValueError, match="таблицу"):
+        copy_sql("select 1", "in")
+    with pytest.raises(ValueError, match="xml"):
+        copy_sql("t", "out", "xml")
+
+
+def test_copy_out_writes_fixed_chunks_with_progress(monkeypatch):
+    """Выгрузка пишет в файл блоками copy_chunk_size и сообщает прогресс после каждого."""
+    lines = [f"{i},name {i}\n" for i in range(3000)]
+    database = CopyDatabase(lines)
+    connector, params = use_database(monkeypatch, database)
+    target, progress = io.BytesIO(), []
+    result = connector.copy_out(params, "events", target, progress=lambda done, elapsed: progress.append(done))
+    data = "".join(lines).encode()
+    assert target.getvalue() == data and result.rows == 3000 and result.bytes == len(data)
+    assert progress[:-1] == [8192 * (i + 1) for i in range(len(progress) - 1)] and progress[-1] == len(data)
+    assert database.commands == ['COPY "events" TO STDOUT WITH (FORMAT csv, HEADER true)']
+    assert "строк" in result.summary() and result.throughput > 0
+
+
+def test_copy_in_reads_chunks_and_rolls_back_on_error(monkeypatch):
+    """Загрузка читает файл блоками и фиксирует транзакцию; при ошибке сервера — откат и ValueError."""
+    data = b"".join(b"%d\n" % i for i in range(5000))
+    database = CopyDatabase([])
+    connector, params = use_database(monkeypatch, database)
+    result = connector.copy_in(params, "ids", io.BytesIO(data), copy_format="text", header=False)
+    assert database.loaded == data and result.rows == 5000 and result.bytes == len(data)
+    assert max(database.reads) == 8192
+    assert [connection.commits for connection in database.connections] == [1]
+
+    failing = CopyDatabase([], fail_on_load=True)
+    connector, params = use_database(monkeypatch, failing)
+    with pytest.raises(ValueError, match="Ошибка COPY: invalid input"):
+        connector.copy_in(params, "ids", io.BytesIO(b"x\n"), copy_format="text")
+    assert failing.connections[0].rollbacks == 1 and failing.connections[0].commits == 0
+
+
+def test_copy_to_endpoint_rolls_back_target_when_source_fails(monkeypatch):
+    """Обрыв источника на середине прерывает загрузку: приёмник откатывает транзакцию."""
+    lines = [b"%d\n" % i for i in range(20000)]
+    database = CopyDatabase(lines)
+    connector, params = use_database(monkeypatch, database)
+    result = connector.copy_to_endpoint(params, "events", dict(params, database="archive"), "events", "text")
+    assert database.loaded == b"".join(lines) and result.rows == 20000
+
+    failing = CopyDatabase(lines, fail_after=15000)
+    connector, params = use_database(monkeypatch, failing)
+    with pytest.raises(ValueError, match="источник: .*server closed"):
+        connector.copy_to_endpoint(params, "events", dict(params, database="archive"), "events", "text")
+    target = next(connection for connection in failing.connections if connection.loads)
+    assert failing.loaded and target.commits == 0 and target.rollbacks == 1
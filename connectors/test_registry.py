@@ -0,0 +1,98 @@
+"""Unit-тесты для реестра коннекторов connectors.registry."""
+
+import json
+import os
+import sys
+
+import pytest
+
+from connectors.registry import ConnectorRegistry
+
+CONNECTOR_SOURCE = '''
+IMPORTED = True
+
+
+class {class_name}:
+    def __init__(self):
+        self.available_options = self.default_options()
+
+    def default_options(self):
+        return {{"timeout": {{"type": int, "description": "Таймаут", "value": {timeout}}}}}
+
+    def get_required_fields(self):
+        return ["host"]
+
+    def test_connection(self, params):
+        return True, "ok"
+'''
+
+
+@pytest.fixture
+def package(tmp_path, monkeypatch):
+    """Временный пакет коннекторов с коннектором `fake` и служебным модулем."""
+    root = tmp_path / "fakeconnectors"
+    root.mkdir()
+    (root / "__init__.py").write_text("", encoding="utf-8")
+    (root / "fake.py").write_text(CONNECTOR_SOURCE.format(class_name="FakeConnector", timeout=5), encoding="utf-8")
+    (root / "helpers.py").write_text("VALUE = 1\n", encoding="utf-8")
+    (root / "test_fake.py").write_text("raise RuntimeError('тесты не импортируются')\n", encoding="utf-8")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield root
+    for name in [name for name in sys.modules if name.startswith("fakeconnectors")]:
+        del sys.modules[name]
+
+
+def make_registry(package):
+    return ConnectorRegistry(str(package), package="fakeconnectors",
+                             cache_path=str(package.parent / "connectors.cache.json"))
+
+
+def forget_modules():
+    for name in [name for name in sys.modules if name.startswith("fakeconnectors.")]:
+        del sys.modules[name]
+
+
+def test_first_load_imports_and_writes_cache(package):
+    """Без кэша модули импортируются, описания сохраняются в кэш."""
+    registry = make_registry(package)
+    connectors = registry.load()
+
+    assert list(connectors) == ["fake"]
+    assert sorted(registry.imported) == ["fake", "helpers"]
+    cache = json.loads((package.parent / "connectors.cache.json").read_text(encoding="utf-8"))
+    assert cache["modules"]["fake"]["options"]["timeout"]["type"] == "int"
+    assert cache["modules"]["helpers"]["class"] is None
+
+
+def test_cached_load_does_not_import_modules(package):
+    """С актуальным кэшем схемы читаются без импорта; модуль грузится при первом обращении."""
+    make_registry(package).load()
+    forget_modules()
+
+    registry = make_registry(package)
+    connector = registry.load()["fake"]
+
+    assert registry.imported == []
+    assert "fakeconnectors.fake" not in sys.modules
+    assert connector.available_options["timeout"] == {"type": int, "description": "Таймаут", "value": 5}
+    assert connector.get_required_fields() == ["host"]
+    assert not connector.loaded
+
+    assert connector.test_connection({}) == (True, "ok")
+    assert connector.loaded and "fakeconnectors.fake" in sys.modules
+
+
+def test_changed_module_is_described_again(package):
+    """Изменение файла коннектора сбрасывает его запись в кэше."""
+    make_registry(package).load()
+    forget_modules()
+    path = package / "fake.py"
+    path.write_text(CONNECTOR_SOURCE.format(class_name="FakeConnector", timeout=30), encoding="utf-8")
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    registry = make_registry(package)
+    connectors = registry.load()
+
+    assert registry.imported == ["fake"]
+    assert connectors["fake"].available_options["timeout"]["value"] == 30
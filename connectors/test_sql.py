@@ -0,0 +1,125 @@
+"""Unit-тесты для потокового чтения SQL-результатов."""
+
+import io
+import json
+import sqlite3
+
+import psycopg2
+import pytest
+
+from connectors import PostgreSQL
+from connectors.PostgreSQL import PostgresqlConnector
+from connectors.sql import RowStream, write_rows
+
+
+PG_PARAMS = {"host": "db", "port": 5432, "database": "app", "user": "report", "password": "x"}
+
+
+class NamedCursor:
+    """Серверный курсор psycopg2: описание столбцов появляется после первого FETCH."""
+
+    def __init__(self, rows, fail_after=None):
+        self.rows = rows
+        self.fail_after = fail_after
+        self.description = None
+        self.fetches = []
+        self.closed = False
+        self.position = 0
+
+    def execute(self, sql, args=None):
+        self.sql = sql
+
+    def fetchmany(self, size):
+        if self.fail_after is not None and self.position >= self.fail_after:
+            raise psycopg2.OperationalError("connection lost")
+        self.description = (("id",), ("name",))
+        self.fetches.append(size)
+        batch = self.rows[self.position:self.position + size]
+        self.position += len(batch)
+        return batch
+
+    def close(self):
+        self.closed = True
+
+
+class FakeConnection:
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.names = []
+        self.finished = []
+        self.closed = 0
+
+    def get_transaction_status(self):
+        return 0
+
+    def cursor(self, name=None):
+        self.names.append(name)
+        return self._cursor
+
+    def commit(self):
+        self.finished.append("commit")
+
+    def rollback(self):
+        self.finished.append("rollback")
+
+    def close(self):
+        self.finished.append("close")
+        self.closed = 1
+
+
+def connect_to(monkeypatch, cursor):
+    connection = FakeConnection(cursor)
+    monkeypatch.setattr(PostgreSQL.psycopg2, "connect", lambda **kwargs: connection)
+    monkeypatch.setattr(PostgresqlConnector, "_pool", None)
+    return connection
+
+
+def test_postgres_streams_from_named_cursor(monkeypatch):
+    """Запрос идёт через именованный курсор, строки читаются пачками по itersize."""
+    rows = [(i, f"row {i}") for i in range(10)]
+    cursor = NamedCursor(rows)
+    connection = connect_to(monkeypatch, cursor)
+    connector = PostgresqlConnector()
+    params = connector.build_params(dict(PG_PARAMS, options={"itersize": 4}))
+
+    stream = connector.stream_query(params, "SELECT id, name FROM t")
+    assert connection.names[0].startswith("bino_") and cursor.itersize == 4
+    assert stream.columns == ["id", "name"]
+    batches = list(stream)
+    assert [len(batch) for batch in batches] == [4, 4, 2] and stream.rows == 10
+    assert cursor.fetches == [4, 4, 4] and cursor.closed
+    assert connection.finished == ["commit"] and len(PostgresqlConnector.pool()) == 1
+
+
+def test_postgres_stream_errors_and_early_close(monkeypatch):
+    """Ошибка чтения становится ValueError; брошенный поток откатывает транзакцию."""
+    connection = connect_to(monkeypatch, NamedCursor([(1, "a")] * 10, fail_after=4))
+    stream = PostgresqlConnector().stream_query(PG_PARAMS, "SELECT 1", itersize=4)
+    with pytest.raises(ValueError, match="connection lost"):
+        list(stream)
+    assert connection.finished == ["rollback"]
+
+    connection = connect_to(monkeypatch, NamedCursor([(1, "a")] * 10))
+    with PostgresqlConnector().stream_query(PG_PARAMS, "SELECT 1", itersize=4) as stream:
+        next(iter(stream))
+    assert connection.finished == ["rollback"]
+
+
+def test_write_rows_formats():
+    """CSV с заголовком, JSONL по объекту на строку, прогресс после каждой пачки."""
+    connection = sqlite3.connect(":memory:")
+    connection.execute("CREATE TABLE t (id INTEGER, name TEXT, data BLOB)")
+    connection.executemany("INSERT INTO t VALUES (?, ?, ?)",
+                           [(i, f"name, {i}", b"\x01" if i == 0 else None) for i in range(5)])
+
+    out = io.StringIO()
+    progress = []
+    rows = write_rows(RowStream(connection.execute("SELECT * FROM t"), 2), out, "csv",
+                      lambda count, elapsed: progress.append(count))
+    assert rows == 5 and progress == [2, 4, 5]
+    assert out.getvalue().splitlines()[:2] == ["id,name,data", '0,"name, 0",01']
+
+    out = io.StringIO()
+    write_rows(RowStream(connection.execute("SELECT id, name FROM t WHERE id > 2"), 10), out, "jsonl")
+    assert [json.loads(line) for line in out.getvalue().splitlines()] == [
+        {"id": 3, "name": "name, 3"}, {"id": 4, "name": "name, 4"}]
@@ -0,0 +1,65 @@
+"""Unit-тесты для профиля производительности и пакетной работы SqliteConnector."""
+
+import pytest
+
+from connectors.SQLite import SqliteConnector
+
+
+def make_params(tmp_path, **options):
+    connector = SqliteConnector()
+    params = connector.build_params({"path": str(tmp_path / "data.db"), "options": options})
+    return connector, params
+
+
+def test_performance_profile_pragmas(tmp_path):
+    """Профиль задаёт PRAGMA, явные опции перекрывают его, недопустимые значения отвергаются."""
+    connector, params = make_params(tmp_path)
+    assert connector.pragmas(params) == {}
+
+    connector, params = make_params(tmp_path, performance_profile=True, synchronous="full", mmap_size=1048576)
+    connection = connector.connect(params)
+    try:
+        values = {name: connection.execute(f"PRAGMA {name}").fetchone()[0]
+                  for name in ("journal_mode", "synchronous", "cache_size", "mmap_size", "temp_store")}
+    finally:
+        connection.close()
+    assert values == {"journal_mode": "wal", "synchronous": 2, "cache_size": -65536,
+                      "mmap_size": 1048576, "temp_store": 2}
+
+    with pytest.raises(ValueError, match="journal_mode"):
+        connector.connect(dict(params, journal_mode="wal; DROP TABLE t"))
+
+
+def test_bulk_write_commits_per_batch(tmp_path):
+    """Строки пишутся пачками в транзакциях; пачка с ошибкой откатывается."""
+    connector, params = make_params(tmp_path, performance_profile=True)
+    connection = connector.connect(params)
+    connection.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT)")
+    connection.close()
+
+    progress = []
+    rows = ((i, f"row {i}") for i in range(25))
+    assert connector.bulk_write(params, "INSERT INTO t VALUES (?, ?)", rows, batch_size=10,
+                                progress=lambda count, elapsed: progress.append(count)) == 25
+    assert progress == [10, 20, 25]
+
+    duplicate = [(100 + i, "new") for i in range(10)] + [(5, "duplicate")] + [(200, "late")]
+    with pytest.raises(ValueError, match="после 10 строк"):
+        connector.bulk_write(params, "INSERT INTO t VALUES (?, ?)", duplicate, batch_size=10)
+    with connector.stream_query(params, "SELECT count(*) FROM t") as stream:
+        assert list(stream) == [[(35,)]]
+
+
+def test_stream_query_fetches_batches(tmp_path):
+    """Запрос читается пачками fetchmany, соединение закрывается вместе с потоком."""
+    connector, params = make_params(tmp_path, batch_size=4)
+    connection = connector.connect(params)
+    connection.execute("CREATE TABLE t (id INTEGER)")
+    connection.close()
+    connector.bulk_write(params, "INSERT INTO t VALUES (?)", ((i,) for i in range(10)))
+
+    stream = connector.stream_query(params, "SELECT id FROM t WHERE id >= ? ORDER BY id", (1,))
+    assert stream.columns == ["id"]
+    assert [len(batch) for batch in stream] == [4, 4, 1] and stream.rows == 9
+    with pytest.raises(ValueError, match="no such table"):
+        connector.stream_query(params, "SELECT * FROM missing")
@@ -0,0 +1,164 @@
+"""Unit-тесты для пула соединений SshConnectionPool."""
+
+import socket
+import threading
+import time
+from unittest.mock import MagicMock
+
+import paramiko
+import pytest
+
+from connectors.ssh import SshConnectionPool, SshConnector
+
+
+PARAMS = {"ip": "10.0.0.1", "port": "22", "login": "root", "password": "secret"}
+
+
+def make_client(alive=True):
+    """Создает поддельный SSHClient с активным транспортом."""
+    client = MagicMock()
+    transport = client.get_transport.return_value
+    transport.is_active.return_value = alive
+    transport.is_authenticated.return_value = alive
+    return client
+
+
+def touch(pool, params):
+    """Берёт соединение из пула и сразу возвращает его."""
+    pool.release(pool.acquire(params))
+
+
+@pytest.fixture
+def factory():
+    """Фабрика соединений, каждый раз возвращающая новый клиент."""
+    return MagicMock(side_effect=lambda params: make_client())
+
+
+def test_pool_reuses_connection(factory):
+    """Повторные запросы с теми же параметрами не открывают новое соединение."""
+    pool = SshConnectionPool(factory)
+
+    with pool.connection(PARAMS) as first:
+        pass
+    with pool.connection(dict(PARAMS)) as second:
+        pass
+
+    assert first is second
+    assert factory.call_count == 1
+    first.get_transport.return_value.set_keepalive.assert_called_once_with(30)
+
+
+def test_pool_key_depends_on_auth(factory):
+    """Разные учётные данные дают разные соединения, пароль не хранится в ключе."""
+    pool = SshConnectionPool(factory)
+    other = {**PARAMS, "password": "other"}
+
+    touch(pool, PARAMS)
+    touch(pool, other)
+
+    assert factory.call_count == 2
+    assert "secret" not in repr(SshConnectionPool.make_key(PARAMS))
+
+
+def test_pool_replaces_dead_connection(factory):
+    """Соединение, не прошедшее проверку здоровья, переоткрывается."""
+    pool = SshConnectionPool(factory)
+    client = pool.acquire(PARAMS)
+    pool.release(client)
+    client.get_transport.return_value.is_active.return_value = False
+
+    fresh = pool.acquire(PARAMS)
+
+    assert fresh is not client
+    client.close.assert_called_once()
+
+
+def test_pool_discards_broken_connection(factory):
+    """Ошибка SSH внутри сессии закрывает соединение."""
+    pool = SshConnectionPool(factory)
+    with pytest.raises(paramiko.SSHException):
+        with pool.connection(PARAMS) as client:
+            raise paramiko.SSHException("channel closed")
+
+    client.close.assert_called_once()
+    assert len(pool) == 0
+
+
+def test_pool_opens_extra_connection_over_max_sessions(factory):
+    """Больше max_sessions одновременных каналов — новое соединение к тому же хосту."""
+    pool = SshConnectionPool(factory, max_sessions=2)
+    clients = [pool.acquire(PARAMS) for _ in range(5)]
+
+    assert factory.call_count == 3
+    assert len(set(map(id, clients))) == 3
+    for client in clients:
+        pool.release(client)
+    touch(pool, PARAMS)
+    assert factory.call_count == 3
+
+
+def test_pool_reaps_idle_connections(factory):
+    """Простаивающие соединения без аренды закрываются, занятые остаются."""
+    pool = SshConnectionPool(factory)
+    busy_params = {**PARAMS, "ip": "10.0.0.2"}
+    idle = pool.acquire({**PARAMS, "pool_idle_timeout": 0})
+    pool.release(idle)
+    busy = pool.acquire({**busy_params, "pool_idle_timeout": 0})
+    time.sleep(0.01)
+
+    assert pool.reap() == 1
+    idle.close.assert_called_once()
+    busy.close.assert_not_called()
+
+
+def test_pool_single_connection_under_concurrency():
+    """Параллельные запуски на один хост ждут одно рукопожатие."""
+    def slow_factory(params):
+        time.sleep(0.05)
+        return make_client()
+
+    factory = MagicMock(side_effect=slow_factory)
+    pool = SshConnectionPool(factory)
+    threads = [threading.Thread(target=touch, args=(pool, PARAMS))
+               for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert factory.call_count == 1
+
+
+def test_build_params_merges_options():
+    """Параметры подключения собираются из значений по умолчанию, опций и полей."""
+    connector = SshConnector()
+    params = connector.build_params({**PARAMS, "options": {"timeout": 30}})
+
+    assert params["timeout"] == 30
+    assert params["auth_timeout"] == 10
+    assert params["ip"] == "10.0.0.1"
+    assert "options" not in params
+
+
+def test_probe_measures_phases_until_failure():
+    """Проверка замеряет TCP и баннер отдельно и сообщает фазу, на которой остановилась."""
+    server = socket.socket()
+    server.bind(("127.0.0.1", 0))
+    server.listen(1)
+
+    def serve():
+        conn, _ = server.accept()
+        time.sleep(0.05)
+        conn.sendall(b"SSH-2.0-OpenSSH_test\r\n")
+        time.sleep(0.05)
+        conn.close()
+
+    threading.Thread(target=serve, daemon=True).start()
+    params = dict(PARAMS, ip="127.0.0.1", port=server.getsockname()[1], timeout=2, banner_timeout=2)
+    success, message, timings = SshConnector().probe(params)
+    server.close()
+
+    assert not success and message
+    assert list(timings) == ["tcp", "banner", "kex"]
+    assert timings["banner"] >= 0.04
+    assert SshConnector().probe({"ip": "127.0.0.1"})[2] == {}
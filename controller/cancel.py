@@ -0,0 +1,207 @@
+"""
+Отмена запусков и ограничения времени выполнения.
+
+Закрытия канала SSH недостаточно, чтобы остановить удалённый скрипт:
+sshd не посылает сигнал процессу без терминала, и тот продолжает
+работать (и держать CPU), пока не попытается что-нибудь вывести. Поэтому
+движок (`controller.engine`) запускает команду через обёртку, которая
+первой строкой stderr сообщает PID оболочки: sshd запускает её в новой
+сессии, так что этот PID — идентификатор группы процессов скрипта и всех
+его потомков. При отмене по отдельному каналу того же соединения
+выполняется `kill -TERM -PGID`, а через `kill_grace` секунд — `KILL`.
+
+Для оболочек, где обёртка не работает, есть режим `pty`: канал получает
+псевдотерминал, и при его закрытии sshd посылает группе процессов SIGHUP
+(stdout и stderr при этом приходят одним потоком). Режим `close` только
+закрывает канал.
+
+`Watchdog` следит за ограничениями времени запуска: общим (`wall_timeout`)
+и временем без вывода (`idle_timeout`) — и отменяет задачу запуска, когда
+одно из них превышено. Ограничения задаются в секции `[Execution]` и
+переопределяются ключами `wall_timeout`/`idle_timeout` в опциях скрипта.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+KILL_MODES = ("pgid", "pty", "close")
+DEFAULT_KILL_MODE = "pgid"
+DEFAULT_KILL_GRACE = 5.0
+
+PGID_MARKER = b"__BINO_PGID__:"
+# Строка с маркером короче этого; всё, что длиннее, — обычный вывод скрипта
+MAX_MARKER_LINE = 64
+
+# Причины остановки запуска (`HostResult.stopped`) и сообщения для вывода
+CANCELLED = "cancelled"
+WALL_TIMEOUT = "wall_timeout"
+IDLE_TIMEOUT = "idle_timeout"
+STOP_MESSAGES = {
+    CANCELLED: "Запуск отменён",
+    WALL_TIMEOUT: "Превышено время выполнения",
+    IDLE_TIMEOUT: "Превышено время ожидания вывода",
+}
+
+
+@dataclass
+class RunLimits:
+    """
+    Ограничения и способ остановки запуска.
+
+    :param wall_timeout: Максимальная длительность запуска в секундах (0 — без ограничения).
+    :param idle_timeout: Максимальное время без вывода в секундах (0 — без ограничения).
+    :param kill_mode: Способ остановки удалённого процесса: одно из `KILL_MODES`.
+    :param kill_grace: Пауза между SIGTERM и SIGKILL в секундах.
+    """
+
+    wall_timeout: float = 0.0
+    idle_timeout: float = 0.0
+    kill_mode: str = DEFAULT_KILL_MODE
+    kill_grace: float = DEFAULT_KILL_GRACE
+
+
+def _seconds(value: Any, default: float) -> float:
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return default
+
+
+def run_limits(config: Optional[Any] = None, options: Optional[Dict[str, Any]] = None) -> RunLimits:
+    """
+    Ограничения запуска из секции [Execution] с переопределением опциями скрипта.
+
+    :param config: `ConfigParser` с настройками приложения (`None` — значения по умолчанию).
+    :param options: Опции скрипта (`Script.options`); учитываются ключи
+                    `wall_timeout`, `idle_timeout`, `kill_mode`.
+    """
+    limits = RunLimits()
+    if config is not None and config.has_section("Execution"):
+        section = config["Execution"]
+        limits.wall_timeout = _seconds(section.get("wall_timeout"), limits.wall_timeout)
+        limits.idle_timeout = _seconds(section.get("idle_timeout"), limits.idle_timeout)
+        limits.kill_grace = _seconds(section.get("kill_grace"), limits.kill_grace)
+        limits.kill_mode = section.get("kill_mode", limits.kill_mode).strip().lower()
+    options = options or {}
+    limits.wall_timeout = _seconds(options.get("wall_timeout"), limits.wall_timeout)
+    limits.idle_timeout = _seconds(options.get("idle_timeout"), limits.idle_timeout)
+    limits.kill_mode = str(options.get("kill_mode") or limits.kill_mode).strip().lower()
+    if limits.kill_mode not in KILL_MODES:
+        logger.warning("run_limits(): неизвестный kill_mode '%s', используется %s",
+                       limits.kill_mode, DEFAULT_KILL_MODE)
+        limits.kill_mode = DEFAULT_KILL_MODE
+    return limits
+
+
+def wrap_command(command: str) -> str:
+    """Команда, которая перед запуском сообщает в stderr идентификатор своей группы процессов."""
+    return f"printf '{PGID_MARKER.decode()}%s\\n' \"$$\" >&2; {command}"
+
+
+def kill_command(pgid: int, grace: float) -> str:
+    """Команда остановки группы процессов: SIGTERM сразу, SIGKILL после паузы."""
+    return (f"kill -TERM -{pgid} 2>/dev/null; "
+            f"(sleep {grace:g}; kill -KILL -{pgid}) </dev/null >/dev/null 2>&1 &")
+
+
+class PgidFilter:
+    """
+    Вырезает строку с маркером группы процессов из начала stderr.
+    """
+
+    def __init__(self) -> None:
+        self.pgid: Optional[int] = None
+        self._buffer = b""
+        self._done = False
+
+    def feed(self, data: bytes) -> bytes:
+        """Принимает кусок stderr и возвращает то, что нужно показать как вывод скрипта."""
+        if self._done:
+            return data
+        self._buffer += data
+        line, newline, rest = self._buffer.partition(b"\n")
+        if not newline:
+            waiting = PGID_MARKER.startswith(line) or line.startswith(PGID_MARKER)
+            if waiting and len(line) < MAX_MARKER_LINE:
+                return b""
+            return self.flush()
+        self._done = True
+        self._buffer = b""
+        value = line[len(PGID_MARKER):] if line.startswith(PGID_MARKER) else b""
+        if value.isdigit() and int(value) > 1:
+            self.pgid = int(value)
+            return rest
+        return line + newline + rest
+
+    def flush(self) -> bytes:
+        """Возвращает накопленное, если маркер так и не пришёл."""
+        self._done = True
+        data, self._buffer = self._buffer, b""
+        return data
+
+
+class Watchdog:
+    """
+    Отменяет задачу запуска при превышении `wall_timeout` или `idle_timeout`.
+
+    Проверка планируется через `loop.call_at` на ближайший срок, а не
+    циклом с ожиданием: на тысячу запусков — тысяча отложенных вызовов, а
+    `touch` при каждом куске вывода — одно присваивание.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, task: "asyncio.Task", limits: RunLimits) -> None:
+        self.loop = loop
+        self.task = task
+        self.limits = limits
+        self.reason: Optional[str] = None
+        self._started = loop.time()
+        self._last_output: Optional[float] = None
+        self._handle: Optional[asyncio.TimerHandle] = None
+
+    def start(self) -> None:
+        """Запускает отсчёт общего времени."""
+        self._schedule()
+
+    def touch(self) -> None:
+        """Отмечает вывод (или открытие канала) — с этого момента считается простой."""
+        first = self._last_output is None
+        self._last_output = self.loop.time()
+        # Дальше срок простоя только отодвигается: запланированная проверка
+        # сработает не позже него и перепланирует себя сама.
+        if first and self.limits.idle_timeout:
+            self.cancel()
+            self._schedule()
+
+    def cancel(self) -> None:
+        """Останавливает отсчёт."""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+    def _deadlines(self) -> Dict[str, float]:
+        deadlines = {}
+        if self.limits.wall_timeout:
+            deadlines[WALL_TIMEOUT] = self._started + self.limits.wall_timeout
+        if self.limits.idle_timeout and self._last_output is not None:
+            deadlines[IDLE_TIMEOUT] = self._last_output + self.limits.idle_timeout
+        return deadlines
+
+    def _schedule(self) -> None:
+        deadlines = self._deadlines()
+        if deadlines:
+            self._handle = self.loop.call_at(min(deadlines.values()), self._check)
+
+    def _check(self) -> None:
+        self._handle = None
+        now = self.loop.time()
+        for reason, deadline in self._deadlines().items():
+            if now >= deadline:
+                self.reason = reason
+                logger.info("Watchdog -> %s, запуск отменяется", reason)
+                self.task.cancel()
+                return
+        self._schedule()
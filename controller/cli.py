@@ -0,0 +1,738 @@
+"""
+Консольный запуск скриптов без UI.
+
+Использует те же модели, хранилище, интерпретаторы и движок выполнения,
+что и приложение на Tk, но не импортирует tkinter, pygments и шрифты:
+запуск подходит для cron, CI и серверов без дисплея.
+
+Команды:
+
+- `run` — выполнить скрипты на эндпоинтах и дождаться результатов;
+- `list` — показать скрипты или эндпоинты;
+- `enqueue`, `schedule add|list|remove`, `queue` — очередь заданий и
+  расписания cron;
+- `daemon` — выполнять задания и расписания из базы;
+- `probe` — проверить подключение к эндпоинтам с замером задержек;
+- `query` — SQL-запрос на одном или нескольких SQL-эндпоинтах;
+- `copy` — выгрузка и загрузка таблиц PostgreSQL командой COPY.
+
+    python cli.py run deploy -e "web-*" -j 50
+    python cli.py run deploy check --group prod --format jsonl
+    python cli.py list endpoints
+    python cli.py enqueue deploy -e "web-*" --priority background
+    python cli.py schedule add nightly-check check "0 3 * * *" --group prod
+    python cli.py queue
+    python cli.py daemon
+    python cli.py probe -g prod --sort auth --export probe.csv
+    python cli.py query reports-db "SELECT * FROM events" -o events.csv
+    python cli.py query "shard-*" "SELECT id, ts FROM events ORDER BY ts" --order-by ts
+    python cli.py copy reports-db public.events -o events.csv
+    python cli.py copy reports-db public.events --to-endpoint archive-db
+
+Вывод хостов передаётся в stdout/stderr по мере поступления (при запуске
+на нескольких хостах каждая строка предваряется именем хоста) или в
+формате JSONL — по записи на кусок вывода, результат хоста и отчёт.
+
+Команды `enqueue`, `schedule` и `queue` работают с базой заданий
+([Scheduler] path), а выполняет задания и расписания `daemon` — один
+процесс на базу (см. `controller.scheduler`).
+
+Код возврата: 0 — все хосты отработали успешно, 1 — хотя бы один хост
+завершился ошибкой, 2 — неверные аргументы или записи не найдены,
+130 — прервано по Ctrl+C (выполняющиеся на хостах процессы останавливаются).
+"""
+
+import argparse
+import configparser
+import json
+import logging
+import sys
+import time
+from datetime import datetime
+from queue import Empty
+from typing import Any, Dict, List, Optional, TextIO, Tuple
+
+from connectors.registry import DEFAULT_CACHE_PATH as CONNECTOR_CACHE_PATH, ConnectorRegistry
+from connectors.sql import COPY_FORMATS, FORMATS as SQL_FORMATS, write_rows
+from connectors.channel import OutputChunk
+from controller.cancel import RunLimits, run_limits
+from controller.engine import ExecutionEngine
+from controller.history import DEFAULT_PATH as HISTORY_PATH, RunHistory
+from controller.query import DEFAULT_SQL_CONCURRENCY, SqlFanOut
+from controller.probe import (PHASES, SORT_KEYS, ProbeCache, export_results, fingerprint, plan_probes,
+                              probe_settings, sort_results)
+from controller.delivery import delivery_settings, prepare_command
+from controller.runner import (DEFAULT_CONCURRENCY, FanOutReport, HostResult,
+                               default_interpreters, endpoint_table, select_endpoints)
+from controller.scheduler import (ACTIVE_STATES, DEFAULT_PATH as JOBS_PATH, PRIORITIES, Job, JobStore,
+                                  Schedule, Scheduler)
+from controller.storage import create_storage
+from model.script import Script
+
+logger = logging.getLogger(__name__)
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+EXIT_INTERRUPTED = 130
+
+DEFAULT_SETTINGS = "settings.ini"
+FORMATS = ("text", "jsonl")
+
+
+class TextWriter:
+    """
+    Текстовый вывод: stdout хостов — в stdout, stderr и итоги — в stderr.
+
+    При запуске на нескольких хостах вывод собирается в строки отдельно по
+    каждому хосту и печатается с префиксом `хост | `, чтобы строки разных
+    хостов не перемешивались посередине.
+    """
+
+    def __init__(self, out: TextIO, err: TextIO, prefix: bool = False) -> None:
+        self.out = out
+        self.err = err
+        self.prefix = prefix
+        self._partial: Dict[tuple, str] = {}
+
+    def _stream(self, stream: str) -> TextIO:
+        return self.err if stream == "stderr" else self.out
+
+    def output(self, script: str, endpoint: str, chunk: OutputChunk) -> None:
+        """Кусок вывода хоста."""
+        target = self._stream(chunk.stream)
+        if not self.prefix:
+            target.write(chunk.data)
+            target.flush()
+            return
+        key = (endpoint, chunk.stream)
+        lines = (self._partial.pop(key, "") + chunk.data).split("\n")
+        if lines[-1]:
+            self._partial[key] = lines[-1]
+        for line in lines[:-1]:
+            target.write(f"{endpoint} | {line}\n")
+        target.flush()
+
+    def _flush_partial(self, endpoint: str) -> None:
+        for stream in ("stdout", "stderr"):
+            rest = self._partial.pop((endpoint, stream), None)
+            if rest:
+                self._stream(stream).write(f"{endpoint} | {rest}\n")
+
+    def result(self, script: str, result: HostResult) -> None:
+        """Итог выполнения на одном хосте."""
+        self._flush_partial(result.endpoint)
+        if self.prefix or not result.success:
+            status = "OK" if result.success else "FAIL"
+            self.err.write(f"[{status}] {result.endpoint} ({result.duration:.2f} с)\n")
+        self.err.flush()
+
+    def report(self, report: FanOutReport) -> None:
+        """Сводка по скрипту."""
+        if self.prefix:
+            self.err.write(report.summary() + "\n")
+            self.err.flush()
+
+
+class JsonlWriter:
+    """
+    Вывод в формате JSONL: по объекту на строку с полем `event`
+    (`output`, `result` или `report`).
+    """
+
+    def __init__(self, out: TextIO) -> None:
+        self.out = out
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        self.out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.out.flush()
+
+    def output(self, script: str, endpoint: str, chunk: OutputChunk) -> None:
+        """Кусок вывода хоста."""
+        self._write({"event": "output", "script": script, "endpoint": endpoint,
+                     "stream": chunk.stream, "data": chunk.data, "ts": chunk.timestamp})
+
+    def result(self, script: str, result: HostResult) -> None:
+        """Итог выполнения на одном хосте."""
+        self._write({"event": "result", "script": script, "endpoint": result.endpoint,
+                     "success": result.success, "exit_code": result.exit_code,
+                     "duration": result.duration, "started_at": result.started_at,
+                     "bytes_out": result.bytes_out, "bytes_err": result.bytes_err,
+                     "timings": result.timings, "error": result.error, "stopped": result.stopped})
+
+    def report(self, report: FanOutReport) -> None:
+        """Сводка по скрипту."""
+        self._write({"event": "report", "script": report.script, "total": len(report.results),
+                     "succeeded": len(report.succeeded), "failed": len(report.failed),
+                     "duration": report.duration})
+
+
+class BatchRunner:
+    """
+    Запускает скрипты из хранилища на эндпоинтах через `ExecutionEngine`
+    и передаёт события движка в writer.
+    """
+
+    def __init__(self, storage: Any, engine: ExecutionEngine, writer: Any,
+                 concurrency: int = DEFAULT_CONCURRENCY, delivery: Optional[Dict[str, Any]] = None,
+                 config: Optional[configparser.ConfigParser] = None,
+                 wall_timeout: Optional[float] = None, idle_timeout: Optional[float] = None) -> None:
+        """
+        :param delivery: Параметры доставки кода (см. `controller.delivery.delivery_settings`).
+        :param config: Настройки, из секции [Execution] которых берутся ограничения времени.
+        :param wall_timeout: Общий таймаут запуска (перекрывает настройки и опции скриптов).
+        :param idle_timeout: Таймаут без вывода (перекрывает настройки и опции скриптов).
+        """
+        self.storage = storage
+        self.engine = engine
+        self.writer = writer
+        self.concurrency = concurrency
+        self.delivery = delivery or delivery_settings(None)
+        self.config = config
+        self.wall_timeout = wall_timeout
+        self.idle_timeout = idle_timeout
+        self.interpreters = default_interpreters()
+        from connectors.ssh import SshConnector  # paramiko нужен только командам, работающим с хостами
+        self.connector = SshConnector()
+
+    def targets(self, script: Script, patterns: List[str], group: Optional[str]) -> Dict[str, Dict[str, Any]]:
+        """Эндпоинты запуска: по шаблонам/группе или эндпоинт из записи скрипта."""
+        if not patterns and not group:
+            patterns = [script.endpoint]
+        return select_endpoints(endpoint_table(self.storage), names=patterns, group=group)
+
+    def limits(self, script: Script) -> RunLimits:
+        """Ограничения запуска скрипта: настройки, опции скрипта, затем аргументы командной строки."""
+        limits = run_limits(self.config, script.options)
+        if self.wall_timeout is not None:
+            limits.wall_timeout = self.wall_timeout
+        if self.idle_timeout is not None:
+            limits.idle_timeout = self.idle_timeout
+        return limits
+
+    def run(self, script: Script, endpoints: Dict[str, Dict[str, Any]]) -> FanOutReport:
+        """Выполняет скрипт на эндпоинтах и ждёт отчёт, передавая вывод в writer."""
+        report = FanOutReport(script=script.name)
+        targets = {}
+        for name, data in endpoints.items():
+            # Движок выполняет команды только по SSH.
+            endpoint_type = data.get("type") or "ssh"
+            if endpoint_type != "ssh":
+                result = HostResult(endpoint=name, error=f"Тип эндпоинта '{endpoint_type}' не поддерживается")
+                report.results.append(result)
+                self.writer.result(script.name, result)
+                continue
+            targets[name] = self.connector.build_params(data)
+        if not targets:
+            self.writer.report(report)
+            return report
+
+        command = prepare_command(self.interpreters, script.interpreter, script.code, script.options,
+                                  **self.delivery)
+        handle = self.engine.fanout(script.name, targets, command, self.concurrency, self.limits(script))
+        host_prefix = handle.run_id + ":"
+        while True:
+            event = self.engine.events.get()
+            if event.key == handle.run_id:
+                if event.kind == "result":
+                    self.writer.result(script.name, event.payload)
+                elif event.kind == "report":
+                    report.results.extend(event.payload.results)
+                    report.duration = event.payload.duration
+                    self.writer.report(report)
+                    return report
+            elif event.key.startswith(host_prefix) and event.kind == "output":
+                self.writer.output(script.name, event.key[len(host_prefix):], event.payload)
+
+
+def load_config(path: str) -> configparser.ConfigParser:
+    """Читает settings.ini (отсутствующий файл — пустая конфигурация)."""
+    config = configparser.ConfigParser()
+    config.read(path, encoding="utf-8")
+    return config
+
+
+def open_history(config: configparser.ConfigParser) -> Optional[RunHistory]:
+    """История запусков по секции [History] (enabled, path)."""
+    if not config.getboolean("History", "enabled", fallback=True):
+        return None
+    path = config.get("History", "path", fallback=HISTORY_PATH).strip().strip("\"'")
+    return RunHistory(path or HISTORY_PATH)
+
+
+def open_jobs(config: configparser.ConfigParser) -> JobStore:
+    """База заданий по секции [Scheduler] (path)."""
+    path = config.get("Scheduler", "path", fallback=JOBS_PATH).strip().strip("\"'")
+    return JobStore(path or JOBS_PATH)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Аргументы командной строки."""
+    parser = argparse.ArgumentParser(prog="cli.py", description="Запуск скриптов B!NO без UI")
+    parser.add_argument("--settings", default=DEFAULT_SETTINGS, help="Путь к settings.ini")
+    parser.add_argument("-v", "--verbose", action="count", default=0, help="Подробный лог в stderr")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Выполнить скрипты на эндпоинтах")
+    run.add_argument("scripts", nargs="+", help="Имена скриптов (выполняются по очереди)")
+    run.add_argument("-e", "--endpoint", action="append", default=[],
+                     help="Имя или glob-шаблон эндпоинта (можно повторять); "
+                          "по умолчанию — эндпоинт из записи скрипта")
+    run.add_argument("-g", "--group", help="Группа эндпоинтов")
+    run.add_argument("-j", "--concurrency", type=int,
+                     help="Максимум одновременно обслуживаемых хостов (по умолчанию из [Execution])")
+    run.add_argument("--timeout", type=float, help="Общий таймаут запуска на хосте, с (0 — без ограничения)")
+    run.add_argument("--idle-timeout", type=float, help="Таймаут без вывода, с (0 — без ограничения)")
+    run.add_argument("--format", choices=FORMATS, default="text", help="Формат вывода")
+    run.add_argument("--no-history", action="store_true", help="Не сохранять запуски в историю")
+    run.add_argument("--fail-fast", action="store_true",
+                     help="Не запускать следующие скрипты после скрипта с ошибками")
+
+    listing = commands.add_parser("list", help="Показать скрипты или эндпоинты")
+    listing.add_argument("kind", choices=("scripts", "endpoints"))
+    listing.add_argument("--format", choices=FORMATS, default="text", help="Формат вывода")
+
+    enqueue = commands.add_parser("enqueue", help="Поставить запуск в очередь заданий")
+    enqueue.add_argument("script", help="Имя скрипта")
+    enqueue.add_argument("-e", "--endpoint", action="append", default=[],
+                         help="Имя или glob-шаблон эндпоинта (можно повторять)")
+    enqueue.add_argument("-g", "--group", help="Группа эндпоинтов")
+    enqueue.add_argument("-j", "--concurrency", type=int, default=0,
+                         help="Максимум одновременно выполняемых хостов задания (0 — только общие лимиты)")
+    enqueue.add_argument("--priority", choices=PRIORITIES, default="normal", help="Приоритет задания")
+
+    schedule = commands.add_parser("schedule", help="Расписания запусков")
+    schedule_commands = schedule.add_subparsers(dest="action", required=True)
+    schedule_add = schedule_commands.add_parser("add", help="Добавить расписание")
+    schedule_add.add_argument("name", help="Имя расписания")
+    schedule_add.add_argument("script", help="Имя скрипта")
+    schedule_add.add_argument("cron", help='Выражение cron: "*/15 * * * *", @daily')
+    schedule_add.add_argument("-e", "--endpoint", action="append", default=[],
+                              help="Имя или glob-шаблон эндпоинта (можно повторять)")
+    schedule_add.add_argument("-g", "--group", help="Группа эндпоинтов")
+    schedule_add.add_argument("--priority", choices=PRIORITIES, default="background", help="Приоритет заданий")
+    schedule_list = schedule_commands.add_parser("list", help="Показать расписания")
+    schedule_list.add_argument("--format", choices=FORMATS, default="text", help="Формат вывода")
+    schedule_remove = schedule_commands.add_parser("remove", help="Удалить расписание")
+    schedule_remove.add_argument("name", help="Имя расписания")
+
+    queue = commands.add_parser("queue", help="Показать незавершённые задания")
+    queue.add_argument("--format", choices=FORMATS, default="text", help="Формат вывода")
+
+    daemon = commands.add_parser("daemon", help="Выполнять задания и расписания из базы до Ctrl+C")
+    daemon.add_argument("--format", choices=FORMATS, default="text", help="Формат вывода")
+    daemon.add_argument("--no-history", action="store_true", help="Не сохранять запуски в историю")
+
+    probe = commands.add_parser("probe", help="Проверить подключение к эндпоинтам с замером задержек")
+    probe.add_argument("-e", "--endpoint", action="append", default=[],
+                       help="Имя или glob-шаблон эндпоинта (можно повторять); по умолчанию — все")
+    probe.add_argument("-g", "--group", help="Группа эндпоинтов")
+    probe.add_argument("-j", "--concurrency", type=int, help="Одновременных проверок (по умолчанию из [Probe])")
+    probe.add_argument("--refresh", action="store_true", help="Не использовать кэш результатов")
+    probe.add_argument("--sort", choices=SORT_KEYS, default="total", help="Сортировка (по убыванию времени)")
+    probe.add_argument("--export", help="Сохранить результаты в CSV или JSONL (.jsonl)")
+    probe.add_argument("--format", choices=FORMATS, default="text", help="Формат вывода")
+
+    query = commands.add_parser("query", help="Выполнить SQL-запрос на эндпоинтах и выгрузить строки потоком")
+    query.add_argument("endpoint", help="Имя или glob-шаблон SQL-эндпоинта")
+    query.add_argument("sql", nargs="?", help="Текст запроса (или --file)")
+    query.add_argument("-f", "--file", help="Файл с текстом запроса")
+    query.add_argument("-o", "--output", help="Файл результата (по умолчанию — stdout)")
+    query.add_argument("--format", choices=SQL_FORMATS,
+                       help="Формат строк (по умолчанию text для stdout, по расширению для файла)")
+    query.add_argument("--itersize", type=int, help="Строк за одну выборку с сервера (по умолчанию из эндпоинта)")
+    query.add_argument("-e", "--endpoint", dest="extra_endpoint", action="append", default=[],
+                       help="Ещё одно имя или glob-шаблон эндпоинта (можно повторять)")
+    query.add_argument("-g", "--group", help="Только эндпоинты группы")
+    query.add_argument("-j", "--concurrency", type=int,
+                       help=f"Одновременных запросов при выполнении на нескольких эндпоинтах "
+                            f"(по умолчанию {DEFAULT_SQL_CONCURRENCY})")
+    query.add_argument("--order-by", help="Столбцы через запятую: слить отсортированные результаты эндпоинтов")
+    query.add_argument("--desc", action="store_true", help="Результаты отсортированы по убыванию (с --order-by)")
+
+    copy = commands.add_parser("copy", help="Выгрузить или загрузить таблицу PostgreSQL командой COPY")
+    copy.add_argument("endpoint", help="Имя эндпоинта PostgreSQL")
+    copy.add_argument("source", help="Таблица (schema.table) или запрос для выгрузки; таблица для загрузки")
+    direction = copy.add_mutually_exclusive_group(required=True)
+    direction.add_argument("-o", "--output", help="Выгрузить в файл")
+    direction.add_argument("-i", "--input", help="Загрузить из файла в таблицу")
+    direction.add_argument("--to-endpoint", help="Скопировать на другой эндпоинт PostgreSQL, минуя диск")
+    copy.add_argument("--table", help="Таблица на эндпоинте --to-endpoint (по умолчанию — source)")
+    copy.add_argument("--format", choices=COPY_FORMATS,
+                      help="Формат COPY (по умолчанию csv для файлов, binary между эндпоинтами)")
+    copy.add_argument("--no-header", action="store_true", help="CSV без строки заголовка")
+    copy.add_argument("--columns", help="Столбцы таблицы через запятую (для загрузки)")
+    return parser
+
+
+def list_records(storage: Any, kind: str, output_format: str, out: TextIO) -> int:
+    """Печатает имена скриптов или эндпоинтов."""
+    table = storage.scripts if kind == "scripts" else storage.endpoints
+    for name in table:
+        if output_format == "jsonl":
+            record = dict(table[name])
+            record.pop("code", None)
+            out.write(json.dumps(dict(record, name=name), ensure_ascii=False) + "\n")
+        else:
+            out.write(name + "\n")
+    return EXIT_OK
+
+
+def run_scripts(args: argparse.Namespace, config: configparser.ConfigParser, storage: Any,
+                out: TextIO, err: TextIO) -> int:
+    """Выполняет команду `run`; возвращает код возврата."""
+    from connectors.ssh import SshConnector
+    scripts = []
+    for name in args.scripts:
+        data = storage.scripts.get(name)
+        if not data:
+            err.write(f"Скрипт '{name}' не найден\n")
+            return EXIT_USAGE
+        scripts.append(Script.from_dict(storage, data))
+
+    concurrency = args.concurrency
+    if concurrency is None:
+        concurrency = config.getint("Execution", "concurrency", fallback=DEFAULT_CONCURRENCY)
+
+    history = None if args.no_history else open_history(config)
+    engine = ExecutionEngine(history=history)
+    status = EXIT_OK
+    try:
+        runner = BatchRunner(storage, engine, JsonlWriter(out), max(1, concurrency),
+                             delivery=delivery_settings(config), config=config,
+                             wall_timeout=args.timeout, idle_timeout=args.idle_timeout)
+        for script in scripts:
+            endpoints = runner.targets(script, args.endpoint, args.group)
+            if not endpoints:
+                err.write(f"Скрипт '{script.name}': не найдено ни одного эндпоинта\n")
+                return EXIT_USAGE
+            if args.format == "text":
+                runner.writer = TextWriter(out, err, prefix=len(endpoints) > 1 or len(scripts) > 1)
+            report = runner.run(script, endpoints)
+            if report.failed:
+                status = EXIT_FAILED
+                if args.fail_fast:
+                    break
+    finally:
+        engine.stop()
+        SshConnector.pool().close_all()
+        if history is not None:
+            history.close()
+    return status
+
+
+def enqueue_job(args: argparse.Namespace, storage: Any, store: JobStore, out: TextIO, err: TextIO) -> int:
+    """Выполняет команду `enqueue`: задание подхватит `daemon` на следующем такте."""
+    data = storage.scripts.get(args.script)
+    if not data:
+        err.write(f"Скрипт '{args.script}' не найден\n")
+        return EXIT_USAGE
+    patterns = args.endpoint or ([] if args.group else [data.get("endpoint", "")])
+    endpoints = select_endpoints(endpoint_table(storage), names=patterns, group=args.group)
+    if not endpoints:
+        err.write(f"Скрипт '{args.script}': не найдено ни одного эндпоинта\n")
+        return EXIT_USAGE
+    job = Job(script=args.script, endpoints=list(endpoints), priority=PRIORITIES[args.priority],
+              max_running=max(0, args.concurrency), source="cli")
+    store.save_job(job)
+    out.write(f"{job.key}: {args.script} на {len(job.endpoints)} хостах\n")
+    return EXIT_OK
+
+
+def manage_schedules(args: argparse.Namespace, config: configparser.ConfigParser, storage: Any,
+                     store: JobStore, out: TextIO, err: TextIO) -> int:
+    """Выполняет команду `schedule add|list|remove`."""
+    # Без движка: планировщик здесь только проверяет и сохраняет расписания.
+    scheduler = Scheduler(None, storage, store=store, config=config)
+    if args.action == "list":
+        for item in store.schedules():
+            next_run = datetime.fromtimestamp(item.next_run).isoformat(" ", "minutes") if item.next_run else "-"
+            if args.format == "jsonl":
+                record = {"name": item.name, "script": item.script, "cron": item.cron,
+                          "endpoints": item.endpoints, "group": item.group, "priority": item.priority,
+                          "enabled": item.enabled, "last_run": item.last_run, "next_run": item.next_run}
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            else:
+                targets = " ".join(item.endpoints) or f"group={item.group}"
+                state = "" if item.enabled else " (disabled)"
+                out.write(f"{item.name}\t{item.cron}\t{item.script}\t{targets}\tnext: {next_run}{state}\n")
+        return EXIT_OK
+    if args.action == "add":
+        ok, message = scheduler.add_schedule(Schedule(
+            name=args.name, script=args.script, cron=args.cron, endpoints=args.endpoint,
+            group=args.group, priority=PRIORITIES[args.priority]))
+    else:
+        ok, message = scheduler.remove_schedule(args.name)
+    (out if ok else err).write(message + "\n")
+    return EXIT_OK if ok else EXIT_USAGE
+
+
+def show_queue(store: JobStore, output_format: str, out: TextIO) -> int:
+    """Выполняет команду `queue`: незавершённые задания и глубина очереди."""
+    jobs = store.jobs(states=ACTIVE_STATES, limit=100000)
+    pending = 0
+    for job in jobs:
+        remaining = len(job.endpoints) - len(job.done)
+        pending += remaining
+        waiting = time.time() - job.enqueued_at
+        if output_format == "jsonl":
+            out.write(json.dumps({"event": "job", "key": job.key, "script": job.script, "state": job.state,
+                                  "priority": job.priority, "hosts": len(job.endpoints),
+                                  "remaining": remaining, "source": job.source, "age": waiting},
+                                 ensure_ascii=False) + "\n")
+        else:
+            out.write(f"{job.key}\t{job.state}\t{job.script}\t{len(job.done)}/{len(job.endpoints)}"
+                      f"\tpriority={job.priority}\t{job.source}\t{waiting:.0f} с\n")
+    if output_format == "jsonl":
+        out.write(json.dumps({"event": "summary", "jobs": len(jobs), "pending_hosts": pending}) + "\n")
+    else:
+        out.write(f"Заданий: {len(jobs)}, хостов в очереди: {pending}\n")
+    return EXIT_OK
+
+
+def run_daemon(args: argparse.Namespace, config: configparser.ConfigParser, storage: Any, store: JobStore,
+               out: TextIO, err: TextIO) -> int:
+    """
+    Выполняет команду `daemon`: задания из базы и расписания до Ctrl+C.
+    По завершении задания итоги его хостов и сводка передаются в writer,
+    метрики очереди периодически пишутся в лог.
+    """
+    from connectors.ssh import SshConnector
+    history = None if args.no_history else open_history(config)
+    engine = ExecutionEngine(history=history)
+    scheduler = Scheduler(engine, storage, store=store, config=config)
+    writer = JsonlWriter(out) if args.format == "jsonl" else TextWriter(out, err, prefix=True)
+    scheduler.start()
+    next_metrics = time.monotonic() + scheduler.tick_interval
+    try:
+        while True:
+            try:
+                event = engine.events.get(timeout=1.0)
+            except Empty:
+                event = None
+            # Вывод хостов сохраняется в историю; сюда попадают только итоги заданий.
+            if event is not None and event.kind == "report":
+                for result in event.payload.results:
+                    writer.result(event.payload.script, result)
+                writer.report(event.payload)
+            if time.monotonic() >= next_metrics:
+                logger.info("Scheduler metrics: %s", json.dumps(scheduler.metrics()))
+                next_metrics = time.monotonic() + scheduler.tick_interval
+    finally:
+        scheduler.stop()
+        engine.stop()
+        SshConnector.pool().close_all()
+        if history is not None:
+            history.close()
+
+
+def probe_endpoints(args: argparse.Namespace, config: configparser.ConfigParser, storage: Any,
+                    out: TextIO, err: TextIO) -> int:
+    """Выполняет команду `probe`: 0 — все эндпоинты доступны, 1 — есть ошибки."""
+    endpoints = select_endpoints(endpoint_table(storage), names=args.endpoint, group=args.group)
+    if not endpoints:
+        err.write("Не найдено ни одного эндпоинта\n")
+        return EXIT_USAGE
+    settings = probe_settings(config)
+    cache = ProbeCache(settings["cache_path"] or None, ttl=settings["ttl"])
+    connectors = load_connectors(config)
+    results, targets = plan_probes(endpoints, connectors, cache, refresh=args.refresh)
+    if targets:
+        engine = ExecutionEngine()
+        try:
+            handle = engine.probe(targets, args.concurrency or settings["concurrency"])
+            while True:
+                event = engine.events.get()
+                if event.key == handle.run_id and event.kind == "report":
+                    break
+                if event.kind == "result":
+                    result = event.payload
+                    cache.put(result, fingerprint(targets[result.endpoint][1]))
+                    results.append(result)
+                    if args.verbose:
+                        err.write(f"[{len(results)}/{len(endpoints)}] {result.endpoint}: {result.status}\n")
+        finally:
+            engine.stop()
+            cache.save()
+    results = sort_results(results, args.sort, reverse=args.sort not in ("endpoint", "status"))
+    if args.export:
+        export_results(results, args.export)
+    for result in results:
+        if args.format == "jsonl":
+            record = dict(result.to_dict(), total=result.total, cached=result.cached)
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        else:
+            timings = " ".join(f"{phase}={result.timings[phase] * 1000:.0f}ms"
+                               for phase in PHASES if phase in result.timings)
+            cached = " (cached)" if result.cached else ""
+            out.write(f"{result.endpoint}\t{result.status}{cached}\t{result.total * 1000:.0f}ms\t{timings}"
+                      f"\t{result.error}\n".rstrip("\t\n") + "\n")
+    failed = sum(not result.success for result in results)
+    err.write(f"Проверено {len(results)}: доступно {len(results) - failed}, с ошибкой {failed}\n")
+    return EXIT_FAILED if failed else EXIT_OK
+
+
+def load_connectors(config: configparser.ConfigParser) -> Dict[str, Any]:
+    """Коннекторы из реестра с кэшем описаний ([Startup] connector_cache)."""
+    cache_path = config.get("Startup", "connector_cache", fallback=CONNECTOR_CACHE_PATH).strip().strip("\"'")
+    return ConnectorRegistry(cache_path=cache_path or None).load()
+
+
+def run_query(args: argparse.Namespace, config: configparser.ConfigParser, storage: Any,
+              out: TextIO, err: TextIO) -> int:
+    """
+    Выполняет команду `query`: строки читаются с сервера пачками и сразу
+    пишутся в stdout или файл, поэтому память не зависит от размера результата.
+    Если выбрано несколько эндпоинтов, запрос выполняется на всех параллельно
+    (`controller.query.SqlFanOut`), первый столбец — имя эндпоинта.
+    Код возврата 1, если запрос не выполнился хотя бы на одном эндпоинте.
+    """
+    endpoints = select_endpoints(endpoint_table(storage), names=[args.endpoint] + args.extra_endpoint,
+                                 group=args.group)
+    if not endpoints:
+        err.write(f"Эндпоинт не найден: {args.endpoint}\n")
+        return EXIT_USAGE
+    if args.file:
+        with open(args.file, "r", encoding="utf-8") as f:
+            sql = f.read()
+    else:
+        sql = args.sql
+    if not sql:
+        err.write("Не указан текст запроса\n")
+        return EXIT_USAGE
+    connectors = load_connectors(config)
+    targets = {}
+    for name, data in endpoints.items():
+        endpoint_type = data.get("type") or "ssh"
+        connector = connectors.get(endpoint_type)
+        if connector is None or not hasattr(connector, "stream_query"):
+            err.write(f"Эндпоинт '{name}' ({endpoint_type}) не поддерживает SQL-запросы\n")
+            return EXIT_USAGE
+        targets[name] = (connector, connector.build_params(data))
+    output_format = args.format or ("jsonl" if (args.output or "").endswith((".jsonl", ".json"))
+                                    else "csv" if args.output else "text")
+    order_by = [column.strip() for column in (args.order_by or "").split(",") if column.strip()]
+
+    def progress(rows: int, elapsed: float) -> None:
+        if args.verbose:
+            err.write(f"{rows} строк, {rows / max(elapsed, 1e-9):.0f} строк/с\n")
+
+    fanout = None
+    try:
+        if len(targets) == 1 and not order_by and not args.group:
+            connector, params = next(iter(targets.values()))
+            stream = connector.stream_query(params, sql, itersize=args.itersize)
+        else:
+            stream = fanout = SqlFanOut(targets, sql, concurrency=args.concurrency or DEFAULT_SQL_CONCURRENCY,
+                                        itersize=args.itersize, order_by=order_by, descending=args.desc)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8", newline="") as f:
+                rows = write_rows(stream, f, output_format, progress)
+        else:
+            rows = write_rows(stream, out, output_format, progress)
+    except ValueError as e:
+        err.write(f"{e}\n")
+        return EXIT_FAILED
+    finally:
+        for connector in {id(connector): connector for connector, _ in targets.values()}.values():
+            if hasattr(connector, "pool"):
+                connector.pool().close_all()
+    elapsed = time.monotonic() - stream.started
+    failed = fanout.failed if fanout is not None else []
+    for result in failed:
+        err.write(f"{result.endpoint}: {result.error}\n")
+    err.write(f"Получено строк: {rows} за {elapsed:.1f} с"
+              + (f" с {len(targets)} эндпоинтов, с ошибкой {len(failed)}" if fanout is not None else "") + "\n")
+    return EXIT_FAILED if failed else EXIT_OK
+
+
+def copy_endpoint(storage: Any, connectors: Dict[str, Any], name: str) -> Tuple[Any, Dict[str, Any]]:
+    """Коннектор и параметры эндпоинта, поддерживающего COPY."""
+    data = storage.endpoints.get(name)
+    if data is None:
+        raise LookupError(f"Эндпоинт не найден: {name}")
+    connector = connectors.get(data.get("type") or "ssh")
+    if connector is None or not hasattr(connector, "copy_out"):
+        raise LookupError(f"Эндпоинт '{name}' ({data.get('type') or 'ssh'}) не поддерживает COPY")
+    return connector, connector.build_params(data)
+
+
+def run_copy(args: argparse.Namespace, config: configparser.ConfigParser, storage: Any,
+             out: TextIO, err: TextIO) -> int:
+    """
+    Выполняет команду `copy`: COPY TO STDOUT / FROM STDIN между таблицей
+    PostgreSQL и файлом (или другим эндпоинтом) блоками `copy_chunk_size`
+    байт. С -v после каждого блока в stderr пишется прогресс, в конце —
+    число строк, объём и скорость.
+    """
+    connectors = load_connectors(config)
+    try:
+        connector, params = copy_endpoint(storage, connectors, args.endpoint)
+        target = copy_endpoint(storage, connectors, args.to_endpoint) if args.to_endpoint else None
+    except LookupError as e:
+        err.write(f"{e.args[0]}\n")
+        return EXIT_USAGE
+    copy_format = args.format or ("binary" if target else "csv")
+    columns = [column.strip() for column in (args.columns or "").split(",") if column.strip()] or None
+
+    def progress(done: int, elapsed: float) -> None:
+        if args.verbose:
+            err.write(f"{done / 1048576:.1f} МиБ, {done / 1048576 / max(elapsed, 1e-9):.1f} МиБ/с\n")
+
+    try:
+        if target is not None:
+            result = connector.copy_to_endpoint(params, args.source, target[1], args.table or args.source,
+                                                copy_format, columns=columns, progress=progress)
+        elif args.output:
+            with open(args.output, "wb") as f:
+                result = connector.copy_out(params, args.source, f, copy_format, not args.no_header, progress)
+        else:
+            with open(args.input, "rb") as f:
+                result = connector.copy_in(params, args.source, f, copy_format, not args.no_header, columns,
+                                           progress)
+    except (OSError, ValueError) as e:
+        err.write(f"{e}\n")
+        return EXIT_FAILED
+    finally:
+        connector.pool().close_all()
+    err.write(f"Скопировано: {result.summary()}\n")
+    return EXIT_OK
+
+
+def main(argv: Optional[List[str]] = None, out: TextIO = sys.stdout, err: TextIO = sys.stderr) -> int:
+    """Точка входа консольного запуска; возвращает код возврата процесса."""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.DEBUG if args.verbose > 1 else logging.INFO if args.verbose else logging.WARNING,
+                        stream=err)
+
+    config = load_config(args.settings)
+    storage = create_storage(config)
+    try:
+        if args.command == "list":
+            return list_records(storage, args.kind, args.format, out)
+        if args.command == "run":
+            return run_scripts(args, config, storage, out, err)
+        if args.command == "probe":
+            return probe_endpoints(args, config, storage, out, err)
+        if args.command == "query":
+            return run_query(args, config, storage, out, err)
+        if args.command == "copy":
+            return run_copy(args, config, storage, out, err)
+        store = open_jobs(config)
+        try:
+            if args.command == "enqueue":
+                return enqueue_job(args, storage, store, out, err)
+            if args.command == "schedule":
+                return manage_schedules(args, config, storage, store, out, err)
+            if args.command == "queue":
+                return show_queue(store, args.format, out)
+            return run_daemon(args, config, storage, store, out, err)
+        finally:
+            store.close()
+    except KeyboardInterrupt:
+        err.write("Прервано\n")
+        return EXIT_INTERRUPTED
+    finally:
+        if hasattr(storage, "close"):
+            storage.close()
@@ -11,6 +11,11 @@ from view.script import ScriptUI
 from view.endpoint import EndpointUI
 from controller.script import ScriptBackend
 from controller.endpoint import EndpointBackend
+from controller.paging import PagedNames
+from controller.search import SEARCH_FIELDS, SearchIndex
+
+# Доля списка от конца, при прокрутке в которую подгружается следующая страница
+SCROLL_PREFETCH = 0.1
 
 
 
@@ -21,6 +26,10 @@ class FormHandler:
         self._type = obj_type
 
         self.data_model = None
+        self.names = None
+        self.search_var = None
+        self.search_index = SearchIndex(SEARCH_FIELDS.get(obj_type, ("name",)))
+        self._filtered = False
 
         self.controller = self._set_controller()
         self.view = self._set_view()
@@ -28,6 +37,7 @@ class FormHandler:
 
         self.listbox = self._setup_listbox()
         self.load_existing_data()
+        self._build_search_index()
         print(f"<Create {self._type} handler>")
 
     def _set_view(self):
@@ -65,7 +75,12 @@ class FormHandler:
         else:
             print("неизвестный тип obj_type")
             return
-        self.listbox = tk.Listbox(container, selectbackground="#f37600", selectforeground="black")
+        self.search_var = tk.StringVar()
+        self.search_entry = StyledEntry(container, textvariable=self.search_var)
+        self.search_entry.pack(fill=tk.X)
+        self.search_var.trace_add("write", lambda *_: self.apply_filter())
+        self.listbox = tk.Listbox(container, selectbackground="#f37600", selectforeground="black",
+                                  yscrollcommand=self._on_listbox_scroll)
         self.listbox.pack(fill=tk.BOTH, expand=True)
         self.listbox.bind("<<ListboxSelect>>", self.display_and_edit)
         self.add_button = StyledButton(container, text="➕ Add", command=self.create_form_and_save, font=self.app.custom_font)
@@ -78,9 +93,55 @@ class FormHandler:
             widget.destroy()
 
     def load_existing_data(self):
-        """Загружает уже существующие скрипты в UI."""
-        for obj in self.app.data[self._type]:
-            self.listbox.insert(tk.END, obj)
+        """Загружает первую страницу имён; остальные подгружаются при прокрутке."""
+        self.names = PagedNames(self.app.data[self._type])
+        self.listbox.delete(0, tk.END)
+        self._load_next_page()
+
+    def _load_next_page(self):
+        """Добавляет в листбокс следующую страницу имён."""
+        names = self.names.next_page()
+        if names:
+            self.listbox.insert(tk.END, *names)
+
+    def _on_listbox_scroll(self, _first, last):
+        """Подгружает страницу, когда прокрутка подошла к концу списка."""
+        if self._filtered:
+            return
+        if self.names is not None and float(last) >= 1.0 - SCROLL_PREFETCH and self.names.has_more():
+            self._load_next_page()
+
+    def _build_search_index(self):
+        """Строит индекс поиска в фоне по снимку записей хранилища."""
+        source = self.app.data[self._type]
+        if hasattr(source, "page"):
+            # Таблица SQLite: читаем записи целиком уже в фоновом потоке.
+            loader = source.items
+        elif hasattr(source, "items"):
+            records = list(source.items())
+            loader = lambda: records
+        else:
+            records = [(name, {"name": name}) for name in source]
+            loader = lambda: records
+        self.search_index.build_async(loader)
+
+    def apply_filter(self):
+        """Показывает в листбоксе записи, подходящие под строку поиска."""
+        query = self.search_var.get().strip() if self.search_var else ""
+        if not query:
+            if self._filtered:
+                self._filtered = False
+                self.load_existing_data()
+            return
+        if not self.search_index.ready.is_set():
+            # Индекс ещё строится: повторим, когда он будет готов.
+            self.listbox.after(100, self.apply_filter)
+            return
+        self._filtered = True
+        self.listbox.delete(0, tk.END)
+        results = self.search_index.search(query)
+        if results:
+            self.listbox.insert(tk.END, *results)
 
     def open_options_window(self):
         """Открывает окно настроек (options) для текущего объекта."""
@@ -150,12 +211,22 @@ class FormHandler:
                                    font=self.app.custom_font,
                                    command=self.controller.run_script)
             run_btn.pack(fill="x", pady=(2, 0))
+            fanout_btn = StyledButton(button_container,
+                                      text="🌐 Fan-out",
+                                      font=self.app.custom_font,
+                                      command=self.controller.run_fanout)
+            fanout_btn.pack(fill="x", pady=(2, 0))
         elif self._type == "endpoints":
             test_btn = StyledButton(button_container,
                                     text="🚀 Test",
                                     font=self.app.custom_font,
                                     command=self.controller.test_connection)
             test_btn.pack(fill="x", pady=(2, 0))
+            probe_btn = StyledButton(button_container,
+                                     text="📡 Test all",
+                                     font=self.app.custom_font,
+                                     command=self.controller.probe_endpoints)
+            probe_btn.pack(fill="x", pady=(2, 0))
 
         opt_btn = StyledButton(button_container,
                                text="⚙️ Options",
@@ -186,6 +257,8 @@ class FormHandler:
                 delete_btn = StyledButton(button_container, text="❌ Delete", command=self.data_model.delete)
                 delete_btn.pack(fill="x", pady=(2, 0))
                 self.listbox.insert(0, data["name"])
+                self.names.added(data["name"])
+                self.search_index.update(data["name"], data)
                 save_btn.after(2000, lambda: save_btn.config(text="Save"))
                 messagebox.showwarning("Заебок!", message)
             else:
@@ -216,6 +289,8 @@ class FormHandler:
                     index = list_items.index(old_name)
                     self.listbox.delete(index)
                     self.listbox.insert(index, new_name)
+                    self.names.renamed(old_name, new_name)
+                    self.search_index.update(new_name, data, old_name=old_name)
 
                     save_btn.config(text="Saved", bg="gray80")
                     save_btn.after(2000, lambda: save_btn.config(text="💾 Save"))
@@ -229,6 +304,8 @@ class FormHandler:
                     list_items = self.listbox.get(0, tk.END)
                     index = list_items.index(name)
                     self.listbox.delete(index)
+                    self.names.removed(name)
+                    self.search_index.remove(name)
                     messagebox.showwarning("Заебок!", message)
                     self.clear_content_frame()
                 else:
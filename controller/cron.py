@@ -0,0 +1,110 @@
+"""
+Расписания в формате cron для периодических запусков (см. `controller.scheduler`).
+
+Поддерживается классический формат из пяти полей — минута, час, день
+месяца, месяц, день недели — со списками (`1,15`), диапазонами (`1-5`),
+шагом (`*/10`, `0-30/5`) и сокращениями `@hourly`, `@daily`, `@weekly`,
+`@monthly`. Как и в cron, если ограничены и день месяца, и день недели,
+срабатывание происходит при совпадении любого из них.
+"""
+
+from datetime import datetime, timedelta
+from typing import List, Set, Tuple
+
+ALIASES = {
+    "@hourly": "0 * * * *",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@weekly": "0 0 * * 0",
+    "@monthly": "0 0 1 * *",
+}
+# Границы полей: минута, час, день месяца, месяц, день недели (0 и 7 — воскресенье)
+BOUNDS: List[Tuple[int, int]] = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+# Дальше этого срока ближайшее срабатывание не ищется (например, `0 0 31 2 *`)
+MAX_YEARS = 5
+
+
+class CronError(ValueError):
+    """Ошибка разбора выражения cron."""
+
+
+def _parse_field(text: str, low: int, high: int) -> Set[int]:
+    values: Set[int] = set()
+    for part in text.split(","):
+        expression, _, step_text = part.partition("/")
+        try:
+            step = int(step_text) if step_text else 1
+            if expression == "*":
+                start, end = low, high
+            elif "-" in expression:
+                start, end = (int(value) for value in expression.split("-", 1))
+            else:
+                start = end = int(expression)
+                if step_text:
+                    end = high
+        except ValueError:
+            raise CronError(f"Неверное поле cron: '{text}'") from None
+        if step < 1 or not low <= start <= end <= high:
+            raise CronError(f"Значение вне диапазона {low}-{high}: '{text}'")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronSchedule:
+    """
+    Разобранное выражение cron.
+    """
+
+    def __init__(self, expression: str) -> None:
+        """
+        :param expression: Выражение из пяти полей или сокращение (`@daily`).
+        :raises CronError: Если выражение не разбирается.
+        """
+        self.expression = expression.strip()
+        fields = ALIASES.get(self.expression, self.expression).split()
+        if len(fields) != 5:
+            raise CronError(f"Ожидается 5 полей cron, получено {len(fields)}: '{expression}'")
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            _parse_field(text, low, high) for text, (low, high) in zip(fields, BOUNDS))
+        self.weekdays = {day % 7 for day in weekdays}
+        self.any_day = fields[2] == "*"
+        self.any_weekday = fields[4] == "*"
+
+    def _day_matches(self, moment: datetime) -> bool:
+        in_month = moment.day in self.days
+        # В cron воскресенье — 0, в datetime.weekday() — 6.
+        in_week = (moment.weekday() + 1) % 7 in self.weekdays
+        if self.any_day or self.any_weekday:
+            return in_month and in_week
+        return in_month or in_week
+
+    def next_after(self, moment: datetime) -> datetime:
+        """
+        Ближайшее срабатывание строго после `moment` (с точностью до минуты).
+
+        Несовпадающие месяц, день и час пропускаются целиком, поэтому поиск
+        занимает не больше нескольких сотен шагов даже для редких расписаний.
+
+        :raises CronError: Если срабатываний нет в ближайшие `MAX_YEARS` лет.
+        """
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = moment + timedelta(days=366 * MAX_YEARS)
+        while candidate <= limit:
+            if candidate.month not in self.months:
+                year, month = divmod(candidate.month, 12)
+                candidate = candidate.replace(year=candidate.year + year, month=month + 1, day=1, hour=0, minute=0)
+                continue
+            if not self._day_matches(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+                continue
+            if candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+                continue
+            if candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+                continue
+            return candidate
+        raise CronError(f"Выражение '{self.expression}' не срабатывает в ближайшие {MAX_YEARS} лет")
+
+    def __repr__(self) -> str:
+        return f"<CronSchedule '{self.expression}'>"
@@ -0,0 +1,165 @@
+"""
+Состояние сводной панели fan-out запуска.
+
+`DashboardModel` собирает события движка по всем хостам запуска в одну
+таблицу `HostRow` (состояние, время, объём вывода, код завершения) и
+отдельный ограниченный буфер вывода на хост. Модель не зависит от Tk:
+её обновляют обработчики событий диспетчера, а перерисовку выполняет
+`view.dashboard.DashboardView` на одном общем таймере, забирая только
+изменившиеся строки (`take_dirty`).
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set
+
+from controller.output import OutputBuffer
+
+# Состояния строки хоста в порядке жизненного цикла
+QUEUED = "queued"
+CONNECTING = "connecting"
+RUNNING = "running"
+OK = "ok"
+FAILED = "failed"
+STOPPED = "stopped"
+STATES = (QUEUED, CONNECTING, RUNNING, OK, FAILED, STOPPED)
+ACTIVE_STATES = (CONNECTING, RUNNING)
+
+# Прокрутка вывода одного хоста: хостов может быть сотни, поэтому меньше общей
+DEFAULT_HOST_SCROLLBACK = 2000
+
+
+@dataclass
+class HostRow:
+    """
+    Строка панели для одного хоста.
+
+    :param endpoint: Имя эндпоинта.
+    :param state: Одно из `STATES`.
+    :param started: Момент начала подключения (`time.monotonic`).
+    :param finished: Момент получения результата (`time.monotonic`).
+    :param bytes_received: Объём вывода; после результата — точный объём
+                           stdout и stderr из `HostResult`.
+    :param exit_code: Код завершения команды.
+    :param error: Хвост stderr или текст ошибки.
+    :param output: Буфер вывода хоста для детального просмотра.
+    """
+
+    endpoint: str
+    state: str = QUEUED
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    bytes_received: int = 0
+    exit_code: Optional[int] = None
+    error: str = ""
+    output: Optional[OutputBuffer] = field(default=None, repr=False)
+
+    def elapsed(self, now: Optional[float] = None) -> Optional[float]:
+        """Время с начала подключения до результата (или до `now` для идущего запуска)."""
+        if self.started is None:
+            return None
+        end = self.finished if self.finished is not None else (time.monotonic() if now is None else now)
+        return end - self.started
+
+
+class DashboardModel:
+    """
+    Таблица хостов fan-out запуска, обновляемая событиями `RunEvent`.
+    """
+
+    def __init__(self, endpoints: Iterable[str], scrollback: int = DEFAULT_HOST_SCROLLBACK) -> None:
+        """
+        :param endpoints: Имена эндпоинтов в порядке отображения.
+        :param scrollback: Размер прокрутки вывода одного хоста (в строках).
+        """
+        self.rows: List[HostRow] = [HostRow(name, output=OutputBuffer(max_lines=scrollback))
+                                    for name in endpoints]
+        self.index: Dict[str, int] = {row.endpoint: i for i, row in enumerate(self.rows)}
+        self.fanout_id: Optional[str] = None
+        self.report = None
+        self._dirty: Set[int] = set(range(len(self.rows)))
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def keys(self, fanout_id: str) -> List[str]:
+        """
+        Ключи событий, на которые нужно подписаться: сам fan-out запуск
+        и запуск на каждом хосте (`"<fanout_id>:<endpoint>"`).
+        """
+        self.fanout_id = fanout_id
+        return [fanout_id] + [f"{fanout_id}:{row.endpoint}" for row in self.rows]
+
+    def apply(self, event) -> Optional[int]:
+        """
+        Применяет событие движка.
+
+        :return: Номер изменившейся строки или `None`, если событие не относится к хосту.
+        """
+        if event.kind == "report":
+            self.report = event.payload
+            return None
+        _, _, endpoint = event.key.partition(":")
+        position = self.index.get(endpoint)
+        if position is None:
+            # Событие `"result"` по ключу самого fan-out дублирует результат хоста.
+            return None
+        row = self.rows[position]
+        now = time.monotonic()
+        if event.kind == "started":
+            row.state, row.started = CONNECTING, now
+        elif event.kind == "connected":
+            row.state = RUNNING
+            if row.started is None:
+                row.started = now
+        elif event.kind == "output":
+            chunk = event.payload
+            row.bytes_received += len(chunk.data.encode("utf-8"))
+            row.output.write(chunk.data, chunk.stream)
+        elif event.kind == "result":
+            result = event.payload
+            row.state = OK if result.success else STOPPED if result.stopped else FAILED
+            row.finished = now
+            if row.started is None:
+                row.started = now - result.duration
+            row.bytes_received = result.bytes_out + result.bytes_err
+            row.exit_code = result.exit_code
+            row.error = result.error
+        else:
+            return None
+        self._dirty.add(position)
+        return position
+
+    def take_dirty(self) -> Set[int]:
+        """Забирает номера строк, изменившихся с прошлого вызова."""
+        dirty, self._dirty = self._dirty, set()
+        return dirty
+
+    def summary(self) -> Dict[str, int]:
+        """Число хостов в каждом состоянии."""
+        counts = dict.fromkeys(STATES, 0)
+        for row in self.rows:
+            counts[row.state] += 1
+        return counts
+
+    @property
+    def finished(self) -> bool:
+        """Получен ли итоговый отчёт fan-out запуска."""
+        return self.report is not None
+
+    def close(self) -> None:
+        """Освобождает буферы вывода хостов."""
+        for row in self.rows:
+            row.output.close()
+
+
+def visible_window(top: int, height: int, row_height: int, total: int) -> range:
+    """
+    Номера строк, попадающих в область высотой `height` пикселей.
+
+    :param top: Номер первой строки области (после прокрутки).
+    :return: Диапазон строк; первая строка ограничена так, чтобы внизу не было пустоты.
+    """
+    rows = max(1, height // max(1, row_height))
+    top = max(0, min(top, total - rows))
+    return range(top, min(total, top + rows + 1))
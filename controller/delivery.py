@@ -0,0 +1,218 @@
+"""
+Доставка кода скриптов на удалённые хосты.
+
+По умолчанию код передаётся в командной строке (`bash -c '...'`): при
+каждом запуске он целиком уходит в exec-запросе, а большие скрипты
+упираются в ARG_MAX. В режиме загрузки (`UploadedScript`) код кладётся
+по SFTP в кэш на хосте — каталог `~/.cache/bino/scripts`, имя файла —
+хэш интерпретатора и кода — и выполняется оттуда. Если файл с таким
+хэшем уже есть, ничего не передаётся: повторные запуски скрипта по
+парку хостов после первого не пересылают ни байта кода.
+
+В режиме потоковой передачи (`StreamedScript`) на хосте запускается
+`bash -s` / `python3 -`, а код пишется кусками в stdin канала: ни
+ограничения длины команды, ни временных файлов на хосте, а память на
+стороне клиента не зависит от размера сгенерированного скрипта.
+
+Режим задаётся ключом `delivery` секции `[Execution]`: `inline`,
+`upload`, `stdin` или `auto` (загрузка для скриптов от `upload_threshold` байт).
+"""
+
+import hashlib
+import logging
+import posixpath
+import threading
+import uuid
+from typing import Any, Dict, Iterable, Optional, Union
+
+from controller.runner import build_command
+
+logger = logging.getLogger(__name__)
+
+DELIVERY_MODES = ("inline", "upload", "stdin", "auto")
+DEFAULT_MODE = "auto"
+DEFAULT_UPLOAD_THRESHOLD = 16384
+# Относительно домашнего каталога пользователя SFTP
+DEFAULT_CACHE_DIR = ".cache/bino/scripts"
+# Размер куска кода (в символах), который пишется в stdin канала за раз
+STDIN_CHUNK = 32768
+
+
+def script_digest(interpreter_name: str, code: str) -> str:
+    """Ключ кэша: SHA-256 от имени интерпретатора и кода скрипта."""
+    return hashlib.sha256(f"{interpreter_name}\0{code}".encode("utf-8")).hexdigest()
+
+
+def _ensure_dir(sftp: Any, path: str) -> None:
+    """Создаёт каталог вместе с родителями (права 0700)."""
+    parts = path.rstrip("/").split("/")
+    for depth in range(1, len(parts) + 1):
+        current = "/".join(parts[:depth])
+        if not current:
+            continue
+        try:
+            sftp.stat(current)
+        except IOError:
+            try:
+                sftp.mkdir(current, 0o700)
+            except IOError:
+                # Каталог мог создать параллельный запуск.
+                sftp.stat(current)
+
+
+class UploadedScript:
+    """
+    Команда запуска скрипта из кэша на хосте.
+
+    Передаётся движку вместо строки команды: после подключения движок
+    вызывает `resolve(client)`, который проверяет наличие файла в кэше,
+    при необходимости загружает его и возвращает команду запуска. Один
+    объект используется всеми хостами fan-out запуска и считает загрузки.
+    """
+
+    def __init__(self, interpreter_name: str, interpreter: Any, code: str,
+                 options: Optional[Dict[str, Any]] = None, cache_dir: str = DEFAULT_CACHE_DIR) -> None:
+        self.interpreter = interpreter
+        self.options = options or {}
+        self.cache_dir = cache_dir
+        self.payload = code.encode("utf-8")
+        self.digest = script_digest(interpreter_name, code)
+        self.file_name = self.digest + getattr(interpreter, "extension", "")
+        self.uploads = 0
+        self.hits = 0
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+
+    def ensure(self, sftp: Any) -> str:
+        """Гарантирует наличие скрипта в кэше хоста; возвращает абсолютный путь к файлу."""
+        path = posixpath.join(self.cache_dir, self.file_name)
+        try:
+            # Файл в кэше адресован содержимым: совпадения имени и размера достаточно.
+            if sftp.stat(path).st_size == len(self.payload):
+                with self._lock:
+                    self.hits += 1
+                return sftp.normalize(path)
+        except IOError:
+            pass
+
+        _ensure_dir(sftp, self.cache_dir)
+        # Пишем во временный файл и переименовываем: параллельный запуск
+        # другого клиента не увидит наполовину записанный скрипт.
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with sftp.open(tmp_path, "wb") as remote_file:
+            remote_file.set_pipelined(True)
+            remote_file.write(self.payload)
+        sftp.chmod(tmp_path, 0o600)
+        try:
+            sftp.posix_rename(tmp_path, path)
+        except IOError:
+            # Сервер без расширения posix-rename: обычный rename не перезаписывает файл.
+            try:
+                sftp.rename(tmp_path, path)
+            except IOError:
+                sftp.remove(tmp_path)
+        with self._lock:
+            self.uploads += 1
+            self.bytes_sent += len(self.payload)
+        logger.info("UploadedScript.ensure() -> загружен %s (%s байт)", path, len(self.payload))
+        return sftp.normalize(path)
+
+    def resolve(self, client: Any) -> str:
+        """Доставляет скрипт через SFTP-канал соединения и возвращает команду запуска."""
+        sftp = client.open_sftp()
+        try:
+            path = self.ensure(sftp)
+        finally:
+            sftp.close()
+        return self.interpreter.format_file_command(path, self.options)
+
+    def __repr__(self) -> str:
+        return f"<UploadedScript {self.file_name} uploads={self.uploads} hits={self.hits}>"
+
+
+class StreamedScript:
+    """
+    Команда запуска скрипта с передачей кода через stdin канала.
+
+    `resolve` возвращает команду вида `bash -s`, затем движок вызывает
+    `feed(channel)` в пуле потоков параллельно с чтением вывода, чтобы ни
+    запись в stdin, ни переполненный stdout не блокировали друг друга.
+    Источник кода — строка или итерируемое строк (например, генератор):
+    в канал уходит по `STDIN_CHUNK` символов, целиком код не кодируется.
+    """
+
+    def __init__(self, interpreter: Any, source: Union[str, Iterable[str]],
+                 options: Optional[Dict[str, Any]] = None) -> None:
+        self.interpreter = interpreter
+        self.source = source
+        self.options = options or {}
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+
+    def resolve(self, client: Any) -> str:
+        return self.interpreter.format_stdin_command(self.options)
+
+    def chunks(self) -> Iterable[bytes]:
+        """Код скрипта кусками в UTF-8."""
+        parts = [self.source] if isinstance(self.source, str) else self.source
+        for part in parts:
+            for start in range(0, len(part), STDIN_CHUNK):
+                yield part[start:start + STDIN_CHUNK].encode("utf-8")
+
+    def feed(self, channel: Any) -> int:
+        """
+        Пишет код в stdin канала и закрывает его (EOF для интерпретатора).
+        Если удалённый процесс завершился раньше, запись молча прекращается.
+        """
+        sent = 0
+        try:
+            for chunk in self.chunks():
+                channel.sendall(chunk)
+                sent += len(chunk)
+            channel.shutdown_write()
+        except (OSError, EOFError) as e:
+            logger.info("StreamedScript.feed() -> канал закрыт после %s байт: %s", sent, e)
+        with self._lock:
+            self.bytes_sent += sent
+        return sent
+
+    def __repr__(self) -> str:
+        return f"<StreamedScript {self.interpreter.format_stdin_command(self.options)!r}>"
+
+
+def delivery_settings(config: Optional[Any]) -> Dict[str, Any]:
+    """Параметры доставки из секции [Execution] (delivery, upload_threshold, upload_dir)."""
+    settings = {"mode": DEFAULT_MODE, "threshold": DEFAULT_UPLOAD_THRESHOLD, "cache_dir": DEFAULT_CACHE_DIR}
+    if config is None or not config.has_section("Execution"):
+        return settings
+    mode = config.get("Execution", "delivery", fallback=DEFAULT_MODE).strip().lower()
+    if mode not in DELIVERY_MODES:
+        logger.warning("delivery_settings(): неизвестный режим '%s', используется %s", mode, DEFAULT_MODE)
+        mode = DEFAULT_MODE
+    settings["mode"] = mode
+    try:
+        settings["threshold"] = config.getint("Execution", "upload_threshold", fallback=DEFAULT_UPLOAD_THRESHOLD)
+    except ValueError:
+        pass
+    settings["cache_dir"] = (config.get("Execution", "upload_dir", fallback=DEFAULT_CACHE_DIR)
+                             .strip().strip("\"'") or DEFAULT_CACHE_DIR)
+    return settings
+
+
+def prepare_command(interpreters: Dict[str, Any], interpreter_name: str, code: str,
+                    options: Dict[str, Any], mode: str = DEFAULT_MODE,
+                    threshold: int = DEFAULT_UPLOAD_THRESHOLD,
+                    cache_dir: str = DEFAULT_CACHE_DIR) -> Union[str, UploadedScript, StreamedScript]:
+    """
+    Команда для движка: строка (код в командной строке), `UploadedScript`
+    или `StreamedScript`.
+
+    Скрипты неизвестного интерпретатора всегда выполняются как есть.
+    """
+    interpreter = interpreters.get(interpreter_name)
+    if interpreter is not None and mode == "stdin":
+        return StreamedScript(interpreter, code, options)
+    if (interpreter is None or mode == "inline"
+            or (mode == "auto" and len(code.encode("utf-8")) < threshold)):
+        return build_command(interpreters, interpreter_name, code, options)
+    return UploadedScript(interpreter_name, interpreter, code, options, cache_dir)
@@ -0,0 +1,84 @@
+"""
+Доставка событий движка выполнения в поток Tk.
+
+`EventDispatcher` опрашивает очередь событий `ExecutionEngine.events` на
+фиксированном тике через `root.after` и вызывает подписчиков по ключу
+события. Вместо отдельного `root.after(0, ...)` на каждую строку вывода
+UI получает события пачкой раз в тик, независимо от числа запусков.
+"""
+
+import logging
+import queue
+from typing import Any, Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TICK_MS = 50
+DEFAULT_MAX_EVENTS = 5000
+
+
+class EventDispatcher:
+    """
+    Опрашивает очередь событий и раздаёт их подписчикам в потоке Tk.
+    """
+
+    def __init__(self, root: Any, events: queue.Queue, tick_ms: int = DEFAULT_TICK_MS,
+                 max_events: int = DEFAULT_MAX_EVENTS) -> None:
+        """
+        :param root: Корневое окно Tk (нужен только `after`).
+        :param events: Очередь событий движка.
+        :param tick_ms: Период опроса очереди (в миллисекундах).
+        :param max_events: Максимум событий, обрабатываемых за один тик.
+        """
+        self.root = root
+        self.events = events
+        self.tick_ms = tick_ms
+        self.max_events = max_events
+        self._subscribers: Dict[str, Callable[[Any], None]] = {}
+        self._running = False
+
+    def subscribe(self, key: str, callback: Callable[[Any], None]) -> None:
+        """Подписывает `callback(event)` на события с ключом `key`."""
+        self._subscribers[key] = callback
+
+    def unsubscribe(self, key: str) -> None:
+        """Отписывает обработчик; события по ключу далее отбрасываются."""
+        self._subscribers.pop(key, None)
+
+    def start(self) -> None:
+        """Запускает периодический опрос очереди."""
+        if not self._running:
+            self._running = True
+            self.root.after(self.tick_ms, self._poll)
+
+    def stop(self) -> None:
+        """Останавливает опрос после текущего тика."""
+        self._running = False
+
+    def poll_once(self) -> int:
+        """
+        Обрабатывает накопившиеся события (не больше `max_events`).
+
+        :return: Количество обработанных событий.
+        """
+        batch: List[Any] = []
+        try:
+            while len(batch) < self.max_events:
+                batch.append(self.events.get_nowait())
+        except queue.Empty:
+            pass
+        for event in batch:
+            callback = self._subscribers.get(event.key)
+            if callback is None:
+                continue
+            try:
+                callback(event)
+            except Exception as e:
+                logger.exception("EventDispatcher: ошибка обработчика %s: %s", event.key, e)
+        return len(batch)
+
+    def _poll(self) -> None:
+        if not self._running:
+            return
+        self.poll_once()
+        self.root.after(self.tick_ms, self._poll)
@@ -1,8 +1,10 @@
-import os
-import sys
-import importlib
 import tkinter as tk
-from tkinter import messagebox
+from tkinter import filedialog, messagebox
+
+from controller.probe import ProbeCache, export_results, fingerprint, plan_probes, probe_settings, sort_results
+from controller.runner import endpoint_table, select_endpoints
+from view.probe import ProbeView
+from view.theme import StyledButton, StyledEntry, StyledLabel, StyledToplevel
 
 
 class EndpointBackend:
@@ -13,27 +15,8 @@ class EndpointBackend:
         self.connectors = self.load_connectors()
 
     def load_connectors(self):
-        """Загружает все коннекторы из каталога 'connectors'."""
-
-        if getattr(sys, 'frozen', False):
-            # Если запущено из .exe
-            base_path = sys._MEIPASS
-            con_path = "connectors"
-        else:
-            # Если обычный запуск из .py
-            base_path = os.path.dirname(__file__)
-            con_path = "../connectors"
-        connectors = {}
-        connectors_dir = os.path.join(base_path, con_path)
-
-        for file in os.listdir(connectors_dir):
-            if file.endswith('.py') and file != '__init__.py':
-                module_name = file[:-3]
-                module = importlib.import_module(f'connectors.{module_name}')
-                connector_class = getattr(module, module_name.capitalize() + 'Connector', None)
-                if connector_class:
-                    connectors[module_name] = connector_class()
-        return connectors
+        """Коннекторы из реестра приложения (модули импортируются при первом использовании)."""
+        return self.app.connectors
 
     def test_connection(self):
         """Проверка соединения с эндпоинтом с потоковым выводом статуса."""
@@ -62,3 +45,111 @@ class EndpointBackend:
             return
 
         self.app.endpoints_manager.view.create_test_connection_window(connector, endpoint)
+
+    def probe_endpoints(self):
+        """
+        Открывает окно массовой проверки: все эндпоинты (или выбранные по
+        шаблону и группе) проверяются параллельно с замером фаз подключения.
+        Свежие результаты из кэша [Probe] повторно не проверяются.
+        """
+        settings = probe_settings(getattr(self.app, "config", None))
+        cache = ProbeCache(settings["cache_path"] or None, ttl=settings["ttl"])
+
+        window = StyledToplevel()
+        window.title("Test endpoints")
+        window.configure(bg="#f2ceae")
+
+        StyledLabel(window, text="Pattern (web-*, db-?; empty — all)").pack(anchor="w", padx=10)
+        pattern_entry = StyledEntry(window)
+        pattern_entry.pack(anchor="w", padx=10)
+
+        StyledLabel(window, text="Group").pack(anchor="w", padx=10)
+        group_entry = StyledEntry(window)
+        group_entry.pack(anchor="w", padx=10)
+
+        StyledLabel(window, text="Concurrency").pack(anchor="w", padx=10)
+        concurrency_var = tk.IntVar(value=settings["concurrency"])
+        StyledEntry(window, textvariable=concurrency_var).pack(anchor="w", padx=10)
+
+        refresh_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(window, text="Ignore cached results", variable=refresh_var,
+                       bg="#f2ceae").pack(anchor="w", padx=10)
+
+        status_label = StyledLabel(window, text="")
+        status_label.pack(pady=5)
+
+        table = ProbeView(window)
+        table.pack(fill="both", expand=True, padx=10, pady=5)
+
+        current = {}
+
+        def update_status(done=False):
+            counts = table.summary()
+            text = f"{len(table.results)}/{current.get('total', 0)} — ok: {counts['ok']}, " \
+                   f"failed: {counts['failed']}, cached: {counts['cached']}"
+            status_label.config(text=text if not done else text + " — done")
+
+        def stop():
+            if current.get("handle") is not None:
+                current["handle"].cancel()
+
+        def start():
+            endpoints = select_endpoints(endpoint_table(self.storage), names=pattern_entry.get().split(),
+                                         group=group_entry.get().strip() or None)
+            if not endpoints:
+                messagebox.showwarning("Ошибка", "Не выбрано ни одного эндпоинта")
+                return
+            try:
+                concurrency = concurrency_var.get()
+            except tk.TclError:
+                concurrency = settings["concurrency"]
+            stop()
+            table.clear()
+            ready, targets = plan_probes(endpoints, self.connectors, cache, refresh=refresh_var.get())
+            for result in ready:
+                table.add(result)
+            current.update(total=len(endpoints), handle=None)
+            if not targets:
+                update_status(done=True)
+                return
+            run_button.config(state="disabled")
+
+            def on_event(event):
+                if event.kind == "result":
+                    result = event.payload
+                    self.app.dispatcher.unsubscribe(event.key)
+                    cache.put(result, fingerprint(targets[result.endpoint][1]))
+                    table.add(result)
+                    update_status()
+                elif event.kind == "report":
+                    self.app.dispatcher.unsubscribe(event.key)
+                    cache.save()
+                    # Самые медленные хосты — наверху
+                    table.sort("total", reverse=True)
+                    update_status(done=True)
+                    run_button.config(state="normal")
+                    current["handle"] = None
+
+            handle = self.app.engine.probe(targets, concurrency)
+            current["handle"] = handle
+            self.app.dispatcher.subscribe(handle.run_id, on_event)
+            for name in targets:
+                self.app.dispatcher.subscribe(f"{handle.run_id}:{name}", on_event)
+            update_status()
+
+        def export():
+            path = filedialog.asksaveasfilename(parent=window, defaultextension=".csv",
+                                                filetypes=[("CSV", "*.csv"), ("JSON Lines", "*.jsonl")])
+            if path:
+                export_results(sort_results(table.results, table.sort_key, table.reverse), path)
+
+        def close():
+            stop()
+            window.destroy()
+
+        window.protocol("WM_DELETE_WINDOW", close)
+        run_button = StyledButton(window, text="🚀 Run", command=start)
+        run_button.pack(pady=5)
+        StyledButton(window, text="⏹ Stop", command=stop).pack(pady=5)
+        StyledButton(window, text="💾 Export", command=export).pack(pady=5)
+        StyledButton(window, text="Закрыть", command=close).pack(pady=5)
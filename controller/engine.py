@@ -0,0 +1,504 @@
+"""
+Движок выполнения запусков на одном цикле asyncio.
+
+`ExecutionEngine` владеет всеми выполняющимися запусками: цикл событий
+работает в одном фоновом потоке, чтение каналов SSH происходит через
+`AsyncSshChannel` без потока на запуск, а блокирующие операции paramiko
+(рукопожатие, открытие канала) выполняются в ограниченном пуле потоков.
+
+Результаты не передаются в UI напрямую: движок складывает события
+`RunEvent` в одну потокобезопасную очередь `events`, которую сторона Tk
+опрашивает на фиксированном тике (см. `controller.dispatcher`).
+"""
+
+import asyncio
+import itertools
+import logging
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from connectors.channel import AsyncSshChannel, OutputChunk
+from controller.cancel import (CANCELLED, STOP_MESSAGES, PgidFilter, RunLimits, Watchdog, kill_command,
+                               wrap_command)
+from controller.output import StreamDecoder, TailBuffer
+from controller.probe import DEFAULT_PROBE_CONCURRENCY, ProbeResult, probe_endpoint
+from controller.runner import DEFAULT_CONCURRENCY, FanOutReport, HostResult
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_IO_WORKERS = 32
+# Сколько ждать команду остановки удалённого процесса и завершения запусков при остановке движка
+KILL_TIMEOUT = 10.0
+STOP_TIMEOUT = 5.0
+
+
+@dataclass
+class RunEvent:
+    """
+    Событие движка для UI.
+
+    :param key: Идентификатор запуска, fan-out группы или проверки.
+    :param kind: `"started"`, `"connected"`, `"output"`, `"result"` или `"report"`.
+    :param payload: Данные события (`OutputChunk` с декодированным текстом,
+                    `HostResult`, `FanOutReport`, ...).
+    """
+
+    key: str
+    kind: str
+    payload: Any = None
+
+
+class RunHandle:
+    """
+    Дескриптор запуска, выполняющегося в движке.
+    """
+
+    def __init__(self, run_id: str, endpoint: str, future: Future,
+                 canceller: Optional[Any] = None) -> None:
+        self.run_id = run_id
+        self.endpoint = endpoint
+        self.future = future
+        self._canceller = canceller
+
+    def cancel(self) -> None:
+        """
+        Отменяет запуск: канал закрывается, удалённому процессу посылается
+        сигнал. Результат с `stopped="cancelled"` приходит обычным событием `"result"`.
+        """
+        if self._canceller is not None and not self.done():
+            self._canceller(self.run_id)
+
+    def done(self) -> bool:
+        """Завершён ли запуск."""
+        return self.future.done()
+
+    def result(self, timeout: Optional[float] = None) -> Any:
+        """Ожидает завершения и возвращает результат запуска."""
+        return self.future.result(timeout)
+
+    def __repr__(self) -> str:
+        return f"<RunHandle id={self.run_id} endpoint={self.endpoint} done={self.done()}>"
+
+
+class ExecutionEngine:
+    """
+    Единый движок выполнения скриптов и проверок соединений.
+    """
+
+    def __init__(self, connector: Optional[Any] = None,
+                 io_workers: int = DEFAULT_IO_WORKERS, history: Optional[Any] = None) -> None:
+        """
+        :param connector: SSH-коннектор, через пул которого открываются соединения
+                          (по умолчанию `SshConnector`, создаётся при первом запуске).
+        :param io_workers: Размер пула потоков для блокирующих операций paramiko.
+        :param history: История запусков (`controller.history.RunHistory`), куда
+                        сохраняется каждый запуск; `None` — не сохранять.
+        """
+        self._connector = connector
+        self.history = history
+        self.events: "queue.Queue[RunEvent]" = queue.Queue()
+        self.runs: Dict[str, RunHandle] = {}
+        self._io_workers = io_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        # Задачи запусков по ключам событий; используются только в потоке цикла
+        self._tasks: Dict[str, "asyncio.Task"] = {}
+
+    @property
+    def connector(self) -> Any:
+        """SSH-коннектор запусков; paramiko импортируется только при первом обращении."""
+        if self._connector is None:
+            from connectors.ssh import SshConnector
+            self._connector = SshConnector()
+        return self._connector
+
+    def start(self) -> None:
+        """Запускает цикл событий в фоновом потоке (повторный вызов безопасен)."""
+        with self._lock:
+            if self._loop is not None:
+                return
+            # Selector-цикл нужен для add_reader и на Windows (Proactor его не поддерживает).
+            loop = asyncio.SelectorEventLoop()
+            ready = threading.Event()
+
+            def run():
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                loop.run_forever()
+
+            self._executor = ThreadPoolExecutor(max_workers=self._io_workers, thread_name_prefix="engine-io")
+            self._loop = loop
+            self._thread = threading.Thread(target=run, name="execution-engine", daemon=True)
+            self._thread.start()
+            ready.wait()
+        logger.info("ExecutionEngine.start()")
+
+    def stop(self) -> None:
+        """
+        Отменяет выполняющиеся запуски (с остановкой удалённых процессов),
+        затем останавливает цикл событий и пул потоков.
+        """
+        handles = list(self.runs.values())
+        for handle in handles:
+            handle.cancel()
+        if handles:
+            wait([handle.future for handle in handles], timeout=STOP_TIMEOUT)
+        with self._lock:
+            loop, thread, executor = self._loop, self._thread, self._executor
+            self._loop = self._thread = self._executor = None
+        if loop is None:
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
+        loop.close()
+        executor.shutdown(wait=False)
+        logger.info("ExecutionEngine.stop()")
+
+    def _next_id(self, prefix: str) -> str:
+        return f"{prefix}-{next(self._ids)}"
+
+    def _emit(self, key: str, kind: str, payload: Any = None) -> None:
+        self.events.put(RunEvent(key, kind, payload))
+
+    def _schedule(self, run_id: str, endpoint: str, coro) -> RunHandle:
+        self.start()
+        future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        handle = RunHandle(run_id, endpoint, future, canceller=self.cancel)
+        self.runs[run_id] = handle
+        future.add_done_callback(lambda _: self.runs.pop(run_id, None))
+        return handle
+
+    def cancel(self, run_id: str) -> None:
+        """
+        Отменяет запуск по ключу; для fan-out запуска — все его хосты,
+        включая ожидающие очереди. Ключ вида `"<fanout_id>:<endpoint>"`
+        отменяет запуск на одном хосте.
+        """
+        loop = self._loop
+        if loop is not None:
+            loop.call_soon_threadsafe(self._cancel, run_id)
+
+    def _cancel(self, run_id: str) -> None:
+        prefix = run_id + ":"
+        for key, task in list(self._tasks.items()):
+            if key == run_id or key.startswith(prefix):
+                task.cancel()
+
+    def submit(self, endpoint_name: str, params: Dict[str, Any], command: str,
+               sink: Optional[Any] = None, script: str = "",
+               limits: Optional[RunLimits] = None, run_id: Optional[str] = None) -> RunHandle:
+        """
+        Запускает команду на одном эндпоинте.
+
+        :param endpoint_name: Имя эндпоинта (для отчёта).
+        :param params: Параметры подключения (см. `BaseConnector.build_params`).
+        :param command: Команда для выполнения или отложенная команда с методом
+                        `resolve(client) -> str` (см. `controller.delivery`).
+        :param sink: Потокобезопасный приёмник вывода с методом `write(text, stream)`
+                     (например, `OutputBuffer`). Если задан, вывод пишется в него
+                     напрямую, а не публикуется событиями `"output"`. stdout и
+                     stderr приходят вперемешку в порядке поступления.
+        :param script: Имя скрипта (для истории запусков).
+        :param limits: Ограничения времени и способ остановки (`controller.cancel.RunLimits`).
+        :param run_id: Ключ событий запуска (по умолчанию — новый `run-N`); планировщик
+                       задаёт ключи вида `"<job.key>:<эндпоинт>"`.
+        :return: Дескриптор запуска; результат — `HostResult`.
+        """
+        run_id = run_id or self._next_id("run")
+        coro = self._run(run_id, endpoint_name, params, command, sink, script=script, limits=limits)
+        return self._schedule(run_id, endpoint_name, coro)
+
+    def fanout(self, script_name: str, targets: Dict[str, Dict[str, Any]], command: str,
+               concurrency: int = DEFAULT_CONCURRENCY, limits: Optional[RunLimits] = None) -> RunHandle:
+        """
+        Запускает команду на множестве эндпоинтов с ограничением параллельности.
+        По каждому хосту публикуется событие `"result"`, по завершении — `"report"`.
+
+        :param script_name: Имя скрипта (для отчёта).
+        :param targets: Параметры подключения по именам эндпоинтов.
+        :param command: Команда для выполнения (или отложенная команда, как в `submit`).
+        :param concurrency: Максимальное число одновременно обслуживаемых хостов.
+        :param limits: Ограничения времени для запуска на каждом хосте.
+        :return: Дескриптор fan-out запуска; результат — `FanOutReport`.
+        """
+        fanout_id = self._next_id("fanout")
+        coro = self._fanout(fanout_id, script_name, targets, command, max(1, int(concurrency)), limits)
+        return self._schedule(fanout_id, script_name, coro)
+
+    def submit_test(self, connector: Any, params: Dict[str, Any]) -> RunHandle:
+        """
+        Проверяет соединение через коннектор; результат `(успех, сообщение)`
+        публикуется событием `"result"`.
+        """
+        test_id = self._next_id("test")
+        return self._schedule(test_id, str(params.get("name", "")), self._test(test_id, connector, params))
+
+    async def _test(self, test_id: str, connector: Any, params: Dict[str, Any]) -> Tuple[bool, Any]:
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(self._executor, connector.test_connection, params)
+        except Exception as e:
+            result = (False, f"Ошибка: {e}")
+        self._emit(test_id, "result", result)
+        return result
+
+    def probe(self, targets: Dict[str, Tuple[Any, Dict[str, Any], str]],
+              concurrency: int = DEFAULT_PROBE_CONCURRENCY) -> RunHandle:
+        """
+        Проверяет подключение к эндпоинтам параллельно с замером фаз
+        (см. `controller.probe`).
+
+        Событие `"result"` с `ProbeResult` публикуется по ключу хоста
+        `"<probe_id>:<эндпоинт>"`, итоговый `"report"` со списком
+        результатов — по ключу самой проверки.
+
+        :param targets: `{имя: (коннектор, параметры, тип)}` (см. `controller.probe.plan_probes`).
+        :param concurrency: Максимальное число одновременных проверок.
+        :return: Дескриптор проверки; результат — список `ProbeResult`.
+        """
+        probe_id = self._next_id("probe")
+        return self._schedule(probe_id, "", self._probe(probe_id, targets, max(1, int(concurrency))))
+
+    async def _probe(self, probe_id: str, targets: Dict[str, Tuple[Any, Dict[str, Any], str]],
+                     concurrency: int) -> List[ProbeResult]:
+        logger.info("ExecutionEngine.probe(hosts=%s, concurrency=%s)", len(targets), concurrency)
+        loop = asyncio.get_running_loop()
+        # Отдельный пул: недоступные хосты ждут таймаутов, не занимая потоки запусков.
+        executor = ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(targets))),
+                                      thread_name_prefix="engine-probe")
+        results: List[ProbeResult] = []
+
+        async def probe_host(name: str, connector: Any, params: Dict[str, Any], endpoint_type: str) -> None:
+            key = f"{probe_id}:{name}"
+            self._tasks[key] = asyncio.current_task()
+            try:
+                result = await loop.run_in_executor(executor, probe_endpoint, connector, name, params,
+                                                    endpoint_type)
+            except asyncio.CancelledError:
+                result = ProbeResult(endpoint=name, type=endpoint_type, phase=CANCELLED,
+                                     error=STOP_MESSAGES[CANCELLED], checked_at=time.time())
+            finally:
+                self._tasks.pop(key, None)
+            results.append(result)
+            self._emit(key, "result", result)
+
+        try:
+            await asyncio.gather(*(probe_host(name, *target) for name, target in targets.items()))
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        logger.info("ExecutionEngine.probe() -> %s из %s успешно",
+                    sum(result.success for result in results), len(results))
+        self._emit(probe_id, "report", results)
+        return results
+
+    async def _fanout(self, fanout_id: str, script_name: str, targets: Dict[str, Dict[str, Any]],
+                      command: str, concurrency: int, limits: Optional[RunLimits] = None) -> FanOutReport:
+        logger.info("ExecutionEngine.fanout(script=%s, hosts=%s, concurrency=%s)",
+                    script_name, len(targets), concurrency)
+        semaphore = asyncio.Semaphore(concurrency)
+        report = FanOutReport(script=script_name)
+        started = time.monotonic()
+        batch = uuid.uuid4().hex
+
+        async def run_host(name: str, params: Dict[str, Any]) -> None:
+            key = f"{fanout_id}:{name}"
+            # Задача регистрируется до очереди, чтобы отмена дошла и до ожидающих хостов.
+            self._tasks[key] = asyncio.current_task()
+            try:
+                async with semaphore:
+                    result = await self._run(key, name, params, command,
+                                             script=script_name, batch=batch, limits=limits)
+            except asyncio.CancelledError:
+                result = HostResult(endpoint=name, started_at=time.time(), stopped=CANCELLED,
+                                    error=STOP_MESSAGES[CANCELLED])
+                self._emit(key, "result", result)
+            finally:
+                self._tasks.pop(key, None)
+            report.results.append(result)
+            self._emit(fanout_id, "result", result)
+
+        await asyncio.gather(*(run_host(name, params) for name, params in targets.items()))
+        report.duration = time.monotonic() - started
+        logger.info("ExecutionEngine.fanout() -> %s", report.summary())
+        self._emit(fanout_id, "report", report)
+        return report
+
+    @staticmethod
+    def _open_channel(client: Any, command: str, pty: bool = False) -> Any:
+        channel = client.get_transport().open_session()
+        if pty:
+            channel.get_pty()
+        channel.exec_command(command)
+        return channel
+
+    @staticmethod
+    def _kill_remote(client: Any, pgid: int, grace: float) -> int:
+        """Останавливает группу процессов запуска по отдельному каналу того же соединения."""
+        channel = client.get_transport().open_session()
+        try:
+            channel.exec_command(kill_command(pgid, grace))
+            return channel.recv_exit_status()
+        finally:
+            channel.close()
+
+    async def _call(self, cleanup: Optional[Any], func: Any, *args: Any) -> Any:
+        """
+        Блокирующий вызов в пуле потоков, переживающий отмену запуска.
+
+        Поток нельзя прервать, поэтому при отмене вызов доработает сам, а его
+        результат (соединение, канал) будет освобождён через `cleanup`.
+        """
+        future = asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            if cleanup is not None:
+                def release(done: "asyncio.Future") -> None:
+                    if not done.cancelled() and done.exception() is None:
+                        cleanup(done.result())
+                future.add_done_callback(release)
+            raise
+
+    async def _stop_remote(self, client: Any, pgid: Optional[int], limits: RunLimits) -> None:
+        if client is None or pgid is None:
+            return
+        loop = asyncio.get_running_loop()
+        try:
+            await asyncio.wait_for(loop.run_in_executor(self._executor, self._kill_remote,
+                                                        client, pgid, limits.kill_grace), KILL_TIMEOUT)
+        except (Exception, asyncio.CancelledError) as e:
+            logger.warning("ExecutionEngine.stop_remote(pgid=%s) -> %r", pgid, e)
+
+    async def _run(self, run_id: str, endpoint_name: str, params: Dict[str, Any], command: str,
+                   sink: Optional[Any] = None, script: str = "", batch: str = "",
+                   limits: Optional[RunLimits] = None) -> HostResult:
+        loop = asyncio.get_running_loop()
+        limits = limits or RunLimits()
+        pool = self.connector.pool()
+        result = HostResult(endpoint=endpoint_name, started_at=time.time())
+        recorder = self.history.recorder(endpoint_name, script=script, batch=batch) if self.history else None
+        # В результате хранится только хвост вывода, полный вывод уходит в sink/события.
+        output, errors = TailBuffer(), TailBuffer()
+        started = time.monotonic()
+        client = channel = None
+        marker = None
+        reused = False
+        task = asyncio.current_task()
+        self._tasks[run_id] = task
+        watchdog = Watchdog(loop, task, limits)
+        watchdog.start()
+
+        def publish(chunk: OutputChunk) -> None:
+            if not chunk.data:
+                return
+            if sink is not None:
+                sink.write(chunk.data, chunk.stream)
+            else:
+                self._emit(run_id, "output", chunk)
+
+        def consume(chunk: OutputChunk) -> None:
+            (errors if chunk.stream == "stderr" else output).write(chunk.data)
+            publish(chunk)
+
+        self._emit(run_id, "started")
+        try:
+            client = await self._call(pool.release, pool.acquire, params)
+            acquired = time.monotonic()
+            # Замеры рукопожатия есть только у нового соединения; забирает их первый запуск.
+            connect_timings = getattr(client, "connect_timings", None)
+            if isinstance(connect_timings, dict):
+                client.connect_timings = None
+                result.timings["auth"] = connect_timings.get("auth", 0.0)
+            else:
+                reused = True
+                result.timings["auth"] = 0.0
+            result.timings["connect"] = acquired - started - result.timings["auth"]
+            self._emit(run_id, "connected")
+
+            feed = getattr(command, "feed", None)
+            if not isinstance(command, str):
+                # Отложенная команда (`controller.delivery`): сначала скрипт
+                # доставляется на хост; время доставки входит в фазу exec.
+                command = await self._call(None, command.resolve, client)
+            # Псевдотерминал исказил бы код, передаваемый через stdin: там остаётся pgid.
+            pty = limits.kill_mode == "pty" and feed is None
+            if limits.kill_mode == "pgid" or (limits.kill_mode == "pty" and not pty):
+                command = wrap_command(command)
+                marker = PgidFilter()
+            channel = await self._call(lambda opened: opened.close(), self._open_channel, client, command, pty)
+            executed = time.monotonic()
+            result.timings["exec"] = executed - acquired
+            watchdog.touch()
+            # Код, передаваемый через stdin, пишется параллельно с чтением вывода.
+            feeding = loop.run_in_executor(self._executor, feed, channel) if feed else None
+            # Декодер на поток: многобайтный символ может быть разрезан между кусками.
+            decoder = StreamDecoder()
+
+            def receive(stream: str, data: bytes, timestamp: float) -> None:
+                if stream == "stderr":
+                    result.bytes_err += len(data)
+                else:
+                    result.bytes_out += len(data)
+                if recorder is not None:
+                    recorder.write(stream, data, timestamp)
+                consume(OutputChunk(stream, decoder.decode(stream, data), timestamp))
+
+            async for chunk in AsyncSshChannel(channel, loop).chunks():
+                watchdog.touch()
+                data = chunk.data
+                if marker is not None and chunk.stream == "stderr":
+                    data = marker.feed(data)
+                if data:
+                    receive(chunk.stream, data, chunk.timestamp)
+            if marker is not None:
+                receive("stderr", marker.flush(), time.time())
+            for stream in ("stdout", "stderr"):
+                consume(OutputChunk(stream, decoder.flush(stream), time.time()))
+            if feeding is not None:
+                await feeding
+            exit_code = await self._call(None, channel.recv_exit_status)
+            # paramiko возвращает -1, если сервер не прислал код завершения.
+            result.exit_code = exit_code if exit_code >= 0 else None
+            result.timings["drain"] = time.monotonic() - executed
+            # Успех определяется только кодом завершения: stderr — обычные данные
+            # (apt, git, curl пишут туда прогресс), а без кода результат неизвестен.
+            result.success = result.exit_code == 0
+            if result.exit_code is None:
+                consume(OutputChunk("stderr", "Код завершения не получен\n", time.time()))
+            elif result.exit_code:
+                consume(OutputChunk("stderr", f"Код завершения: {result.exit_code}\n", time.time()))
+        except asyncio.CancelledError:
+            result.stopped = watchdog.reason or CANCELLED
+            message = STOP_MESSAGES[result.stopped]
+            logger.info("ExecutionEngine.run(%s) -> %s", endpoint_name, message)
+            errors.write(message)
+            publish(OutputChunk("stderr", f"{message}\n", time.time()))
+            await self._stop_remote(client, marker.pgid if marker else None, limits)
+        except Exception as e:
+            logger.warning("ExecutionEngine.run(%s) -> %s", endpoint_name, e)
+            errors.write(str(e))
+            publish(OutputChunk("stderr", f"Ошибка: {e}\n", time.time()))
+        finally:
+            watchdog.cancel()
+            self._tasks.pop(run_id, None)
+            if channel is not None:
+                # В режиме pty закрытие канала посылает SIGHUP группе процессов.
+                channel.close()
+            if client is not None:
+                pool.release(client)
+
+        result.output = output.getvalue()
+        result.error = errors.getvalue()
+        result.duration = time.monotonic() - started
+        if recorder is not None:
+            recorder.finish(result, reused=reused)
+        self._emit(run_id, "result", result)
+        return result
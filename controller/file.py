@@ -1,12 +1,13 @@
 import json
 import os
-
-from view.theme import StyledToplevel, StyledLabel, StyledButton, StyledEntry
+import tempfile
 
 class FileStorage:
     def __init__(self, file_path="data.json"):
         self.file_path = file_path
         self.data = self.load()
+        # Растёт при каждом сохранении: по нему кэши (runner.endpoint_table) узнают об изменениях.
+        self.revision = 0
 
     def load(self):
         if os.path.exists(self.file_path):
@@ -15,8 +16,20 @@ class FileStorage:
         return {"scripts": {}, "endpoints": {}}
 
     def save(self):
-        with open(self.file_path, 'w') as f:
-            json.dump(self.data, f, indent=2)
+        # Пишем во временный файл рядом и атомарно подменяем: при сбое data.json не обрезается.
+        directory = os.path.dirname(os.path.abspath(self.file_path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".data-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self.data, f, indent=2, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.file_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        finally:
+            self.revision += 1
 
     @property
     def scripts(self):
@@ -32,6 +45,9 @@ class StorageHandler:
         self.config = config
 
     def setting_window(self):
+        # Tk импортируется только здесь: хранилище используется и без UI (см. controller.cli).
+        from view.theme import StyledToplevel, StyledLabel, StyledButton, StyledEntry
+
         result_window = StyledToplevel()
         result_window.title("Настройки Storage")
         result_window.configure(bg="#f2ceae")
@@ -0,0 +1,353 @@
+"""
+История запусков скриптов.
+
+`RunHistory` сохраняет каждый запуск в SQLite: скрипт, эндпоинт, время
+начала, длительности фаз (`connect`, `auth`, `exec`, `drain`), код
+завершения и объём stdout/stderr в байтах. Вывод архивируется кусками:
+записи `(поток, время, байты)` копятся в кадре до `chunk_size` байт,
+кадр сжимается zlib и пишется отдельной строкой `output_chunks`, поэтому
+вывод любого размера читается обратно потоково, кадр за кадром.
+
+Запись идёт из отдельного потока-писателя через очередь, так что цикл
+движка выполнения не ждёт диска. Методы `runs`, `slowest_hosts` и
+`regressions` отвечают на вопросы «какие хосты медленные» и «где запуск
+стал медленнее обычного».
+"""
+
+import logging
+import queue
+import sqlite3
+import statistics
+import struct
+import threading
+import time
+import uuid
+import zlib
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from connectors.channel import OutputChunk
+from controller.runner import PHASES, HostResult
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = "history.db"
+DEFAULT_CHUNK_SIZE = 256 * 1024
+STREAM_CODES = {"stdout": 0, "stderr": 1}
+STREAM_NAMES = {code: name for name, code in STREAM_CODES.items()}
+# Заголовок записи в кадре: код потока, время получения, длина данных
+RECORD_HEADER = struct.Struct("<BdI")
+
+SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS runs (
+        id TEXT PRIMARY KEY,
+        batch TEXT,
+        script TEXT,
+        endpoint TEXT NOT NULL,
+        started_at REAL NOT NULL,
+        duration REAL,
+        connect REAL,
+        auth REAL,
+        exec REAL,
+        drain REAL,
+        reused INTEGER,
+        exit_code INTEGER,
+        success INTEGER,
+        bytes_out INTEGER,
+        bytes_err INTEGER,
+        error TEXT
+    )""",
+    "CREATE INDEX IF NOT EXISTS runs_endpoint ON runs (endpoint, started_at)",
+    "CREATE INDEX IF NOT EXISTS runs_script ON runs (script, started_at)",
+    """CREATE TABLE IF NOT EXISTS output_chunks (
+        run_id TEXT NOT NULL,
+        seq INTEGER NOT NULL,
+        raw_size INTEGER NOT NULL,
+        data BLOB NOT NULL,
+        PRIMARY KEY (run_id, seq)
+    )""",
+)
+
+
+@dataclass
+class RunRecord:
+    """
+    Запись истории об одном запуске на одном эндпоинте.
+    """
+
+    id: str
+    endpoint: str
+    started_at: float
+    script: str = ""
+    batch: str = ""
+    duration: float = 0.0
+    timings: Dict[str, float] = field(default_factory=dict)
+    reused: bool = False
+    exit_code: Optional[int] = None
+    success: bool = False
+    bytes_out: int = 0
+    bytes_err: int = 0
+    error: str = ""
+
+
+def encode_records(records: List[Tuple[str, float, bytes]]) -> bytes:
+    """Упаковывает записи вывода в несжатый кадр."""
+    parts = []
+    for stream, timestamp, data in records:
+        parts.append(RECORD_HEADER.pack(STREAM_CODES[stream], timestamp, len(data)))
+        parts.append(data)
+    return b"".join(parts)
+
+
+def decode_records(frame: bytes) -> Iterator[Tuple[str, float, bytes]]:
+    """Разбирает несжатый кадр на записи `(поток, время, байты)`."""
+    pos = 0
+    while pos < len(frame):
+        code, timestamp, size = RECORD_HEADER.unpack_from(frame, pos)
+        pos += RECORD_HEADER.size
+        yield STREAM_NAMES[code], timestamp, frame[pos:pos + size]
+        pos += size
+
+
+class RunRecorder:
+    """
+    Записывает один запуск: копит вывод кадрами и отдаёт их писателю истории.
+    Используется из одного потока (цикла движка).
+    """
+
+    def __init__(self, history: "RunHistory", endpoint: str, script: str = "", batch: str = "") -> None:
+        self.history = history
+        self.record = RunRecord(id=uuid.uuid4().hex, endpoint=endpoint, started_at=time.time(),
+                                script=script, batch=batch)
+        self._records: List[Tuple[str, float, bytes]] = []
+        self._size = 0
+        self._seq = 0
+
+    def write(self, stream: str, data: bytes, timestamp: Optional[float] = None) -> None:
+        """Добавляет кусок сырого вывода."""
+        if not data:
+            return
+        self._records.append((stream, timestamp or time.time(), data))
+        self._size += len(data)
+        if self._size >= self.history.chunk_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._records:
+            return
+        frame = encode_records(self._records)
+        self.history.submit(("chunk", self.record.id, self._seq, len(frame), zlib.compress(frame)))
+        self._seq += 1
+        self._records, self._size = [], 0
+
+    def finish(self, result: HostResult, reused: bool = False) -> RunRecord:
+        """Сбрасывает остаток вывода и сохраняет итоги запуска."""
+        self._flush()
+        record = self.record
+        record.started_at = result.started_at or record.started_at
+        record.duration = result.duration
+        record.timings = dict(result.timings)
+        record.reused = reused
+        record.exit_code = result.exit_code
+        record.success = result.success
+        record.bytes_out = result.bytes_out
+        record.bytes_err = result.bytes_err
+        record.error = result.error[-1000:] if not result.success else ""
+        self.history.submit(("run", record))
+        return record
+
+
+class RunHistory:
+    """
+    Хранилище истории запусков на SQLite с фоновым писателем.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH, chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+        """
+        :param path: Путь к файлу базы истории.
+        :param chunk_size: Размер несжатого кадра вывода (в байтах).
+        """
+        self.path = path
+        self.chunk_size = chunk_size
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        for statement in SCHEMA:
+            self.connection.execute(statement)
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="run-history", daemon=True)
+        self._writer.start()
+
+    def recorder(self, endpoint: str, script: str = "", batch: str = "") -> RunRecorder:
+        """Начинает запись нового запуска."""
+        return RunRecorder(self, endpoint, script=script, batch=batch)
+
+    def submit(self, item: Tuple[Any, ...]) -> None:
+        """Ставит кадр или итог запуска в очередь писателя."""
+        self._queue.put(item)
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """Ждёт, пока писатель сохранит всё поставленное в очередь."""
+        done = threading.Event()
+        self._queue.put(("sync", done))
+        done.wait(timeout)
+
+    def close(self) -> None:
+        """Сохраняет очередь и закрывает базу."""
+        self._queue.put(None)
+        self._writer.join(timeout=10)
+        self.connection.close()
+
+    def _write_loop(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            # Всё, что накопилось, пишем одной транзакцией.
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in batch
+            try:
+                self._write_batch([entry for entry in batch if entry is not None])
+            except Exception as e:
+                logger.exception("RunHistory: ошибка записи истории: %s", e)
+            if stop:
+                return
+
+    def _write_batch(self, batch: List[Tuple[Any, ...]]) -> None:
+        syncs = []
+        with self._lock:
+            self.connection.execute("BEGIN")
+            try:
+                for item in batch:
+                    kind = item[0]
+                    if kind == "chunk":
+                        self.connection.execute(
+                            "INSERT INTO output_chunks (run_id, seq, raw_size, data) VALUES (?, ?, ?, ?)",
+                            item[1:])
+                    elif kind == "run":
+                        self._insert_run(item[1])
+                    elif kind == "sync":
+                        syncs.append(item[1])
+                self.connection.execute("COMMIT")
+            except Exception:
+                self.connection.execute("ROLLBACK")
+                raise
+            finally:
+                for event in syncs:
+                    event.set()
+
+    def _insert_run(self, record: RunRecord) -> None:
+        timings = [record.timings.get(phase) for phase in PHASES]
+        self.connection.execute(
+            "INSERT OR REPLACE INTO runs (id, batch, script, endpoint, started_at, duration, "
+            "connect, auth, exec, drain, reused, exit_code, success, bytes_out, bytes_err, error) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (record.id, record.batch, record.script, record.endpoint, record.started_at,
+             record.duration, *timings, int(record.reused), record.exit_code, int(record.success),
+             record.bytes_out, record.bytes_err, record.error))
+
+    def _query(self, sql: str, params: Tuple[Any, ...] = ()) -> List[Tuple[Any, ...]]:
+        with self._lock:
+            return self.connection.execute(sql, params).fetchall()
+
+    @staticmethod
+    def _filters(script: Optional[str], endpoint: Optional[str], since: Optional[float],
+                 until: Optional[float] = None) -> Tuple[str, Tuple[Any, ...]]:
+        clauses, params = [], []
+        for column, value, op in (("script", script, "="), ("endpoint", endpoint, "="),
+                                  ("started_at", since, ">="), ("started_at", until, "<")):
+            if value is not None:
+                clauses.append(f"{column} {op} ?")
+                params.append(value)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", tuple(params)
+
+    def runs(self, script: Optional[str] = None, endpoint: Optional[str] = None,
+             since: Optional[float] = None, until: Optional[float] = None,
+             success: Optional[bool] = None, limit: int = 100) -> List[RunRecord]:
+        """
+        Запуски, новые первыми.
+
+        :param since: Начало интервала (`time.time()`), включительно.
+        :param until: Конец интервала, не включительно.
+        :param success: Только успешные (`True`) или только неуспешные (`False`).
+        """
+        where, params = self._filters(script, endpoint, since, until)
+        if success is not None:
+            where += (" AND " if where else " WHERE ") + "success = ?"
+            params += (int(success),)
+        rows = self._query(
+            "SELECT id, endpoint, started_at, script, batch, duration, connect, auth, exec, drain, "
+            f"reused, exit_code, success, bytes_out, bytes_err, error FROM runs{where} "
+            "ORDER BY started_at DESC LIMIT ?", params + (limit,))
+        return [RunRecord(id=row[0], endpoint=row[1], started_at=row[2], script=row[3] or "",
+                          batch=row[4] or "", duration=row[5] or 0.0,
+                          timings={phase: value for phase, value in zip(PHASES, row[6:10]) if value is not None},
+                          reused=bool(row[10]), exit_code=row[11], success=bool(row[12]),
+                          bytes_out=row[13] or 0, bytes_err=row[14] or 0, error=row[15] or "")
+                for row in rows]
+
+    def slowest_hosts(self, script: Optional[str] = None, since: Optional[float] = None,
+                      metric: str = "duration", limit: int = 10) -> List[Tuple[str, float, float, int]]:
+        """
+        Самые медленные эндпоинты по средней длительности.
+
+        :param metric: `"duration"` или одна из фаз `PHASES`.
+        :return: Список `(эндпоинт, среднее, максимум, число запусков)`.
+        """
+        if metric != "duration" and metric not in PHASES:
+            raise ValueError(f"Неизвестная метрика: {metric}")
+        where, params = self._filters(script, None, since)
+        where += (" AND " if where else " WHERE ") + f"{metric} IS NOT NULL"
+        return [tuple(row) for row in self._query(
+            f"SELECT endpoint, AVG({metric}), MAX({metric}), COUNT(*) FROM runs{where} "
+            f"GROUP BY endpoint ORDER BY AVG({metric}) DESC LIMIT ?", params + (limit,))]
+
+    def regressions(self, script: str, baseline_runs: int = 10, threshold: float = 1.5,
+                    metric: str = "duration") -> List[Tuple[str, float, float, float]]:
+        """
+        Эндпоинты, где последний запуск скрипта медленнее медианы предыдущих.
+
+        :param baseline_runs: Сколько предыдущих запусков брать для медианы.
+        :param threshold: Во сколько раз последний запуск должен быть медленнее.
+        :return: Список `(эндпоинт, последний, медиана, отношение)`, худшие первыми.
+        """
+        if metric != "duration" and metric not in PHASES:
+            raise ValueError(f"Неизвестная метрика: {metric}")
+        rows = self._query(
+            f"SELECT endpoint, {metric} FROM ("
+            f"  SELECT endpoint, {metric}, ROW_NUMBER() OVER "
+            f"    (PARTITION BY endpoint ORDER BY started_at DESC) AS n"
+            f"  FROM runs WHERE script = ? AND {metric} IS NOT NULL"
+            f") WHERE n <= ? ORDER BY endpoint, n", (script, baseline_runs + 1))
+        by_endpoint: Dict[str, List[float]] = {}
+        for endpoint, value in rows:
+            by_endpoint.setdefault(endpoint, []).append(value)
+        found = []
+        for endpoint, values in by_endpoint.items():
+            if len(values) < 2:
+                continue
+            latest, baseline = values[0], statistics.median(values[1:])
+            if baseline > 0 and latest / baseline >= threshold:
+                found.append((endpoint, latest, baseline, latest / baseline))
+        return sorted(found, key=lambda item: item[3], reverse=True)
+
+    def output(self, run_id: str) -> Iterator[OutputChunk]:
+        """Вывод запуска кусками в исходном порядке (сырые байты в `data`)."""
+        seq = 0
+        while True:
+            rows = self._query("SELECT data FROM output_chunks WHERE run_id = ? AND seq = ?", (run_id, seq))
+            if not rows:
+                return
+            for stream, timestamp, data in decode_records(zlib.decompress(rows[0][0])):
+                yield OutputChunk(stream, data, timestamp)
+            seq += 1
+
+    def output_text(self, run_id: str, encoding: str = "utf-8") -> str:
+        """Весь вывод запуска одной строкой (stdout и stderr вперемешку)."""
+        return b"".join(chunk.data for chunk in self.output(run_id)).decode(encoding, errors="replace")
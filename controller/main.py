@@ -14,12 +14,18 @@ import tkinter as tk
 from tkinter import ttk
 import tkinter.font as tkfont
 import configparser
-import webbrowser
 from ctypes import windll, byref, create_unicode_buffer, create_string_buffer
 import os
 
-from controller.file import FileStorage, StorageHandler
+from controller.file import StorageHandler
+from controller.storage import create_storage
 from controller.controller import FormHandler
+from controller.engine import ExecutionEngine
+from controller.history import DEFAULT_PATH as HISTORY_PATH, RunHistory
+from controller.scheduler import DEFAULT_PATH as JOBS_PATH, JobStore, Scheduler
+from controller.dispatcher import EventDispatcher
+from controller.startup import StartupProfiler
+from connectors.registry import DEFAULT_CACHE_PATH as CONNECTOR_CACHE_PATH, ConnectorRegistry
 
 FR_PRIVATE = 0x10
 FR_NOT_ENUM = 0x20
@@ -49,13 +55,14 @@ class App:
     Main application class that initializes and manages the UI components.
     """
 
-    def __init__(self, root: tk.Tk):
+    def __init__(self, root: tk.Tk, profiler: StartupProfiler = None):
         """
         Initialize the main application window and its components.
 
         :param root: The root Tkinter window.
+        :param profiler: Startup profiler timing the initialization phases.
         """
-
+        self.profiler = profiler or StartupProfiler()
 
         # Configure the main application window
         self.config = configparser.ConfigParser()
@@ -70,7 +77,8 @@ class App:
         self.style = ttk.Style()
         self.style.theme_use("classic")  # Use a classic theme for better compatibility
         self._create_menu_bar()
-        self._init_font()
+        with self.profiler.phase("fonts"):
+            self._init_font()
 
         # Configure notebook (tab container) styles
         self.style.configure("TNotebook",
@@ -89,8 +97,25 @@ class App:
         self.style.map("TNotebook.Tab", background=[("selected", "#f37600"), ("active", "#31b7c3")])
 
         # Load saved data (scripts, endpoints, etc.)
-        self.storage = FileStorage()
-        self.data = self.storage.data
+        with self.profiler.phase("storage"):
+            self.storage = create_storage(self.config)
+            self.data = self.storage.data
+
+        # Connector names and option schemas; driver modules load on first use
+        with self.profiler.phase("connectors"):
+            self.connectors = self._init_connectors()
+
+        # Single execution engine for all runs; the UI polls its event queue
+        with self.profiler.phase("history + engine"):
+            self.history = self._init_history()
+            self.engine = ExecutionEngine(history=self.history)
+            self.dispatcher = EventDispatcher(self.root, self.engine.events)
+            self.dispatcher.start()
+
+        # All runs go through one queue with global and per-host limits
+        with self.profiler.phase("scheduler"):
+            self.scheduler = self._init_scheduler()
+            self.scheduler.start()
 
         # Create the main layout frames
         self.main_frame = tk.Frame(root, bg="#f2ceae")
@@ -117,8 +142,10 @@ class App:
         self.notebook.add(self.endpoints_frame, text="Endpoints")
 
         # Managers for handling scripts and endpoints
-        self.scripts_manager = FormHandler(self, "scripts")
-        self.endpoints_manager = FormHandler(self, "endpoints")
+        with self.profiler.phase("scripts tab"):
+            self.scripts_manager = FormHandler(self, "scripts")
+        with self.profiler.phase("endpoints tab"):
+            self.endpoints_manager = FormHandler(self, "endpoints")
 
         # Footer section (bottom of the window)
         self.footer_frame = tk.Frame(root, height=30, bg="#d5a78d")
@@ -158,8 +185,35 @@ class App:
 
         :param _event: Unused event parameter from Tkinter.
         """
+        import webbrowser
+
         webbrowser.open("https://github.com/Ilya-Guyduk/bino")
 
+    def _init_connectors(self):
+        """Реестр коннекторов с кэшем описаний по секции [Startup] (connector_cache)."""
+        cache_path = self.config.get("Startup", "connector_cache",
+                                     fallback=CONNECTOR_CACHE_PATH).strip().strip("\"'")
+        return ConnectorRegistry(cache_path=cache_path or None).load()
+
+    def _init_history(self):
+        """Открывает историю запусков по секции [History] (enabled, path)."""
+        if not self.config.getboolean("History", "enabled", fallback=True):
+            return None
+        path = self.config.get("History", "path", fallback=HISTORY_PATH).strip().strip("\"'")
+        return RunHistory(path or HISTORY_PATH)
+
+    def _init_scheduler(self):
+        """
+        Планировщик запусков по секции [Scheduler]. База заданий и расписания
+        подключаются только при run_schedules = true: с одной базой должен
+        работать один процесс (приложение или `cli.py daemon`).
+        """
+        store = None
+        if self.config.getboolean("Scheduler", "run_schedules", fallback=False):
+            path = self.config.get("Scheduler", "path", fallback=JOBS_PATH).strip().strip("\"'")
+            store = JobStore(path or JOBS_PATH)
+        return Scheduler(self.engine, self.storage, store=store, config=self.config)
+
     def _init_font(self):
         font_path = "fonts/Silkscreen-Regular.ttf"
 
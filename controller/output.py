@@ -0,0 +1,197 @@
+"""
+Буферизация вывода запусков для окна результата.
+
+`OutputBuffer` принимает куски вывода из любого потока и хранит только
+ограниченную прокрутку (кольцевой буфер последних строк); строки,
+вытесненные из кольца, сбрасываются во временный файл на диске. UI
+забирает накопленный текст одной пачкой через `drain` (см.
+`view.output.OutputView`), поэтому объём памяти не зависит от размера
+вывода, а число обновлений виджета — от числа строк.
+
+`StreamDecoder` декодирует куски байтов из stdout и stderr независимо,
+не разрывая многобайтные символы UTF-8 на границах кусков.
+"""
+
+import codecs
+import shutil
+import tempfile
+import threading
+from collections import deque
+from typing import Deque, Dict, List, Optional, TextIO, Tuple
+
+DEFAULT_SCROLLBACK = 10000
+MAX_LINE_CHARS = 65536
+DEFAULT_TAIL_CHARS = 65536
+
+
+class OutputBuffer:
+    """
+    Потокобезопасный буфер вывода с ограниченной прокруткой и сбросом на диск.
+    """
+
+    def __init__(self, max_lines: int = DEFAULT_SCROLLBACK, spill_dir: Optional[str] = None) -> None:
+        """
+        :param max_lines: Размер видимой прокрутки (в строках).
+        :param spill_dir: Каталог для файла со старыми строками (по умолчанию — системный temp).
+        """
+        self.max_lines = max(1, int(max_lines))
+        self.spill_dir = spill_dir
+        self.total_chars = 0
+        self.total_lines = 0
+        self._lock = threading.Lock()
+        self._lines: Deque[str] = deque()
+        self._partial = ""
+        self._pending: List[Tuple[str, str]] = []
+        self._pending_lines = 0
+        self._reset = False
+        self._spill: Optional[TextIO] = None
+        self._closed = False
+        self.spilled_lines = 0
+
+    def write(self, text: str, stream: str = "stdout") -> None:
+        """
+        Добавляет кусок вывода (вызывается из любого потока).
+
+        :param text: Текст куска.
+        :param stream: `"stdout"` или `"stderr"` — для подсветки в окне вывода.
+        """
+        if not text:
+            return
+        with self._lock:
+            if self._closed:
+                return
+            self.total_chars += len(text)
+            parts = (self._partial + text).split("\n")
+            self._partial = parts.pop()
+            if len(self._partial) > MAX_LINE_CHARS:
+                # Очень длинная строка без перевода строки: режем, чтобы не копить её в памяти.
+                parts.append(self._partial)
+                self._partial = ""
+            self.total_lines += len(parts)
+            self._lines.extend(line + "\n" for line in parts)
+            overflow = len(self._lines) - self.max_lines
+            if overflow > 0:
+                self._spill_lines([self._lines.popleft() for _ in range(overflow)])
+
+            if self._reset:
+                return
+            self._pending.append((stream, text))
+            self._pending_lines += text.count("\n")
+            if self._pending_lines > self.max_lines:
+                # Непоказанного больше, чем помещается в прокрутку: UI перерисует кольцо целиком.
+                self._pending.clear()
+                self._pending_lines = 0
+                self._reset = True
+
+    def drain(self) -> Tuple[bool, List[Tuple[str, str]]]:
+        """
+        Забирает накопленный с прошлого вызова вывод.
+
+        :return: `(reset, segments)`, где `segments` — список `(поток, текст)`
+                 в порядке поступления; соседние куски одного потока склеены.
+                 При `reset=True` сегмент один — вся видимая прокрутка, и
+                 виджет нужно очистить перед вставкой.
+        """
+        with self._lock:
+            if self._reset:
+                self._reset = False
+                return True, [("stdout", "".join(self._lines) + self._partial)]
+            pending, self._pending = self._pending, []
+            self._pending_lines = 0
+        segments: List[Tuple[str, str]] = []
+        parts: List[str] = []
+        current = None
+        for stream, text in pending:
+            if stream != current and parts:
+                segments.append((current, "".join(parts)))
+                parts = []
+            current = stream
+            parts.append(text)
+        if parts:
+            segments.append((current, "".join(parts)))
+        return False, segments
+
+    def scrollback(self) -> str:
+        """Текст видимой прокрутки."""
+        with self._lock:
+            return "".join(self._lines) + self._partial
+
+    def export(self, path: str) -> None:
+        """Сохраняет полный вывод (сброшенные на диск строки и прокрутку) в файл."""
+        with self._lock:
+            with open(path, "w", encoding="utf-8") as target:
+                if self._spill is not None:
+                    self._spill.flush()
+                    self._spill.seek(0)
+                    shutil.copyfileobj(self._spill, target)
+                    self._spill.seek(0, 2)
+                target.writelines(self._lines)
+                target.write(self._partial)
+
+    def close(self) -> None:
+        """Удаляет временный файл со сброшенными строками; дальнейший вывод отбрасывается."""
+        with self._lock:
+            self._closed = True
+            if self._spill is not None:
+                self._spill.close()
+                self._spill = None
+
+    def _spill_lines(self, lines) -> None:
+        if self._spill is None:
+            self._spill = tempfile.TemporaryFile("w+", encoding="utf-8", dir=self.spill_dir,
+                                                 prefix="bino-output-")
+        self._spill.writelines(lines)
+        self.spilled_lines += len(lines)
+
+
+class TailBuffer:
+    """
+    Хранит только последние `max_chars` символов вывода (для отчётов по хостам).
+    """
+
+    def __init__(self, max_chars: int = DEFAULT_TAIL_CHARS) -> None:
+        self.max_chars = max_chars
+        self.total_chars = 0
+        self._chunks: Deque[str] = deque()
+        self._size = 0
+
+    def write(self, text: str) -> None:
+        """Добавляет кусок вывода, вытесняя самые старые."""
+        self.total_chars += len(text)
+        self._chunks.append(text)
+        self._size += len(text)
+        while self._size - len(self._chunks[0]) >= self.max_chars:
+            self._size -= len(self._chunks.popleft())
+
+    @property
+    def truncated(self) -> bool:
+        """Был ли вывод обрезан."""
+        return self.total_chars > self._size
+
+    def getvalue(self) -> str:
+        """Хвост вывода не длиннее `max_chars`."""
+        value = "".join(self._chunks)
+        return value[-self.max_chars:]
+
+
+class StreamDecoder:
+    """
+    Инкрементальный декодер кусков вывода с отдельным состоянием на поток.
+    """
+
+    def __init__(self, encoding: str = "utf-8") -> None:
+        self.encoding = encoding
+        self._decoders: Dict[str, codecs.IncrementalDecoder] = {}
+
+    def decode(self, stream: str, data: bytes) -> str:
+        """Декодирует кусок; незавершённый многобайтный символ ждёт следующего куска."""
+        decoder = self._decoders.get(stream)
+        if decoder is None:
+            decoder = codecs.getincrementaldecoder(self.encoding)(errors="replace")
+            self._decoders[stream] = decoder
+        return decoder.decode(data)
+
+    def flush(self, stream: str) -> str:
+        """Возвращает остаток потока после EOF."""
+        decoder = self._decoders.get(stream)
+        return decoder.decode(b"", final=True) if decoder else ""
@@ -0,0 +1,71 @@
+"""
+Постраничная выдача имён записей для списков боковой панели.
+
+`PagedNames` отдаёт имена скриптов или эндпоинтов страницами по мере
+прокрутки списка, не загружая весь инвентарь разом. Источник — таблица
+хранилища: у `SqliteTable` страница читается одним запросом по индексу
+(`page`), у обычного словаря или списка — срезом итератора. Полная
+запись читается только при выборе элемента (`model.read(name)`).
+"""
+
+import itertools
+from typing import Any, List, Set
+
+DEFAULT_PAGE_SIZE = 200
+
+
+class PagedNames:
+    """
+    Курсор по именам источника с учётом правок, сделанных из UI.
+
+    Новые записи UI показывает сразу (вверху списка), поэтому при
+    дальнейшей подгрузке они пропускаются; удаление уже показанной записи
+    сдвигает смещение, чтобы следующая страница ничего не потеряла.
+    """
+
+    def __init__(self, source: Any, page_size: int = DEFAULT_PAGE_SIZE) -> None:
+        """
+        :param source: Таблица хранилища (`SqliteTable`, dict) или список имён.
+        :param page_size: Количество имён на странице.
+        """
+        self.source = source
+        self.page_size = max(1, int(page_size))
+        self.offset = 0
+        self._added: Set[str] = set()
+
+    def has_more(self) -> bool:
+        """Остались ли непросмотренные имена (среди них могут быть уже показанные из UI)."""
+        return self.offset < len(self.source)
+
+    def next_page(self) -> List[str]:
+        """Следующая страница имён (пустая, если всё уже подгружено)."""
+        names: List[str] = []
+        while len(names) < self.page_size and self.has_more():
+            batch = self._fetch(self.offset, self.page_size - len(names))
+            if not batch:
+                break
+            self.offset += len(batch)
+            names.extend(name for name in batch if name not in self._added)
+        return names
+
+    def added(self, name: str) -> None:
+        """Запись создана и уже показана в UI."""
+        self._added.add(name)
+
+    def removed(self, name: str) -> None:
+        """Показанная в UI запись удалена."""
+        if name in self._added:
+            self._added.discard(name)
+        elif self.offset > 0:
+            self.offset -= 1
+
+    def renamed(self, old_name: str, new_name: str) -> None:
+        """Показанная запись переименована (хранилище переносит её в конец)."""
+        self.removed(old_name)
+        self.added(new_name)
+
+    def _fetch(self, offset: int, limit: int) -> List[str]:
+        page = getattr(self.source, "page", None)
+        if page is not None:
+            return page(offset, limit)
+        return list(itertools.islice(iter(self.source), offset, offset + limit))
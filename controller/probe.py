@@ -0,0 +1,256 @@
+"""
+Массовая проверка подключения к эндпоинтам с замером задержек.
+
+После смены учётных данных нужно за один проход проверить тысячи
+эндпоинтов и найти недоступные и медленные. Проверка выполняется
+коннекторами (`BaseConnector.probe`): для SSH время TCP-подключения,
+ожидания баннера, обмена ключами и аутентификации замеряется отдельно,
+для остальных коннекторов — время подключения целиком.
+
+Хосты проверяет движок (`ExecutionEngine.probe`) параллельно, с лимитом
+одновременных проверок. Результаты кэшируются (`ProbeCache`) на `ttl`
+секунд с привязкой к параметрам подключения: повторный проход проверяет
+только хосты с устаревшим результатом или изменёнными параметрами.
+Результаты сортируются по любой фазе (`sort_results`) и выгружаются
+в CSV или JSONL (`export_results`).
+"""
+
+import csv
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from controller.cancel import CANCELLED
+
+logger = logging.getLogger(__name__)
+
+# Фазы подключения в порядке выполнения; `connect` — у коннекторов без разбивки
+PHASES = ("tcp", "banner", "kex", "auth", "connect")
+SORT_KEYS = ("endpoint", "status", "total") + PHASES
+DEFAULT_TTL = 600.0
+DEFAULT_CACHE_PATH = "probe.cache.json"
+DEFAULT_PROBE_CONCURRENCY = 64
+CACHE_VERSION = 1
+
+
+@dataclass
+class ProbeResult:
+    """
+    Результат проверки одного эндпоинта.
+
+    :param endpoint: Имя эндпоинта.
+    :param type: Тип эндпоинта (имя коннектора).
+    :param success: Подключение и аутентификация прошли успешно.
+    :param error: Текст ошибки.
+    :param phase: Фаза, на которой проверка остановилась (при ошибке).
+    :param timings: Длительности фаз в секундах (`PHASES`).
+    :param checked_at: Время проверки (Unix time).
+    :param cached: Результат взят из кэша, а не получен сейчас.
+    """
+
+    endpoint: str
+    type: str = "ssh"
+    success: bool = False
+    error: str = ""
+    phase: str = ""
+    timings: Dict[str, float] = field(default_factory=dict)
+    checked_at: float = 0.0
+    cached: bool = False
+
+    @property
+    def total(self) -> float:
+        """Суммарное время всех фаз."""
+        return sum(self.timings.values())
+
+    @property
+    def status(self) -> str:
+        """`"ok"` или `"failed:<фаза>"`."""
+        return "ok" if self.success else f"failed:{self.phase or 'config'}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Запись для кэша и экспорта."""
+        data = asdict(self)
+        data.pop("cached")
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ProbeResult":
+        """Обратное к `to_dict`."""
+        return cls(**{name: data[name] for name in ("endpoint", "type", "success", "error", "phase",
+                                                    "timings", "checked_at") if name in data})
+
+
+def probe_settings(config: Optional[Any]) -> Dict[str, Any]:
+    """Параметры проверки из секции [Probe] (concurrency, ttl, cache_path)."""
+    settings: Dict[str, Any] = {"concurrency": DEFAULT_PROBE_CONCURRENCY, "ttl": DEFAULT_TTL,
+                                "cache_path": DEFAULT_CACHE_PATH}
+    if config is None or not config.has_section("Probe"):
+        return settings
+    try:
+        settings["concurrency"] = config.getint("Probe", "concurrency", fallback=settings["concurrency"])
+        settings["ttl"] = config.getfloat("Probe", "ttl", fallback=settings["ttl"])
+    except ValueError:
+        logger.warning("probe_settings(): неверное значение в секции [Probe]")
+    settings["cache_path"] = config.get("Probe", "cache_path", fallback=DEFAULT_CACHE_PATH).strip().strip("\"'")
+    return settings
+
+
+def fingerprint(params: Dict[str, Any]) -> str:
+    """Отпечаток параметров подключения: изменение любого параметра сбрасывает кэш хоста."""
+    encoded = json.dumps(params, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def probe_endpoint(connector: Any, name: str, params: Dict[str, Any], endpoint_type: str = "ssh") -> ProbeResult:
+    """Проверяет один эндпоинт через `connector.probe` (блокирующий вызов)."""
+    try:
+        success, error, timings = connector.probe(params)
+    except Exception as e:
+        success, error, timings = False, str(e) or type(e).__name__, {}
+    phase = "" if success else next(reversed(timings), "")
+    return ProbeResult(endpoint=name, type=endpoint_type, success=success, error=str(error or ""),
+                       phase=phase, timings=dict(timings), checked_at=time.time())
+
+
+class ProbeCache:
+    """
+    Кэш результатов проверок с временем жизни, сохраняемый в JSON.
+    """
+
+    def __init__(self, path: Optional[str] = DEFAULT_CACHE_PATH, ttl: float = DEFAULT_TTL) -> None:
+        """
+        :param path: Файл кэша; `None` — только в памяти.
+        :param ttl: Сколько секунд результат считается свежим.
+        """
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Tuple[str, ProbeResult]] = {}
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != CACHE_VERSION:
+                return
+            for name, entry in data.get("entries", {}).items():
+                self._entries[name] = (entry["fingerprint"], ProbeResult.from_dict(entry["result"]))
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning("ProbeCache: кэш %s не прочитан: %s", self.path, e)
+
+    def get(self, name: str, params_fingerprint: str, now: Optional[float] = None) -> Optional[ProbeResult]:
+        """Свежий результат для эндпоинта с теми же параметрами или `None`."""
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._entries.get(name)
+        if entry is None or entry[0] != params_fingerprint or now - entry[1].checked_at > self.ttl:
+            return None
+        result = ProbeResult.from_dict(entry[1].to_dict())
+        result.cached = True
+        return result
+
+    def put(self, result: ProbeResult, params_fingerprint: str) -> None:
+        """
+        Запоминает результат проверки. Отменённая проверка ничего не говорит
+        о хосте и не запоминается: следующий запуск проверит его заново.
+        """
+        if result.phase == CANCELLED:
+            return
+        with self._lock:
+            self._entries[result.endpoint] = (params_fingerprint, result)
+
+    def save(self) -> None:
+        """Сохраняет непросроченные записи (атомарная замена файла)."""
+        if not self.path:
+            return
+        now = time.time()
+        with self._lock:
+            entries = {name: {"fingerprint": key, "result": result.to_dict()}
+                       for name, (key, result) in self._entries.items() if now - result.checked_at <= self.ttl}
+        directory = os.path.dirname(os.path.abspath(self.path))
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".probe-", suffix=".json")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"version": CACHE_VERSION, "entries": entries}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning("ProbeCache: кэш %s не сохранён: %s", self.path, e)
+
+
+def plan_probes(endpoints: Dict[str, Dict[str, Any]], connectors: Dict[str, Any],
+                cache: Optional[ProbeCache] = None, refresh: bool = False
+                ) -> Tuple[List[ProbeResult], Dict[str, Tuple[Any, Dict[str, Any], str]]]:
+    """
+    Делит эндпоинты на уже проверенные и те, что нужно проверить.
+
+    :param endpoints: Записи эндпоинтов по именам (например, результат `select_endpoints`).
+    :param connectors: Коннекторы по типам (`ConnectorRegistry.load()`).
+    :param refresh: Не использовать кэш.
+    :return: `(результаты из кэша и ошибки конфигурации, {имя: (коннектор, параметры, тип)})`.
+    """
+    ready: List[ProbeResult] = []
+    targets: Dict[str, Tuple[Any, Dict[str, Any], str]] = {}
+    for name, data in endpoints.items():
+        endpoint_type = data.get("type") or "ssh"
+        connector = connectors.get(endpoint_type)
+        if connector is None:
+            ready.append(ProbeResult(endpoint=name, type=endpoint_type, checked_at=time.time(),
+                                     error=f"Неизвестный тип соединения: {endpoint_type}"))
+            continue
+        params = connector.build_params(data)
+        cached = None if refresh or cache is None else cache.get(name, fingerprint(params))
+        if cached is not None:
+            ready.append(cached)
+        else:
+            targets[name] = (connector, params, endpoint_type)
+    return ready, targets
+
+
+def sort_results(results: Iterable[ProbeResult], key: str = "total", reverse: bool = False) -> List[ProbeResult]:
+    """
+    Сортирует результаты по имени, статусу, общему времени или фазе.
+    Хосты без замера фазы (не дошедшие до неё) идут в конце.
+    """
+    if key not in SORT_KEYS:
+        raise ValueError(f"Неизвестный ключ сортировки: {key}")
+    if key in ("endpoint", "status"):
+        return sorted(results, key=lambda result: getattr(result, key), reverse=reverse)
+    measured, missing = [], []
+    for result in results:
+        value = result.total if key == "total" else result.timings.get(key)
+        (missing if value is None else measured).append((value, result))
+    measured.sort(key=lambda item: item[0], reverse=reverse)
+    return [result for _, result in measured] + [result for _, result in missing]
+
+
+def export_results(results: Iterable[ProbeResult], path: str) -> int:
+    """
+    Выгружает результаты в CSV (по умолчанию) или JSONL (расширение `.jsonl`/`.json`).
+
+    :return: Количество записанных результатов.
+    """
+    count = 0
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        if path.endswith((".jsonl", ".json")):
+            for result in results:
+                f.write(json.dumps(dict(result.to_dict(), total=result.total), ensure_ascii=False) + "\n")
+                count += 1
+            return count
+        writer = csv.writer(f)
+        writer.writerow(["endpoint", "type", "status", "total"] + list(PHASES) + ["checked_at", "error"])
+        for result in results:
+            writer.writerow([result.endpoint, result.type, result.status, f"{result.total:.4f}"]
+                            + [f"{result.timings[phase]:.4f}" if phase in result.timings else ""
+                               for phase in PHASES]
+                            + [f"{result.checked_at:.0f}", result.error])
+            count += 1
+    return count
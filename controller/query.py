@@ -0,0 +1,229 @@
+"""
+Параллельное выполнение SQL-запроса на нескольких SQL-эндпоинтах.
+
+Шарды одной базы хранятся отдельными эндпоинтами PostgreSQL/SQLite.
+`SqlFanOut` выполняет один запрос на всех выбранных эндпоинтах
+одновременно (`stream_query` коннектора, отдельный поток на шард) и
+отдаёт строки с именем эндпоинта в первом столбце, поэтому запрос по
+всем шардам длится столько, сколько самый медленный шард.
+
+Каждый шард передаёт пачки строк через очередь ограниченной длины:
+если потребитель не успевает, чтение с сервера приостанавливается, и
+память ограничена `queue_batches` пачками на шард при любом размере
+результата.
+
+С `order_by` результаты шардов сливаются k-путевым слиянием
+(`heapq.merge`) по указанным столбцам — запрос на каждом шарде должен
+сам сортировать строки по тем же столбцам. Без `order_by` строки
+отдаются в порядке поступления.
+
+`SqlFanOut` повторяет интерфейс `connectors.sql.RowStream` (`columns`,
+итерация пачками, `rows`, `close`), поэтому результат пишется в файл
+той же `write_rows`.
+"""
+
+import heapq
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from connectors.sql import DEFAULT_ITERSIZE
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SQL_CONCURRENCY = 16
+# Сколько непрочитанных пачек может накопиться в очереди одного шарда
+DEFAULT_QUEUE_BATCHES = 4
+ENDPOINT_COLUMN = "endpoint"
+_PUT_TIMEOUT = 0.1
+
+
+@dataclass
+class ShardResult:
+    """
+    Итог выполнения запроса на одном эндпоинте.
+
+    :param endpoint: Имя эндпоинта.
+    :param rows: Сколько строк получено.
+    :param error: Текст ошибки (пусто при успехе).
+    :param elapsed: Длительность в секундах.
+    """
+
+    endpoint: str
+    rows: int = 0
+    error: str = ""
+    elapsed: float = 0.0
+
+    @property
+    def success(self) -> bool:
+        return not self.error
+
+
+class SqlFanOut:
+    """
+    Запрос, выполняемый на нескольких эндпоинтах; читается пачками строк
+    вида `(эндпоинт, *значения)`.
+
+    Потоки шардов запускаются при создании. Итоги по шардам — в `results`
+    (окончательные после исчерпания итерации). Ошибка шарда не прерывает
+    остальные: она записывается в его `ShardResult`.
+    """
+
+    def __init__(self, targets: Dict[str, Tuple[Any, Dict[str, Any]]], sql: str,
+                 args: Optional[Sequence[Any]] = None, concurrency: int = DEFAULT_SQL_CONCURRENCY,
+                 itersize: Optional[int] = None, order_by: Optional[Sequence[str]] = None,
+                 descending: bool = False, queue_batches: int = DEFAULT_QUEUE_BATCHES) -> None:
+        """
+        :param targets: `{имя эндпоинта: (коннектор, параметры)}`; коннектор
+                        должен поддерживать `stream_query`.
+        :param concurrency: Максимум одновременно выполняемых запросов. При
+                            слиянии все шарды читаются одновременно (слиянию
+                            нужна первая строка каждого), и лимит не действует.
+        :param itersize: Размер пачки чтения с сервера.
+        :param order_by: Столбцы ключа слияния.
+        :param descending: Шарды отсортированы по убыванию ключа.
+        :param queue_batches: Длина очереди пачек одного шарда.
+        """
+        self.sql = sql
+        self.order_by = list(order_by or [])
+        self.descending = descending
+        self.batch_size = int(itersize or DEFAULT_ITERSIZE)
+        self.results: Dict[str, ShardResult] = {name: ShardResult(name) for name in targets}
+        self.rows = 0
+        self.started = time.monotonic()
+        self._columns: Optional[List[str]] = None
+        self._columns_ready = threading.Event()
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+        self._pending = len(targets)
+        if self.order_by:
+            workers = max(1, len(targets))
+            self._queues = {name: queue.Queue(maxsize=max(1, queue_batches)) for name in targets}
+        else:
+            workers = max(1, min(int(concurrency or 1), len(targets) or 1))
+            shared = queue.Queue(maxsize=max(1, queue_batches) * workers)
+            self._queues = {name: shared for name in targets}
+        if not targets:
+            self._columns_ready.set()
+        logger.info("SqlFanOut(endpoints=%s, workers=%s, order_by=%s)", len(targets), workers, self.order_by)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sql-fanout")
+        for name, (connector, params) in targets.items():
+            self._executor.submit(self._produce, name, connector, params, args)
+        self._executor.shutdown(wait=False)
+
+    @property
+    def columns(self) -> List[str]:
+        """
+        Столбцы результата: `endpoint` и столбцы запроса. Ждёт, пока первый
+        шард получит описание результата (или все шарды завершатся).
+        """
+        self._columns_ready.wait()
+        return [ENDPOINT_COLUMN] + list(self._columns or [])
+
+    def _put(self, target: queue.Queue, item: Any) -> bool:
+        while not self._cancelled.is_set():
+            try:
+                target.put(item, timeout=_PUT_TIMEOUT)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self, name: str, connector: Any, params: Dict[str, Any], args: Optional[Sequence[Any]]) -> None:
+        result = self.results[name]
+        target = self._queues[name]
+        started = time.monotonic()
+        try:
+            if self._cancelled.is_set():
+                return
+            with connector.stream_query(params, self.sql, args, itersize=self.batch_size) as stream:
+                columns = stream.columns
+                with self._lock:
+                    if self._columns is None:
+                        self._columns = columns
+                        self._columns_ready.set()
+                if columns != self._columns:
+                    raise ValueError(f"Столбцы результата {columns} отличаются от {self._columns}")
+                for batch in stream:
+                    result.rows += len(batch)
+                    if not self._put(target, (name, batch)):
+                        return
+        except Exception as e:
+            result.error = str(e) or type(e).__name__
+            logger.warning("SqlFanOut: эндпоинт '%s': %s", name, result.error)
+        finally:
+            result.elapsed = time.monotonic() - started
+            with self._lock:
+                self._pending -= 1
+                if not self._pending:
+                    self._columns_ready.set()
+            self._put(target, (name, None))
+
+    def _shard_rows(self, name: str) -> Iterator[Tuple[Any, ...]]:
+        source = self._queues[name]
+        while True:
+            _, batch = source.get()
+            if batch is None:
+                return
+            for row in batch:
+                yield (name,) + tuple(row)
+
+    def _merge_key(self):
+        columns = self._columns or []
+        missing = [column for column in self.order_by if column not in columns]
+        if missing:
+            raise ValueError(f"Нет столбцов для слияния: {', '.join(missing)}")
+        indexes = [columns.index(column) + 1 for column in self.order_by]
+        # NULL идут после значений (при убывании — перед ними), как в PostgreSQL по умолчанию
+        return lambda row: tuple((row[index] is None, row[index]) for index in indexes)
+
+    def __iter__(self) -> Iterator[List[Tuple[Any, ...]]]:
+        try:
+            if self.order_by:
+                self._columns_ready.wait()
+                if self._columns is None:
+                    return
+                merged = heapq.merge(*(self._shard_rows(name) for name in self.results),
+                                     key=self._merge_key(), reverse=self.descending)
+                batch: List[Tuple[Any, ...]] = []
+                for row in merged:
+                    batch.append(row)
+                    if len(batch) >= self.batch_size:
+                        self.rows += len(batch)
+                        yield batch
+                        batch = []
+                if batch:
+                    self.rows += len(batch)
+                    yield batch
+                return
+            source = next(iter(self._queues.values()), None)
+            finished = 0
+            while source is not None and finished < len(self.results):
+                name, batch = source.get()
+                if batch is None:
+                    finished += 1
+                    continue
+                self.rows += len(batch)
+                yield [(name,) + tuple(row) for row in batch]
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """Останавливает чтение шардов; незавершённые запросы прерываются."""
+        self._cancelled.set()
+        self._columns_ready.set()
+
+    def __enter__(self) -> "SqlFanOut":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    @property
+    def failed(self) -> List[ShardResult]:
+        """Шарды, завершившиеся ошибкой."""
+        return [result for result in self.results.values() if not result.success]
@@ -0,0 +1,157 @@
+"""
+Модуль подготовки запусков скриптов без привязки к UI.
+
+Содержит формирование команды (`build_command`), отбор эндпоинтов для
+fan-out режима (`select_endpoints` по колоночной таблице эндпоинтов
+хранилища `endpoint_table`) и результаты запусков: по одному хосту
+(`HostResult`) и сводный отчёт fan-out запуска (`FanOutReport`).
+Сами запуски выполняет `controller.engine.ExecutionEngine`.
+"""
+
+import fnmatch
+import threading
+import weakref
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from interpreters.bash import BashInterpreter
+from interpreters.python import PythonInterpreter
+from model.record import EndpointTable
+
+DEFAULT_CONCURRENCY = 20
+# Таблицы эндпоинтов по хранилищам: (ревизия хранилища, таблица)
+_TABLES: "weakref.WeakKeyDictionary[Any, Any]" = weakref.WeakKeyDictionary()
+_TABLES_LOCK = threading.Lock()
+
+# Фазы запуска: подключение (TCP + рукопожатие), аутентификация,
+# открытие канала и запуск команды, чтение вывода до кода завершения
+PHASES = ("connect", "auth", "exec", "drain")
+
+
+@dataclass
+class HostResult:
+    """
+    Результат выполнения скрипта на одном эндпоинте.
+    """
+
+    endpoint: str
+    success: bool = False
+    output: str = ""
+    error: str = ""
+    duration: float = 0.0
+    exit_code: Optional[int] = None
+    bytes_out: int = 0
+    bytes_err: int = 0
+    started_at: float = 0.0
+    timings: Dict[str, float] = field(default_factory=dict)
+    # Причина принудительной остановки: "cancelled", "wall_timeout", "idle_timeout"
+    stopped: str = ""
+
+
+@dataclass
+class FanOutReport:
+    """
+    Сводный отчёт fan-out запуска скрипта по нескольким эндпоинтам.
+    """
+
+    script: str
+    results: List[HostResult] = field(default_factory=list)
+    duration: float = 0.0
+
+    @property
+    def succeeded(self) -> List[HostResult]:
+        """Хосты, на которых скрипт отработал без ошибок."""
+        return [result for result in self.results if result.success]
+
+    @property
+    def failed(self) -> List[HostResult]:
+        """Хосты, на которых выполнение завершилось ошибкой."""
+        return [result for result in self.results if not result.success]
+
+    def summary(self) -> str:
+        """Короткая строка с итогами запуска."""
+        return (f"Скрипт '{self.script}': {len(self.succeeded)} успешно, "
+                f"{len(self.failed)} с ошибкой, всего {len(self.results)} "
+                f"за {self.duration:.2f} с")
+
+    def to_text(self) -> str:
+        """Полный текстовый отчёт с выводом по каждому хосту."""
+        parts = [self.summary(), ""]
+        for result in sorted(self.results, key=lambda r: r.endpoint):
+            status = "OK" if result.success else (result.stopped.upper() or "FAIL")
+            parts.append(f"=== {result.endpoint} [{status}] {result.duration:.2f} с")
+            if result.output:
+                parts.append(result.output.rstrip("\n"))
+            if result.error:
+                parts.append(f"[Ошибка] {result.error.rstrip()}")
+            parts.append("")
+        return "\n".join(parts)
+
+
+def default_interpreters() -> Dict[str, Any]:
+    """Интерпретаторы скриптов по их именам в записи `Script.interpreter`."""
+    return {
+        "python": PythonInterpreter(),
+        "bash": BashInterpreter(),
+    }
+
+
+def build_command(interpreters: Dict[str, Any], interpreter_name: str,
+                  code: str, options: Dict[str, Any]) -> str:
+    """
+    Формирует команду для удалённого выполнения через интерпретатор скрипта.
+    Если интерпретатор неизвестен, код выполняется как есть.
+    """
+    interpreter = interpreters.get(interpreter_name)
+    if interpreter:
+        return interpreter.format_command(code, options)
+    return code
+
+
+def endpoint_table(storage: Any) -> EndpointTable:
+    """
+    Колоночная таблица эндпоинтов хранилища для отбора по всему парку.
+
+    Таблица строится один раз и переиспользуется, пока не изменится
+    `storage.revision` (сохранение `FileStorage`, запись строки
+    `SqliteStorage`): повторные fan-out запуски, проверки и расписания не
+    обходят словари всех эндпоинтов. Хранилище без `revision` получает
+    новую таблицу при каждом вызове.
+    """
+    revision = getattr(storage, "revision", None)
+    if not isinstance(revision, int):
+        return EndpointTable.from_dicts(storage.endpoints)
+    with _TABLES_LOCK:
+        cached = _TABLES.get(storage)
+    if cached is not None and cached[0] == revision:
+        return cached[1]
+    table = EndpointTable.from_dicts(storage.endpoints)
+    with _TABLES_LOCK:
+        _TABLES[storage] = (revision, table)
+    return table
+
+
+def select_endpoints(endpoints: Union[Dict[str, Dict[str, Any]], EndpointTable],
+                     names: Optional[Iterable[str]] = None,
+                     group: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Отбирает эндпоинты для fan-out запуска.
+
+    :param endpoints: Словарь эндпоинтов из хранилища (`FileStorage.endpoints`)
+                      или колоночная таблица `EndpointTable`: в ней отбор идёт
+                      по столбцам, а словари собираются только для отобранных.
+    :param names: Имена или glob-шаблоны имён (например, `web-*`).
+    :param group: Значение поля `group` у эндпоинта.
+    :return: Отобранные эндпоинты в порядке хранилища.
+    """
+    if isinstance(endpoints, EndpointTable):
+        return {endpoints.names[row]: endpoints.row(row) for row in endpoints.select(names, group)}
+    patterns = [name for name in (names or []) if name]
+    selected = {}
+    for name, data in endpoints.items():
+        if patterns and not any(fnmatch.fnmatchcase(name, pattern) for pattern in patterns):
+            continue
+        if group and data.get("group") != group:
+            continue
+        selected[name] = data
+    return selected
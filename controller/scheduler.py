@@ -0,0 +1,709 @@
+"""
+Очередь заданий и планировщик запусков.
+
+Задание (`Job`) — запуск сохранённого скрипта на списке эндпоинтов.
+`Scheduler` не отдаёт задание движку целиком, а выдаёт ему хосты по
+одному, соблюдая лимиты: общее число одновременно выполняемых хостов
+(`max_running`), число запусков на один адрес (`per_host` — чтобы не
+перегружать jump-хосты и сами машины) и собственный лимит задания.
+
+Выбор следующего хоста — справедливый (stride scheduling): у каждого
+активного задания есть «проход», который после выдачи хоста растёт на
+`1 / priority`, и следующим обслуживается задание с наименьшим проходом.
+Поэтому большой fan-out не вытесняет интерактивный запуск на один хост:
+тот получает слот сразу, а задания с большим приоритетом получают
+пропорционально больше слотов.
+
+Задания и расписания в формате cron (`Schedule`, см. `controller.cron`)
+хранятся в SQLite (`JobStore`): после перезапуска незавершённые задания
+продолжаются с невыполненных хостов, а задания, добавленные другим
+процессом (`cli.py enqueue`), подхватываются на следующем такте.
+
+События выполнения публикуются в очередь движка так же, как у fan-out
+запуска: по хостам — с ключами `"<job.key>:<эндпоинт>"`, по заданию —
+`"result"` на каждый хост и итоговый `"report"` с ключом `job.key`.
+"""
+
+import heapq
+import itertools
+import json
+import logging
+import sqlite3
+import statistics
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+from controller.cancel import CANCELLED, STOP_MESSAGES, run_limits
+from controller.cron import CronError, CronSchedule
+from controller.delivery import delivery_settings, prepare_command
+from controller.engine import RunEvent
+from controller.runner import (FanOutReport, HostResult, default_interpreters, endpoint_table,
+                               select_endpoints)
+from model.script import Script
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = "jobs.db"
+DEFAULT_MAX_RUNNING = 20
+DEFAULT_PER_HOST = 2
+DEFAULT_MAX_QUEUED = 1000
+# Как часто проверяются расписания и новые задания в базе (в секундах)
+DEFAULT_TICK = 30.0
+# Сколько завершённых заданий хранится в базе
+KEEP_FINISHED = 1000
+# По скольким последним выдачам хостов считается статистика ожидания
+WAIT_SAMPLES = 1000
+
+# Приоритет — вес задания в справедливой выдаче слотов
+PRIORITY_BACKGROUND = 1
+PRIORITY_NORMAL = 4
+PRIORITY_INTERACTIVE = 16
+PRIORITIES = {"background": PRIORITY_BACKGROUND, "normal": PRIORITY_NORMAL,
+              "interactive": PRIORITY_INTERACTIVE}
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+JOB_CANCELLED = "cancelled"
+ACTIVE_STATES = (QUEUED, RUNNING)
+
+SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        script TEXT NOT NULL,
+        endpoints TEXT NOT NULL,
+        done TEXT NOT NULL DEFAULT '[]',
+        priority INTEGER NOT NULL,
+        max_running INTEGER NOT NULL DEFAULT 0,
+        source TEXT,
+        schedule_id INTEGER,
+        state TEXT NOT NULL,
+        enqueued_at REAL NOT NULL,
+        started_at REAL,
+        finished_at REAL,
+        succeeded INTEGER NOT NULL DEFAULT 0,
+        failed INTEGER NOT NULL DEFAULT 0
+    )""",
+    "CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, id)",
+    """CREATE TABLE IF NOT EXISTS schedules (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL UNIQUE,
+        script TEXT NOT NULL,
+        cron TEXT NOT NULL,
+        endpoints TEXT NOT NULL,
+        group_name TEXT,
+        priority INTEGER NOT NULL,
+        enabled INTEGER NOT NULL DEFAULT 1,
+        last_run REAL,
+        next_run REAL
+    )""",
+)
+
+
+class QueueFull(RuntimeError):
+    """В очереди уже `max_queued` незавершённых заданий."""
+
+
+@dataclass
+class Job:
+    """
+    Задание: запуск скрипта на списке эндпоинтов.
+
+    :param script: Имя скрипта в хранилище.
+    :param endpoints: Имена эндпоинтов.
+    :param priority: Вес в справедливой выдаче слотов (`PRIORITIES`).
+    :param max_running: Лимит одновременно выполняемых хостов задания (0 — без лимита).
+    :param source: Откуда пришло задание: `"manual"`, `"schedule"`, `"cli"`.
+    :param schedule_id: Расписание, создавшее задание.
+    :param done: Эндпоинты, на которых запуск уже завершён.
+    :param transient: Задание живёт только в памяти (например, привязано к окну UI).
+    """
+
+    script: str
+    endpoints: List[str]
+    priority: int = PRIORITY_NORMAL
+    max_running: int = 0
+    source: str = "manual"
+    schedule_id: Optional[int] = None
+    id: Optional[int] = None
+    state: str = QUEUED
+    enqueued_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    done: List[str] = field(default_factory=list)
+    succeeded: int = 0
+    failed: int = 0
+    transient: bool = False
+    # Состояние выполнения, в базе не хранится
+    pending: Deque[str] = field(default_factory=deque, repr=False, compare=False)
+    running: int = field(default=0, repr=False, compare=False)
+    sink: Any = field(default=None, repr=False, compare=False)
+    limits: Any = field(default=None, repr=False, compare=False)
+    command: Any = field(default=None, repr=False, compare=False)
+    report: Optional[FanOutReport] = field(default=None, repr=False, compare=False)
+    stride_pass: float = field(default=0.0, repr=False, compare=False)
+    # Ключ лимита per_host (адрес) каждого эндпоинта; вычисляется один раз при постановке в очередь
+    host_keys: Dict[str, str] = field(default_factory=dict, repr=False, compare=False)
+
+    @property
+    def key(self) -> str:
+        """Ключ событий задания в очереди движка."""
+        return f"job-{self.id}" if not self.transient else f"job-local{-self.id}"
+
+    @property
+    def finished(self) -> bool:
+        """Все хосты задания обработаны."""
+        return not self.pending and not self.running
+
+
+@dataclass
+class Schedule:
+    """
+    Периодический запуск скрипта по расписанию cron.
+
+    :param endpoints: Имена или glob-шаблоны эндпоинтов (разрешаются при каждом срабатывании).
+    :param group: Группа эндпоинтов.
+    """
+
+    name: str
+    script: str
+    cron: str
+    endpoints: List[str] = field(default_factory=list)
+    group: Optional[str] = None
+    priority: int = PRIORITY_BACKGROUND
+    enabled: bool = True
+    id: Optional[int] = None
+    last_run: Optional[float] = None
+    next_run: Optional[float] = None
+
+    def advance(self, now: float) -> None:
+        """Вычисляет следующее срабатывание после `now`."""
+        following = CronSchedule(self.cron).next_after(datetime.fromtimestamp(now))
+        self.next_run = following.timestamp()
+
+
+class JobStore:
+    """
+    Хранилище заданий и расписаний в SQLite.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        for statement in SCHEMA:
+            self.connection.execute(statement)
+
+    def _execute(self, sql: str, params: Tuple[Any, ...] = ()) -> sqlite3.Cursor:
+        with self._lock:
+            return self.connection.execute(sql, params)
+
+    def save_job(self, job: Job) -> None:
+        """Добавляет задание (присваивая `id`) или сохраняет его состояние."""
+        values = (job.script, json.dumps(job.endpoints), json.dumps(job.done), job.priority,
+                  job.max_running, job.source, job.schedule_id, job.state, job.enqueued_at,
+                  job.started_at, job.finished_at, job.succeeded, job.failed)
+        if job.id is None:
+            cursor = self._execute(
+                "INSERT INTO jobs (script, endpoints, done, priority, max_running, source, schedule_id, "
+                "state, enqueued_at, started_at, finished_at, succeeded, failed) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", values)
+            job.id = cursor.lastrowid
+        else:
+            self._execute(
+                "UPDATE jobs SET script = ?, endpoints = ?, done = ?, priority = ?, max_running = ?, "
+                "source = ?, schedule_id = ?, state = ?, enqueued_at = ?, started_at = ?, "
+                "finished_at = ?, succeeded = ?, failed = ? WHERE id = ?", values + (job.id,))
+
+    def jobs(self, states: Optional[Iterable[str]] = None, after_id: int = 0, limit: int = 100) -> List[Job]:
+        """Задания в порядке постановки в очередь."""
+        sql = ("SELECT id, script, endpoints, done, priority, max_running, source, schedule_id, state, "
+               "enqueued_at, started_at, finished_at, succeeded, failed FROM jobs WHERE id > ?")
+        params: Tuple[Any, ...] = (after_id,)
+        states = list(states or [])
+        if states:
+            sql += f" AND state IN ({', '.join('?' for _ in states)})"
+            params += tuple(states)
+        rows = self._execute(sql + " ORDER BY id LIMIT ?", params + (limit,)).fetchall()
+        return [Job(id=row[0], script=row[1], endpoints=json.loads(row[2]), done=json.loads(row[3]),
+                    priority=row[4], max_running=row[5], source=row[6] or "", schedule_id=row[7],
+                    state=row[8], enqueued_at=row[9], started_at=row[10], finished_at=row[11],
+                    succeeded=row[12], failed=row[13])
+                for row in rows]
+
+    def prune(self, keep: int = KEEP_FINISHED) -> None:
+        """Удаляет старые завершённые задания, оставляя `keep` последних."""
+        self._execute(
+            "DELETE FROM jobs WHERE state NOT IN (?, ?) AND id NOT IN "
+            "(SELECT id FROM jobs WHERE state NOT IN (?, ?) ORDER BY id DESC LIMIT ?)",
+            ACTIVE_STATES + ACTIVE_STATES + (keep,))
+
+    def save_schedule(self, schedule: Schedule) -> None:
+        """Добавляет или обновляет расписание."""
+        values = (schedule.name, schedule.script, schedule.cron, json.dumps(schedule.endpoints),
+                  schedule.group, schedule.priority, int(schedule.enabled), schedule.last_run,
+                  schedule.next_run)
+        if schedule.id is None:
+            cursor = self._execute(
+                "INSERT INTO schedules (name, script, cron, endpoints, group_name, priority, enabled, "
+                "last_run, next_run) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", values)
+            schedule.id = cursor.lastrowid
+        else:
+            self._execute(
+                "UPDATE schedules SET name = ?, script = ?, cron = ?, endpoints = ?, group_name = ?, "
+                "priority = ?, enabled = ?, last_run = ?, next_run = ? WHERE id = ?", values + (schedule.id,))
+
+    def delete_schedule(self, name: str) -> bool:
+        """Удаляет расписание по имени; `False`, если его нет."""
+        return self._execute("DELETE FROM schedules WHERE name = ?", (name,)).rowcount > 0
+
+    def schedules(self) -> List[Schedule]:
+        """Все расписания."""
+        rows = self._execute(
+            "SELECT id, name, script, cron, endpoints, group_name, priority, enabled, last_run, next_run "
+            "FROM schedules ORDER BY name").fetchall()
+        return [Schedule(id=row[0], name=row[1], script=row[2], cron=row[3], endpoints=json.loads(row[4]),
+                         group=row[5], priority=row[6], enabled=bool(row[7]), last_run=row[8], next_run=row[9])
+                for row in rows]
+
+    def close(self) -> None:
+        """Закрывает базу."""
+        with self._lock:
+            self.connection.close()
+
+
+def scheduler_settings(config: Optional[Any]) -> Dict[str, Any]:
+    """Параметры планировщика из секции [Scheduler]."""
+    settings = {"max_running": DEFAULT_MAX_RUNNING, "per_host": DEFAULT_PER_HOST,
+                "max_queued": DEFAULT_MAX_QUEUED, "tick": DEFAULT_TICK}
+    if config is None or not config.has_section("Scheduler"):
+        return settings
+    for key, getter in (("max_running", config.getint), ("per_host", config.getint),
+                        ("max_queued", config.getint), ("tick", config.getfloat)):
+        try:
+            settings[key] = getter("Scheduler", key, fallback=settings[key])
+        except ValueError:
+            logger.warning("scheduler_settings(): неверное значение %s", key)
+    return settings
+
+
+class Scheduler:
+    """
+    Очередь заданий с лимитами, приоритетами, справедливой выдачей и расписаниями.
+    """
+
+    def __init__(self, engine: Any, storage: Any, store: Optional[JobStore] = None,
+                 config: Optional[Any] = None, run_schedules: bool = True,
+                 max_running: Optional[int] = None, per_host: Optional[int] = None,
+                 max_queued: Optional[int] = None, tick: Optional[float] = None) -> None:
+        """
+        :param engine: Движок выполнения (`ExecutionEngine`).
+        :param storage: Хранилище скриптов и эндпоинтов.
+        :param store: База заданий; `None` — очередь только в памяти.
+        :param config: Настройки ([Scheduler], а также [Execution] для доставки и таймаутов).
+        :param run_schedules: Запускать ли задания по расписаниям из базы.
+        """
+        settings = scheduler_settings(config)
+        self.engine = engine
+        self.storage = storage
+        self.store = store
+        self.config = config
+        self.run_schedules = run_schedules and store is not None
+        self.max_running = max(1, max_running or settings["max_running"])
+        self.per_host = max(1, per_host or settings["per_host"])
+        self.max_queued = max(1, max_queued or settings["max_queued"])
+        self.tick_interval = tick or settings["tick"]
+        self.delivery = delivery_settings(config)
+        self.interpreters = default_interpreters()
+        self.jobs: Dict[str, Job] = {}
+        self._running = 0
+        self._host_running: Dict[str, int] = {}
+        self._virtual_pass = 0.0
+        self._local_ids = itertools.count(1)
+        self._last_loaded = 0
+        # Завершённые хосты: (задание, эндпоинт, результат, результат создан без движка)
+        self._completions: Deque[Tuple[Job, str, HostResult, bool]] = deque()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self._woken = False
+        self._waits: Deque[float] = deque(maxlen=WAIT_SAMPLES)
+        self.counters = {"submitted": 0, "rejected": 0, "dispatched": 0, "completed": 0,
+                         "schedule_runs": 0, "schedule_overlaps": 0}
+
+    # --- Жизненный цикл ---
+
+    def start(self) -> None:
+        """Восстанавливает незавершённые задания и запускает поток планировщика."""
+        if self._thread is not None:
+            return
+        if self.store is not None:
+            self.store.prune()
+            with self._cond:
+                self._load_jobs(resume=True)
+        self._stopping = False
+        self._thread = threading.Thread(target=self._loop, name="scheduler", daemon=True)
+        self._thread.start()
+        logger.info("Scheduler.start(max_running=%s, per_host=%s)", self.max_running, self.per_host)
+
+    def stop(self) -> None:
+        """Останавливает поток; задания в базе продолжатся при следующем запуске."""
+        with self._cond:
+            self._stopping = True
+            self._wake()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        logger.info("Scheduler.stop()")
+
+    # --- Задания ---
+
+    def submit(self, script: str, endpoints: Iterable[str], priority: int = PRIORITY_NORMAL,
+               max_running: int = 0, source: str = "manual", sink: Optional[Any] = None,
+               limits: Optional[Any] = None, persist: bool = True,
+               schedule_id: Optional[int] = None) -> Job:
+        """
+        Ставит задание в очередь.
+
+        :param sink: Приёмник вывода хостов (как в `ExecutionEngine.submit`).
+        :param limits: Ограничения времени; по умолчанию — из настроек и опций скрипта.
+        :param persist: Сохранять задание в базе (если она есть).
+        :raises QueueFull: Если незавершённых заданий уже `max_queued`.
+        """
+        job = Job(script=script, endpoints=list(dict.fromkeys(endpoints)), priority=max(1, int(priority)),
+                  max_running=max(0, int(max_running)), source=source, schedule_id=schedule_id,
+                  transient=not persist or self.store is None)
+        job.sink, job.limits = sink, limits
+        with self._cond:
+            if len(self.jobs) >= self.max_queued:
+                self.counters["rejected"] += 1
+                raise QueueFull(f"В очереди уже {len(self.jobs)} заданий")
+            if job.transient:
+                job.id = -next(self._local_ids)
+            else:
+                self.store.save_job(job)
+            self._activate(job)
+            self.counters["submitted"] += 1
+            self._wake()
+        logger.info("Scheduler.submit(%s, script=%s, hosts=%s, priority=%s)",
+                    job.key, script, len(job.endpoints), job.priority)
+        return job
+
+    def cancel(self, key: str) -> bool:
+        """
+        Отменяет задание по ключу (`job.key`): ожидающие хосты снимаются
+        с очереди, выполняющиеся — останавливаются движком.
+        """
+        with self._cond:
+            job = self.jobs.get(key)
+            if job is None:
+                return False
+            skipped = list(job.pending)
+            job.pending.clear()
+            job.state = JOB_CANCELLED
+            for endpoint in skipped:
+                self._completions.append((job, endpoint, HostResult(
+                    endpoint=endpoint, started_at=time.time(), stopped=CANCELLED,
+                    error=STOP_MESSAGES[CANCELLED]), True))
+            self._wake()
+        self.engine.cancel(key)
+        return True
+
+    def queued(self) -> List[Job]:
+        """Незавершённые задания в порядке постановки."""
+        with self._cond:
+            return sorted(self.jobs.values(), key=lambda job: job.enqueued_at)
+
+    # --- Расписания ---
+
+    def add_schedule(self, schedule: Schedule) -> Tuple[bool, str]:
+        """Сохраняет расписание; возвращает `(успех, сообщение)`."""
+        if self.store is None:
+            return False, "Расписания требуют базы заданий"
+        if schedule.script not in self.storage.scripts:
+            return False, f"Скрипт '{schedule.script}' не найден"
+        try:
+            schedule.advance(time.time())
+        except CronError as e:
+            return False, str(e)
+        try:
+            self.store.save_schedule(schedule)
+        except sqlite3.IntegrityError:
+            return False, f"Расписание '{schedule.name}' уже существует"
+        with self._cond:
+            self._wake()
+        return True, f"Расписание '{schedule.name}': следующий запуск {datetime.fromtimestamp(schedule.next_run)}"
+
+    def remove_schedule(self, name: str) -> Tuple[bool, str]:
+        """Удаляет расписание; возвращает `(успех, сообщение)`."""
+        if self.store is None or not self.store.delete_schedule(name):
+            return False, f"Расписание '{name}' не найдено"
+        return True, f"Расписание '{name}' удалено"
+
+    def tick(self, now: Optional[float] = None) -> List[Job]:
+        """
+        Ставит в очередь задания по наступившим расписаниям и задания,
+        добавленные в базу другим процессом. Возвращает новые задания.
+        """
+        if self.store is None:
+            return []
+        now = time.time() if now is None else now
+        created = []
+        with self._cond:
+            created.extend(self._load_jobs())
+        if not self.run_schedules:
+            return created
+        for schedule in self.store.schedules():
+            if not schedule.enabled or schedule.next_run is None or schedule.next_run > now:
+                continue
+            job = self._fire(schedule, now)
+            if job is not None:
+                created.append(job)
+        return created
+
+    def _fire(self, schedule: Schedule, now: float) -> Optional[Job]:
+        job = None
+        with self._cond:
+            overlap = any(active.schedule_id == schedule.id for active in self.jobs.values())
+        if overlap:
+            # Предыдущий запуск ещё идёт: копить очередь из одних и тех же проверок нельзя.
+            self.counters["schedule_overlaps"] += 1
+            logger.warning("Scheduler: расписание '%s' пропущено — предыдущий запуск не завершён", schedule.name)
+        else:
+            endpoints = list(select_endpoints(endpoint_table(self.storage), names=schedule.endpoints,
+                                              group=schedule.group))
+            if schedule.script in self.storage.scripts and endpoints:
+                try:
+                    job = self.submit(schedule.script, endpoints, priority=schedule.priority,
+                                      source="schedule", schedule_id=schedule.id)
+                    self.counters["schedule_runs"] += 1
+                except QueueFull as e:
+                    logger.warning("Scheduler: расписание '%s' пропущено: %s", schedule.name, e)
+            else:
+                logger.warning("Scheduler: расписание '%s': нет скрипта или эндпоинтов", schedule.name)
+        schedule.last_run = now
+        try:
+            schedule.advance(now)
+        except CronError as e:
+            logger.warning("Scheduler: расписание '%s' отключено: %s", schedule.name, e)
+            schedule.enabled = False
+        self.store.save_schedule(schedule)
+        return job
+
+    # --- Метрики ---
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Глубина очереди и время ожидания.
+
+        `wait` — статистика по последним `WAIT_SAMPLES` выдачам хостов:
+        сколько секунд хост ждал слота с момента постановки задания.
+        """
+        with self._cond:
+            waits = sorted(self._waits)
+            metrics: Dict[str, Any] = {
+                "queued_jobs": sum(1 for job in self.jobs.values() if job.state == QUEUED),
+                "running_jobs": sum(1 for job in self.jobs.values() if job.state == RUNNING),
+                "pending_hosts": sum(len(job.pending) for job in self.jobs.values()),
+                "running_hosts": self._running,
+                "max_running": self.max_running,
+            }
+            metrics.update(self.counters)
+        if waits:
+            metrics["wait"] = {"count": len(waits), "avg": statistics.fmean(waits),
+                               "p50": waits[len(waits) // 2],
+                               "p95": waits[min(len(waits) - 1, int(len(waits) * 0.95))],
+                               "max": waits[-1]}
+        else:
+            metrics["wait"] = {"count": 0, "avg": 0.0, "p50": 0.0, "p95": 0.0, "max": 0.0}
+        return metrics
+
+    def pump(self) -> None:
+        """Учитывает завершённые хосты и выдаёт движку новые (обычно вызывается потоком планировщика)."""
+        with self._cond:
+            self._complete()
+            self._dispatch()
+
+    # --- Внутреннее ---
+
+    def _load_jobs(self, resume: bool = False) -> List[Job]:
+        """Подхватывает из базы незавершённые задания, которых ещё нет в памяти."""
+        loaded = []
+        for job in self.store.jobs(states=ACTIVE_STATES, after_id=self._last_loaded, limit=self.max_queued):
+            self._last_loaded = max(self._last_loaded, job.id)
+            if job.key in self.jobs:
+                continue
+            if resume and job.state == RUNNING:
+                logger.info("Scheduler: задание %s продолжается после перезапуска", job.key)
+            job.state = QUEUED
+            self._activate(job)
+            self.counters["submitted"] += 1
+            loaded.append(job)
+        return loaded
+
+    def _activate(self, job: Job) -> None:
+        done = set(job.done)
+        job.pending = deque(endpoint for endpoint in job.endpoints if endpoint not in done)
+        job.host_keys = self._host_keys(job.pending)
+        job.report = FanOutReport(script=job.script)
+        # Новое задание встаёт в ряд с текущими, а не обгоняет их на весь накопленный проход.
+        job.stride_pass = self._virtual_pass
+        self.jobs[job.key] = job
+        if not job.pending:
+            self._finish(job)
+
+    def _host_keys(self, endpoints: Iterable[str]) -> Dict[str, str]:
+        """
+        Ключи лимита per_host (адрес, иначе имя) по одному столбцу таблицы
+        эндпоинтов: `_next_host` сканирует очередь задания на каждой выдаче
+        и не должен обращаться к хранилищу за каждым эндпоинтом.
+        """
+        table = endpoint_table(self.storage)
+        ips = table.column("ip")
+        keys = {}
+        for endpoint in endpoints:
+            ip = ips[table.index(endpoint)] if endpoint in table else None
+            keys[endpoint] = str(ip or endpoint)
+        return keys
+
+    def _next_host(self) -> Optional[Tuple[Job, str]]:
+        """Следующий хост по справедливой очереди с учётом лимитов."""
+        candidates = [(job.stride_pass, job.enqueued_at, job.key) for job in self.jobs.values()
+                      if job.pending and job.state != JOB_CANCELLED
+                      and (not job.max_running or job.running < job.max_running)]
+        heapq.heapify(candidates)
+        while candidates:
+            job = self.jobs[heapq.heappop(candidates)[2]]
+            for endpoint in job.pending:
+                if self._host_running.get(job.host_keys.get(endpoint, endpoint), 0) < self.per_host:
+                    job.pending.remove(endpoint)
+                    return job, endpoint
+        return None
+
+    def _dispatch(self) -> None:
+        while self._running < self.max_running:
+            chosen = self._next_host()
+            if chosen is None:
+                return
+            job, endpoint = chosen
+            self._virtual_pass = job.stride_pass
+            job.stride_pass += 1.0 / job.priority
+            if job.state == QUEUED:
+                job.state, job.started_at = RUNNING, time.time()
+                self._save(job)
+            self._waits.append(time.time() - job.enqueued_at)
+            self.counters["dispatched"] += 1
+            self._start_host(job, endpoint)
+
+    def _start_host(self, job: Job, endpoint: str) -> None:
+        data = self.storage.endpoints.get(endpoint)
+        script_data = self.storage.scripts.get(job.script)
+        error = None
+        if not script_data:
+            error = f"Скрипт '{job.script}' не найден"
+        elif not data:
+            error = f"Эндпоинт '{endpoint}' не найден"
+        elif (data.get("type") or "ssh") != "ssh":
+            error = f"Тип эндпоинта '{data.get('type')}' не поддерживается"
+        if error is not None:
+            result = HostResult(endpoint=endpoint, error=error, started_at=time.time())
+            self._completions.append((job, endpoint, result, True))
+            return
+        if job.command is None:
+            script = Script.from_dict(self.storage, script_data)
+            job.command = prepare_command(self.interpreters, script.interpreter, script.code,
+                                          script.options, **self.delivery)
+            if job.limits is None:
+                job.limits = run_limits(self.config, script.options)
+        host_key = job.host_keys.get(endpoint, endpoint)
+        job.running += 1
+        self._running += 1
+        self._host_running[host_key] = self._host_running.get(host_key, 0) + 1
+        handle = self.engine.submit(endpoint, self.engine.connector.build_params(data), job.command,
+                                    sink=job.sink, script=job.script, limits=job.limits,
+                                    run_id=f"{job.key}:{endpoint}")
+
+        def done(future) -> None:
+            try:
+                result = future.result()
+            except BaseException as e:
+                result = HostResult(endpoint=endpoint, error=str(e) or type(e).__name__)
+            with self._cond:
+                job.running -= 1
+                self._running -= 1
+                self._host_running[host_key] -= 1
+                self._completions.append((job, endpoint, result, False))
+                self._wake()
+
+        handle.future.add_done_callback(done)
+
+    def _complete(self) -> None:
+        while self._completions:
+            job, endpoint, result, local = self._completions.popleft()
+            job.done.append(endpoint)
+            job.report.results.append(result)
+            if result.success:
+                job.succeeded += 1
+            else:
+                job.failed += 1
+            self.counters["completed"] += 1
+            if local:
+                # Хост не дошёл до движка: его результат публикуется и по ключу хоста.
+                self.engine.events.put(RunEvent(f"{job.key}:{endpoint}", "result", result))
+            self.engine.events.put(RunEvent(job.key, "result", result))
+            if job.finished:
+                self._finish(job)
+            else:
+                self._save(job)
+
+    def _finish(self, job: Job) -> None:
+        if job.state != JOB_CANCELLED:
+            job.state = DONE
+        job.finished_at = time.time()
+        job.report.duration = job.finished_at - (job.started_at or job.enqueued_at)
+        self.jobs.pop(job.key, None)
+        self._save(job)
+        logger.info("Scheduler: задание %s завершено: %s", job.key, job.report.summary())
+        self.engine.events.put(RunEvent(job.key, "report", job.report))
+
+    def _save(self, job: Job) -> None:
+        if not job.transient and self.store is not None:
+            try:
+                self.store.save_job(job)
+            except sqlite3.Error as e:
+                logger.warning("Scheduler: задание %s не сохранено: %s", job.key, e)
+
+    def _wake(self) -> None:
+        # Вызывается под self._cond; флаг не даёт потерять пробуждение, пока поток занят.
+        self._woken = True
+        self._cond.notify()
+
+    def _loop(self) -> None:
+        next_tick = 0.0
+        while True:
+            with self._cond:
+                if self._stopping:
+                    return
+                # Без базы ждать нечего, кроме новых заданий и завершённых хостов.
+                timeout = max(0.0, next_tick - time.monotonic()) if self.store is not None else None
+                if not self._completions and not self._woken and timeout != 0:
+                    self._cond.wait(timeout)
+                self._woken = False
+                if self._stopping:
+                    return
+            if self.store is not None and time.monotonic() >= next_tick:
+                try:
+                    self.tick()
+                except Exception as e:
+                    logger.exception("Scheduler.tick() -> %s", e)
+                next_tick = time.monotonic() + self.tick_interval
+            try:
+                self.pump()
+            except Exception as e:
+                logger.exception("Scheduler: ошибка выдачи заданий: %s", e)
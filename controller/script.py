@@ -1,60 +1,82 @@
 """docstring"""
 import tkinter as tk
-import threading
-from tkinter import messagebox
-import paramiko
+from tkinter import filedialog, messagebox
 
 #from model.script import Script
-from model.endpoint import Endpoint
-from view.theme import StyledToplevel, StyledButton, StyledFrame, StyledLabel
-from interpreters.python import PythonInterpreter
-from interpreters.bash import BashInterpreter
+from view.theme import StyledToplevel, StyledButton, StyledFrame, StyledLabel, StyledEntry
+from controller.dashboard import DEFAULT_HOST_SCROLLBACK, DashboardModel
+from controller.output import DEFAULT_SCROLLBACK
+from controller.spool import Spool
+from controller.cancel import run_limits
+from controller.runner import (DEFAULT_CONCURRENCY, default_interpreters, endpoint_table,
+                               select_endpoints)
+from controller.scheduler import PRIORITY_INTERACTIVE, PRIORITY_NORMAL, QueueFull
+from view.dashboard import DashboardView
+from view.output import DEFAULT_FPS
+from view.spool import SpoolView
 
 class ScriptBackend:
     """docstring"""
     def __init__(self, app):
         self.app = app
         self.storage = self.app.storage  # ссылка на file_storage
-        self.interpreters = {
-            "python": PythonInterpreter(),
-            "bash": BashInterpreter()
-        }
+        self.interpreters = default_interpreters()
+
+    def _limits(self, script):
+        """Ограничения времени запуска: секция [Execution] и опции скрипта."""
+        return run_limits(getattr(self.app, "config", None), script.options)
 
     def run_script(self):
         """
         Запускает скрипт на удалённом сервере 
         по SSH с потоковым выводом и статусом подключения.
+        Закрытие окна или кнопка Stop отменяют запуск вместе с удалённым процессом.
+        Запуск идёт через планировщик с интерактивным приоритетом, поэтому
+        не ждёт, пока закончится большой fan-out.
         """
         name = self.app.scripts_manager.view.name_entry.get()
         script = self.app.scripts_manager.model.read(name)
 
         endpoint_name = script.endpoint
-        endpoint_data = self.storage.endpoints.get(endpoint_name)
-        if not endpoint_data:
+        if not self.storage.endpoints.get(endpoint_name):
             messagebox.showwarning("Ошибка", "Эндпоинт не существует")
             return
 
-        endpoint = Endpoint.from_dict(self.storage, endpoint_data)
-
-        hostname = endpoint.ip
-        port = int(endpoint.port)
-        username = endpoint.login
-        password = endpoint.password
-        interpreter_name = script.interpreter
-        script_code = script.code
-        options = script.options
-
         # Создаём окно сразу
         result_window = StyledToplevel()
         result_window.title("Результат выполнения")
         result_window.configure(bg="#f2ceae")
 
-        text_widget = tk.Text(result_window, wrap="word", height=20, width=80)
-        text_widget.pack(fill="both", expand=True, padx=10, pady=10)
-        text_widget.config(state="disabled")
+        # Полный вывод пишется в файл на диске, окно показывает только видимые строки
+        # и обновляется не чаще fps раз в секунду
+        _, fps = self._output_settings()
+        output = Spool(directory=self._spool_dir())
+        output_view = SpoolView(self.app.root, result_window, output, fps=fps)
+        output_view.pack(fill="both", expand=True, padx=10, pady=10)
+
+        jobs = []
+
+        def stop():
+            for job in jobs:
+                self.app.scheduler.cancel(job.key)
 
-        close_button = StyledButton(result_window, text="Закрыть", command=result_window.destroy)
+        def close():
+            stop()
+            output_view.stop()
+            output.close()
+            result_window.destroy()
+
+        def save_log():
+            path = filedialog.asksaveasfilename(parent=result_window, defaultextension=".log")
+            if path:
+                output.export(path)
+
+        result_window.protocol("WM_DELETE_WINDOW", close)
+        close_button = StyledButton(result_window, text="Закрыть", command=close)
         close_button.pack(pady=5)
+        stop_button = StyledButton(result_window, text="⏹ Stop", command=stop)
+        stop_button.pack(pady=5)
+        StyledButton(result_window, text="💾 Save log", command=save_log).pack(pady=5)
 
         # Строка статуса
         status_frame = StyledFrame(result_window)
@@ -66,13 +88,6 @@ class ScriptBackend:
         status_icon = tk.Canvas(status_frame, width=20, height=20, highlightthickness=0)
         status_icon.pack(side="left", padx=5)
 
-        def update_output(text):
-            """Добавляет текст в окно с результатом."""
-            text_widget.config(state="normal")
-            text_widget.insert("end", text)
-            text_widget.see("end")
-            text_widget.config(state="disabled")
-
         def animate_spinner(angle=0):
             """Анимация вращающегося значка."""
             status_icon.delete("all")
@@ -82,38 +97,170 @@ class ScriptBackend:
             if status_label["text"] == "Connecting...":
                 self.app.root.after(100, animate_spinner, (angle + 30) % 360)
 
-        def execute_script():
-            """Функция для выполнения скрипта и обновления статуса."""
-            try:
-                ssh_client = paramiko.SSHClient()
-                ssh_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-                ssh_client.connect(hostname, port=port, username=username, password=password)
-
-                # Статус подключения
-                self.app.root.after(0, lambda: status_label.config(text="Connected"))
-                self.app.root.after(0, lambda: status_icon.delete("all"))
-                self.app.root.after(0, lambda: status_icon.create_text(10,
-                                                                       10, text="✔",
-                                                                       font=("Arial", 14),
-                                                                       fill="green"))
-
-                if interpreter_name in self.interpreters:
-                    interpreter = self.interpreters[interpreter_name]
-                    command = interpreter.format_command(script_code, options)
-                else:
-                    command = script_code
-
-                _, stdout, stderr = ssh_client.exec_command(command)
-                for line in iter(stdout.readline, ""):
-                    self.app.root.after(0, update_output, line)
-                for line in iter(stderr.readline, ""):
-                    self.app.root.after(0, update_output, f"[Ошибка] {line}")
-
-                ssh_client.close()
-
-            except Exception as e:
-                self.app.root.after(0, update_output, f"Ошибка: {e}")
+        def on_event(event):
+            """Обработка событий запуска из движка."""
+            if event.kind == "connected":
+                status_label.config(text="Connected")
+                status_icon.delete("all")
+                status_icon.create_text(10, 10, text="✔", font=("Arial", 14), fill="green")
+            elif event.kind == "result":
+                self.app.dispatcher.unsubscribe(event.key)
+                output_view.finish()
+                stop_button.config(state="disabled")
+                if event.payload.stopped:
+                    status_label.config(text="Stopped")
+                    status_icon.delete("all")
+                    status_icon.create_text(10, 10, text="■", font=("Arial", 14), fill="darkorange")
+                elif status_label["text"] == "Connecting...":
+                    status_label.config(text="Failed")
+                    status_icon.delete("all")
+                    status_icon.create_text(10, 10, text="✖", font=("Arial", 14), fill="red")
 
+        try:
+            job = self.app.scheduler.submit(script.name, [endpoint_name], priority=PRIORITY_INTERACTIVE,
+                                            sink=output, limits=self._limits(script), persist=False)
+        except QueueFull as e:
+            close()
+            messagebox.showwarning("Ошибка", str(e))
+            return
+        jobs.append(job)
         # Запуск индикатора загрузки
         animate_spinner()
-        threading.Thread(target=execute_script, daemon=True).start()
+        output_view.start()
+        self.app.dispatcher.subscribe(f"{job.key}:{endpoint_name}", on_event)
+
+    def _output_settings(self):
+        """Размер прокрутки и частота обновления окна вывода из секции [Output]."""
+        config = getattr(self.app, "config", None)
+        try:
+            return (config.getint("Output", "scrollback_lines", fallback=DEFAULT_SCROLLBACK),
+                    config.getint("Output", "fps", fallback=DEFAULT_FPS))
+        except (AttributeError, ValueError):
+            return DEFAULT_SCROLLBACK, DEFAULT_FPS
+
+    def _spool_dir(self):
+        """Каталог файлов вывода из секции [Output] (по умолчанию — системный temp)."""
+        config = getattr(self.app, "config", None)
+        try:
+            return config.get("Output", "spool_dir", fallback="").strip().strip("\"'") or None
+        except AttributeError:
+            return None
+
+    def _default_concurrency(self):
+        """Лимит параллельных хостов из секции [Execution] файла settings.ini."""
+        config = getattr(self.app, "config", None)
+        try:
+            return config.getint("Execution", "concurrency", fallback=DEFAULT_CONCURRENCY)
+        except (AttributeError, ValueError):
+            return DEFAULT_CONCURRENCY
+
+    def run_fanout(self):
+        """
+        Открывает окно fan-out запуска: выбор эндпоинтов (по именам, шаблону
+        или группе) и лимита параллельности, затем запуск скрипта на всех
+        выбранных хостах. Ход запуска показывает сводная панель
+        (`view.dashboard.DashboardView`) со строкой на хост и выводом
+        выбранного хоста. Хосты выдаёт планировщик: лимит параллельности
+        задания действует вместе с общими лимитами [Scheduler].
+        """
+        name = self.app.scripts_manager.view.name_entry.get()
+        script = self.app.scripts_manager.model.read(name)
+        if not script:
+            messagebox.showwarning("Ошибка", "Сначала сохраните скрипт")
+            return
+
+        window = StyledToplevel()
+        window.title(f"Fan-out '{script.name}'")
+        window.configure(bg="#f2ceae")
+
+        StyledLabel(window, text="Endpoints").pack(anchor="w", padx=10)
+        endpoints_list = tk.Listbox(window, selectmode=tk.MULTIPLE, height=8, exportselection=False,
+                                    selectbackground="#f37600", selectforeground="black")
+        endpoints_list.pack(fill="x", padx=10)
+        for endpoint_name in self.storage.endpoints:
+            endpoints_list.insert(tk.END, endpoint_name)
+
+        StyledLabel(window, text="Pattern (web-*, db-?)").pack(anchor="w", padx=10)
+        pattern_entry = StyledEntry(window)
+        pattern_entry.pack(anchor="w", padx=10)
+
+        StyledLabel(window, text="Group").pack(anchor="w", padx=10)
+        group_entry = StyledEntry(window)
+        group_entry.pack(anchor="w", padx=10)
+
+        StyledLabel(window, text="Concurrency").pack(anchor="w", padx=10)
+        concurrency_var = tk.IntVar(value=self._default_concurrency())
+        StyledEntry(window, textvariable=concurrency_var).pack(anchor="w", padx=10)
+
+        status_label = StyledLabel(window, text="")
+        status_label.pack(pady=5)
+
+        scrollback, fps = self._output_settings()
+        # Текущая сводная панель; при повторном запуске заменяется новой
+        current = {}
+
+        def stop_dashboard():
+            if current:
+                self.app.scheduler.cancel(current["job"].key)
+                current["view"].stop()
+                current["view"].frame.destroy()
+                current["model"].close()
+                for key in current["keys"]:
+                    self.app.dispatcher.unsubscribe(key)
+                current.clear()
+
+        def start():
+            names = [endpoints_list.get(i) for i in endpoints_list.curselection()]
+            if pattern_entry.get().strip():
+                names.extend(pattern_entry.get().split())
+            endpoints = select_endpoints(endpoint_table(self.storage),
+                                         names=names,
+                                         group=group_entry.get().strip() or None)
+            if not endpoints:
+                messagebox.showwarning("Ошибка", "Не выбрано ни одного эндпоинта")
+                return
+            try:
+                concurrency = concurrency_var.get()
+            except tk.TclError:
+                concurrency = self._default_concurrency()
+
+            stop_dashboard()
+            try:
+                job = self.app.scheduler.submit(script.name, endpoints, priority=PRIORITY_NORMAL,
+                                                max_running=concurrency, limits=self._limits(script),
+                                                persist=False)
+            except QueueFull as e:
+                messagebox.showwarning("Ошибка", str(e))
+                return
+            status_label.config(text=f"Running on {len(endpoints)} hosts...")
+            run_button.config(state="disabled")
+
+            # Одна панель и один таймер на все хосты вместо окна на хост
+            model = DashboardModel(endpoints, scrollback=min(scrollback, DEFAULT_HOST_SCROLLBACK))
+            view = DashboardView(self.app.root, window, model, fps=fps)
+            view.pack(fill="both", expand=True, padx=10, pady=10, before=run_button)
+
+            def on_event(event):
+                model.apply(event)
+                if event.kind == "report":
+                    for key in keys:
+                        self.app.dispatcher.unsubscribe(key)
+                    status_label.config(text=event.payload.summary())
+                    run_button.config(state="normal")
+
+            keys = model.keys(job.key)
+            for key in keys:
+                self.app.dispatcher.subscribe(key, on_event)
+            current.update(model=model, view=view, keys=keys, job=job)
+            view.start()
+
+        def close():
+            stop_dashboard()
+            window.destroy()
+
+        window.protocol("WM_DELETE_WINDOW", close)
+        run_button = StyledButton(window, text="🚀 Run", command=start)
+        run_button.pack(pady=5)
+        StyledButton(window, text="⏹ Stop",
+                     command=lambda: current and self.app.scheduler.cancel(current["job"].key)).pack(pady=5)
+        StyledButton(window, text="Закрыть", command=close).pack(pady=5)
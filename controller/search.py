@@ -0,0 +1,180 @@
+"""
+Индекс поиска по скриптам и эндпоинтам.
+
+`SearchIndex` — n-граммный индекс в памяти: для каждого поля записи
+(имя, ip/login эндпоинта, интерпретатор и код скрипта) хранятся множества
+записей по триграммам, а для коротких полей (всё, кроме кода) — ещё и по
+униграммам и биграммам, чтобы запросы из одного-двух символов тоже
+отвечались по индексу. Запрос разбивается на слова, кандидаты — пересечение
+множеств, для слов длиннее триграммы кандидаты проверяются подстрокой.
+
+Индекс строится в фоновом потоке по содержимому хранилища и дальше
+обновляется по одной записи при создании, изменении и удалении.
+"""
+
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+GRAM = 3
+DEFAULT_LIMIT = 1000
+
+# Поля записей, по которым идёт поиск; поля из LONG_FIELDS индексируются только триграммами
+SEARCH_FIELDS = {
+    "scripts": ("name", "interpreter", "code"),
+    "endpoints": ("name", "ip", "login", "group"),
+}
+LONG_FIELDS = ("code",)
+
+
+def _grams(text: str, size: int) -> Set[str]:
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+class SearchIndex:
+    """
+    Потокобезопасный n-граммный индекс записей одного типа.
+    """
+
+    def __init__(self, fields: Tuple[str, ...], long_fields: Tuple[str, ...] = LONG_FIELDS) -> None:
+        """
+        :param fields: Поля записи, участвующие в поиске.
+        :param long_fields: Поля, для которых не строятся короткие n-граммы (например, код).
+        """
+        self.fields = fields
+        self.long_fields = long_fields
+        self.ready = threading.Event()
+        self._lock = threading.Lock()
+        self._postings: Dict[str, Set[int]] = {}
+        self._ids: Dict[str, int] = {}
+        self._names: Dict[int, str] = {}
+        self._texts: Dict[int, Tuple[str, Tuple[Tuple[str, bool], ...]]] = {}
+        self._next_id = 0
+        self._pending: Optional[List[Tuple[str, Optional[Dict[str, Any]]]]] = None
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def build(self, records: Iterable[Tuple[str, Dict[str, Any]]]) -> None:
+        """
+        Заполняет индекс записями `(имя, запись)`. Изменения, пришедшие через
+        `update`/`remove` во время построения, применяются после него.
+        """
+        with self._lock:
+            if self._pending is None:
+                self._pending = []
+        count = 0
+        for name, record in records:
+            with self._lock:
+                self._add(name, record)
+            count += 1
+        with self._lock:
+            pending, self._pending = self._pending, None
+            for name, record in pending:
+                self._remove(name)
+                if record is not None:
+                    self._add(name, record)
+        self.ready.set()
+        logger.info("SearchIndex.build() -> %s записей", count)
+
+    def build_async(self, records_loader) -> threading.Thread:
+        """Строит индекс в фоновом потоке; `records_loader()` возвращает пары `(имя, запись)`."""
+        with self._lock:
+            self._pending = []
+
+        def run():
+            try:
+                self.build(records_loader())
+            except Exception as e:
+                logger.exception("SearchIndex.build() -> ошибка: %s", e)
+                self.ready.set()
+
+        thread = threading.Thread(target=run, name="search-index", daemon=True)
+        thread.start()
+        return thread
+
+    def update(self, name: str, record: Dict[str, Any], old_name: Optional[str] = None) -> None:
+        """Добавляет или переиндексирует запись (с учётом переименования)."""
+        with self._lock:
+            if old_name is not None and old_name != name:
+                self._change(old_name, None)
+            self._change(name, record)
+
+    def remove(self, name: str) -> None:
+        """Убирает запись из индекса."""
+        with self._lock:
+            self._change(name, None)
+
+    def search(self, query: str, limit: int = DEFAULT_LIMIT) -> List[str]:
+        """
+        Имена записей, содержащих все слова запроса (без учёта регистра).
+        Совпадения по имени идут первыми.
+        """
+        terms = query.lower().split()
+        if not terms:
+            return []
+        with self._lock:
+            candidates: Optional[Set[int]] = None
+            for term in sorted(terms, key=len, reverse=True):
+                found = self._lookup(term)
+                candidates = found if candidates is None else candidates & found
+                if not candidates:
+                    return []
+            by_name, others = [], []
+            for doc_id in sorted(candidates):
+                name_text = self._texts[doc_id][0]
+                (by_name if all(term in name_text for term in terms) else others).append(self._names[doc_id])
+        return (by_name + others)[:limit]
+
+    def _lookup(self, term: str) -> Set[int]:
+        if len(term) <= GRAM:
+            return set(self._postings.get(term, ()))
+        postings = sorted((self._postings.get(gram, set()) for gram in _grams(term, GRAM)), key=len)
+        if not postings[0]:
+            return set()
+        candidates = set.intersection(*postings)
+        return {doc_id for doc_id in candidates
+                if any(term in text for text, _ in self._texts[doc_id][1])}
+
+    def _change(self, name: str, record: Optional[Dict[str, Any]]) -> None:
+        if self._pending is not None:
+            self._pending.append((name, record))
+        self._remove(name)
+        if record is not None:
+            self._add(name, record)
+
+    def _grams_of(self, parts: Tuple[Tuple[str, bool], ...]) -> Set[str]:
+        grams: Set[str] = set()
+        for text, is_long in parts:
+            for size in range(GRAM if is_long else 1, GRAM + 1):
+                grams |= _grams(text, size)
+        return grams
+
+    def _add(self, name: str, record: Dict[str, Any]) -> None:
+        if name in self._ids:
+            self._remove(name)
+        doc_id = self._next_id
+        self._next_id += 1
+        record = dict(record, name=name)
+        parts = tuple((str(record[field]).lower(), field in self.long_fields)
+                      for field in self.fields if record.get(field) not in (None, ""))
+        self._ids[name] = doc_id
+        self._names[doc_id] = name
+        self._texts[doc_id] = (name.lower(), parts)
+        for gram in self._grams_of(parts):
+            self._postings.setdefault(gram, set()).add(doc_id)
+
+    def _remove(self, name: str) -> None:
+        doc_id = self._ids.pop(name, None)
+        if doc_id is None:
+            return
+        del self._names[doc_id]
+        _, parts = self._texts.pop(doc_id)
+        for gram in self._grams_of(parts):
+            postings = self._postings.get(gram)
+            if postings is not None:
+                postings.discard(doc_id)
+                if not postings:
+                    del self._postings[gram]
@@ -0,0 +1,243 @@
+"""
+Запись полного вывода запуска на диск и чтение его окнами строк.
+
+`tk.Text` хранит весь текст в куче Tk и замедляется уже на сотнях тысяч
+строк, поэтому окно результата держит в виджете только видимые строки,
+а полный вывод пишется в файл (`Spool`) по мере поступления.
+
+Для быстрого перехода к любой строке при записи строится разреженный
+индекс: смещение начала каждой `index_step`-й строки. Строка `n`
+находится за O(1): смещение блока из индекса и не больше `index_step - 1`
+поисков перевода строки. Индекс на 64 строки — 8 байт, поэтому даже для
+многогигабайтного вывода он занимает единицы мегабайт.
+
+Чтение и поиск идут через `mmap` файла: окно строк и регулярное
+выражение читают страницы файла напрямую, не копируя вывод в память
+процесса. Диапазоны байтов stderr хранятся отдельно (соседние куски
+одного потока склеиваются) для подсветки.
+"""
+
+import mmap
+import os
+import re
+import shutil
+import tempfile
+import threading
+from array import array
+from bisect import bisect_right
+from typing import List, Optional, Tuple
+
+INDEX_STEP = 64
+# Размер блока обратного поиска (в строках индекса)
+SEARCH_BACK_BLOCKS = 1024
+
+
+class Spool:
+    """
+    Файл вывода одного запуска с индексом строк; приёмник вывода для движка
+    (`write(text, stream)`), читается из другого потока.
+    """
+
+    def __init__(self, directory: Optional[str] = None, index_step: int = INDEX_STEP) -> None:
+        """
+        :param directory: Каталог файла (по умолчанию — системный temp).
+        :param index_step: Через сколько строк запоминается смещение начала строки.
+        """
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        fd, self.path = tempfile.mkstemp(prefix="bino-spool-", suffix=".log", dir=directory or None)
+        self._file = os.fdopen(fd, "wb")
+        self.index_step = max(1, int(index_step))
+        self._lock = threading.Lock()
+        # _offsets[k] — смещение строки k * index_step
+        self._offsets = array("Q", [0])
+        self._stderr_starts = array("Q")
+        self._stderr_ends = array("Q")
+        self._lines = 0
+        self._partial = False
+        self._size = 0
+        self._flushed = 0
+        self._reader = None
+        self._map: Optional[mmap.mmap] = None
+        self._closed = False
+
+    # --- Запись ---
+
+    def write(self, text: str, stream: str = "stdout") -> None:
+        """Добавляет кусок вывода в конец файла (вызывается из любого потока)."""
+        if not text:
+            return
+        data = text.encode("utf-8")
+        with self._lock:
+            if self._closed:
+                return
+            base = self._size
+            self._file.write(data)
+            self._size += len(data)
+            if stream == "stderr":
+                if self._stderr_ends and self._stderr_ends[-1] == base:
+                    self._stderr_ends[-1] = self._size
+                else:
+                    self._stderr_starts.append(base)
+                    self._stderr_ends.append(self._size)
+            step = self.index_step
+            newlines = data.count(b"\n")
+            # Переводы строк ищутся только до последней строки, попадающей в индекс.
+            last = (self._lines + newlines) // step * step
+            pos = -1
+            for number in range(self._lines + 1, last + 1):
+                pos = data.find(b"\n", pos + 1)
+                if number % step == 0:
+                    self._offsets.append(base + pos + 1)
+            self._lines += newlines
+            self._partial = not data.endswith(b"\n")
+
+    def flush(self) -> None:
+        """Сбрасывает буфер записи на диск."""
+        with self._lock:
+            if not self._closed:
+                self._file.flush()
+                self._flushed = self._size
+
+    # --- Чтение ---
+
+    @property
+    def size(self) -> int:
+        """Размер вывода в байтах."""
+        return self._size
+
+    @property
+    def line_count(self) -> int:
+        """Число строк, включая незавершённую последнюю."""
+        with self._lock:
+            return self._lines + (1 if self._partial else 0)
+
+    def _view(self) -> Tuple[Optional[mmap.mmap], array, int]:
+        """Отображение файла на текущий размер, снимок индекса и число строк."""
+        with self._lock:
+            if self._closed:
+                raise ValueError("Spool закрыт")
+            if self._map is None or len(self._map) != self._size:
+                if self._flushed != self._size:
+                    self._file.flush()
+                    self._flushed = self._size
+                if self._reader is None:
+                    self._reader = open(self.path, "rb")
+                # Старое отображение не закрывается: его может читать поиск в другом потоке.
+                self._map = mmap.mmap(self._reader.fileno(), self._size, access=mmap.ACCESS_READ) \
+                    if self._size else None
+            return self._map, self._offsets[:], self._lines + (1 if self._partial else 0)
+
+    def _start_of(self, view: mmap.mmap, offsets: array, line: int) -> int:
+        """Смещение начала строки `line` (конец файла, если строки ещё нет)."""
+        block, rest = divmod(line, self.index_step)
+        if block >= len(offsets):
+            return len(view)
+        pos = offsets[block]
+        for _ in range(rest):
+            pos = view.find(b"\n", pos)
+            if pos == -1:
+                return len(view)
+            pos += 1
+        return pos
+
+    def lines(self, start: int, count: int) -> List[Tuple[str, bool]]:
+        """
+        Строки `[start, start + count)` с признаком вывода в stderr.
+        Строки декодируются без завершающего перевода строки.
+        """
+        view, offsets, total = self._view()
+        start = max(0, start)
+        if view is None or start >= total or count <= 0:
+            return []
+        pos = self._start_of(view, offsets, start)
+        result = []
+        for _ in range(min(count, total - start)):
+            end = view.find(b"\n", pos)
+            end = len(view) if end == -1 else end
+            result.append((view[pos:end].decode("utf-8", errors="replace"), self._is_stderr(pos, end)))
+            pos = end + 1
+        return result
+
+    def _is_stderr(self, start: int, end: int) -> bool:
+        # Последний диапазон stderr, начавшийся внутри строки или до неё, заходит в строку?
+        last_byte = end - 1 if end > start else start
+        with self._lock:
+            index = bisect_right(self._stderr_starts, last_byte) - 1
+            return index >= 0 and self._stderr_ends[index] > start
+
+    def line_of(self, offset: int) -> int:
+        """Номер строки, в которой лежит байт `offset`."""
+        view, offsets, _ = self._view()
+        if view is None:
+            return 0
+        block = bisect_right(offsets, offset) - 1
+        return block * self.index_step + view[offsets[block]:offset].count(b"\n")
+
+    def search(self, pattern: str, start_line: int = 0, backwards: bool = False,
+               ignore_case: bool = False) -> Optional[Tuple[int, int, int]]:
+        """
+        Ищет регулярное выражение в выводе.
+
+        Поиск вперёд начинается со строки `start_line`, назад — с конца
+        строки перед ней; регулярное выражение выполняется прямо над
+        `mmap` (`^`/`$` совпадают с границами строк).
+
+        :return: `(строка, начало, конец)` — позиции в символах внутри строки,
+                 или `None`, если совпадений нет.
+        :raises re.error: Если выражение не разбирается.
+        """
+        flags = re.MULTILINE | (re.IGNORECASE if ignore_case else 0)
+        regex = re.compile(pattern.encode("utf-8"), flags)
+        view, offsets, _ = self._view()
+        if view is None:
+            return None
+        if not backwards:
+            match = regex.search(view, self._start_of(view, offsets, max(0, start_line)))
+        else:
+            match = self._search_back(regex, view, offsets, self._start_of(view, offsets, max(0, start_line)))
+        if match is None:
+            return None
+        line = self.line_of(match.start())
+        line_start = self._start_of(view, offsets, line)
+        begin = len(view[line_start:match.start()].decode("utf-8", errors="replace"))
+        return line, begin, begin + len(match.group().decode("utf-8", errors="replace"))
+
+    def _search_back(self, regex, view: mmap.mmap, offsets: array, end: int):
+        # Блоки выровнены по строкам индекса, поэтому совпадение в пределах строки не разрезается.
+        block = bisect_right(offsets, max(0, end - 1)) - 1
+        while block >= 0:
+            first = max(0, block - SEARCH_BACK_BLOCKS + 1)
+            last = None
+            for last in regex.finditer(view, offsets[first], end):
+                pass
+            if last is not None and last.start() < end:
+                return last
+            end, block = offsets[first], first - 1
+        return None
+
+    # --- Файл ---
+
+    def export(self, path: str) -> None:
+        """Сохраняет полный вывод в файл."""
+        self.flush()
+        shutil.copyfile(self.path, path)
+
+    def close(self, delete: bool = True) -> None:
+        """Закрывает файл (и удаляет его); дальнейший вывод отбрасывается."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._file.close()
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+            if self._reader is not None:
+                self._reader.close()
+                self._reader = None
+        if delete:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
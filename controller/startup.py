@@ -0,0 +1,153 @@
+"""
+Замеры холодного старта приложения.
+
+`StartupProfiler` включается ключом `report` секции `[Startup]` в
+settings.ini, флагом `--startup-report` или переменной окружения
+`BINO_STARTUP_REPORT=1`. Во включённом режиме он перехватывает импорт и
+считает для каждого впервые загруженного модуля собственное время
+(без вложенных импортов) и полное, а также время этапов инициализации
+(`phase`). Отчёт пишется в лог после первого простоя главного цикла Tk.
+В выключенном режиме `phase` ничего не делает.
+"""
+
+import builtins
+import configparser
+import contextlib
+import importlib.util
+import logging
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+REPORT_FLAG = "--startup-report"
+REPORT_ENV = "BINO_STARTUP_REPORT"
+REPORT_TOP = 25
+
+
+@dataclass
+class ImportCost:
+    """Время загрузки модуля: собственное и вместе с вложенными импортами."""
+
+    module: str
+    self_time: float
+    total_time: float
+
+
+class ImportTimer:
+    """
+    Перехватчик `builtins.__import__`, засекающий загрузку новых модулей.
+
+    Время засекается только для модулей, которых ещё нет в `sys.modules`;
+    повторные импорты проходят без замеров. Замеры ведутся в потоке, который
+    установил перехватчик.
+    """
+
+    def __init__(self) -> None:
+        self.costs: List[ImportCost] = []
+        self._original = None
+        self._thread: Optional[int] = None
+        self._stack: List[float] = []
+
+    def install(self) -> None:
+        if self._original is not None:
+            return
+        self._original = builtins.__import__
+        self._thread = threading.get_ident()
+        builtins.__import__ = self._import
+
+    def uninstall(self) -> None:
+        if self._original is not None:
+            builtins.__import__ = self._original
+            self._original = None
+
+    def _new_modules(self, name, globals_, fromlist, level) -> List[str]:
+        try:
+            package = (globals_ or {}).get("__package__") if level else None
+            fullname = importlib.util.resolve_name("." * level + name, package) if level else name
+        except (ImportError, ValueError):
+            return []
+        names = [fullname] + [f"{fullname}.{item}" for item in fromlist or () if item != "*"]
+        return [module for module in names if module not in sys.modules]
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        original = self._original or builtins.__import__
+        if self._original is None or threading.get_ident() != self._thread:
+            return original(name, globals, locals, fromlist, level)
+        new = self._new_modules(name, globals, fromlist, level)
+        if not new:
+            return original(name, globals, locals, fromlist, level)
+        self._stack.append(0.0)
+        started = time.perf_counter()
+        try:
+            return original(name, globals, locals, fromlist, level)
+        finally:
+            total = time.perf_counter() - started
+            nested = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += total
+            # Для `from pkg import sub` имя подмодуля, а не уже загруженного пакета.
+            loaded = [module for module in new if module in sys.modules]
+            if loaded:
+                self.costs.append(ImportCost(loaded[0], total - nested, total))
+
+
+class StartupProfiler:
+    """
+    Отчёт о холодном старте: импорты по модулям и этапы инициализации.
+    """
+
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = enabled
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.imports = ImportTimer()
+        if enabled:
+            self.imports.install()
+
+    @classmethod
+    def from_settings(cls, path: str = "settings.ini", argv: Optional[List[str]] = None) -> "StartupProfiler":
+        """Профилировщик, включённый флагом, переменной окружения или `[Startup] report`."""
+        enabled = REPORT_FLAG in (argv or []) or os.environ.get(REPORT_ENV, "") not in ("", "0")
+        if not enabled:
+            config = configparser.ConfigParser()
+            config.read(path, encoding="utf-8")
+            enabled = config.getboolean("Startup", "report", fallback=False)
+        return cls(enabled)
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Засекает этап инициализации (повторные замеры одного этапа суммируются)."""
+        if not self.enabled:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - started
+
+    def to_text(self, top: int = REPORT_TOP) -> str:
+        """Текст отчёта: общее время, этапы и самые дорогие импорты."""
+        elapsed = time.perf_counter() - self.started
+        lines = [f"Старт за {elapsed * 1000:.1f} мс, импортировано модулей: {len(self.imports.costs)}",
+                 "Этапы инициализации (мс):"]
+        lines += [f"  {name:<32} {duration * 1000:9.1f}" for name, duration in self.phases.items()]
+        lines.append(f"Импорты, топ-{top} по собственному времени (собственное / полное, мс):")
+        costs = sorted(self.imports.costs, key=lambda cost: cost.self_time, reverse=True)[:top]
+        lines += [f"  {cost.module:<32} {cost.self_time * 1000:9.1f} {cost.total_time * 1000:9.1f}"
+                  for cost in costs]
+        return "\n".join(lines)
+
+    def report(self) -> Optional[str]:
+        """Снимает перехватчик импорта и пишет отчёт в лог (если профилировщик включён)."""
+        if not self.enabled:
+            return None
+        self.imports.uninstall()
+        text = self.to_text()
+        logger.info("Отчёт о старте:\n%s", text)
+        return text
@@ -0,0 +1,208 @@
+"""
+Подключаемые хранилища скриптов и эндпоинтов.
+
+Формат хранилища выбирается ключом `format` секции `[Storage]` в
+settings.ini (`json` или `sqlite`), путь к файлу — ключом `path`. Путь с
+расширением другого формата (например, `data.json` при `format = sqlite`)
+не используется: хранилище создаётся в том же каталоге под именем по
+умолчанию, поэтому для перехода на SQLite достаточно сменить `format`.
+
+`SqliteStorage` хранит каждую запись отдельной строкой таблицы: создание,
+изменение и удаление записи — один upsert/delete по индексу имени, а не
+перезапись всего файла. Тела скриптов (`code`) лежат в отдельной колонке
+и читаются только при обращении к конкретному скрипту: список имён для
+боковой панели строится по индексу, без чтения кода.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from controller.file import FileStorage
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FORMAT = "json"
+DEFAULT_PATHS = {"json": "data.json", "sqlite": "data.db"}
+FORMAT_EXTENSIONS = {"json": (".json",), "sqlite": (".db", ".sqlite", ".sqlite3")}
+TABLES = {"scripts": ("code",), "endpoints": ()}
+
+
+class SqliteTable(MutableMapping):
+    """
+    Таблица записей с интерфейсом словаря `имя -> dict`.
+
+    Запись на ключ сразу сохраняется в базу (upsert по уникальному индексу
+    имени), удаление — сразу удаляется. Поля из `lazy_fields` хранятся в
+    отдельных колонках и не читаются при обходе имён.
+    """
+
+    def __init__(self, storage: "SqliteStorage", name: str, lazy_fields: Tuple[str, ...] = ()) -> None:
+        self.storage = storage
+        self.name = name
+        self.lazy_fields = lazy_fields
+        columns = ", ".join(("name", "data") + lazy_fields)
+        placeholders = ", ".join("?" * (2 + len(lazy_fields)))
+        updates = ", ".join(f"{column} = excluded.{column}" for column in ("data",) + lazy_fields)
+        self._select = f"SELECT {columns} FROM {name}"
+        self._upsert = (f"INSERT INTO {name} ({columns}) VALUES ({placeholders}) "
+                        f"ON CONFLICT(name) DO UPDATE SET {updates}")
+
+    def create_schema(self) -> None:
+        """Создаёт таблицу и индекс по имени, если их ещё нет."""
+        lazy = "".join(f", {column} TEXT" for column in self.lazy_fields)
+        self.storage.execute(f"CREATE TABLE IF NOT EXISTS {self.name} "
+                             f"(id INTEGER PRIMARY KEY, name TEXT NOT NULL, data TEXT NOT NULL{lazy})")
+        self.storage.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS {self.name}_name ON {self.name} (name)")
+
+    def _decode(self, row: Tuple[Any, ...]) -> Dict[str, Any]:
+        record = json.loads(row[1])
+        for column, value in zip(self.lazy_fields, row[2:]):
+            record[column] = value if value is not None else ""
+        return record
+
+    def __getitem__(self, key: str) -> Dict[str, Any]:
+        row = self.storage.execute(f"{self._select} WHERE name = ?", (key,)).fetchone()
+        if row is None:
+            raise KeyError(key)
+        return self._decode(row)
+
+    def __setitem__(self, key: str, value: Dict[str, Any]) -> None:
+        record = dict(value)
+        lazy = [record.pop(column, "") for column in self.lazy_fields]
+        self.storage.execute(self._upsert, (key, json.dumps(record, ensure_ascii=False), *lazy))
+        self.storage.revision += 1
+
+    def __delitem__(self, key: str) -> None:
+        cursor = self.storage.execute(f"DELETE FROM {self.name} WHERE name = ?", (key,))
+        if cursor.rowcount == 0:
+            raise KeyError(key)
+        self.storage.revision += 1
+
+    def __contains__(self, key: object) -> bool:
+        return self.storage.execute(f"SELECT 1 FROM {self.name} WHERE name = ?", (key,)).fetchone() is not None
+
+    def __iter__(self) -> Iterator[str]:
+        rows = self.storage.execute(f"SELECT name FROM {self.name} ORDER BY id").fetchall()
+        return iter([row[0] for row in rows])
+
+    def __len__(self) -> int:
+        return self.storage.execute(f"SELECT COUNT(*) FROM {self.name}").fetchone()[0]
+
+    def page(self, offset: int, limit: int) -> List[str]:
+        """Имена записей `offset..offset+limit` в порядке создания (только индекс, без данных)."""
+        rows = self.storage.execute(f"SELECT name FROM {self.name} ORDER BY id LIMIT ? OFFSET ?",
+                                    (limit, offset)).fetchall()
+        return [row[0] for row in rows]
+
+    def items(self):
+        """Все записи одним запросом (в порядке создания)."""
+        rows = self.storage.execute(f"{self._select} ORDER BY id").fetchall()
+        return [(row[0], self._decode(row)) for row in rows]
+
+    def values(self):
+        """Все записи одним запросом (в порядке создания)."""
+        return [record for _, record in self.items()]
+
+
+class SqliteStorage:
+    """
+    Хранилище на SQLite с тем же интерфейсом, что и `FileStorage`.
+    """
+
+    def __init__(self, file_path: str = DEFAULT_PATHS["sqlite"]) -> None:
+        self.file_path = file_path
+        # Растёт при каждой записи или удалении строки, как `FileStorage.revision` при сохранении.
+        self.revision = 0
+        self._lock = threading.RLock()
+        # Каждый upsert — отдельная транзакция в autocommit-режиме.
+        self.connection = sqlite3.connect(file_path, isolation_level=None, check_same_thread=False)
+        self.execute("PRAGMA journal_mode=WAL")
+        self.execute("PRAGMA synchronous=NORMAL")
+        self.tables = {name: SqliteTable(self, name, lazy) for name, lazy in TABLES.items()}
+        for table in self.tables.values():
+            table.create_schema()
+        self.data = dict(self.tables)
+
+    def execute(self, sql: str, params: Tuple[Any, ...] = ()) -> sqlite3.Cursor:
+        """Выполняет запрос под блокировкой соединения."""
+        with self._lock:
+            return self.connection.execute(sql, params)
+
+    @property
+    def scripts(self) -> SqliteTable:
+        return self.tables["scripts"]
+
+    @property
+    def endpoints(self) -> SqliteTable:
+        return self.tables["endpoints"]
+
+    def load(self) -> Dict[str, SqliteTable]:
+        return self.data
+
+    def save(self) -> None:
+        """Изменения уже записаны построчно; метод оставлен для совместимости с `FileStorage`."""
+
+    def import_data(self, data: Dict[str, Dict[str, Any]]) -> None:
+        """Загружает словарь в формате data.json одной транзакцией."""
+        with self._lock:
+            self.execute("BEGIN")
+            try:
+                for name, table in self.tables.items():
+                    for key, record in data.get(name, {}).items():
+                        table[key] = record
+                self.execute("COMMIT")
+            except Exception:
+                self.execute("ROLLBACK")
+                raise
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+STORAGE_FORMATS = {
+    "json": FileStorage,
+    "sqlite": SqliteStorage,
+}
+
+
+def create_storage(config: Optional[Any] = None) -> Any:
+    """
+    Создаёт хранилище по секции `[Storage]` конфигурации.
+
+    Если выбран `sqlite`, а базы ещё нет, в неё переносятся данные из
+    JSON-хранилища: файла из `path`, если он указан для JSON, иначе
+    data.json рядом с базой (если он существует).
+    """
+    storage_format, path = DEFAULT_FORMAT, None
+    if config is not None and config.has_section("Storage"):
+        storage_format = config.get("Storage", "format", fallback=DEFAULT_FORMAT).strip().lower()
+        path = config.get("Storage", "path", fallback="").strip().strip("\"'") or None
+
+    storage_class = STORAGE_FORMATS.get(storage_format)
+    if storage_class is None:
+        logger.warning("create_storage(): неизвестный формат '%s', используется %s", storage_format, DEFAULT_FORMAT)
+        storage_format, storage_class, path = DEFAULT_FORMAT, FileStorage, None
+    configured = path
+    if path and any(path.lower().endswith(FORMAT_EXTENSIONS[other])
+                    for other in FORMAT_EXTENSIONS if other != storage_format):
+        path = os.path.join(os.path.dirname(path), DEFAULT_PATHS[storage_format])
+        logger.info("create_storage(): путь %s не подходит для формата %s, используется %s",
+                    configured, storage_format, path)
+    path = path or DEFAULT_PATHS[storage_format]
+
+    if configured and configured.lower().endswith(FORMAT_EXTENSIONS["json"]):
+        json_path = configured
+    else:
+        json_path = os.path.join(os.path.dirname(path), DEFAULT_PATHS["json"])
+    migrate = storage_format == "sqlite" and not os.path.exists(path) and os.path.exists(json_path)
+    storage = storage_class(path)
+    if migrate:
+        logger.info("create_storage(): перенос %s в %s", json_path, path)
+        storage.import_data(FileStorage(json_path).data)
+    logger.info("create_storage() -> %s(%s)", storage_class.__name__, path)
+    return storage
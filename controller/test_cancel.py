@@ -0,0 +1,49 @@
+"""Unit-тесты для отмены и ограничений запусков controller.cancel."""
+
+import configparser
+
+from controller.cancel import PgidFilter, kill_command, run_limits, wrap_command
+
+
+def test_pgid_marker_is_cut_from_stderr():
+    """Маркер, разрезанный между кусками, вырезается; остальной stderr проходит как есть."""
+    marker = PgidFilter()
+
+    assert marker.feed(b"__BINO_PG") == b""
+    assert marker.feed(b"ID__:31337\nwarning\n") == b"warning\n"
+    assert marker.pgid == 31337
+    assert marker.feed(b"__BINO_PGID__:1\n") == b"__BINO_PGID__:1\n"
+
+
+def test_stderr_without_marker_is_untouched():
+    """Если обёртка не сработала, stderr не теряется, а группа процессов неизвестна."""
+    marker = PgidFilter()
+    assert marker.feed(b"csh: syntax error\n") == b"csh: syntax error\n"
+    assert marker.pgid is None
+
+    marker = PgidFilter()
+    assert marker.feed(b"__BINO_PGID__:1\n") == b"__BINO_PGID__:1\n"
+    assert marker.pgid is None
+
+    marker = PgidFilter()
+    assert marker.feed(b"__BINO") == b""
+    assert marker.flush() == b"__BINO"
+
+
+def test_commands_target_process_group():
+    """Обёртка печатает PID оболочки, остановка адресована всей группе."""
+    assert wrap_command("uptime") == "printf '__BINO_PGID__:%s\\n' \"$$\" >&2; uptime"
+    assert kill_command(4242, 5).startswith("kill -TERM -4242 ")
+    assert "kill -KILL -4242" in kill_command(4242, 5)
+
+
+def test_limits_from_settings_and_script_options():
+    """Значения из [Execution] переопределяются опциями скрипта."""
+    config = configparser.ConfigParser()
+    config.read_dict({"Execution": {"wall_timeout": "600", "idle_timeout": "60", "kill_mode": "pty"}})
+
+    limits = run_limits(config, {"idle_timeout": 5, "-e": True})
+    assert (limits.wall_timeout, limits.idle_timeout, limits.kill_mode) == (600, 5, "pty")
+
+    limits = run_limits(None, {"wall_timeout": "oops", "kill_mode": "nohup"})
+    assert (limits.wall_timeout, limits.idle_timeout, limits.kill_mode) == (0, 0, "pgid")
@@ -0,0 +1,131 @@
+"""Unit-тесты для консольного запуска controller.cli."""
+
+import io
+import json
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+
+from connectors.channel import OutputChunk
+from controller.cli import EXIT_OK, EXIT_USAGE, BatchRunner, JsonlWriter, TextWriter, main
+from controller.engine import ExecutionEngine
+from controller.file import FileStorage
+from controller.runner import HostResult
+from controller.test_engine import FakeChannel, make_connector
+from model.script import Script
+
+PACKAGE_ROOT = __file__.rsplit("controller", 1)[0]
+
+
+@pytest.fixture
+def storage(tmp_path):
+    """JSON-хранилище со скриптом и двумя эндпоинтами."""
+    storage = FileStorage(str(tmp_path / "data.json"))
+    storage.scripts["hello"] = {"name": "hello", "interpreter": "bash", "code": "echo hi",
+                                "endpoint": "web-1", "options": {}}
+    for name in ("web-1", "web-2"):
+        storage.endpoints[name] = {"name": name, "type": "ssh", "ip": "10.0.0.1", "options": {}}
+    storage.endpoints["db"] = {"name": "db", "type": "PostgreSQL", "options": {}}
+    storage.save()
+    return storage
+
+
+def test_import_does_not_load_ui_modules():
+    """Консольный запуск не тянет tkinter, pygments и модули view, а paramiko — до запуска на хостах."""
+    code = ("import sys, controller.cli; "
+            "print([m for m in sys.modules if m.split('.')[0] in ('tkinter', 'pygments', 'view', 'paramiko')])")
+    output = subprocess.run([sys.executable, "-c", code], cwd=PACKAGE_ROOT,
+                            capture_output=True, text=True, check=True).stdout
+    assert output.strip() == "[]"
+
+
+def test_text_writer_prefixes_whole_lines():
+    """Строки нескольких хостов печатаются целиком и с префиксом хоста."""
+    out, err = io.StringIO(), io.StringIO()
+    writer = TextWriter(out, err, prefix=True)
+
+    writer.output("s", "web-1", OutputChunk("stdout", "par", 0.0))
+    writer.output("s", "web-2", OutputChunk("stdout", "other\n", 0.0))
+    writer.output("s", "web-1", OutputChunk("stdout", "tial\nnext", 0.0))
+    writer.result("s", HostResult(endpoint="web-1", success=True))
+
+    assert out.getvalue() == "web-2 | other\nweb-1 | partial\nweb-1 | next\n"
+    assert err.getvalue().startswith("[OK] web-1")
+
+
+def test_batch_runner_streams_jsonl(storage):
+    """Вывод и результаты хостов уходят в JSONL; неподдерживаемый тип — ошибка хоста."""
+    engine = ExecutionEngine(connector=make_connector(lambda: FakeChannel(stdout=[b"hi\n"])), io_workers=4)
+    out = io.StringIO()
+    runner = BatchRunner(storage, engine, JsonlWriter(out))
+    script = Script.from_dict(storage, storage.scripts["hello"])
+    try:
+        report = runner.run(script, runner.targets(script, ["web-*", "db"], None))
+    finally:
+        engine.stop()
+
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    outputs = sorted(record["endpoint"] for record in records if record["event"] == "output")
+    results = {record["endpoint"]: record["success"] for record in records if record["event"] == "result"}
+    assert outputs == ["web-1", "web-2"]
+    assert results == {"web-1": True, "web-2": True, "db": False}
+    assert records[-1] == dict(records[-1], event="report", total=3, succeeded=2, failed=1)
+    assert [result.endpoint for result in report.failed] == ["db"]
+
+
+def test_main_lists_and_rejects_unknown_script(storage, tmp_path):
+    """`list` печатает имена, неизвестный скрипт даёт код возврата 2."""
+    settings = tmp_path / "settings.ini"
+    settings.write_text(f"[Storage]\nformat = json\npath = {storage.file_path}\n", encoding="utf-8")
+    out, err = io.StringIO(), io.StringIO()
+
+    assert main(["--settings", str(settings), "list", "endpoints"], out, err) == EXIT_OK
+    assert out.getvalue().split() == ["web-1", "web-2", "db"]
+    assert main(["--settings", str(settings), "run", "missing"], out, err) == EXIT_USAGE
+    assert "missing" in err.getvalue()
+
+
+def test_enqueue_schedule_and_queue_share_job_store(storage, tmp_path):
+    """Задания и расписания из командной строки сохраняются в базе [Scheduler] path."""
+    settings = tmp_path / "settings.ini"
+    settings.write_text(f"[Storage]\nformat = json\npath = {tmp_path / 'data.json'}\n"
+                        f"[Scheduler]\npath = {tmp_path / 'jobs.db'}\n", encoding="utf-8")
+    out, err = io.StringIO(), io.StringIO()
+    base = ["--settings", str(settings)]
+
+    assert main(base + ["enqueue", "hello", "-e", "web-*", "--priority", "background"], out, err) == EXIT_OK
+    assert main(base + ["schedule", "add", "nightly", "hello", "0 3 * * *", "-g", "prod"], out, err) == EXIT_OK
+    assert main(base + ["schedule", "add", "broken", "hello", "61 * * * *"], out, err) == EXIT_USAGE
+    assert main(base + ["queue", "--format", "jsonl"], out, err) == EXIT_OK
+    assert main(base + ["schedule", "list"], out, err) == EXIT_OK
+
+    records = [json.loads(line) for line in out.getvalue().splitlines() if line.startswith("{")]
+    assert records[0]["key"] == "job-1" and records[0]["hosts"] == 2 and records[0]["priority"] == 1
+    assert records[-1] == {"event": "summary", "jobs": 1, "pending_hosts": 2}
+    assert out.getvalue().splitlines()[-1].startswith("nightly\t0 3 * * *\thello\tgroup=prod")
+    assert "61" in err.getvalue()
+
+
+def test_query_fans_out_over_sqlite_shards(storage, tmp_path):
+    """`query` по шаблону выполняет запрос на всех шардах и сливает строки по ключу."""
+    for shard in range(2):
+        path = tmp_path / f"shard-{shard}.db"
+        connection = sqlite3.connect(path)
+        connection.execute("CREATE TABLE t (n INTEGER)")
+        connection.executemany("INSERT INTO t VALUES (?)", [(shard + 2 * i,) for i in range(3)])
+        connection.commit()
+        connection.close()
+        storage.endpoints[f"shard-{shard}"] = {"name": f"shard-{shard}", "type": "SQLite", "path": str(path)}
+    storage.save()
+    settings = tmp_path / "settings.ini"
+    settings.write_text(f"[Storage]\nformat = json\npath = {storage.file_path}\n"
+                        f"[Startup]\nconnector_cache =\n", encoding="utf-8")
+    out, err = io.StringIO(), io.StringIO()
+    base = ["--settings", str(settings), "query"]
+
+    assert main(base + ["shard-*", "SELECT n FROM t ORDER BY n", "--order-by", "n", "--format", "csv"],
+                out, err) == EXIT_OK
+    assert out.getvalue().splitlines() == ["endpoint,n"] + [f"shard-{n % 2},{n}" for n in range(6)]
+    assert main(base + ["web-1", "SELECT 1"], out, err) == EXIT_USAGE
@@ -1,10 +1,12 @@
 """Unit-тесты для класса FormHandler в модуле controller.controller."""
 
 import tkinter as tk
+from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 
 import pytest
 from controller.controller import FormHandler
+from controller.script import ScriptBackend
 
 
 @pytest.fixture
@@ -107,3 +109,12 @@ def test_create_form_and_save(_mock_model, _mock_backend, _mock_ui, dummy_app):
         save_func()
 
     assert handler.data_model == mock_instance
+
+
+def test_script_option_source_uses_backend_interpreters():
+    """Окно Options скрипта берёт опции интерпретатора из ScriptBackend."""
+    handler = FormHandler.__new__(FormHandler)
+    handler._type = "scripts"
+    handler.controller = ScriptBackend(SimpleNamespace(storage=None))
+    handler.data_model = SimpleNamespace(interpreter="python")
+    assert handler._get_option_source() == handler.controller.interpreters["python"].available_options
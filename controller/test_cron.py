@@ -0,0 +1,34 @@
+"""Unit-тесты для расписаний controller.cron."""
+
+from datetime import datetime
+
+import pytest
+
+from controller.cron import CronError, CronSchedule
+
+
+def test_next_after_skips_to_matching_slot():
+    """Следующее срабатывание ищется строго после момента, с переходом через сутки и выходные."""
+    schedule = CronSchedule("*/15 9-17 * * 1-5")
+
+    assert schedule.next_after(datetime(2026, 3, 6, 10, 7)) == datetime(2026, 3, 6, 10, 15)
+    assert schedule.next_after(datetime(2026, 3, 6, 10, 15)) == datetime(2026, 3, 6, 10, 30)
+    # Пятница после 17:45 -> понедельник 9:00
+    assert schedule.next_after(datetime(2026, 3, 6, 17, 45)) == datetime(2026, 3, 9, 9, 0)
+    assert CronSchedule("@monthly").next_after(datetime(2026, 12, 31, 23, 59)) == datetime(2027, 1, 1)
+
+
+def test_day_of_month_or_day_of_week():
+    """Если ограничены оба поля дня, достаточно совпадения любого."""
+    schedule = CronSchedule("0 0 13 * 5")
+
+    assert schedule.next_after(datetime(2026, 3, 1)) == datetime(2026, 3, 6)
+    assert schedule.next_after(datetime(2026, 3, 12, 1)) == datetime(2026, 3, 13)
+    assert CronSchedule("0 0 * * 7").next_after(datetime(2026, 3, 1)) == datetime(2026, 3, 8)
+
+
+@pytest.mark.parametrize("expression", ["* * * *", "61 * * * *", "*/0 * * * *", "a * * * *", "0 0 31 2 *"])
+def test_invalid_expressions(expression):
+    """Неверные и никогда не срабатывающие выражения отклоняются."""
+    with pytest.raises(CronError):
+        CronSchedule(expression).next_after(datetime(2026, 1, 1))
@@ -0,0 +1,48 @@
+"""Unit-тесты для модели сводной панели controller.dashboard."""
+
+from connectors.channel import OutputChunk
+from controller.dashboard import CONNECTING, FAILED, OK, QUEUED, RUNNING, STOPPED, DashboardModel, visible_window
+from controller.engine import RunEvent
+from controller.runner import HostResult
+
+
+def test_events_move_hosts_through_states():
+    """События движка переводят строку хоста по состояниям и копят её вывод."""
+    model = DashboardModel(["web-1", "web-2", "db"])
+    keys = model.keys("fanout-1")
+    assert keys == ["fanout-1", "fanout-1:web-1", "fanout-1:web-2", "fanout-1:db"]
+    model.take_dirty()
+
+    assert model.apply(RunEvent("fanout-1:web-2", "started")) == 1
+    model.apply(RunEvent("fanout-1:web-2", "connected"))
+    model.apply(RunEvent("fanout-1:web-2", "output", OutputChunk("stdout", "привет\n", 0.0)))
+    row = model.rows[1]
+    assert (row.state, row.bytes_received) == (RUNNING, len("привет\n".encode()))
+    assert row.output.scrollback() == "привет\n"
+    assert model.rows[0].state == QUEUED and model.rows[0].elapsed() is None
+
+    result = HostResult(endpoint="web-2", success=False, exit_code=3, bytes_out=13, bytes_err=2, error="x")
+    model.apply(RunEvent("fanout-1:web-2", "result", result))
+    # Дубль результата по ключу fan-out не меняет строк.
+    assert model.apply(RunEvent("fanout-1", "result", result)) is None
+    model.apply(RunEvent("fanout-1:db", "started"))
+
+    assert model.take_dirty() == {1, 2}
+    assert (row.state, row.exit_code, row.bytes_received) == (FAILED, 3, 15)
+    assert row.elapsed() == row.elapsed() >= 0
+    assert model.summary() == {QUEUED: 1, CONNECTING: 1, RUNNING: 0, OK: 0, FAILED: 1, STOPPED: 0}
+    model.apply(RunEvent("fanout-1:db", "result", HostResult(endpoint="db", stopped="cancelled")))
+    assert model.rows[2].state == STOPPED
+    assert not model.finished
+    model.apply(RunEvent("fanout-1", "report", object()))
+    assert model.finished
+    model.close()
+
+
+def test_visible_window_is_bounded_by_height():
+    """Отрисовываются только строки, попадающие в окно, независимо от числа хостов."""
+    assert visible_window(0, 200, 20, 10000) == range(0, 11)
+    assert visible_window(500, 200, 20, 10000) == range(500, 511)
+    # Прокрутка за конец прижимает окно к последним строкам.
+    assert visible_window(9999, 200, 20, 10000) == range(9990, 10000)
+    assert visible_window(5, 200, 20, 3) == range(0, 3)
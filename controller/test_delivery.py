@@ -0,0 +1,149 @@
+"""Unit-тесты для доставки скриптов controller.delivery."""
+
+import configparser
+import shlex
+import threading
+from types import SimpleNamespace
+
+from controller.delivery import (STDIN_CHUNK, StreamedScript, UploadedScript, delivery_settings,
+                                 prepare_command, script_digest)
+from controller.runner import default_interpreters
+
+
+class FakeSftp:
+    """SFTP-клиент поверх словаря путь -> содержимое; домашний каталог — /home/u."""
+
+    def __init__(self, files=None):
+        self.files = dict(files or {})
+        self.dirs = set()
+        self.written = 0
+        self.closed = False
+        self._lock = threading.Lock()
+
+    def _abs(self, path):
+        return path if path.startswith("/") else f"/home/u/{path}"
+
+    def stat(self, path):
+        path = self._abs(path)
+        if path in self.dirs:
+            return SimpleNamespace(st_size=0)
+        if path not in self.files:
+            raise IOError(2, "No such file")
+        return SimpleNamespace(st_size=len(self.files[path]))
+
+    def mkdir(self, path, mode=0o777):
+        self.dirs.add(self._abs(path))
+
+    def normalize(self, path):
+        return self._abs(path)
+
+    def open(self, path, mode):
+        sftp, path = self, self._abs(path)
+
+        class RemoteFile:
+            def set_pipelined(self, pipelined):
+                pass
+
+            def write(self, data):
+                with sftp._lock:
+                    sftp.files[path] = sftp.files.get(path, b"") + data
+                    sftp.written += len(data)
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+        return RemoteFile()
+
+    def chmod(self, path, mode):
+        pass
+
+    def posix_rename(self, old, new):
+        self.files[self._abs(new)] = self.files.pop(self._abs(old))
+
+    def close(self):
+        self.closed = True
+
+
+def make_client(sftp):
+    return SimpleNamespace(open_sftp=lambda: sftp)
+
+
+def test_inline_command_survives_quotes():
+    """Код с кавычками и `$` передаётся в командной строке без искажений."""
+    code = 'echo "$HOME" it\'s "done"'
+    command = prepare_command(default_interpreters(), "bash", code, {"-e": True, "timeout": 5}, mode="inline")
+
+    assert shlex.split(command) == ["bash", "-e", "-c", code]
+
+
+def test_upload_once_then_reuse_cache():
+    """Первый запуск загружает скрипт, повторный берёт его из кэша без передачи данных."""
+    sftp = FakeSftp()
+    code = "echo big\n" * 1000
+    command = prepare_command(default_interpreters(), "bash", code, {}, mode="upload")
+    assert isinstance(command, UploadedScript)
+
+    first = command.resolve(make_client(sftp))
+    second = command.resolve(make_client(sftp))
+
+    path = f"/home/u/.cache/bino/scripts/{script_digest('bash', code)}.sh"
+    assert first == second == f"bash {path}"
+    assert sftp.files[path] == code.encode()
+    assert sftp.written == len(code.encode())
+    assert (command.uploads, command.hits) == (1, 1)
+    assert "/home/u/.cache/bino" in sftp.dirs and sftp.closed
+    assert [name for name in sftp.files if name.endswith(".tmp")] == []
+
+
+def test_interpreter_is_part_of_the_key():
+    """Один и тот же код для разных интерпретаторов лежит в разных файлах."""
+    assert script_digest("bash", "x") != script_digest("python", "x")
+    command = prepare_command(default_interpreters(), "python", "print(1)", {"-u": True}, mode="upload")
+
+    assert command.resolve(make_client(FakeSftp())).startswith("python3 -u /home/u/.cache/bino/scripts/")
+
+
+def test_stdin_mode_streams_in_chunks():
+    """Потоковый режим запускает `bash -s`/`python3 -` и пишет код кусками."""
+    sent = []
+    channel = SimpleNamespace(sendall=sent.append, shutdown_write=lambda: sent.append(None))
+    code = "ж" * (STDIN_CHUNK + 10)
+    command = prepare_command(default_interpreters(), "bash", code, {"-x": True}, mode="stdin")
+
+    assert isinstance(command, StreamedScript)
+    assert command.resolve(None) == "bash -x -s"
+    assert command.feed(channel) == len(code.encode())
+    assert [len(chunk) for chunk in sent[:-1]] == [STDIN_CHUNK * 2, 20] and sent[-1] is None
+    assert prepare_command(default_interpreters(), "python", "print(1)", {}, mode="stdin").resolve(None) == "python3 -"
+
+
+def test_stdin_feed_stops_when_remote_exits():
+    """Если процесс на хосте завершился раньше, запись прекращается без ошибки."""
+    def sendall(chunk):
+        raise OSError("Socket is closed")
+
+    command = StreamedScript(default_interpreters()["bash"], ["exit 0\n", "echo never\n"])
+
+    assert command.feed(SimpleNamespace(sendall=sendall, shutdown_write=lambda: None)) == 0
+
+
+def test_auto_mode_uses_threshold():
+    """В режиме auto загружаются только скрипты от порога; неизвестный интерпретатор — как есть."""
+    interpreters = default_interpreters()
+
+    assert isinstance(prepare_command(interpreters, "bash", "ls", {}, threshold=10), str)
+    assert isinstance(prepare_command(interpreters, "bash", "x" * 10, {}, threshold=10), UploadedScript)
+    assert prepare_command(interpreters, "perl", "x" * 100, {}, mode="upload", threshold=10) == "x" * 100
+
+
+def test_delivery_settings_from_config():
+    """Режим, порог и каталог кэша читаются из [Execution]."""
+    config = configparser.ConfigParser()
+    config.read_dict({"Execution": {"delivery": "upload", "upload_threshold": "5", "upload_dir": '"/var/tmp/b"'}})
+
+    assert delivery_settings(config) == {"mode": "upload", "threshold": 5, "cache_dir": "/var/tmp/b"}
+    config.set("Execution", "delivery", "scp")
+    assert delivery_settings(config)["mode"] == "auto"
@@ -0,0 +1,60 @@
+"""Unit-тесты для EventDispatcher."""
+
+import queue
+from unittest.mock import MagicMock
+
+from controller.dispatcher import EventDispatcher
+from controller.engine import RunEvent
+
+
+def test_poll_once_dispatches_by_key():
+    """События доставляются подписчику своего ключа, чужие отбрасываются."""
+    events = queue.Queue()
+    dispatcher = EventDispatcher(MagicMock(), events)
+    received = []
+    dispatcher.subscribe("run-1", received.append)
+
+    events.put(RunEvent("run-1", "output", "a"))
+    events.put(RunEvent("run-2", "output", "b"))
+    events.put(RunEvent("run-1", "result", None))
+
+    assert dispatcher.poll_once() == 3
+    assert [event.kind for event in received] == ["output", "result"]
+
+
+def test_poll_once_limits_batch():
+    """За один тик обрабатывается не больше max_events событий."""
+    events = queue.Queue()
+    dispatcher = EventDispatcher(MagicMock(), events, max_events=2)
+    for i in range(5):
+        events.put(RunEvent("run-1", "output", i))
+
+    assert dispatcher.poll_once() == 2
+    assert events.qsize() == 3
+
+
+def test_start_schedules_single_timer():
+    """Опрос запускается одним таймером root.after и продолжает себя сам."""
+    root = MagicMock()
+    dispatcher = EventDispatcher(root, queue.Queue(), tick_ms=20)
+    dispatcher.start()
+    dispatcher.start()
+
+    root.after.assert_called_once_with(20, dispatcher._poll)
+    dispatcher._poll()
+    assert root.after.call_count == 2
+
+
+def test_failing_callback_does_not_stop_polling():
+    """Исключение в обработчике не прерывает обработку остальных событий."""
+    events = queue.Queue()
+    dispatcher = EventDispatcher(MagicMock(), events)
+    dispatcher.subscribe("bad", MagicMock(side_effect=RuntimeError("x")))
+    good = []
+    dispatcher.subscribe("good", good.append)
+    events.put(RunEvent("bad", "output"))
+    events.put(RunEvent("good", "output"))
+
+    dispatcher.poll_once()
+
+    assert len(good) == 1
@@ -0,0 +1,340 @@
+"""Unit-тесты для движка выполнения controller.engine."""
+
+import os
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from controller.cancel import RunLimits, kill_command, wrap_command
+from controller.delivery import StreamedScript
+from controller.engine import ExecutionEngine
+from controller.history import RunHistory
+from interpreters.bash import BashInterpreter
+
+
+class FakeChannel:
+    """Канал paramiko с заранее заданным выводом и настоящим fd для add_reader."""
+
+    def __init__(self, stdout=(), stderr=(), exit_status=0):
+        self.stdout = list(stdout)
+        self.stderr = list(stderr)
+        self.exit_status = exit_status
+        self.command = None
+        self.stdin = bytearray()
+        self.stdin_closed = False
+        self.eof_received = True
+        self.closed = False
+        self._read_fd, self._write_fd = os.pipe()
+        os.write(self._write_fd, b"x")
+
+    def fileno(self):
+        return self._read_fd
+
+    def exec_command(self, command):
+        self.command = command
+
+    def recv_ready(self):
+        return bool(self.stdout)
+
+    def recv_stderr_ready(self):
+        return bool(self.stderr)
+
+    def recv(self, _size):
+        return self.stdout.pop(0)
+
+    def recv_stderr(self, _size):
+        return self.stderr.pop(0)
+
+    def recv_exit_status(self):
+        return self.exit_status
+
+    def sendall(self, data):
+        self.stdin += data
+
+    def shutdown_write(self):
+        self.stdin_closed = True
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            os.close(self._read_fd)
+            os.close(self._write_fd)
+
+
+class HangingChannel(FakeChannel):
+    """Канал команды, которая не завершается сама: EOF не приходит, пока канал открыт."""
+
+    def __init__(self, stdout=(), stderr=()):
+        super().__init__(stdout, stderr)
+        self.eof_received = False
+
+    def _consumed(self):
+        # Когда данные кончились, fd перестаёт быть готовым к чтению.
+        if not self.stdout and not self.stderr:
+            os.read(self._read_fd, 1)
+
+    def recv(self, size):
+        data = super().recv(size)
+        self._consumed()
+        return data
+
+    def recv_stderr(self, size):
+        data = super().recv_stderr(size)
+        self._consumed()
+        return data
+
+
+def wait_until(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "условие не выполнилось"
+        time.sleep(0.01)
+
+
+def make_connector(channel_factory, acquire=None):
+    """Поддельный коннектор, пул которого выдаёт клиента с каналами из фабрики."""
+    client = MagicMock()
+    client.get_transport.return_value.open_session.side_effect = channel_factory
+    pool = MagicMock()
+    pool.acquire.side_effect = acquire or (lambda params: client)
+    connector = MagicMock()
+    connector.pool.return_value = pool
+    return connector
+
+
+@pytest.fixture
+def engine_factory():
+    """Создает движки и останавливает их после теста."""
+    engines = []
+
+    def create(connector):
+        engine = ExecutionEngine(connector=connector, io_workers=4)
+        engines.append(engine)
+        return engine
+
+    yield create
+    for engine in engines:
+        engine.stop()
+
+
+def drain(engine):
+    """Забирает все события из очереди движка."""
+    events = []
+    while not engine.events.empty():
+        events.append(engine.events.get_nowait())
+    return events
+
+
+def test_submit_streams_output_and_result(engine_factory):
+    """Вывод канала публикуется событиями, результат содержит весь вывод."""
+    channels = []
+
+    def new_channel():
+        channels.append(FakeChannel(stdout=[b"hello ", b"world\n"]))
+        return channels[-1]
+
+    connector = make_connector(new_channel)
+    engine = engine_factory(connector)
+
+    handle = engine.submit("web-1", {"ip": "10.0.0.1"}, "uptime")
+    result = handle.result(timeout=5)
+
+    assert result.success is True
+    assert result.output == "hello world\n"
+    assert channels[0].command == wrap_command("uptime")
+    assert channels[0].closed
+    kinds = [event.kind for event in drain(engine) if event.key == handle.run_id]
+    assert kinds == ["started", "connected", "output", "output", "result"]
+    connector.pool.return_value.release.assert_called_once()
+    assert handle.run_id not in engine.runs
+
+
+def test_submit_resolves_deferred_command(engine_factory):
+    """Отложенная команда разрешается по соединению до открытия канала."""
+    channel = FakeChannel(stdout=[b"ok\n"])
+    connector = make_connector(lambda: channel)
+    client = connector.pool.return_value.acquire.side_effect({})
+    command = MagicMock()
+    command.resolve.return_value = "bash /home/u/.cache/bino/scripts/abc.sh"
+    engine = engine_factory(connector)
+
+    result = engine.submit("web-1", {}, command).result(timeout=5)
+
+    assert result.success is True
+    command.resolve.assert_called_once_with(client)
+    assert channel.command == wrap_command("bash /home/u/.cache/bino/scripts/abc.sh")
+
+
+def test_submit_streams_script_to_stdin(engine_factory):
+    """Код потоковой команды пишется в stdin канала и закрывается EOF до кода завершения."""
+    channel = FakeChannel(stdout=[b"done\n"])
+    engine = engine_factory(make_connector(lambda: channel))
+    command = StreamedScript(BashInterpreter(), (f"echo {i}\n" for i in range(1000)))
+
+    result = engine.submit("web-1", {}, command).result(timeout=5)
+
+    assert result.success is True
+    assert channel.command == wrap_command("bash -s")
+    assert channel.stdin.decode() == "".join(f"echo {i}\n" for i in range(1000))
+    assert channel.stdin_closed and command.bytes_sent == len(channel.stdin)
+
+
+def test_submit_success_follows_exit_status(engine_factory):
+    """Успех определяется кодом завершения: stderr при коде 0 — не ошибка, без кода — неуспех."""
+    engine = engine_factory(make_connector(lambda: FakeChannel(stderr=[b"progress 50%\n"])))
+    result = engine.submit("web-1", {}, "apt-get update").result(timeout=5)
+    assert result.success is True and result.exit_code == 0
+    assert result.error == "progress 50%\n"
+
+    engine = engine_factory(make_connector(lambda: FakeChannel(stderr=[b"boom\n"], exit_status=-1)))
+    result = engine.submit("web-1", {}, "false").result(timeout=5)
+    assert result.success is False and result.exit_code is None
+    assert result.error.startswith("boom\n")
+
+
+def test_submit_collects_exit_status_and_phases(engine_factory, tmp_path):
+    """Ненулевой код завершения — неуспех; фазы, байты и вывод попадают в историю."""
+    history = RunHistory(str(tmp_path / "history.db"))
+    connector = make_connector(lambda: FakeChannel(stdout=[b"partial\n"], exit_status=3))
+    engine = engine_factory(connector)
+    engine.history = history
+
+    result = engine.submit("web-1", {}, "exit 3", script="deploy").result(timeout=5)
+    history.flush(timeout=5)
+
+    assert result.success is False
+    assert result.exit_code == 3
+    assert result.bytes_out == len(b"partial\n")
+    assert set(result.timings) == {"connect", "auth", "exec", "drain"}
+    [record] = history.runs(script="deploy")
+    assert (record.endpoint, record.exit_code, record.reused) == ("web-1", 3, True)
+    assert history.output_text(record.id) == "partial\n"
+    history.close()
+
+
+def test_submit_sink_receives_interleaved_streams(engine_factory):
+    """sink получает stdout и stderr по потокам; разрезанный UTF-8 не портится."""
+    data = "ошибка\n".encode("utf-8")
+    sink = MagicMock()
+    engine = engine_factory(make_connector(lambda: FakeChannel(stdout=[b"ok\n"], stderr=[data[:3], data[3:]])))
+
+    result = engine.submit("web-1", {}, "cmd", sink=sink).result(timeout=5)
+
+    written = [c.args for c in sink.write.call_args_list]
+    assert ("ok\n", "stdout") in written
+    assert "".join(text for text, stream in written if stream == "stderr") == "ошибка\n"
+    assert result.error == "ошибка\n"
+
+
+def test_submit_connection_error(engine_factory):
+    """Ошибка подключения попадает в результат, соединение не возвращается в пул."""
+    def fail(params):
+        raise OSError("unreachable")
+
+    connector = make_connector(FakeChannel, acquire=fail)
+    engine = engine_factory(connector)
+
+    result = engine.submit("web-1", {}, "uptime").result(timeout=5)
+
+    assert result.success is False
+    assert "unreachable" in result.error
+    connector.pool.return_value.release.assert_not_called()
+
+
+def test_fanout_respects_concurrency(engine_factory):
+    """Fan-out не обслуживает одновременно больше хостов, чем задано."""
+    active, peak = [0], [0]
+    lock = threading.Lock()
+    client = MagicMock()
+    client.get_transport.return_value.open_session.side_effect = lambda: FakeChannel(stdout=[b"ok\n"])
+
+    def slow_acquire(params):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        return client
+
+    engine = engine_factory(make_connector(None, acquire=slow_acquire))
+    targets = {f"web-{i}": {"ip": f"10.0.0.{i}"} for i in range(5)}
+
+    handle = engine.fanout("check", targets, "uptime", concurrency=2)
+    report = handle.result(timeout=5)
+
+    assert peak[0] == 2
+    assert len(report.succeeded) == 5
+    events = [event for event in drain(engine) if event.key == handle.run_id]
+    assert [event.kind for event in events].count("result") == 5
+    assert events[-1].kind == "report"
+
+
+def test_submit_test_publishes_result(engine_factory):
+    """Проверка соединения выполняется в движке и публикует результат."""
+    engine = engine_factory(make_connector(FakeChannel))
+    connector = MagicMock()
+    connector.test_connection.return_value = (True, "")
+
+    handle = engine.submit_test(connector, {"name": "web-1"})
+
+    assert handle.result(timeout=5) == (True, "")
+    event = engine.events.get(timeout=1)
+    assert (event.key, event.kind, event.payload) == (handle.run_id, "result", (True, ""))
+
+
+def test_cancel_kills_remote_process_group(engine_factory):
+    """Отмена закрывает канал и останавливает группу процессов, о которой сообщила обёртка."""
+    channels = [HangingChannel(stderr=[b"__BINO_PGID__:4242\n"]), FakeChannel()]
+    connector = make_connector(lambda: channels.pop(0))
+    main, kill = channels
+    engine = engine_factory(connector)
+
+    handle = engine.submit("web-1", {}, "sleep 1000", limits=RunLimits(kill_grace=2))
+    wait_until(lambda: not main.stderr)
+    handle.cancel()
+    result = handle.result(timeout=5)
+
+    assert (result.success, result.stopped, result.exit_code) == (False, "cancelled", None)
+    assert "__BINO_PGID__" not in result.error and result.bytes_err == 0
+    assert kill.command == kill_command(4242, 2) and kill.closed
+    assert main.closed
+    connector.pool.return_value.release.assert_called_once()
+
+
+def test_idle_timeout_stops_silent_run(engine_factory):
+    """Запуск без вывода дольше idle_timeout останавливается движком."""
+    channel = HangingChannel(stdout=[b"started\n"])
+    engine = engine_factory(make_connector(lambda: channel))
+
+    started = time.monotonic()
+    result = engine.submit("web-1", {}, "cat", limits=RunLimits(idle_timeout=0.2)).result(timeout=5)
+
+    assert result.stopped == "idle_timeout"
+    assert result.output == "started\n"
+    assert 0.2 <= time.monotonic() - started < 3
+    assert channel.closed
+
+
+def test_cancel_fanout_stops_running_and_queued_hosts(engine_factory):
+    """Отмена fan-out запуска останавливает и работающие, и ожидающие очереди хосты."""
+    channels = []
+
+    def new_channel():
+        channels.append(HangingChannel())
+        return channels[-1]
+
+    engine = engine_factory(make_connector(new_channel))
+    targets = {f"web-{i}": {} for i in range(3)}
+
+    handle = engine.fanout("hang", targets, "sleep 1000", concurrency=1, limits=RunLimits(kill_mode="close"))
+    wait_until(lambda: channels)
+    handle.cancel()
+    report = handle.result(timeout=5)
+
+    assert sorted(result.endpoint for result in report.results) == ["web-0", "web-1", "web-2"]
+    assert {result.stopped for result in report.results} == {"cancelled"}
+    assert len(channels) == 1 and channels[0].closed
+    assert channels[0].command == "sleep 1000"
@@ -0,0 +1,80 @@
+"""Unit-тесты для истории запусков controller.history."""
+
+import time
+
+import pytest
+
+from controller.history import RunHistory, decode_records, encode_records
+from controller.runner import HostResult
+
+
+@pytest.fixture
+def history(tmp_path):
+    """История запусков во временном каталоге."""
+    history = RunHistory(str(tmp_path / "history.db"), chunk_size=16)
+    yield history
+    history.close()
+
+
+def record_run(history, endpoint, duration, script="deploy", started_at=None, output=b""):
+    """Сохраняет запуск с заданной длительностью."""
+    recorder = history.recorder(endpoint, script=script)
+    for i in range(0, len(output), 10):
+        recorder.write("stdout" if i % 20 == 0 else "stderr", output[i:i + 10], 1000.0 + i)
+    result = HostResult(endpoint=endpoint, success=True, duration=duration, exit_code=0,
+                        bytes_out=len(output), started_at=started_at or time.time(),
+                        timings={"connect": duration / 4, "auth": 0.0, "exec": 0.01, "drain": duration / 2})
+    return recorder.finish(result)
+
+
+def test_frame_roundtrip():
+    """Кадр вывода разбирается обратно в те же записи."""
+    records = [("stdout", 1.5, b"abc"), ("stderr", 2.5, b""), ("stdout", 3.0, b"\x00\xff")]
+
+    assert list(decode_records(encode_records(records))) == records
+
+
+def test_run_is_persisted_with_chunked_output(history):
+    """Запуск сохраняется с фазами, а вывод — несколькими сжатыми кадрами."""
+    output = b"0123456789" * 10
+    record = record_run(history, "web-1", 2.0, output=output)
+    history.flush(timeout=5)
+
+    [stored] = history.runs(endpoint="web-1")
+    assert stored.id == record.id
+    assert stored.timings == {"connect": 0.5, "auth": 0.0, "exec": 0.01, "drain": 1.0}
+    assert stored.exit_code == 0 and stored.bytes_out == 100
+    chunks = list(history.output(record.id))
+    assert b"".join(chunk.data for chunk in chunks) == output
+    assert [chunk.stream for chunk in chunks[:2]] == ["stdout", "stderr"]
+    assert history._query("SELECT COUNT(*) FROM output_chunks")[0][0] > 1
+
+
+def test_runs_filters(history):
+    """Отбор по скрипту, интервалу и успешности; новые первыми."""
+    record_run(history, "web-1", 1.0, started_at=100.0)
+    record_run(history, "web-2", 1.0, started_at=200.0)
+    record_run(history, "web-1", 1.0, script="other", started_at=300.0)
+    history.flush(timeout=5)
+
+    assert [r.endpoint for r in history.runs(script="deploy")] == ["web-2", "web-1"]
+    assert [r.started_at for r in history.runs(since=150.0)] == [300.0, 200.0]
+    assert history.runs(success=False) == []
+
+
+def test_slowest_hosts_and_regressions(history):
+    """Медленные хосты и регрессии относительно медианы прошлых запусков."""
+    for i in range(5):
+        record_run(history, "fast", 1.0, started_at=100.0 + i)
+        record_run(history, "slow", 5.0, started_at=100.0 + i)
+    record_run(history, "fast", 4.0, started_at=200.0)
+    history.flush(timeout=5)
+
+    slowest = history.slowest_hosts(script="deploy")
+    assert slowest[0][0] == "slow" and slowest[0][3] == 5
+    assert history.slowest_hosts(metric="drain")[0][0] == "slow"
+
+    [(endpoint, latest, baseline, ratio)] = history.regressions("deploy")
+    assert (endpoint, latest, baseline, ratio) == ("fast", 4.0, 1.0, 4.0)
+    with pytest.raises(ValueError):
+        history.slowest_hosts(metric="name; DROP TABLE runs")
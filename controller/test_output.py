@@ -0,0 +1,114 @@
+"""Unit-тесты для буферов вывода controller.output."""
+
+import threading
+
+from controller.output import MAX_LINE_CHARS, OutputBuffer, StreamDecoder, TailBuffer
+
+
+def test_drain_coalesces_chunks():
+    """Несколько кусков между кадрами отдаются одной пачкой."""
+    buffer = OutputBuffer(max_lines=100)
+    buffer.write("a\n")
+    buffer.write("b")
+    buffer.write("c\n")
+
+    assert buffer.drain() == (False, [("stdout", "a\nbc\n")])
+    assert buffer.drain() == (False, [])
+
+
+def test_scrollback_is_bounded_and_spills_to_disk(tmp_path):
+    """В памяти остаются последние строки, вытесненные уходят в файл."""
+    buffer = OutputBuffer(max_lines=3, spill_dir=str(tmp_path))
+    for i in range(10):
+        buffer.write(f"line {i}\n")
+
+    assert buffer.scrollback() == "line 7\nline 8\nline 9\n"
+    assert buffer.spilled_lines == 7
+
+    target = tmp_path / "full.log"
+    buffer.export(str(target))
+    assert target.read_text(encoding="utf-8") == "".join(f"line {i}\n" for i in range(10))
+    buffer.close()
+
+
+def test_drain_keeps_stream_order():
+    """stdout и stderr возвращаются сегментами в порядке поступления."""
+    buffer = OutputBuffer()
+    buffer.write("a\n")
+    buffer.write("b\n")
+    buffer.write("oops\n", "stderr")
+    buffer.write("c\n")
+
+    assert buffer.drain() == (False, [("stdout", "a\nb\n"), ("stderr", "oops\n"), ("stdout", "c\n")])
+    assert buffer.scrollback() == "a\nb\noops\nc\n"
+
+
+def test_drain_resets_when_ui_falls_behind():
+    """Если непоказанного больше прокрутки, UI получает кольцо целиком."""
+    buffer = OutputBuffer(max_lines=2)
+    buffer.write("1\n2\n3\n4\n")
+    buffer.write("5")
+
+    assert buffer.drain() == (True, [("stdout", "3\n4\n5")])
+    assert buffer.drain() == (False, [])
+    buffer.write("\n")
+    assert buffer.drain() == (False, [("stdout", "\n")])
+
+
+def test_long_line_without_newline_is_split():
+    """Строка без перевода строки не копится в памяти бесконечно."""
+    buffer = OutputBuffer(max_lines=10)
+    buffer.write("x" * (MAX_LINE_CHARS + 1))
+
+    assert buffer.total_lines == 1
+    assert buffer.scrollback().endswith("x\n")
+
+
+def test_close_discards_further_output():
+    """После закрытия окна вывод из движка отбрасывается."""
+    buffer = OutputBuffer(max_lines=10)
+    buffer.close()
+    buffer.write("late\n")
+    assert buffer.drain() == (False, [])
+
+
+def test_concurrent_writes_keep_all_lines():
+    """Запись из нескольких потоков не теряет строки."""
+    buffer = OutputBuffer(max_lines=100000)
+
+    def writer(n):
+        for i in range(1000):
+            buffer.write(f"{n}:{i}\n")
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert buffer.total_lines == 4000
+    assert buffer.drain()[1][0][1].count("\n") == 4000
+
+
+def test_tail_buffer_keeps_last_chars():
+    """TailBuffer хранит только хвост вывода."""
+    tail = TailBuffer(max_chars=5)
+    for chunk in ("abc", "def", "ghi"):
+        tail.write(chunk)
+
+    assert tail.getvalue() == "efghi"
+    assert tail.truncated is True
+    assert tail.total_chars == 9
+
+
+def test_stream_decoder_joins_split_characters():
+    """Многобайтный символ, разрезанный между кусками, декодируется целиком."""
+    data = "привет".encode("utf-8")
+    decoder = StreamDecoder()
+
+    text = decoder.decode("stdout", data[:3]) + decoder.decode("stderr", b"e") + decoder.decode("stdout", data[3:])
+
+    assert text == "пeривет"
+    assert decoder.flush("stdout") == ""
+    assert decoder.decode("stderr", b"\xd0") == ""
+    assert decoder.flush("stderr") == "\ufffd"
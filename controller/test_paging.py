@@ -0,0 +1,62 @@
+"""Unit-тесты для постраничной выдачи имён controller.paging."""
+
+import time
+
+from controller.paging import PagedNames
+from controller.storage import SqliteStorage
+
+
+def test_pages_through_list():
+    """Имена отдаются страницами до конца источника."""
+    names = PagedNames([f"n{i}" for i in range(5)], page_size=2)
+
+    assert names.next_page() == ["n0", "n1"]
+    assert names.next_page() == ["n2", "n3"]
+    assert names.has_more() is True
+    assert names.next_page() == ["n4"]
+    assert names.has_more() is False
+    assert names.next_page() == []
+
+
+def test_added_names_are_not_repeated():
+    """Запись, созданная из UI, не появляется повторно при подгрузке."""
+    source = {f"n{i}": {} for i in range(3)}
+    names = PagedNames(source, page_size=2)
+    assert names.next_page() == ["n0", "n1"]
+
+    source["new"] = {}
+    names.added("new")
+
+    assert names.next_page() == ["n2"]
+    assert names.has_more() is False
+
+
+def test_removed_and_renamed_names_keep_offset():
+    """Удаление и переименование показанной записи не теряют непоказанные."""
+    source = {f"n{i}": {} for i in range(4)}
+    names = PagedNames(source, page_size=2)
+    assert names.next_page() == ["n0", "n1"]
+
+    del source["n0"]
+    names.removed("n0")
+    source["renamed"] = source.pop("n1")
+    names.renamed("n1", "renamed")
+
+    assert names.next_page() == ["n2", "n3"]
+    assert names.next_page() == []
+    assert names.has_more() is False
+
+
+def test_sqlite_first_page_is_fast(tmp_path):
+    """Первая страница большого хранилища читается по индексу, без загрузки всех записей."""
+    storage = SqliteStorage(str(tmp_path / "data.db"))
+    storage.import_data({"endpoints": {f"host-{i}": {"name": f"host-{i}", "type": "ssh"}
+                                       for i in range(100000)}})
+    started = time.monotonic()
+    names = PagedNames(storage.endpoints, page_size=200)
+    first = names.next_page()
+    elapsed = time.monotonic() - started
+
+    assert first[:2] == ["host-0", "host-1"] and len(first) == 200
+    assert elapsed < 0.5
+    storage.close()
@@ -0,0 +1,131 @@
+"""Unit-тесты для массовой проверки подключения controller.probe."""
+
+import csv
+import json
+import threading
+import time
+
+from controller.engine import ExecutionEngine
+from controller.probe import ProbeCache, ProbeResult, export_results, fingerprint, plan_probes, sort_results
+
+
+class FakeConnector:
+    """Коннектор, «проверяющий» эндпоинт по заранее заданным замерам."""
+
+    def __init__(self, timings, delay=0.0):
+        self.timings = timings
+        self.delay = delay
+        self.calls = []
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def build_params(self, data):
+        return dict(data)
+
+    def probe(self, params):
+        with self._lock:
+            self.calls.append(params["name"])
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        timings = self.timings[params["name"]]
+        if "auth" in timings and timings["auth"] < 0:
+            return False, "Ошибка аутентификации", dict(timings, auth=0.01)
+        return True, "", timings
+
+
+ENDPOINTS = {
+    "fast": {"name": "fast", "type": "ssh"},
+    "slow": {"name": "slow", "type": "ssh"},
+    "rotated": {"name": "rotated", "type": "ssh"},
+    "odd": {"name": "odd", "type": "telnet"},
+}
+TIMINGS = {
+    "fast": {"tcp": 0.001, "banner": 0.002, "kex": 0.01, "auth": 0.01},
+    "slow": {"tcp": 0.2, "banner": 0.5, "kex": 0.03, "auth": 0.02},
+    "rotated": {"tcp": 0.001, "banner": 0.002, "kex": 0.01, "auth": -1},
+}
+
+
+def test_engine_probes_in_parallel_and_reports():
+    """Хосты проверяются параллельно в пределах лимита, результат каждого — отдельным событием."""
+    connector = FakeConnector(TIMINGS, delay=0.05)
+    ready, targets = plan_probes(ENDPOINTS, {"ssh": connector})
+    engine = ExecutionEngine()
+    try:
+        results = engine.probe(targets, concurrency=2).future.result(timeout=5)
+    finally:
+        engine.stop()
+
+    assert [result.error for result in ready] == ["Неизвестный тип соединения: telnet"]
+    assert sorted(connector.calls) == ["fast", "rotated", "slow"] and connector.peak == 2
+    by_name = {result.endpoint: result for result in results}
+    assert by_name["rotated"].status == "failed:auth" and by_name["fast"].success
+    events = [engine.events.get_nowait() for _ in range(engine.events.qsize())]
+    assert [event.kind for event in events] == ["result"] * 3 + ["report"]
+    assert events[-1].payload == results
+
+
+def test_cache_honours_ttl_and_parameters(tmp_path):
+    """Свежий результат берётся из кэша, пока не истёк ttl и не изменились параметры."""
+    path = str(tmp_path / "probe.json")
+    connectors = {"ssh": FakeConnector(TIMINGS)}
+    key = fingerprint(connectors["ssh"].build_params(ENDPOINTS["fast"]))
+    cache = ProbeCache(path, ttl=60)
+    result = ProbeResult(endpoint="fast", success=True, timings=TIMINGS["fast"], checked_at=time.time())
+    cache.put(result, key)
+    cache.save()
+
+    reloaded = ProbeCache(path, ttl=60)
+    ready, targets = plan_probes({"fast": ENDPOINTS["fast"]}, connectors, reloaded)
+    assert targets == {} and ready[0].cached and ready[0].total == result.total
+
+    changed = {"fast": dict(ENDPOINTS["fast"], password="new")}
+    assert list(plan_probes(changed, connectors, reloaded)[1]) == ["fast"]
+    assert list(plan_probes({"fast": ENDPOINTS["fast"]}, connectors, reloaded, refresh=True)[1]) == ["fast"]
+    assert reloaded.get("fast", key, now=time.time() + 120) is None
+
+
+def test_cancelled_probe_is_not_cached(tmp_path):
+    """Хосты, проверка которых отменена кнопкой Stop, не попадают в кэш."""
+    connector = FakeConnector(TIMINGS, delay=0.5)
+    _, targets = plan_probes({"slow": ENDPOINTS["slow"]}, {"ssh": connector})
+    cache = ProbeCache(str(tmp_path / "probe.json"), ttl=600)
+    engine = ExecutionEngine()
+    try:
+        handle = engine.probe(targets, concurrency=1)
+        time.sleep(0.1)
+        handle.cancel()
+        results = handle.future.result(timeout=5)
+    finally:
+        engine.stop()
+    assert [result.status for result in results] == ["failed:cancelled"]
+    for result in results:
+        cache.put(result, fingerprint(targets[result.endpoint][1]))
+    cache.save()
+    assert ProbeCache(cache.path, ttl=600).get("slow", fingerprint(targets["slow"][1])) is None
+
+
+def test_sort_and_export(tmp_path):
+    """Сортировка по фазе ставит хосты без замера в конец; экспорт — CSV и JSONL."""
+    results = [
+        ProbeResult(endpoint="a", success=True, timings={"tcp": 0.3, "banner": 0.1}),
+        ProbeResult(endpoint="b", phase="tcp", error="refused", timings={"tcp": 0.01}),
+        ProbeResult(endpoint="c", success=True, timings={"tcp": 0.1, "banner": 0.5}),
+    ]
+    assert [r.endpoint for r in sort_results(results, "banner", reverse=True)] == ["c", "a", "b"]
+    assert [r.endpoint for r in sort_results(results, "total")] == ["b", "a", "c"]
+    assert [r.endpoint for r in sort_results(results, "status")] == ["b", "a", "c"]
+
+    assert export_results(results, str(tmp_path / "probe.csv")) == 3
+    with open(tmp_path / "probe.csv", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert rows[1]["status"] == "failed:tcp" and rows[1]["banner"] == "" and rows[1]["error"] == "refused"
+
+    export_results(results, str(tmp_path / "probe.jsonl"))
+    with open(tmp_path / "probe.jsonl", encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    assert records[2]["total"] == 0.6 and records[2]["timings"]["banner"] == 0.5
@@ -0,0 +1,74 @@
+"""Unit-тесты для параллельного SQL-запроса controller.query."""
+
+import sqlite3
+import threading
+
+import pytest
+
+from connectors.SQLite import SqliteConnector
+from controller.query import SqlFanOut
+
+
+def make_shards(tmp_path, count=3, rows=20):
+    """SQLite-шарды: в шарде i строки с ts = i, i + count, i + 2 * count, ..."""
+    connector = SqliteConnector()
+    targets = {}
+    for shard in range(count):
+        path = str(tmp_path / f"shard-{shard}.db")
+        connection = sqlite3.connect(path)
+        connection.execute("CREATE TABLE events (id INTEGER, ts INTEGER)")
+        connection.executemany("INSERT INTO events VALUES (?, ?)",
+                               [(shard * 1000 + i, shard + i * count) for i in range(rows)])
+        connection.commit()
+        connection.close()
+        targets[f"shard-{shard}"] = (connector, connector.build_params({"path": path}))
+    return targets
+
+
+class SlowConnector:
+    """Коннектор, чей запрос не возвращает строки, пока его не отпустят."""
+
+    def __init__(self, release):
+        self.release = release
+
+    def stream_query(self, params, sql, args=None, itersize=None):
+        self.release.wait(5)
+        raise ValueError("timeout")
+
+
+def test_merge_orders_rows_across_shards(tmp_path):
+    """k-путевое слияние даёт общий порядок по ключу, строки помечены эндпоинтом."""
+    targets = make_shards(tmp_path)
+    fanout = SqlFanOut(targets, "SELECT id, ts FROM events ORDER BY ts", itersize=7,
+                       order_by=["ts"], queue_batches=1)
+    assert fanout.columns == ["endpoint", "id", "ts"]
+    rows = [row for batch in fanout for row in batch]
+    assert [row[2] for row in rows] == list(range(60))
+    assert rows[:2] == [("shard-0", 0, 0), ("shard-1", 1000, 1)]
+    assert fanout.rows == 60 and all(result.rows == 20 and result.success for result in fanout.results.values())
+
+    descending = SqlFanOut(targets, "SELECT id, ts FROM events ORDER BY ts DESC", order_by=["ts"], descending=True)
+    assert [row[2] for batch in descending for row in batch] == list(range(59, -1, -1))
+
+
+def test_unordered_fanout_reports_failed_shard(tmp_path):
+    """Без слияния строки идут по мере поступления; ошибка шарда не останавливает остальные."""
+    targets = make_shards(tmp_path, count=2)
+    targets["broken"] = (SqliteConnector(), {"path": str(tmp_path / "missing" / "x.db")})
+    with SqlFanOut(targets, "SELECT id FROM events", concurrency=2, itersize=3) as fanout:
+        rows = [row for batch in fanout for row in batch]
+    assert len(rows) == 40 and {row[0] for row in rows} == {"shard-0", "shard-1"}
+    assert [result.endpoint for result in fanout.failed] == ["broken"]
+    assert "unable to open" in fanout.results["broken"].error
+
+
+def test_merge_key_must_be_a_result_column(tmp_path):
+    """Слияние по отсутствующему столбцу — ошибка; закрытие останавливает потоки шардов."""
+    targets = make_shards(tmp_path, count=2)
+    release = threading.Event()
+    targets["slow"] = (SlowConnector(release), {})
+    fanout = SqlFanOut(targets, "SELECT id FROM events ORDER BY id", order_by=["ts"])
+    with pytest.raises(ValueError, match="ts"):
+        list(fanout)
+    release.set()
+    assert fanout.columns == ["endpoint", "id"]
@@ -0,0 +1,68 @@
+"""Unit-тесты для модуля controller.runner."""
+
+from unittest.mock import MagicMock
+
+from controller.file import FileStorage
+from controller.runner import FanOutReport, HostResult, build_command, endpoint_table, select_endpoints
+from model.record import EndpointTable
+
+
+ENDPOINTS = {
+    "web-1": {"name": "web-1", "type": "ssh", "ip": "10.0.0.1", "port": "22", "group": "web"},
+    "web-2": {"name": "web-2", "type": "ssh", "ip": "10.0.0.2", "port": "22", "group": "web"},
+    "db-1": {"name": "db-1", "type": "ssh", "ip": "10.0.0.3", "port": "22", "group": "db"},
+}
+
+
+def test_select_endpoints_by_names_and_patterns():
+    """Отбор по точным именам и glob-шаблонам."""
+    assert list(select_endpoints(ENDPOINTS, names=["db-1"])) == ["db-1"]
+    assert list(select_endpoints(ENDPOINTS, names=["web-*"])) == ["web-1", "web-2"]
+
+
+def test_select_endpoints_by_group():
+    """Отбор по группе, без имён берутся все эндпоинты группы."""
+    assert list(select_endpoints(ENDPOINTS, group="web")) == ["web-1", "web-2"]
+    assert list(select_endpoints(ENDPOINTS, names=["*-1"], group="db")) == ["db-1"]
+    assert len(select_endpoints(ENDPOINTS)) == 3
+
+
+def test_select_endpoints_from_table():
+    """Отбор по колоночной таблице даёт тот же результат, что и по словарю."""
+    table = EndpointTable.from_dicts(ENDPOINTS)
+    assert select_endpoints(table, names=["*-1"]) == select_endpoints(ENDPOINTS, names=["*-1"])
+    assert select_endpoints(table, group="web") == select_endpoints(ENDPOINTS, group="web")
+
+
+def test_endpoint_table_is_cached_until_storage_changes(tmp_path):
+    """Таблица хранилища переиспользуется и перестраивается после сохранения."""
+    storage = FileStorage(str(tmp_path / "data.json"))
+    storage.data["endpoints"].update(ENDPOINTS)
+    storage.save()
+    table = endpoint_table(storage)
+    assert endpoint_table(storage) is table and len(table) == 3
+
+    storage.endpoints["web-3"] = {"type": "ssh", "group": "web"}
+    storage.save()
+    assert list(select_endpoints(endpoint_table(storage), group="web")) == ["web-1", "web-2", "web-3"]
+
+
+def test_fanout_report_text():
+    """Текстовый отчёт содержит итоги и вывод по каждому хосту."""
+    report = FanOutReport(script="s", results=[
+        HostResult(endpoint="b", success=False, error="boom"),
+        HostResult(endpoint="a", success=True, output="ok\n"),
+    ])
+    text = report.to_text()
+    assert "1 успешно, 1 с ошибкой" in text
+    assert text.index("=== a [OK]") < text.index("=== b [FAIL]")
+    assert "[Ошибка] boom" in text
+
+
+def test_build_command_uses_interpreter():
+    """Команда формируется интерпретатором, неизвестный выполняется как есть."""
+    interpreter = MagicMock()
+    interpreter.format_command.return_value = "bash -c 'ls'"
+
+    assert build_command({"bash": interpreter}, "bash", "ls", {}) == "bash -c 'ls'"
+    assert build_command({}, "sh", "ls", {}) == "ls"
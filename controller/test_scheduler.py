@@ -0,0 +1,178 @@
+"""Unit-тесты для очереди заданий и планировщика controller.scheduler."""
+
+import queue
+from concurrent.futures import Future
+from types import SimpleNamespace
+
+import pytest
+
+from controller.runner import HostResult
+from controller.scheduler import (PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE, JobStore, QueueFull, Schedule,
+                                  Scheduler)
+
+
+class FakeEngine:
+    """Движок, запуски которого завершает тест."""
+
+    def __init__(self):
+        self.events = queue.Queue()
+        self.started = []
+        self.cancelled = []
+        self.connector = SimpleNamespace(build_params=dict)
+
+    def submit(self, endpoint, params, command, sink=None, script="", limits=None, run_id=None):
+        future = Future()
+        self.started.append((run_id, future))
+        return SimpleNamespace(future=future)
+
+    def cancel(self, key):
+        self.cancelled.append(key)
+
+    def running(self):
+        return [run_id for run_id, future in self.started if not future.done()]
+
+    def finish(self, run_id, success=True):
+        future = dict(self.started)[run_id]
+        future.set_result(HostResult(endpoint=run_id.split(":")[1], success=success))
+
+    def drain(self):
+        events = []
+        while not self.events.empty():
+            events.append(self.events.get_nowait())
+        return events
+
+
+def make_storage(hosts=10, same_ip=()):
+    endpoints = {f"web-{i}": {"type": "ssh", "ip": f"10.0.0.{i}"} for i in range(hosts)}
+    for name in same_ip:
+        endpoints[name]["ip"] = "10.0.0.250"
+    scripts = {"check": {"name": "check", "interpreter": "bash", "code": "uptime", "endpoint": "web-0",
+                         "options": {}}}
+    return SimpleNamespace(scripts=scripts, endpoints=endpoints)
+
+
+def test_interactive_job_is_not_starved_by_fanout():
+    """Пока большой fan-out занимает все слоты, освободившийся слот достаётся интерактивному заданию."""
+    engine = FakeEngine()
+    scheduler = Scheduler(engine, make_storage(), max_running=2)
+    bulk = scheduler.submit("check", [f"web-{i}" for i in range(10)], priority=PRIORITY_BACKGROUND)
+    scheduler.pump()
+    assert engine.running() == [f"{bulk.key}:web-0", f"{bulk.key}:web-1"]
+
+    interactive = scheduler.submit("check", ["web-9"], priority=PRIORITY_INTERACTIVE)
+    engine.finish(f"{bulk.key}:web-0")
+    scheduler.pump()
+
+    assert engine.running() == [f"{bulk.key}:web-1", f"{interactive.key}:web-9"]
+    metrics = scheduler.metrics()
+    assert (metrics["pending_hosts"], metrics["running_hosts"], metrics["dispatched"]) == (8, 2, 3)
+    assert metrics["wait"]["count"] == 3
+
+
+def test_per_host_limit_and_report_events():
+    """Эндпоинты с одним адресом не выполняются одновременно сверх per_host; по завершении — отчёт."""
+    engine = FakeEngine()
+    scheduler = Scheduler(engine, make_storage(hosts=3, same_ip=("web-0", "web-1")), per_host=1)
+    job = scheduler.submit("check", ["web-0", "web-1", "web-2", "missing"])
+    scheduler.pump()
+    assert engine.running() == [f"{job.key}:web-0", f"{job.key}:web-2"]
+
+    engine.finish(f"{job.key}:web-0")
+    engine.finish(f"{job.key}:web-2", success=False)
+    scheduler.pump()
+    engine.finish(f"{job.key}:web-1")
+    scheduler.pump()
+
+    events = engine.drain()
+    assert ("missing" in events[0].key and events[0].kind == "result")
+    report = events[-1]
+    assert (report.key, report.kind) == (job.key, "report")
+    assert (len(report.payload.succeeded), len(report.payload.failed)) == (2, 2)
+    assert (job.state, job.succeeded, job.failed) == ("done", 2, 2)
+    assert scheduler.metrics()["running_hosts"] == 0
+
+
+class CountingEndpoints(dict):
+    """Эндпоинты хранилища, считающие обращения к отдельным записям."""
+
+    lookups = 0
+
+    def get(self, key, default=None):
+        self.lookups += 1
+        return super().get(key, default)
+
+
+def test_blocked_host_scan_does_not_query_storage():
+    """Адрес эндпоинта берётся один раз при постановке: выдача, упёршаяся в per_host, не читает хранилище."""
+    storage = make_storage(hosts=200, same_ip=[f"web-{i}" for i in range(200)])
+    storage.endpoints = CountingEndpoints(storage.endpoints)
+    engine = FakeEngine()
+    scheduler = Scheduler(engine, storage, per_host=1)
+    job = scheduler.submit("check", list(storage.endpoints))
+    scheduler.pump()
+    lookups = storage.endpoints.lookups
+    for _ in range(20):
+        scheduler.pump()
+    assert len(engine.running()) == 1 and storage.endpoints.lookups == lookups
+    assert lookups <= 2 and len(job.pending) == 199
+
+
+def test_queue_is_bounded_and_cancel_drops_pending_hosts():
+    """Очередь ограничена max_queued; отмена снимает ожидающие хосты и останавливает работающие."""
+    engine = FakeEngine()
+    scheduler = Scheduler(engine, make_storage(), max_running=1, max_queued=1)
+    job = scheduler.submit("check", ["web-0", "web-1", "web-2"])
+    with pytest.raises(QueueFull):
+        scheduler.submit("check", ["web-3"])
+    scheduler.pump()
+
+    assert scheduler.cancel(job.key)
+    engine.finish(f"{job.key}:web-0")
+    scheduler.pump()
+
+    assert engine.cancelled == [job.key]
+    assert [result.stopped for result in job.report.results] == ["cancelled", "cancelled", ""]
+    assert job.state == "cancelled" and scheduler.queued() == []
+    assert scheduler.metrics()["rejected"] == 1
+
+
+def test_persistent_job_resumes_remaining_hosts(tmp_path):
+    """После перезапуска задание продолжается только с невыполненных хостов."""
+    store = JobStore(str(tmp_path / "jobs.db"))
+    engine = FakeEngine()
+    scheduler = Scheduler(engine, make_storage(), store=store, max_running=1)
+    job = scheduler.submit("check", ["web-0", "web-1", "web-2"])
+    scheduler.pump()
+    engine.finish(f"{job.key}:web-0")
+    scheduler.pump()
+    store.close()
+
+    store = JobStore(str(tmp_path / "jobs.db"))
+    engine = FakeEngine()
+    restarted = Scheduler(engine, make_storage(), store=store)
+    [loaded] = restarted.tick()
+    restarted.pump()
+
+    assert loaded.key == job.key and loaded.done == ["web-0"]
+    assert engine.running() == [f"{job.key}:web-1", f"{job.key}:web-2"]
+    store.close()
+
+
+def test_schedule_fires_once_while_previous_run_is_active(tmp_path):
+    """Наступившее расписание ставит задание; пока оно идёт, повторные срабатывания пропускаются."""
+    store = JobStore(str(tmp_path / "jobs.db"))
+    scheduler = Scheduler(FakeEngine(), make_storage(), store=store)
+    ok, message = scheduler.add_schedule(Schedule(name="fleet", script="check", cron="*/5 * * * *",
+                                                  endpoints=["web-*"]))
+    assert ok, message
+    assert scheduler.add_schedule(Schedule(name="bad", script="check", cron="* *"))[0] is False
+
+    [schedule] = store.schedules()
+    [job] = scheduler.tick(now=schedule.next_run)
+    assert (job.source, len(job.endpoints), job.priority) == ("schedule", 10, PRIORITY_BACKGROUND)
+
+    [schedule] = store.schedules()
+    assert scheduler.tick(now=schedule.next_run) == []
+    assert scheduler.metrics()["schedule_overlaps"] == 1
+    assert store.schedules()[0].next_run > schedule.next_run
+    store.close()
@@ -0,0 +1,95 @@
+"""Unit-тесты для индекса поиска controller.search."""
+
+import time
+
+from controller.search import SEARCH_FIELDS, SearchIndex
+
+
+def make_index(records, fields=SEARCH_FIELDS["endpoints"]):
+    """Индекс, построенный по словарю записей."""
+    index = SearchIndex(fields)
+    index.build(records.items())
+    return index
+
+
+ENDPOINTS = {
+    "web-1": {"ip": "10.0.0.1", "login": "deploy"},
+    "web-2": {"ip": "10.0.0.2", "login": "root"},
+    "db-1": {"ip": "10.0.1.5", "login": "postgres", "group": "web-db"},
+}
+
+
+def test_search_matches_substrings_case_insensitive():
+    """Поиск по подстроке в имени, ip и login без учёта регистра."""
+    index = make_index(ENDPOINTS)
+
+    assert index.search("WEB") == ["web-1", "web-2", "db-1"]
+    assert index.search("0.0.2") == ["web-2"]
+    assert index.search("postgres") == ["db-1"]
+    assert index.search("nothing") == []
+    assert index.search("  ") == []
+
+
+def test_short_and_multi_word_queries():
+    """Короткие запросы отвечаются по индексу, несколько слов — пересечение."""
+    index = make_index(ENDPOINTS)
+
+    assert index.search("2") == ["web-2"]
+    assert index.search("db") == ["db-1"]
+    assert index.search("web root") == ["web-2"]
+
+
+def test_script_code_is_searchable():
+    """По коду скрипта ищутся слова от трёх символов."""
+    index = make_index({"backup": {"interpreter": "bash", "code": "tar czf /tmp/etc.tgz /etc"},
+                        "report": {"interpreter": "python", "code": "print('done')"}},
+                       SEARCH_FIELDS["scripts"])
+
+    assert index.search("czf") == ["backup"]
+    assert index.search("print(") == ["report"]
+    assert index.search("python") == ["report"]
+
+
+def test_incremental_update_and_remove():
+    """Изменения записей сразу видны в поиске; переименование убирает старое имя."""
+    index = make_index(ENDPOINTS)
+
+    index.update("web-3", {"ip": "192.168.0.3"})
+    assert index.search("192.168") == ["web-3"]
+
+    index.update("cache-3", {"ip": "192.168.0.3"}, old_name="web-3")
+    assert index.search("192.168") == ["cache-3"]
+    assert "web-3" not in index.search("web")
+
+    index.remove("cache-3")
+    assert index.search("192") == []
+    assert len(index) == 3
+
+
+def test_changes_during_build_are_applied():
+    """Правки, пришедшие во время построения, не теряются."""
+    index = SearchIndex(SEARCH_FIELDS["endpoints"])
+
+    def records():
+        yield "web-1", {"ip": "10.0.0.1"}
+        index.remove("web-1")
+        index.update("web-9", {"ip": "10.0.0.9"})
+        yield "web-2", {"ip": "10.0.0.2"}
+
+    index.build(records())
+
+    assert index.ready.is_set()
+    assert index.search("web") == ["web-2", "web-9"]
+
+
+def test_search_is_fast_on_large_inventory():
+    """Запрос по большому инвентарю отвечается за миллисекунды."""
+    index = make_index({f"host-{i}": {"ip": f"10.{i // 65536}.{i // 256 % 256}.{i % 256}", "login": "root"}
+                        for i in range(20000)})
+
+    started = time.monotonic()
+    result = index.search("host-9999")
+    elapsed = time.monotonic() - started
+
+    assert result[0] == "host-9999"
+    assert elapsed < 0.05
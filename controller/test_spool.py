@@ -0,0 +1,65 @@
+"""Unit-тесты для записи вывода на диск controller.spool."""
+
+import os
+
+from controller.spool import Spool
+
+
+def make_spool(tmp_path, lines=100, step=8):
+    spool = Spool(directory=str(tmp_path), index_step=step)
+    # Куски режут строки в произвольных местах, как при потоковом выводе.
+    text = "".join(f"line {i}\n" for i in range(lines))
+    for start in range(0, len(text), 13):
+        spool.write(text[start:start + 13])
+    return spool
+
+
+def test_lines_use_sparse_index(tmp_path):
+    """Окно строк читается с любого места; индекс хранит каждую index_step-ю строку."""
+    spool = make_spool(tmp_path)
+    try:
+        assert spool.line_count == 100 and len(spool._offsets) == 100 // 8 + 1
+        assert [text for text, _ in spool.lines(61, 3)] == ["line 61", "line 62", "line 63"]
+        assert [text for text, _ in spool.lines(98, 10)] == ["line 98", "line 99"]
+        assert spool.lines(100, 5) == []
+
+        # Файл дописывается после первого чтения: отображение пересоздаётся.
+        spool.write("tail without newline", "stderr")
+        assert spool.line_count == 101
+        assert spool.lines(99, 5) == [("line 99", False), ("tail without newline", True)]
+    finally:
+        spool.close()
+
+
+def test_stderr_ranges_are_merged(tmp_path):
+    """Соседние куски stderr склеиваются, подсветка берётся по диапазонам байтов."""
+    spool = Spool(directory=str(tmp_path))
+    try:
+        spool.write("out\nerr ", "stdout")
+        spool.write("first\n", "stderr")
+        spool.write("second\n", "stderr")
+        spool.write("привет\n", "stdout")
+        assert len(spool._stderr_starts) == 1
+        assert spool.lines(0, 10) == [("out", False), ("err first", True), ("second", True),
+                                      ("привет", False)]
+    finally:
+        spool.close()
+
+
+def test_search_export_and_close(tmp_path):
+    """Поиск вперёд и назад возвращает строку и позиции; close удаляет файл."""
+    spool = make_spool(tmp_path, lines=5000, step=4)
+    try:
+        assert spool.search(r"line 4\d{3}$") == (4000, 0, 9)
+        assert spool.search(r"LINE 12\b", start_line=13, ignore_case=True) is None
+        assert spool.search(r"\d+7$", start_line=4000, backwards=True) == (3997, 5, 9)
+        assert spool.search(r"^line 0$", start_line=5000, backwards=True) == (0, 0, 6)
+        assert spool.line_of(spool._offsets[10] + 3) == 40
+
+        spool.export(str(tmp_path / "run.log"))
+        with open(tmp_path / "run.log", encoding="utf-8") as f:
+            assert sum(1 for _ in f) == 5000
+    finally:
+        spool.close()
+    assert not os.path.exists(spool.path)
+    spool.write("ignored\n")
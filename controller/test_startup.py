@@ -0,0 +1,60 @@
+"""Unit-тесты для замеров старта controller.startup."""
+
+import builtins
+import sys
+
+from controller.startup import StartupProfiler
+
+
+def test_disabled_profiler_does_not_hook_imports():
+    """Выключенный профилировщик не трогает импорт и не пишет отчёт."""
+    original = builtins.__import__
+    profiler = StartupProfiler(enabled=False)
+    with profiler.phase("storage"):
+        pass
+
+    assert builtins.__import__ is original
+    assert profiler.phases == {}
+    assert profiler.report() is None
+
+
+def test_profiler_reports_imports_and_phases(tmp_path, monkeypatch):
+    """Новые модули попадают в отчёт с собственным и полным временем, этапы — с длительностью."""
+    (tmp_path / "startup_outer.py").write_text("import startup_inner\n", encoding="utf-8")
+    (tmp_path / "startup_inner.py").write_text("import time\ntime.sleep(0.02)\n", encoding="utf-8")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    original = builtins.__import__
+
+    profiler = StartupProfiler(enabled=True)
+    try:
+        with profiler.phase("imports"):
+            import startup_outer  # noqa: F401
+    finally:
+        text = profiler.report()
+        for name in ("startup_outer", "startup_inner"):
+            sys.modules.pop(name, None)
+
+    assert builtins.__import__ is original
+    costs = {cost.module: cost for cost in profiler.imports.costs}
+    assert costs["startup_inner"].self_time >= 0.02
+    assert costs["startup_outer"].total_time >= costs["startup_inner"].total_time
+    assert costs["startup_outer"].self_time < costs["startup_inner"].self_time
+    assert profiler.phases["imports"] >= 0.02
+    assert "startup_inner" in text and "imports" in text
+
+
+def test_from_settings_reads_flag_and_section(tmp_path, monkeypatch):
+    """Режим включается флагом командной строки или секцией [Startup]."""
+    monkeypatch.delenv("BINO_STARTUP_REPORT", raising=False)
+    settings = tmp_path / "settings.ini"
+    settings.write_text("[Startup]\nreport = false\n", encoding="utf-8")
+
+    assert StartupProfiler.from_settings(str(settings), []).enabled is False
+    profiler = StartupProfiler.from_settings(str(settings), ["main.py", "--startup-report"])
+    profiler.report()
+    assert profiler.enabled is True
+
+    settings.write_text("[Startup]\nreport = true\n", encoding="utf-8")
+    profiler = StartupProfiler.from_settings(str(settings), [])
+    profiler.report()
+    assert profiler.enabled is True
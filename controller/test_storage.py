@@ -0,0 +1,135 @@
+"""Unit-тесты для хранилищ controller.storage и controller.file."""
+
+import configparser
+import json
+import os
+
+import pytest
+
+from controller.file import FileStorage
+from controller.storage import SqliteStorage, create_storage
+from model.script import Script
+
+
+@pytest.fixture
+def sqlite_storage(tmp_path):
+    """Хранилище SQLite во временном каталоге."""
+    storage = SqliteStorage(str(tmp_path / "data.db"))
+    yield storage
+    storage.close()
+
+
+def make_config(storage_format, path):
+    """Конфигурация с секцией [Storage]."""
+    config = configparser.ConfigParser()
+    config.read_dict({"Storage": {"format": storage_format, "path": path}})
+    return config
+
+
+def test_sqlite_table_behaves_like_dict(sqlite_storage):
+    """Таблица поддерживает запись, чтение, обход по порядку создания и удаление."""
+    scripts = sqlite_storage.scripts
+    scripts["b"] = {"name": "b", "interpreter": "bash", "code": "echo b", "endpoint": "e", "options": {}}
+    scripts["a"] = {"name": "a", "interpreter": "python", "code": "print('a')", "endpoint": "e", "options": {}}
+
+    assert list(scripts) == ["b", "a"]
+    assert len(scripts) == 2
+    assert "a" in scripts and "c" not in scripts
+    assert scripts["a"]["code"] == "print('a')"
+    assert scripts.get("c") is None
+
+    del scripts["b"]
+    assert list(scripts) == ["a"]
+    with pytest.raises(KeyError):
+        del scripts["b"]
+
+
+def test_sqlite_upsert_keeps_position_and_code_column(sqlite_storage):
+    """Повторная запись обновляет строку на месте; код хранится в отдельной колонке."""
+    scripts = sqlite_storage.scripts
+    scripts["a"] = {"name": "a", "code": "v1"}
+    scripts["b"] = {"name": "b", "code": "x"}
+    scripts["a"] = {"name": "a", "code": "v2"}
+
+    assert list(scripts) == ["a", "b"]
+    row = sqlite_storage.execute("SELECT data, code FROM scripts WHERE name = 'a'").fetchone()
+    assert json.loads(row[0]) == {"name": "a"}
+    assert row[1] == "v2"
+
+
+def test_sqlite_persists_and_uses_wal(tmp_path):
+    """Данные переживают переоткрытие базы, журнал — WAL."""
+    path = str(tmp_path / "data.db")
+    storage = SqliteStorage(path)
+    storage.endpoints["web-1"] = {"name": "web-1", "type": "ssh", "ip": "10.0.0.1", "options": {}}
+    storage.close()
+
+    reopened = SqliteStorage(path)
+    assert reopened.endpoints.items() == [("web-1", {"name": "web-1", "type": "ssh",
+                                                     "ip": "10.0.0.1", "options": {}})]
+    assert reopened.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    reopened.close()
+
+
+def test_script_model_works_on_sqlite(sqlite_storage):
+    """Модель Script создаёт, переименовывает и удаляет записи в SQLite."""
+    script = Script(name="deploy", interpreter="bash", code="make", endpoint="web", storage=sqlite_storage)
+    assert script.create()[0] is True
+
+    data = dict(sqlite_storage.scripts["deploy"], name="deploy2")
+    assert script.update("deploy", "deploy2", data)[0] is True
+    assert list(sqlite_storage.scripts) == ["deploy2"]
+    assert script.read("deploy2").code == "make"
+
+
+def test_file_storage_save_is_atomic(tmp_path):
+    """JSON сохраняется целиком через временный файл, который затем удаляется."""
+    path = tmp_path / "data.json"
+    storage = FileStorage(str(path))
+    storage.scripts["s"] = {"name": "s", "code": "echo привет"}
+    storage.save()
+
+    assert json.loads(path.read_text(encoding="utf-8"))["scripts"]["s"]["code"] == "echo привет"
+    assert os.listdir(tmp_path) == ["data.json"]
+
+
+def test_create_storage_selects_format(tmp_path):
+    """Формат и путь берутся из [Storage]; кавычки вокруг пути убираются."""
+    json_path = tmp_path / "data.json"
+    storage = create_storage(make_config("json", f'"{json_path}"'))
+    assert isinstance(storage, FileStorage)
+    assert storage.file_path == str(json_path)
+
+    storage = create_storage(make_config("sqlite", str(tmp_path / "bino.db")))
+    assert isinstance(storage, SqliteStorage)
+    storage.close()
+
+
+def test_create_storage_migrates_json(tmp_path, monkeypatch):
+    """При первом переходе на SQLite данные переносятся из data.json."""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data.json").write_text(json.dumps({
+        "scripts": {"s": {"name": "s", "code": "ls"}},
+        "endpoints": {"e": {"name": "e", "type": "ssh"}},
+    }), encoding="utf-8")
+
+    storage = create_storage(make_config("sqlite", "data.db"))
+
+    assert storage.scripts["s"]["code"] == "ls"
+    assert list(storage.endpoints) == ["e"]
+    storage.close()
+
+
+def test_create_storage_switches_existing_install_to_sqlite(tmp_path):
+    """Смена только `format` при пути к data.json: база создаётся рядом, данные переносятся из него."""
+    json_path = tmp_path / "conf" / "data.json"
+    json_path.parent.mkdir()
+    storage = create_storage(make_config("json", f'"{json_path}"'))
+    storage.endpoints["e"] = {"name": "e", "type": "ssh"}
+    storage.save()
+
+    storage = create_storage(make_config("sqlite", f'"{json_path}"'))
+    assert isinstance(storage, SqliteStorage) and list(storage.endpoints) == ["e"]
+    storage.close()
+    assert (tmp_path / "conf" / "data.db").exists()
+    assert json.loads(json_path.read_text(encoding="utf-8"))["endpoints"]["e"]["type"] == "ssh"
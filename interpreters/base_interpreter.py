@@ -0,0 +1,50 @@
+import shlex
+from typing import Any, Dict, Optional
+
+
+class BaseInterpreter:
+    """
+    Базовый класс интерпретаторов: сборка командной строки для удалённого запуска.
+
+    Код и значения опций экранируются для POSIX-оболочки (`shlex.quote`),
+    поэтому кавычки, `$` и переводы строк в скрипте передаются как есть.
+    """
+
+    # Исполняемый файл интерпретатора на удалённом хосте
+    binary: str = ""
+    # Расширение файла скрипта в кэше на хосте (см. controller.delivery)
+    extension: str = ""
+    # Аргумент, с которым интерпретатор читает скрипт из stdin
+    stdin_argument: str = ""
+    # Опции, задающие режим запуска, а не флаги интерпретатора
+    mode_options: tuple = ()
+
+    def format_flags(self, options: Optional[Dict[str, Any]]) -> str:
+        """
+        Флаги интерпретатора из опций скрипта.
+
+        Учитываются только ключи вида `-x`/`--flag`: `True` даёт флаг без
+        значения, строка или число — флаг со значением, `None`/`False` — пропуск.
+        """
+        parts = []
+        for key, value in (options or {}).items():
+            key = str(key)
+            if not key.startswith("-") or key in self.mode_options or value in (None, False, ""):
+                continue
+            parts.append(key if value is True else f"{key} {shlex.quote(str(value))}")
+        return " ".join(parts)
+
+    def _join(self, *parts: str) -> str:
+        return " ".join(part for part in parts if part)
+
+    def format_command(self, script_code: str, options: Optional[Dict[str, Any]] = None) -> str:
+        """Команда, передающая код скрипта в командной строке (`-c`)."""
+        return self._join(self.binary, self.format_flags(options), "-c", shlex.quote(script_code))
+
+    def format_file_command(self, path: str, options: Optional[Dict[str, Any]] = None) -> str:
+        """Команда, выполняющая скрипт из файла на удалённом хосте."""
+        return self._join(self.binary, self.format_flags(options), shlex.quote(path))
+
+    def format_stdin_command(self, options: Optional[Dict[str, Any]] = None) -> str:
+        """Команда, читающая код скрипта из stdin канала (`bash -s`, `python3 -`)."""
+        return self._join(self.binary, self.format_flags(options), self.stdin_argument)
@@ -1,7 +1,14 @@
 import subprocess
 from typing import Dict, Any
 
-class BashInterpreter:
+from .base_interpreter import BaseInterpreter
+
+
+class BashInterpreter(BaseInterpreter):
+    binary = "bash"
+    extension = ".sh"
+    stdin_argument = "-s"
+
     def __init__(self, interpreter_args=None):
         """
         :param interpreter_args: Словарь с аргументами интерпретатора
@@ -78,11 +85,6 @@ class BashInterpreter:
         }
 
 
-    def format_command(self, script_code, options):
-        """Форматирует команду для выполнения в bash."""
-        options = " ".join([key for key, value in options.items() if value])
-        return f"bash {options} -c \"{script_code}\""
-
     def execute(self, script_code, options):
         """Выполняет команду в Bash."""
         command = self.format_command(script_code, options)
@@ -1,6 +1,14 @@
 import subprocess
 
-class PythonInterpreter:
+from .base_interpreter import BaseInterpreter
+
+
+class PythonInterpreter(BaseInterpreter):
+    binary = "python3"
+    extension = ".py"
+    stdin_argument = "-"
+    mode_options = ("-c", "-m")
+
     def __init__(self, interpreter_args="-c"):
         """
         :param interpreter_args: Аргументы для интерпретатора (по умолчанию "-c")
@@ -40,10 +48,6 @@ class PythonInterpreter:
                 if key in self.available_options:
                     self.available_options[key] = interpreter_args[key]
 
-    def format_command(self, script_code):
-        """Форматирует команду для выполнения в bash."""
-        return f"python3 {self.interpreter_args} \"{script_code}\""
-
     def execute(script_code):
         """Выполняет Python код."""
         command = self.format_command(script_code)
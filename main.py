@@ -8,6 +8,7 @@ Features:
 - Resolves resource paths correctly for both development and packaged execution.
 - Initializes the Tkinter-based UI.
 - Loads application icons dynamically.
+- Optionally reports the cold-start cost (`--startup-report`, see `controller.startup`).
 
 Usage:
 Run this script to start the application.
@@ -16,8 +17,7 @@ Run this script to start the application.
 import sys
 import os
 import logging
-from tkinter import Tk
-from controller.main import App
+from controller.startup import StartupProfiler
 
 
 def resource_path(relative_path: str) -> str:
@@ -41,11 +41,18 @@ def resource_path(relative_path: str) -> str:
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.DEBUG)
+    # Installed before the UI imports so that their cost shows up in the report
+    profiler = StartupProfiler.from_settings("settings.ini", sys.argv)
+    with profiler.phase("imports"):
+        from tkinter import Tk
+        from controller.main import App
     # Initialize the main Tkinter application window
     root = Tk()
     # Create an instance of the App class, passing the root window
-    app = App(root)
+    app = App(root, profiler=profiler)
     # Set the application icon (use absolute path resolution for packaged executables)
     root.iconbitmap(resource_path("icon.ico"))
+    # Report once the first frame has been drawn
+    root.after_idle(profiler.report)
     # Start the Tkinter event loop
     root.mainloop()
@@ -0,0 +1,355 @@
+"""Compact endpoint records for large inventories.
+
+`Endpoint` keeps its connection fields in a per-instance dict behind
+`__getattr__`/`__setattr__` hooks, which is convenient for the edit form
+but costs one object, one dict and a Python-level lookup per attribute
+for every endpoint. This module provides two leaner representations of
+the same data, both round-tripping through the `Endpoint.to_dict()` format:
+
+- `EndpointRecord` subclasses generated per connector type by
+  `record_type()`: the connector's required fields and option schema
+  become `__slots__`, so attribute reads are plain slot loads and an
+  instance has no `__dict__`. Keys outside the schema are still accepted
+  and kept in a side dict that is only allocated when needed.
+- `EndpointTable`: a columnar container (one list per field) for
+  fleet-wide operations such as filtering thousands of endpoints by name
+  pattern or group without materializing a dict per endpoint.
+"""
+
+import fnmatch
+import logging
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Type
+
+logger = logging.getLogger(__name__)
+
+# Fields every record has regardless of the connector schema
+COMMON_FIELDS = ("group",)
+_RESERVED = frozenset(("name", "type", "type_", "options"))
+_MISSING = object()
+_TYPES: Dict[Tuple[str, Tuple[str, ...], Tuple[str, ...]], Type["EndpointRecord"]] = {}
+
+
+class EndpointRecord:
+    """
+    Base class of generated endpoint records.
+
+    Subclasses define `FIELDS` (top-level keys) and `OPTIONS` (keys of the
+    `options` dict) and get one slot per name. Which slots hold a value is
+    tracked in a bit mask so that `to_dict()` reproduces exactly the keys
+    that were given, including explicit `None` values.
+    """
+
+    __slots__ = ("name", "type_", "_present", "_extra", "_extra_options")
+    FIELDS: Tuple[str, ...] = ()
+    OPTIONS: Tuple[str, ...] = ()
+    _BITS: Dict[str, int] = {}
+    _DESCRIPTORS: Tuple[Tuple[str, int, Any], ...] = ()
+
+    def __init__(self, name: str = "", type_: str = "", **values: Any) -> None:
+        object.__setattr__(self, "name", name)
+        object.__setattr__(self, "type_", type_)
+        object.__setattr__(self, "_present", 0)
+        object.__setattr__(self, "_extra", None)
+        object.__setattr__(self, "_extra_options", None)
+        for key, value in values.items():
+            setattr(self, key, value)
+
+    def __getattr__(self, item: str) -> Any:
+        """
+        Called only when the slot is empty or the name is not in the schema:
+        unknown and unset fields read as None, like `Endpoint`.
+        """
+        if item.startswith("__"):
+            raise AttributeError(item)
+        extra = self._extra
+        return extra.get(item) if extra else None
+
+    def __setattr__(self, key: str, value: Any) -> None:
+        bit = self._BITS.get(key)
+        if bit is not None:
+            object.__setattr__(self, key, value)
+            object.__setattr__(self, "_present", self._present | bit)
+        elif key == "options":
+            self._set_options(value)
+        elif key in EndpointRecord.__slots__:
+            object.__setattr__(self, key, value)
+        else:
+            if self._extra is None:
+                object.__setattr__(self, "_extra", {})
+            self._extra[key] = value
+
+    def __delattr__(self, key: str) -> None:
+        bit = self._BITS.get(key)
+        if bit is not None and self._present & bit:
+            object.__delattr__(self, key)
+            object.__setattr__(self, "_present", self._present & ~bit)
+        elif self._extra and key in self._extra:
+            del self._extra[key]
+        else:
+            raise AttributeError(key)
+
+    @property
+    def options(self) -> Dict[str, Any]:
+        """
+        Connection options as a new dict. Assign a dict to change them;
+        mutating the returned dict does not change the record.
+        """
+        options = {name: value for name, bit, descriptor in self._DESCRIPTORS[len(self.FIELDS):]
+                   if self._present & bit for value in (descriptor.__get__(self),)}
+        if self._extra_options:
+            options.update(self._extra_options)
+        return options
+
+    def _set_options(self, options: Optional[Dict[str, Any]]) -> None:
+        present = self._present
+        extra = None
+        for name, value in (options or {}).items():
+            bit = self._BITS.get(name) if name in self.OPTIONS else None
+            if bit is None:
+                extra = {} if extra is None else extra
+                extra[name] = value
+            else:
+                object.__setattr__(self, name, value)
+                present |= bit
+        object.__setattr__(self, "_present", present)
+        object.__setattr__(self, "_extra_options", extra)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "EndpointRecord":
+        """
+        Create a record from an endpoint dictionary (the storage format).
+        """
+        record = cls.__new__(cls)
+        set_slot = object.__setattr__
+        set_slot(record, "name", data.get("name", ""))
+        set_slot(record, "type_", data.get("type", ""))
+        set_slot(record, "_extra_options", None)
+        present = 0
+        extra = None
+        bits = cls._BITS
+        fields = cls.FIELDS
+        for key, value in data.items():
+            if key in fields:
+                set_slot(record, key, value)
+                present |= bits[key]
+            elif key not in ("name", "type", "options"):
+                extra = {} if extra is None else extra
+                extra[key] = value
+        set_slot(record, "_present", present)
+        set_slot(record, "_extra", extra)
+        record._set_options(data.get("options"))
+        return record
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert the record to the dictionary produced by `Endpoint.to_dict()`.
+        """
+        result = {"name": self.name, "type": self.type_, "options": self.options}
+        present = self._present
+        for name, bit, descriptor in self._DESCRIPTORS[:len(self.FIELDS)]:
+            if present & bit:
+                result[name] = descriptor.__get__(self)
+        if self._extra:
+            result.update(self._extra)
+        return result
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, EndpointRecord):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} name={self.name} type={self.type_}>"
+
+
+def record_type(type_name: str, connector: Any) -> Type[EndpointRecord]:
+    """
+    Return the record class for a connector type, generating it on first use.
+
+    Top-level fields come from `connector.required_fields` (plus
+    `COMMON_FIELDS`); option slots come from the schema entries of
+    `connector.available_options` (dicts with a "type" key). Flat defaults,
+    as used by the PostgreSQL connector, describe top-level fields and are
+    added to them. Classes are cached per schema, so records of the same
+    type share one class.
+
+    :param type_name: Endpoint type (connector module name).
+    :param connector: Connector or `LazyConnector` exposing `required_fields`
+                      and `available_options`.
+    """
+    required = getattr(connector, "required_fields", None) or connector.get_required_fields()
+    available = getattr(connector, "available_options", None) or connector.default_options()
+    options = tuple(name for name, details in available.items()
+                    if isinstance(details, dict) and "type" in details and name not in _RESERVED)
+    flat = tuple(name for name, details in available.items()
+                 if not (isinstance(details, dict) and "type" in details))
+    fields = tuple(name for name in dict.fromkeys(tuple(required) + flat + COMMON_FIELDS)
+                   if name not in _RESERVED and name not in options)
+    key = (type_name, fields, options)
+    cls = _TYPES.get(key)
+    if cls is None:
+        class_name = "".join(part.capitalize() for part in type_name.replace("-", "_").split("_")) + "Record"
+        names = fields + options
+        cls = type(class_name, (EndpointRecord,), {"__slots__": names, "FIELDS": fields, "OPTIONS": options})
+        cls._BITS = {name: 1 << index for index, name in enumerate(names)}
+        cls._DESCRIPTORS = tuple((name, 1 << index, cls.__dict__[name]) for index, name in enumerate(names))
+        _TYPES[key] = cls
+        logger.debug("record_type(%s) -> %s fields, %s options", type_name, len(fields), len(options))
+    return cls
+
+
+def make_record(data: Dict[str, Any], connectors: Dict[str, Any]) -> EndpointRecord:
+    """
+    Create a record for an endpoint dictionary using its connector's schema.
+    Unknown types get a record without schema slots.
+    """
+    type_name = data.get("type") or "ssh"
+    connector = connectors.get(type_name)
+    if connector is None:
+        cls = _TYPES.get((type_name, (), ()))
+        if cls is None:
+            cls = record_type(type_name, _EmptySchema)
+    else:
+        cls = record_type(type_name, connector)
+    return cls.from_dict(data)
+
+
+class _EmptySchema:
+    required_fields: List[str] = []
+    available_options: Dict[str, Any] = {}
+
+
+class EndpointTable:
+    """
+    Columnar container of endpoints: one list per top-level field and per
+    option, indexed by row. Missing values are kept as a sentinel so that
+    `row()` reproduces the original dictionary; `column()` reads them as
+    None.
+
+    Columns are created as keys are seen, so endpoints of different types
+    share one table; a column of a key that only SSH endpoints have simply
+    holds the sentinel in other rows.
+    """
+
+    def __init__(self) -> None:
+        self.names: List[str] = []
+        self.types: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._columns: Dict[str, List[Any]] = {}
+        self._options: Dict[str, List[Any]] = {}
+        self._has_options: List[bool] = []
+
+    @classmethod
+    def from_dicts(cls, endpoints: Dict[str, Dict[str, Any]]) -> "EndpointTable":
+        """
+        Build a table from `FileStorage.endpoints` (name -> dictionary).
+        """
+        table = cls()
+        for name, data in endpoints.items():
+            table.append(dict(data, name=data.get("name") or name))
+        return table
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._rows
+
+    def index(self, name: str) -> int:
+        """
+        Row number of an endpoint.
+
+        :raises KeyError: If there is no such endpoint.
+        """
+        return self._rows[name]
+
+    def append(self, data: Dict[str, Any]) -> int:
+        """
+        Add an endpoint dictionary as a new row and return its row number.
+
+        :raises ValueError: If an endpoint with the same name is already in the table.
+        """
+        name = data.get("name", "")
+        if name in self._rows:
+            raise ValueError(f"Endpoint '{name}' is already in the table")
+        row = len(self.names)
+        self._rows[name] = row
+        self.names.append(name)
+        self.types.append(data.get("type", ""))
+        self._store(self._columns, row, {k: v for k, v in data.items() if k not in ("name", "type", "options")})
+        options = data.get("options")
+        self._has_options.append(options is not None)
+        self._store(self._options, row, options or {})
+        return row
+
+    def _store(self, columns: Dict[str, List[Any]], row: int, values: Dict[str, Any]) -> None:
+        for key, value in values.items():
+            column = columns.get(key)
+            if column is None:
+                column = columns[key] = [_MISSING] * row
+            column.append(value)
+        for column in columns.values():
+            if len(column) == row:
+                column.append(_MISSING)
+
+    def column(self, name: str) -> List[Any]:
+        """
+        Values of a top-level field for every row (None where it is not set).
+        `"name"` and `"type"` are columns too.
+        """
+        if name == "name":
+            return list(self.names)
+        if name == "type":
+            return list(self.types)
+        return [None if value is _MISSING else value for value in self._columns.get(name, [_MISSING] * len(self))]
+
+    def option_column(self, name: str) -> List[Any]:
+        """
+        Values of an option for every row (None where it is not set).
+        """
+        return [None if value is _MISSING else value for value in self._options.get(name, [_MISSING] * len(self))]
+
+    def row(self, index: int) -> Dict[str, Any]:
+        """
+        Endpoint dictionary of a row in the storage format.
+        """
+        data = {"name": self.names[index], "type": self.types[index]}
+        for key, column in self._columns.items():
+            if column[index] is not _MISSING:
+                data[key] = column[index]
+        if self._has_options[index]:
+            data["options"] = {key: column[index] for key, column in self._options.items()
+                               if column[index] is not _MISSING}
+        return data
+
+    def to_dicts(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Inverse of `from_dicts`.
+        """
+        return {name: self.row(index) for index, name in enumerate(self.names)}
+
+    def select(self, patterns: Optional[Iterable[str]] = None, group: Optional[str] = None) -> List[int]:
+        """
+        Row numbers of endpoints whose name matches any of the glob patterns
+        and whose `group` field equals `group`; same rules as
+        `controller.runner.select_endpoints`.
+        """
+        patterns = [pattern for pattern in (patterns or []) if pattern]
+        rows: Iterable[int] = range(len(self))
+        if group:
+            groups = self._columns.get("group", ())
+            rows = [index for index, value in enumerate(groups) if value == group]
+        if patterns:
+            names = self.names
+            rows = [index for index in rows if any(fnmatch.fnmatchcase(names[index], p) for p in patterns)]
+        return list(rows)
+
+    def records(self, connectors: Dict[str, Any],
+                rows: Optional[Iterable[int]] = None) -> Iterator[EndpointRecord]:
+        """
+        Schema-driven records for the given rows (all rows by default).
+        """
+        for index in range(len(self)) if rows is None else rows:
+            yield make_record(self.row(index), connectors)
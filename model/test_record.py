@@ -0,0 +1,87 @@
+"""unit-tests for compact endpoint records"""
+import pytest
+from model.endpoint import Endpoint
+from model.record import EndpointTable, make_record, record_type
+
+
+class SchemaConnector:
+    """
+    Connector stub exposing only the schema used to generate records.
+    """
+    required_fields = ["ip", "port", "login", "password"]
+    available_options = {
+        "timeout": {"type": int, "description": "", "value": 5},
+        "compress": {"type": bool, "description": "", "value": False},
+    }
+
+
+class FlatConnector:
+    """
+    Connector stub with flat defaults, like the PostgreSQL connector.
+    """
+    required_fields = ["host", "port"]
+    available_options = {"host": "localhost", "port": 5432, "database": "postgres"}
+
+
+CONNECTORS = {"ssh": SchemaConnector(), "pg": FlatConnector()}
+ENDPOINTS = {
+    "web-1": {"name": "web-1", "type": "ssh", "ip": "10.0.0.1", "port": 22, "login": "root",
+              "password": "x", "group": "prod", "options": {"timeout": 10, "proxy": "bastion"}},
+    "web-2": {"name": "web-2", "type": "ssh", "ip": "10.0.0.2", "port": 22, "login": "root",
+              "password": None, "group": "dev", "note": "legacy"},
+    "db-1": {"name": "db-1", "type": "pg", "host": "db", "port": 5432, "database": "app", "group": "prod"},
+}
+
+
+def test_record_is_slotted_and_round_trips():
+    """
+    Schema fields are slots; to_dict matches Endpoint.to_dict for the same data.
+    """
+    cls = record_type("ssh", CONNECTORS["ssh"])
+    assert cls is record_type("ssh", SchemaConnector())
+    assert cls.FIELDS == ("ip", "port", "login", "password", "group")
+    assert cls.OPTIONS == ("timeout", "compress")
+    assert record_type("pg", CONNECTORS["pg"]).FIELDS == ("host", "port", "database", "group")
+
+    for data in ENDPOINTS.values():
+        record = make_record(data, CONNECTORS)
+        assert not hasattr(record, "__dict__")
+        assert record.to_dict() == Endpoint.from_dict(None, data).to_dict()
+
+
+def test_record_attribute_access():
+    """
+    Unset and unknown attributes read as None; assignments update to_dict.
+    """
+    record = make_record(ENDPOINTS["web-2"], CONNECTORS)
+    assert record.ip == "10.0.0.2" and record.note == "legacy"
+    assert record.password is None and record.timeout is None and record.missing is None
+
+    record.port = 2222
+    record.options = {"compress": True, "jump": "gw"}
+    record.tag = "new"
+    del record.group
+    data = record.to_dict()
+    assert data["port"] == 2222 and data["tag"] == "new" and "group" not in data
+    assert data["options"] == {"compress": True, "jump": "gw"}
+    with pytest.raises(AttributeError):
+        del record.group
+
+
+def test_table_columns_select_and_records():
+    """
+    The columnar table keeps the storage format and filters like select_endpoints.
+    """
+    table = EndpointTable.from_dicts(ENDPOINTS)
+    assert len(table) == 3 and "db-1" in table and table.index("db-1") == 2
+    assert table.column("port") == [22, 22, 5432]
+    assert table.column("login") == ["root", "root", None]
+    assert table.option_column("timeout") == [10, None, None]
+    assert table.to_dicts() == ENDPOINTS
+
+    assert table.select(group="prod") == [0, 2]
+    assert table.select(["web-*"], group="prod") == [0]
+    assert table.select(["db-*", "web-2"]) == [1, 2]
+    assert [record.name for record in table.records(CONNECTORS, table.select(group="prod"))] == ["web-1", "db-1"]
+    with pytest.raises(ValueError):
+        table.append({"name": "web-1"})
@@ -0,0 +1,218 @@
+"""
+This module provides the DashboardView class: a single window showing the
+state of every host in a fan-out run, with drill-down into one host's output.
+"""
+
+import time
+import tkinter as tk
+from typing import Any, Dict, List, Optional
+
+from controller.dashboard import ACTIVE_STATES, DashboardModel, visible_window
+from view.output import DEFAULT_FPS, OutputView
+
+ROW_HEIGHT = 20
+# Column titles and their x offsets on the grid canvas
+COLUMNS = (("Host", 6), ("State", 240), ("Elapsed", 340), ("Bytes", 430), ("Exit", 530))
+STATE_COLORS = {
+    "queued": "gray40",
+    "connecting": "darkorange3",
+    "running": "royalblue3",
+    "ok": "darkgreen",
+    "failed": "darkred",
+    "stopped": "darkorange4",
+}
+SELECTED_BACKGROUND = "#f37600"
+
+
+def format_bytes(count: int) -> str:
+    """Human-readable byte count (B, KiB, MiB, GiB)."""
+    value = float(count)
+    for unit in ("B", "KiB", "MiB"):
+        if value < 1024:
+            return f"{int(value)} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} GiB"
+
+
+class DashboardView:
+    """
+    Virtualized host grid driven by one shared refresh timer.
+
+    The grid canvas holds a fixed pool of row items, one per visible slot,
+    and only visible rows are ever drawn: each frame redraws the rows that
+    changed since the previous frame plus the running ones (their elapsed
+    time moves), and flushes the drill-down output pane. No per-host timers
+    or widgets are created, so the cost of a frame depends on the window
+    height rather than on the number of hosts in the run.
+    """
+
+    def __init__(self, root: Any, parent: tk.Widget, model: DashboardModel, fps: int = DEFAULT_FPS) -> None:
+        self.root = root
+        self.model = model
+        self.interval = max(1, 1000 // max(1, int(fps)))
+        self.top = 0
+        self.selected: Optional[int] = None
+        self._job: Optional[str] = None
+        self._slots: List[Dict[str, int]] = []
+        self._slot_rows: List[Optional[int]] = []
+        self._detail: Optional[OutputView] = None
+
+        self.frame = tk.Frame(parent)
+        self.summary_label = tk.Label(self.frame, anchor="w", text="")
+        self.summary_label.pack(fill="x")
+
+        header = tk.Canvas(self.frame, height=ROW_HEIGHT, highlightthickness=0, bg="#e8e8e8")
+        for title, x in COLUMNS:
+            header.create_text(x, ROW_HEIGHT // 2, text=title, anchor="w", font=("TkDefaultFont", 9, "bold"))
+        header.pack(fill="x")
+
+        grid = tk.Frame(self.frame)
+        grid.pack(fill="both", expand=True)
+        self.canvas = tk.Canvas(grid, height=ROW_HEIGHT * 12, highlightthickness=0, bg="white")
+        self.scrollbar = tk.Scrollbar(grid, orient="vertical", command=self._yview)
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+        self.canvas.bind("<Configure>", self._on_resize)
+        self.canvas.bind("<Button-1>", self._on_click)
+        self.canvas.bind("<MouseWheel>", lambda e: self._yview("scroll", -1 if e.delta > 0 else 1, "units"))
+        self.canvas.bind("<Button-4>", lambda e: self._yview("scroll", -1, "units"))
+        self.canvas.bind("<Button-5>", lambda e: self._yview("scroll", 1, "units"))
+
+        self.detail_label = tk.Label(self.frame, anchor="w", text="Click a host to see its output")
+        self.detail_label.pack(fill="x", pady=(6, 0))
+        self.detail_text = tk.Text(self.frame, wrap="word", height=12, width=80, state="disabled")
+        self.detail_text.pack(fill="both", expand=True)
+
+    def pack(self, **kwargs) -> None:
+        """Pack the dashboard frame into its parent."""
+        self.frame.pack(**kwargs)
+
+    def start(self) -> None:
+        """Start the shared refresh timer."""
+        if self._job is None:
+            self._job = self.root.after(self.interval, self._tick)
+
+    def stop(self) -> None:
+        """Cancel the refresh timer."""
+        if self._job is not None:
+            try:
+                self.root.after_cancel(self._job)
+            except tk.TclError:
+                pass
+            self._job = None
+
+    def select(self, position: int) -> None:
+        """Show the output of the host at `position` in the drill-down pane."""
+        if not 0 <= position < len(self.model):
+            return
+        self.selected = position
+        row = self.model.rows[position]
+        self.detail_label.config(text=f"Output: {row.endpoint}")
+        # The pane is filled from the host's scrollback, then kept up to date
+        # by the shared timer; OutputView's own timer is never started.
+        self._detail = OutputView(self.root, self.detail_text, row.output)
+        self.detail_text.config(state="normal")
+        self.detail_text.delete("1.0", "end")
+        self.detail_text.insert("end", row.output.scrollback())
+        self.detail_text.see("end")
+        self.detail_text.config(state="disabled")
+        row.output.drain()
+        self.redraw(full=True)
+
+    def redraw(self, full: bool = False) -> None:
+        """Redraw changed and running rows in the visible window (all of them if `full`)."""
+        height = self.canvas.winfo_height()
+        window = visible_window(self.top, height, ROW_HEIGHT, len(self.model))
+        self.top = window.start
+        self._ensure_slots(len(window))
+        dirty = self.model.take_dirty()
+        now = time.monotonic()
+        for slot, position in enumerate(window):
+            row = self.model.rows[position]
+            if full or position in dirty or row.state in ACTIVE_STATES or self._slot_rows[slot] != position:
+                self._draw_row(slot, position, now)
+        for slot in range(len(window), len(self._slots)):
+            if self._slot_rows[slot] is not None:
+                self._hide_slot(slot)
+        self._update_scrollbar(len(window))
+        self._update_summary()
+
+    def _ensure_slots(self, count: int) -> None:
+        while len(self._slots) < count:
+            y = len(self._slots) * ROW_HEIGHT
+            items = {"background": self.canvas.create_rectangle(0, y, 10000, y + ROW_HEIGHT, outline="",
+                                                                fill="white")}
+            for title, x in COLUMNS:
+                items[title] = self.canvas.create_text(x, y + ROW_HEIGHT // 2, anchor="w", text="")
+            self._slots.append(items)
+            self._slot_rows.append(None)
+
+    def _draw_row(self, slot: int, position: int, now: float) -> None:
+        row = self.model.rows[position]
+        items = self._slots[slot]
+        elapsed = row.elapsed(now)
+        values = {
+            "Host": row.endpoint,
+            "State": row.state,
+            "Elapsed": "" if elapsed is None else f"{elapsed:.1f} s",
+            "Bytes": format_bytes(row.bytes_received) if row.bytes_received else "",
+            "Exit": "" if row.exit_code is None else str(row.exit_code),
+        }
+        canvas = self.canvas
+        for title, _ in COLUMNS:
+            canvas.itemconfigure(items[title], text=values[title])
+        canvas.itemconfigure(items["State"], fill=STATE_COLORS.get(row.state, "black"))
+        canvas.itemconfigure(items["background"],
+                             fill=SELECTED_BACKGROUND if position == self.selected else "white")
+        self._slot_rows[slot] = position
+
+    def _hide_slot(self, slot: int) -> None:
+        for key, item in self._slots[slot].items():
+            if key == "background":
+                self.canvas.itemconfigure(item, fill="white")
+            else:
+                self.canvas.itemconfigure(item, text="")
+        self._slot_rows[slot] = None
+
+    def _update_scrollbar(self, visible: int) -> None:
+        total = len(self.model) or 1
+        self.scrollbar.set(self.top / total, min(1.0, (self.top + visible) / total))
+
+    def _update_summary(self) -> None:
+        counts = self.model.summary()
+        parts = [f"{state}: {count}" for state, count in counts.items() if count]
+        text = f"{len(self.model)} hosts — " + ", ".join(parts)
+        if self.model.report is not None:
+            text += f"  |  {self.model.report.summary()}"
+        if self.summary_label["text"] != text:
+            self.summary_label.config(text=text)
+
+    def _yview(self, *args) -> None:
+        rows = max(1, self.canvas.winfo_height() // ROW_HEIGHT)
+        if args[0] == "moveto":
+            self.top = int(float(args[1]) * len(self.model))
+        elif args[0] == "scroll":
+            step = rows if args[2] == "pages" else 1
+            self.top += int(args[1]) * step
+        self.redraw()
+
+    def _on_resize(self, _event) -> None:
+        self.redraw(full=True)
+
+    def _on_click(self, event) -> None:
+        slot = int(self.canvas.canvasy(event.y)) // ROW_HEIGHT
+        if slot < len(self._slot_rows) and self._slot_rows[slot] is not None:
+            self.select(self._slot_rows[slot])
+
+    def _tick(self) -> None:
+        self._job = None
+        try:
+            if not self.canvas.winfo_exists():
+                return
+            self.redraw()
+            if self._detail is not None:
+                self._detail.flush()
+        except tk.TclError:
+            # The window was closed while the run was still going.
+            return
+        self._job = self.root.after(self.interval, self._tick)
@@ -5,7 +5,6 @@ import tkinter as tk
 from model.endpoint import Endpoint
 from view.main import MainUI
 from view.theme import StyledLabel, StyledEntry, StyledCombobox, StyledFrame, StyledButton, StyledToplevel
-import threading
 
 class EndpointUI(MainUI):
     """docstring"""
@@ -134,28 +133,31 @@ class EndpointUI(MainUI):
             if status_label["text"] == "Connecting...":
                 self.app.root.after(100, animate_spinner, (angle + 30) % 360)
 
-        def check_connection():
-            """Проверяет соединение и выводит результаты в окно."""
-            try:
-                update_output("Попытка подключения...")  # Стартовый вывод
-                data = self.app.endpoints_manager.view.get_data()
-                success, test_result = connector.test_connection(data)
-                if success:
-                    self.app.root.after(0, lambda: status_label.config(text="Connected"))
-                    self.app.root.after(0, lambda: status_icon.delete("all"))
-                    self.app.root.after(0, lambda: status_icon.create_text(10, 10, text="✔", font=("Arial", 14), fill="green"))
-                    self.app.root.after(0, lambda: update_output("Соединение успешно установлено!"))
-                else:
-                    self.app.root.after(0, lambda: update_output(str(test_result)))
-                    self.app.root.after(0, lambda: status_label.config(text="Failed"))
-                    self.app.root.after(0, lambda: status_icon.delete("all"))
-                    self.app.root.after(0, lambda: status_icon.create_text(10, 10, text="✖", font=("Arial", 14), fill="red"))
-            except Exception as e:
-                error_message = f"Ошибка: {e}"
-                self.app.root.after(0, lambda: update_output(error_message))
-                self.app.root.after(0, lambda: status_label.config(text="Failed"))
-                self.app.root.after(0, lambda: status_icon.delete("all"))
-                self.app.root.after(0, lambda: status_icon.create_text(10, 10, text="✖", font=("Arial", 14), fill="red"))
+        def set_failed():
+            status_label.config(text="Failed")
+            status_icon.delete("all")
+            status_icon.create_text(10, 10, text="✖", font=("Arial", 14), fill="red")
+
+        def on_event(event):
+            """Выводит результат проверки из движка выполнения."""
+            self.app.dispatcher.unsubscribe(event.key)
+            success, test_result = event.payload
+            if success:
+                status_label.config(text="Connected")
+                status_icon.delete("all")
+                status_icon.create_text(10, 10, text="✔", font=("Arial", 14), fill="green")
+                update_output("Соединение успешно установлено!")
+            else:
+                update_output(str(test_result))
+                set_failed()
 
         animate_spinner()
-        threading.Thread(target=check_connection, daemon=True).start()
\ No newline at end of file
+        update_output("Попытка подключения...")  # Стартовый вывод
+        try:
+            data = self.app.endpoints_manager.view.get_data()
+            params = connector.build_params({**endpoint.to_dict(), **data})
+            handle = self.app.engine.submit_test(connector, params)
+            self.app.dispatcher.subscribe(handle.run_id, on_event)
+        except Exception as e:
+            update_output(f"Ошибка: {e}")
+            set_failed()
@@ -0,0 +1,377 @@
+"""
+This module provides incremental syntax highlighting for the script editor.
+
+`LineTokenCache` keeps the pygments tokens and lexer state of every line of
+the last highlighted text. A new pass only re-lexes lines from the last
+clean state boundary before the first changed line, and stops as soon as
+the lexer state converges with the cached state of an unchanged line.
+
+`IncrementalHighlighter` binds the cache to a `tk.Text` widget: lexing runs
+on a worker thread, tags are applied on the Tk thread in batches of lines,
+and passes over unchanged content are skipped by hash.
+"""
+
+import bisect
+import hashlib
+import logging
+import tkinter as tk
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from itertools import accumulate
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from pygments.lexer import Lexer, RegexLexer
+from pygments.lexers import get_lexer_by_name
+from pygments.token import Error, Token, Whitespace, _TokenType
+from pygments.util import ClassNotFound
+
+logger = logging.getLogger(__name__)
+
+STYLES = {
+    Token.Keyword: {"foreground": "blue"},
+    Token.Name: {"foreground": "darkgreen"},
+    Token.String: {"foreground": "darkred"},
+    Token.Comment: {"foreground": "gray"},
+    Token.Number: {"foreground": "purple"},
+    Token.Operator: {"foreground": "black"},
+}
+TAGS = [str(token_type) for token_type in STYLES]
+
+DEBOUNCE_MS = 100
+POLL_MS = 20
+BATCH_LINES = 500
+
+LineTokens = List[Tuple[int, int, str]]
+State = Optional[Tuple[str, ...]]
+
+
+def tag_for(token_type: _TokenType) -> Optional[str]:
+    """Return the styled tag for a token type, falling back to its nearest styled parent."""
+    while token_type is not None:
+        if token_type in STYLES:
+            return str(token_type)
+        token_type = token_type.parent
+    return None
+
+
+def get_lexer(language: str) -> Optional[Lexer]:
+    """Return a pygments lexer for the interpreter name, or None if it is unknown."""
+    try:
+        return get_lexer_by_name(language)
+    except ClassNotFound:
+        return None
+
+
+def _matches(lexer: RegexLexer, text: str, pos: int,
+             stack: List[str]) -> Iterator[Tuple[int, List[Tuple[int, Any, str]]]]:
+    """
+    Same loop as `RegexLexer.get_tokens_unprocessed`, started at `pos` with a
+    given state stack. Yields `(match_start, tokens)` per match; at yield time
+    `stack` holds the lexer state at `match_start`.
+    """
+    tokendefs = lexer._tokens
+    statetokens = tokendefs[stack[-1]]
+    while True:
+        for rexmatch, action, new_state in statetokens:
+            m = rexmatch(text, pos)
+            if m:
+                if action is None:
+                    tokens = []
+                elif type(action) is _TokenType:
+                    tokens = [(pos, action, m.group())]
+                else:
+                    tokens = list(action(lexer, m))
+                yield pos, tokens
+                pos = m.end()
+                if new_state is not None:
+                    if isinstance(new_state, tuple):
+                        for state in new_state:
+                            if state == "#pop":
+                                if len(stack) > 1:
+                                    stack.pop()
+                            elif state == "#push":
+                                stack.append(stack[-1])
+                            else:
+                                stack.append(state)
+                    elif isinstance(new_state, int):
+                        if abs(new_state) >= len(stack):
+                            del stack[1:]
+                        else:
+                            del stack[new_state:]
+                    elif new_state == "#push":
+                        stack.append(stack[-1])
+                    statetokens = tokendefs[stack[-1]]
+                break
+        else:
+            if pos >= len(text):
+                return
+            if text[pos] == "\n":
+                yield pos, [(pos, Whitespace, "\n")]
+                stack[:] = ["root"]
+                statetokens = tokendefs["root"]
+            else:
+                yield pos, [(pos, Error, text[pos])]
+            pos += 1
+
+
+@dataclass
+class HighlightPass:
+    """
+    Result of lexing one snapshot of the text.
+
+    Lines `start..stop` (new numbering) got new tokens in `changed`; the tags of
+    all other lines are still valid in the widget.
+    """
+
+    text_hash: bytes
+    lines: List[str]
+    states: List[State]
+    tokens: List[LineTokens]
+    start: int = 0
+    stop: int = 0
+    changed: Dict[int, LineTokens] = field(default_factory=dict)
+
+
+class LineTokenCache:
+    """
+    Per-line tokens and lexer states of the last highlighted text.
+
+    `states[i]` is the lexer stack at the start of line `i`, or None when a
+    token runs across that line boundary and lexing cannot resume there.
+    """
+
+    def __init__(self, lexer: Optional[Lexer]) -> None:
+        self.lexer = lexer
+        self.lines: List[str] = []
+        self.states: List[State] = []
+        self.tokens: List[LineTokens] = []
+
+    def invalidate(self, from_line: int = 0) -> None:
+        """Forget everything cached from `from_line` on."""
+        del self.lines[from_line:]
+        del self.states[from_line:]
+        del self.tokens[from_line:]
+
+    def commit(self, result: HighlightPass) -> None:
+        """Make a pass the new baseline (after its tags are in the widget)."""
+        self.lines, self.states, self.tokens = result.lines, result.states, result.tokens
+
+    def prepare(self, text: str, text_hash: bytes = b"") -> HighlightPass:
+        """
+        Lex the lines of `text` that differ from the cached text.
+        Pure with respect to the cache, so it may run on a worker thread.
+        """
+        lines = text.split("\n")
+        old_lines, old_states, old_tokens = self.lines, self.states, self.tokens
+
+        # Changed region: everything between the common prefix and the common suffix.
+        limit = min(len(lines), len(old_lines))
+        prefix = 0
+        while prefix < limit and lines[prefix] == old_lines[prefix]:
+            prefix += 1
+        suffix = 0
+        while suffix < limit - prefix and lines[-1 - suffix] == old_lines[-1 - suffix]:
+            suffix += 1
+        stable_from = len(lines) - suffix
+        delta = len(lines) - len(old_lines)
+
+        # Resume from the last clean state boundary strictly before the change:
+        # a token ending the previous line may depend on the changed one.
+        start = min(prefix - 1, len(old_states) - 1)
+        while start > 0 and old_states[start] is None:
+            start -= 1
+        start = max(start, 0)
+
+        result = HighlightPass(text_hash, lines, old_states[:start], old_tokens[:start], start=start)
+        if self.lexer is None:
+            result.states += [("root",)] * (len(lines) - start)
+            result.tokens += [[] for _ in range(len(lines) - start)]
+            result.stop = len(lines)
+            result.changed = {line: [] for line in range(start, len(lines))}
+            return result
+
+        offsets = [0] + list(accumulate(len(line) + 1 for line in lines))
+        source = text if text.endswith("\n") else text + "\n"
+        states: Dict[int, State] = {}
+        changed: Dict[int, LineTokens] = {line: [] for line in range(start, len(lines))}
+        stop = len(lines)
+
+        if isinstance(self.lexer, RegexLexer):
+            stack = list(old_states[start]) if start else ["root"]
+            matches = _matches(self.lexer, source, offsets[start], stack)
+        else:
+            # Lexers without a state stack can only start over from the top.
+            stack = None
+            matches = ((pos, [(pos, token_type, value)])
+                       for pos, token_type, value in self.lexer.get_tokens_unprocessed(source))
+
+        line = start
+        for match_start, tokens in matches:
+            while line < len(lines) and offsets[line] <= match_start:
+                if offsets[line] == match_start and stack is not None:
+                    states[line] = tuple(stack)
+                else:
+                    states[line] = None
+                if line == 0:
+                    states[line] = ("root",)
+                if (line >= stable_from and line > prefix and states[line] is not None
+                        and 0 <= line - delta < len(old_states) and old_states[line - delta] == states[line]):
+                    stop = line
+                    break
+                line += 1
+            if stop < len(lines):
+                break
+            for pos, token_type, value in tokens:
+                tag = tag_for(token_type)
+                if tag is None:
+                    continue
+                token_line = bisect.bisect_right(offsets, pos) - 1
+                column = pos - offsets[token_line]
+                for i, part in enumerate(value.split("\n")):
+                    if i:
+                        token_line += 1
+                        column = 0
+                    if part.strip() and token_line < len(lines):
+                        changed[token_line].append((column, column + len(part), tag))
+                    column += len(part)
+
+        for line in range(start, len(lines)):
+            states.setdefault(line, None)
+        if stop < len(lines):
+            for line in range(stop, len(lines)):
+                changed.pop(line, None)
+        result.stop = stop
+        result.changed = changed
+        result.states += [states[line] for line in range(start, stop)]
+        result.tokens += [changed[line] for line in range(start, stop)]
+        if stop < len(lines):
+            result.states += old_states[stop - delta:]
+            result.tokens += old_tokens[stop - delta:]
+        return result
+
+
+class IncrementalHighlighter:
+    """
+    Keeps the pygments highlighting of a `tk.Text` widget up to date as it is edited.
+    """
+
+    def __init__(self, text_widget: tk.Text, language: str) -> None:
+        self.text_widget = text_widget
+        self.cache = LineTokenCache(get_lexer(language))
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="highlight")
+        self._future: Optional[Future] = None
+        self._generation = 0
+        self._pending_generation = 0
+        self._applied_hash: Optional[bytes] = None
+        self._applying = False
+        self._again = False
+        self._debounce_job: Optional[str] = None
+        self._poll_job: Optional[str] = None
+        self._stopped = False
+
+        for token_type, style in STYLES.items():
+            text_widget.tag_configure(str(token_type), **style)
+        text_widget.bind("<<Modified>>", self._on_modified, add="+")
+        text_widget.bind("<Destroy>", lambda e: self.stop(), add="+")
+
+    def set_language(self, language: str) -> None:
+        """Switch the lexer and re-highlight from scratch."""
+        self.cache = LineTokenCache(get_lexer(language))
+        self._applied_hash = None
+        self._generation += 1
+        self.schedule()
+
+    def schedule(self, delay: int = DEBOUNCE_MS) -> None:
+        """Start a highlighting pass after `delay` ms of no further edits."""
+        if self._stopped:
+            return
+        if self._debounce_job is not None:
+            self.text_widget.after_cancel(self._debounce_job)
+        self._debounce_job = self.text_widget.after(delay, self._start_pass)
+
+    def stop(self) -> None:
+        """Cancel pending work and shut the worker down."""
+        self._stopped = True
+        for job in (self._debounce_job, self._poll_job):
+            if job is not None:
+                try:
+                    self.text_widget.after_cancel(job)
+                except tk.TclError:
+                    pass
+        self._debounce_job = self._poll_job = None
+        self._executor.shutdown(wait=False)
+
+    def _on_modified(self, _event: Any = None) -> None:
+        if not self.text_widget.edit_modified():
+            return
+        self.text_widget.edit_modified(False)
+        self._generation += 1
+        self.schedule()
+
+    def _start_pass(self) -> None:
+        self._debounce_job = None
+        if self._stopped:
+            return
+        if self._future is not None or self._applying:
+            self._again = True
+            return
+        text = self.text_widget.get("1.0", "end-1c")
+        text_hash = hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+        if text_hash == self._applied_hash:
+            return
+        self._pending_generation = self._generation
+        self._future = self._executor.submit(self.cache.prepare, text, text_hash)
+        self._poll_job = self.text_widget.after(POLL_MS, self._poll)
+
+    def _poll(self) -> None:
+        self._poll_job = None
+        if self._stopped:
+            return
+        if not self._future.done():
+            self._poll_job = self.text_widget.after(POLL_MS, self._poll)
+            return
+        future, self._future = self._future, None
+        if self._generation != self._pending_generation:
+            # The text changed while it was being lexed; the result is stale.
+            self._restart()
+            return
+        try:
+            result = future.result()
+        except Exception as e:
+            logger.exception("IncrementalHighlighter: lexing failed: %s", e)
+            self.cache.invalidate()
+            return
+        self._applying = True
+        self._apply_batch(result, result.start)
+
+    def _apply_batch(self, result: HighlightPass, first: int) -> None:
+        if self._stopped:
+            return
+        if self._generation != self._pending_generation:
+            # Tags of lines result.start..first are already new; force them to be re-lexed.
+            self.cache.invalidate(result.start)
+            self._applying = False
+            self._restart()
+            return
+        widget = self.text_widget
+        last = min(first + BATCH_LINES, result.stop)
+        ranges: Dict[str, List[str]] = {}
+        for line in range(first, last):
+            for start, end, tag in result.changed.get(line, ()):
+                ranges.setdefault(tag, []).extend((f"{line + 1}.{start}", f"{line + 1}.{end}"))
+        for tag in TAGS:
+            widget.tag_remove(tag, f"{first + 1}.0", f"{last + 1}.0")
+        for tag, indices in ranges.items():
+            widget.tag_add(tag, *indices)
+        if last < result.stop:
+            widget.after_idle(lambda: self._apply_batch(result, last))
+            return
+        self.cache.commit(result)
+        self._applied_hash = result.text_hash
+        self._applying = False
+        if self._again:
+            self._restart()
+
+    def _restart(self) -> None:
+        self._again = False
+        self.schedule(0)
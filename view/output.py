@@ -0,0 +1,93 @@
+"""
+This module provides the OutputView class, which pumps buffered script
+output into a Tk text widget in coalesced batches at a capped frame rate.
+"""
+
+import tkinter as tk
+from typing import Any, Callable, Optional
+
+from controller.output import OutputBuffer
+
+DEFAULT_FPS = 20
+STDERR_COLOR = "darkred"
+
+
+class OutputView:
+    """
+    Flushes an `OutputBuffer` into a `tk.Text` widget.
+
+    All output gathered since the previous frame is inserted with a single
+    `insert`/`see` call, and the widget is trimmed to the buffer's scrollback
+    size, so a run printing hundreds of thousands of lines costs at most
+    `fps` widget updates per second. stderr output is interleaved with
+    stdout in arrival order and highlighted with the "stderr" tag.
+    """
+
+    def __init__(self, root: Any, text_widget: tk.Text, buffer: OutputBuffer, fps: int = DEFAULT_FPS) -> None:
+        self.root = root
+        self.text_widget = text_widget
+        self.buffer = buffer
+        self.interval = max(1, 1000 // max(1, int(fps)))
+        self._job: Optional[str] = None
+        self._finished = False
+        self._on_idle: Optional[Callable[[], None]] = None
+        self.text_widget.tag_configure("stderr", foreground=STDERR_COLOR)
+
+    def start(self) -> None:
+        """Start the periodic flush."""
+        self._finished = False
+        if self._job is None:
+            self._job = self.root.after(self.interval, self._tick)
+
+    def finish(self, on_idle: Optional[Callable[[], None]] = None) -> None:
+        """
+        Mark the run as finished: flush what is left and stop the timer.
+
+        :param on_idle: Called once the last batch has been shown.
+        """
+        self._finished = True
+        self._on_idle = on_idle
+
+    def stop(self) -> None:
+        """Cancel the periodic flush immediately."""
+        if self._job is not None:
+            try:
+                self.root.after_cancel(self._job)
+            except tk.TclError:
+                pass
+            self._job = None
+
+    def flush(self) -> None:
+        """Insert everything buffered since the previous flush."""
+        reset, segments = self.buffer.drain()
+        if not reset and not segments:
+            return
+        widget = self.text_widget
+        widget.config(state="normal")
+        if reset:
+            widget.delete("1.0", "end")
+        # One insert call for the whole batch; stderr segments get their own tag.
+        args = []
+        for stream, text in segments:
+            args.extend((text, (stream,) if stream == "stderr" else ()))
+        widget.insert("end", *args)
+        line_count = int(widget.index("end-1c").split(".")[0])
+        if line_count > self.buffer.max_lines:
+            widget.delete("1.0", f"{line_count - self.buffer.max_lines + 1}.0")
+        widget.see("end")
+        widget.config(state="disabled")
+
+    def _tick(self) -> None:
+        self._job = None
+        try:
+            if not self.text_widget.winfo_exists():
+                return
+            self.flush()
+        except tk.TclError:
+            # The window was closed while the run was still producing output.
+            return
+        if self._finished:
+            if self._on_idle:
+                self._on_idle()
+            return
+        self._job = self.root.after(self.interval, self._tick)
@@ -0,0 +1,89 @@
+"""
+This module provides the ProbeView class: a sortable table of bulk
+connection test results with per-phase latencies.
+"""
+
+import tkinter as tk
+from tkinter import ttk
+from typing import Any, Dict, List, Optional
+
+from controller.probe import ProbeResult, sort_results
+
+# Column id, title, width; phase columns show milliseconds
+COLUMNS = (("endpoint", "Endpoint", 180), ("status", "Status", 110), ("tcp", "TCP, ms", 70),
+           ("banner", "Banner, ms", 80), ("kex", "KEX, ms", 70), ("auth", "Auth, ms", 70),
+           ("connect", "Connect, ms", 80), ("total", "Total, ms", 80), ("error", "Error", 260))
+STATUS_COLORS = {"ok": "darkgreen", "failed": "darkred", "cached": "gray40"}
+
+
+def format_ms(value: Any) -> str:
+    """Seconds as whole milliseconds; empty for phases that were not reached."""
+    return "" if value is None else f"{value * 1000:.0f}"
+
+
+class ProbeView:
+    """
+    Result table that can be re-sorted by any column.
+
+    Results are kept in a list and the tree is rebuilt only on sort; new
+    results are appended as rows, so a run over thousands of hosts costs
+    one insert per host.
+    """
+
+    def __init__(self, parent: tk.Widget) -> None:
+        self.results: List[ProbeResult] = []
+        self.sort_key = "total"
+        self.reverse = True
+        self.frame = tk.Frame(parent)
+        self.tree = ttk.Treeview(self.frame, columns=[column for column, _, _ in COLUMNS], show="headings",
+                                 height=16)
+        for column, title, width in COLUMNS:
+            self.tree.heading(column, text=title, command=lambda c=column: self.sort(c))
+            self.tree.column(column, width=width, anchor="w" if column in ("endpoint", "error") else "e")
+        for tag, color in STATUS_COLORS.items():
+            self.tree.tag_configure(tag, foreground=color)
+        scrollbar = tk.Scrollbar(self.frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side="left", fill="both", expand=True)
+        scrollbar.pack(side="right", fill="y")
+
+    def pack(self, **kwargs) -> None:
+        """Pack the table frame into its parent."""
+        self.frame.pack(**kwargs)
+
+    def clear(self) -> None:
+        """Remove all results."""
+        self.results = []
+        self.tree.delete(*self.tree.get_children())
+
+    def add(self, result: ProbeResult) -> None:
+        """Append one result as a row."""
+        self.results.append(result)
+        self._insert(result)
+
+    def sort(self, column: str, reverse: Optional[bool] = None) -> None:
+        """
+        Sort by `column`. Without an explicit `reverse`, sorting by the same
+        column again flips the order; timings start with the slowest host.
+        """
+        if column == "error":
+            column = "status"
+        if reverse is None:
+            reverse = not self.reverse if column == self.sort_key else column not in ("endpoint", "status")
+        self.sort_key, self.reverse = column, reverse
+        self.tree.delete(*self.tree.get_children())
+        for result in sort_results(self.results, column, self.reverse):
+            self._insert(result)
+
+    def summary(self) -> Dict[str, int]:
+        """Number of succeeded, failed and cached results."""
+        return {"ok": sum(result.success for result in self.results),
+                "failed": sum(not result.success for result in self.results),
+                "cached": sum(result.cached for result in self.results)}
+
+    def _insert(self, result: ProbeResult) -> None:
+        values = [result.endpoint, result.status + (" (cached)" if result.cached else "")]
+        values += [format_ms(result.timings.get(phase)) for phase in ("tcp", "banner", "kex", "auth", "connect")]
+        values += [format_ms(result.total), result.error]
+        tag = "cached" if result.cached else "ok" if result.success else "failed"
+        self.tree.insert("", "end", values=values, tags=(tag,))
@@ -5,17 +5,16 @@ like syntax highlighting and form fields for script attributes.
 """
 
 import tkinter as tk
-from typing import Any, Optional, Type
+from typing import TYPE_CHECKING, Any, Optional, Type
 from tkinter import scrolledtext
-from pygments.token import Token
-from pygments.lexers import get_lexer_by_name
-from pygments import lex
-
 
 from model.script import Script
 from view.main import MainUI
 from view.theme import StyledLabel, StyledEntry, StyledCombobox
 
+if TYPE_CHECKING:
+    from view.highlight import IncrementalHighlighter
+
 
 class ScriptUI(MainUI):
     """
@@ -30,59 +29,20 @@ class ScriptUI(MainUI):
         self.name_entry: Optional[StyledEntry] = None
         self.interpreter_entry: Optional[tk.StringVar] = None
         self.endpoint_var: Optional[tk.StringVar] = None
+        self.highlighter: Optional["IncrementalHighlighter"] = None
 
 
-    def _add_syntax_highlighting(self, code: str, language: str) -> None:
+    def _add_syntax_highlighting(self, language: str) -> None:
+        """Подключает инкрементальную подсветку к полю кода"""
         if not self.script_text:
             return
+        # pygments is imported with the first opened script, not at startup.
+        from view.highlight import IncrementalHighlighter
 
-        text_widget = self.script_text
-        text_widget.config(state="normal")
-        text_widget.delete("1.0", tk.END)
-        text_widget.insert("1.0", code)
-
-        lexer = get_lexer_by_name(language, stripall=True)
-
-        # Удалим предыдущие теги
-        for tag in text_widget.tag_names():
-            text_widget.tag_delete(tag)
-
-        # Определяем стили
-        styles = {
-            Token.Keyword: {"foreground": "blue"},
-            Token.Name: {"foreground": "darkgreen"},
-            Token.String: {"foreground": "darkred"},
-            Token.Comment: {"foreground": "gray"},
-            Token.Number: {"foreground": "purple"},
-            Token.Operator: {"foreground": "black"},
-        }
-
-        for token_type, style in styles.items():
-            text_widget.tag_configure(str(token_type), **style)
-
-        # Начальная позиция в тексте
-        line = 1
-        column = 0
-
-        for token_type, token_text in lex(code, lexer):
-            lines = token_text.split("\n")
-
-            for i, part in enumerate(lines):
-                start_index = f"{line}.{column}"
-                end_col = column + len(part)
-                end_index = f"{line}.{end_col}"
-
-                if part.strip():  # не подсвечиваем пустые символы
-                    tag_name = str(token_type)
-                    text_widget.tag_add(tag_name, start_index, end_index)
-
-                column = end_col
-
-                if i < len(lines) - 1:
-                    line += 1
-                    column = 0
-
-        text_widget.config(state="normal")
+        if self.highlighter:
+            self.highlighter.stop()
+        self.highlighter = IncrementalHighlighter(self.script_text, language)
+        self.highlighter.schedule(0)
 
 
     def _create_labeled_widget(
@@ -112,6 +72,7 @@ class ScriptUI(MainUI):
         self.name_entry.insert(0, script.name)
 
         self.interpreter_entry = tk.StringVar(value=script.interpreter)
+        self.interpreter_entry.trace_add("write", lambda *_: self._on_interpreter_change())
         self._create_labeled_widget(frame,
                                     "Interpreter",
                                     StyledCombobox,
@@ -126,7 +87,12 @@ class ScriptUI(MainUI):
                                     value=list(self.app.data["endpoints"].keys()))
 
         self._create_code_field(self.app.content_frame, script.code)
-        self._add_syntax_highlighting(script.code, script.interpreter)
+        self._add_syntax_highlighting(script.interpreter)
+
+    def _on_interpreter_change(self) -> None:
+        """Перестраивает подсветку под выбранный интерпретатор"""
+        if self.highlighter and self.interpreter_entry:
+            self.highlighter.set_language(self.interpreter_entry.get())
 
 
     def _create_code_field(self, parent: tk.Widget, code: str = "") -> None:
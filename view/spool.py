@@ -0,0 +1,215 @@
+"""
+This module provides the SpoolView class: a virtualized viewer for run
+output spooled to disk, with line jumps and regex search.
+"""
+
+import re
+import threading
+import tkinter as tk
+import tkinter.font as tkfont
+from typing import Any, Optional, Tuple
+
+from controller.spool import Spool
+from view.output import DEFAULT_FPS, STDERR_COLOR
+
+MATCH_BACKGROUND = "#f37600"
+
+
+class SpoolView:
+    """
+    Shows the visible window of a `Spool` in a small `tk.Text`.
+
+    The text widget only ever holds the lines that fit on screen: each
+    frame re-reads that window from the memory-mapped spool when the
+    output grew or the view moved, so neither the Tk heap nor the frame
+    cost depends on the size of the output. While the view is at the end
+    it follows new output; scrolling up detaches it until End is pressed
+    or the view is scrolled back to the bottom.
+    """
+
+    def __init__(self, root: Any, parent: tk.Widget, spool: Spool, fps: int = DEFAULT_FPS) -> None:
+        self.root = root
+        self.spool = spool
+        self.interval = max(1, 1000 // max(1, int(fps)))
+        self.top = 0
+        self.follow = True
+        self.match: Optional[Tuple[int, int, int]] = None
+        self._rows = 20
+        self._shown: Optional[Tuple[int, int, int]] = None
+        self._job: Optional[str] = None
+        self._finished = False
+        self._search: Optional[threading.Thread] = None
+
+        self.frame = tk.Frame(parent)
+        search_bar = tk.Frame(self.frame)
+        search_bar.pack(fill="x")
+        tk.Label(search_bar, text="Regex").pack(side="left")
+        self.search_entry = tk.Entry(search_bar, width=30)
+        self.search_entry.pack(side="left", padx=4)
+        self.search_entry.bind("<Return>", lambda _e: self.find())
+        self.ignore_case = tk.BooleanVar(value=False)
+        tk.Checkbutton(search_bar, text="Aa", variable=self.ignore_case, onvalue=True,
+                       offvalue=False).pack(side="left")
+        tk.Button(search_bar, text="▼", command=self.find).pack(side="left")
+        tk.Button(search_bar, text="▲", command=lambda: self.find(backwards=True)).pack(side="left")
+        tk.Label(search_bar, text="Line").pack(side="left", padx=(10, 0))
+        self.line_entry = tk.Entry(search_bar, width=10)
+        self.line_entry.pack(side="left", padx=4)
+        self.line_entry.bind("<Return>", lambda _e: self._goto_entry())
+        self.status_label = tk.Label(search_bar, anchor="e", text="")
+        self.status_label.pack(side="right", fill="x", expand=True)
+
+        body = tk.Frame(self.frame)
+        body.pack(fill="both", expand=True)
+        self.text = tk.Text(body, wrap="none", height=20, width=80, state="disabled")
+        self.scrollbar = tk.Scrollbar(body, orient="vertical", command=self._yview)
+        self.text.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+        self.text.tag_configure("stderr", foreground=STDERR_COLOR)
+        self.text.tag_configure("match", background=MATCH_BACKGROUND)
+        self.text.bind("<Configure>", self._on_resize)
+        self.text.bind("<MouseWheel>", lambda e: self._yview("scroll", -3 if e.delta > 0 else 3, "units"))
+        self.text.bind("<Button-4>", lambda e: self._yview("scroll", -3, "units"))
+        self.text.bind("<Button-5>", lambda e: self._yview("scroll", 3, "units"))
+        for key, args in (("<Prior>", ("scroll", -1, "pages")), ("<Next>", ("scroll", 1, "pages")),
+                          ("<Control-Home>", ("moveto", 0)), ("<Control-End>", ("moveto", 1))):
+            self.text.bind(key, lambda _e, a=args: (self._yview(*a), "break")[1])
+
+    def pack(self, **kwargs) -> None:
+        """Pack the viewer frame into its parent."""
+        self.frame.pack(**kwargs)
+
+    def start(self) -> None:
+        """Start the periodic refresh."""
+        self._finished = False
+        if self._job is None:
+            self._job = self.root.after(self.interval, self._tick)
+
+    def finish(self) -> None:
+        """Mark the run as finished: refresh once more and stop the timer."""
+        self._finished = True
+
+    def stop(self) -> None:
+        """Cancel the periodic refresh immediately."""
+        if self._job is not None:
+            try:
+                self.root.after_cancel(self._job)
+            except tk.TclError:
+                pass
+            self._job = None
+
+    def goto(self, line: int) -> None:
+        """Scroll so that `line` (0-based) is at the top of the view."""
+        total = self.spool.line_count
+        self.top = max(0, min(line, total - self._rows))
+        self.follow = self.top + self._rows >= total
+        self.redraw()
+
+    def find(self, backwards: bool = False) -> None:
+        """Search for the regex in the entry, starting after (or before) the current match."""
+        pattern = self.search_entry.get()
+        # Tk variables may only be read on the Tk thread; the worker gets a plain bool.
+        ignore_case = bool(self.ignore_case.get())
+        if not pattern or (self._search is not None and self._search.is_alive()):
+            return
+        try:
+            re.compile(pattern)
+        except re.error as e:
+            self.status_label.config(text=f"Bad regex: {e}")
+            return
+        if self.match is not None:
+            start = self.match[0] if backwards else self.match[0] + 1
+        else:
+            start = self.top + self._rows if backwards else self.top
+        found = {}
+
+        def run(ignore_case: bool):
+            try:
+                found["match"] = self.spool.search(pattern, start, backwards, ignore_case)
+            except (ValueError, re.error) as e:
+                found["error"] = str(e)
+
+        # Searching a multi-gigabyte spool takes a while; the UI keeps refreshing meanwhile.
+        self.status_label.config(text="Searching...")
+        self._search = threading.Thread(target=run, args=(ignore_case,), name="spool-search", daemon=True)
+        self._search.start()
+        self._poll_search(found)
+
+    def redraw(self, force: bool = False) -> None:
+        """Re-read and show the visible window if the output or the position changed."""
+        total = self.spool.line_count
+        if self.follow:
+            self.top = max(0, total - self._rows)
+        shown = (self.top, min(total, self.top + self._rows), hash(self.match))
+        if shown == self._shown and not force:
+            return
+        self._shown = shown
+        widget = self.text
+        widget.config(state="normal")
+        widget.delete("1.0", "end")
+        args = []
+        for text, is_stderr in self.spool.lines(self.top, self._rows):
+            args.extend((text + "\n", ("stderr",) if is_stderr else ()))
+        if args:
+            widget.insert("end", *args)
+        if self.match is not None and self.top <= self.match[0] < self.top + self._rows:
+            row = self.match[0] - self.top + 1
+            widget.tag_add("match", f"{row}.{self.match[1]}", f"{row}.{self.match[2]}")
+            widget.see(f"{row}.{self.match[1]}")
+        widget.config(state="disabled")
+        self._update_scrollbar(total)
+
+    def _update_scrollbar(self, total: int) -> None:
+        total = max(1, total)
+        self.scrollbar.set(self.top / total, min(1.0, (self.top + self._rows) / total))
+        mode = "following" if self.follow else f"line {self.top + 1}"
+        if not (self._search is not None and self._search.is_alive()):
+            self.status_label.config(text=f"{total} lines, {mode}")
+
+    def _yview(self, *args) -> None:
+        total = self.spool.line_count
+        if args[0] == "moveto":
+            top = int(float(args[1]) * total)
+        else:
+            step = self._rows if args[2] == "pages" else 1
+            top = self.top + int(args[1]) * step
+        self.goto(top)
+
+    def _goto_entry(self) -> None:
+        try:
+            line = int(self.line_entry.get()) - 1
+        except ValueError:
+            return
+        self.goto(line - self._rows // 2)
+
+    def _poll_search(self, found: dict) -> None:
+        if self._search is not None and self._search.is_alive():
+            self.root.after(50, self._poll_search, found)
+            return
+        if "error" in found:
+            self.status_label.config(text=found["error"])
+            return
+        self.match = found.get("match")
+        if self.match is None:
+            self.status_label.config(text="Not found")
+            self.redraw(force=True)
+            return
+        self.goto(self.match[0] - self._rows // 2)
+
+    def _on_resize(self, _event) -> None:
+        font = tkfont.Font(font=self.text["font"])
+        self._rows = max(1, self.text.winfo_height() // max(1, font.metrics("linespace")))
+        self.redraw(force=True)
+
+    def _tick(self) -> None:
+        self._job = None
+        try:
+            if not self.text.winfo_exists():
+                return
+            self.redraw()
+        except (tk.TclError, ValueError):
+            # The window was closed (or the spool released) while the run was going.
+            return
+        if self._finished:
+            return
+        self._job = self.root.after(self.interval, self._tick)
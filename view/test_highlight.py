@@ -0,0 +1,78 @@
+"""Unit-тесты для инкрементальной подсветки view.highlight."""
+
+from view.highlight import LineTokenCache, get_lexer, tag_for
+from pygments.token import Token
+
+CODE = "\n".join(
+    ["import os", "", "def main():"]
+    + [f"    value_{i} = {i}  # comment {i}" for i in range(200)]
+    + ["    return 'done'", ""]
+)
+
+
+def highlight(text, cache=None):
+    """Проход подсветки с фиксацией результата в кэше."""
+    cache = cache or LineTokenCache(get_lexer("python"))
+    result = cache.prepare(text)
+    cache.commit(result)
+    return cache, result
+
+
+def test_tag_for_uses_nearest_styled_parent():
+    """Подтипы токенов получают тег ближайшего стилизованного родителя."""
+    assert tag_for(Token.Keyword.Namespace) == "Token.Keyword"
+    assert tag_for(Token.Literal.String.Single) == "Token.Literal.String"
+    assert tag_for(Token.Text) is None
+
+
+def test_first_pass_tokenizes_every_line():
+    """Первый проход размечает весь текст."""
+    _, result = highlight(CODE)
+
+    assert (result.start, result.stop) == (0, len(CODE.split("\n")))
+    assert (0, 6, "Token.Keyword") in result.tokens[0]
+    assert (17, 28, "Token.Comment") in result.tokens[3]
+
+
+def test_edit_relexes_only_touched_lines():
+    """Правка одной строки перелексирует только её окрестность."""
+    cache, _ = highlight(CODE)
+    lines = CODE.split("\n")
+    lines[100] = "    value_97 = 'text'"
+    edited = "\n".join(lines)
+
+    _, result = highlight(edited, cache)
+
+    assert result.start >= 98 and result.stop <= 102
+    assert result.tokens == LineTokenCache(get_lexer("python")).prepare(edited).tokens
+
+
+def test_inserted_lines_shift_cached_tokens():
+    """Вставка строк сдвигает закэшированные токены последующих строк."""
+    cache, _ = highlight(CODE)
+    lines = CODE.split("\n")
+    edited = "\n".join(lines[:50] + ["    x = 1", "    y = 2"] + lines[50:])
+
+    _, result = highlight(edited, cache)
+
+    assert result.stop - result.start < 10
+    assert result.tokens == LineTokenCache(get_lexer("python")).prepare(edited).tokens
+
+
+def test_multiline_string_does_not_converge_early():
+    """Открытая многострочная строка перекрашивает строки до её закрытия."""
+    cache, _ = highlight(CODE)
+    lines = CODE.split("\n")
+    opened = "\n".join(lines[:10] + ['    """'] + lines[10:20] + ['    """'] + lines[20:])
+    _, result = highlight(opened, cache)
+
+    assert result.tokens == LineTokenCache(get_lexer("python")).prepare(opened).tokens
+    assert all(tag == "Token.Literal.String" for _, _, tag in result.tokens[15])
+    assert result.stop >= 22
+
+
+def test_unknown_language_has_no_tokens():
+    """Для неизвестного интерпретатора подсветка не строится."""
+    _, result = highlight("anything here", LineTokenCache(get_lexer("no-such-language")))
+
+    assert result.tokens == [[]]